@@ -10,7 +10,7 @@
 import os
 import logging
 import threading
-from typing import List, Any
+from typing import List, Dict, Any
 from .core import BaseManagerEventHandler
 from ..globalData.globalData import GlobalData
 from ..globalData.managerObjects import ManagerObjOption, ManagerObjNode, ManagerObjSensor, ManagerObjManager, \
@@ -151,6 +151,31 @@ class ManagerEventHandler(BaseManagerEventHandler):
 
         return result
 
+    def status_update_delta(self,
+                            msg_time: int,
+                            options: List[ManagerObjOption],
+                            profiles: List[ManagerObjProfile],
+                            nodes: List[ManagerObjNode],
+                            sensors: List[ManagerObjSensor],
+                            managers: List[ManagerObjManager],
+                            alerts: List[ManagerObjAlert],
+                            alert_levels: List[ManagerObjAlertLevel],
+                            deleted: Dict[str, List[Any]]) -> bool:
+
+        result = super().status_update_delta(msg_time,
+                                             options,
+                                             profiles,
+                                             nodes,
+                                             sensors,
+                                             managers,
+                                             alerts,
+                                             alert_levels,
+                                             deleted)
+
+        self._update_db_data_non_blocking()
+
+        return result
+
     def sensor_alert(self,
                      msg_time: int,
                      sensor_alert: ManagerObjSensorAlert) -> bool:
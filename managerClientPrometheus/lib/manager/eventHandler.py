@@ -7,7 +7,7 @@
 #
 # Licensed under the GNU Affero General Public License, version 3.
 import logging
-from typing import List, Any
+from typing import List, Dict, Any
 from .core import BaseManagerEventHandler
 from .prometheus import Prometheus
 from ..globalData.globalData import GlobalData
@@ -115,3 +115,38 @@ class ManagerEventHandler(BaseManagerEventHandler):
             result = False
 
         return result
+
+    def status_update_delta(self,
+                            msg_time: int,
+                            options: List[ManagerObjOption],
+                            profiles: List[ManagerObjProfile],
+                            nodes: List[ManagerObjNode],
+                            sensors: List[ManagerObjSensor],
+                            managers: List[ManagerObjManager],
+                            alerts: List[ManagerObjAlert],
+                            alert_levels: List[ManagerObjAlertLevel],
+                            deleted: Dict[str, List[Any]]) -> bool:
+
+        result = super().status_update_delta(msg_time,
+                                             options,
+                                             profiles,
+                                             nodes,
+                                             sensors,
+                                             managers,
+                                             alerts,
+                                             alert_levels,
+                                             deleted)
+
+        sensors_list = list()
+        for sensor in self._system_data.get_sensors_list():
+            if sensor.dataType == SensorDataType.INT or sensor.dataType == SensorDataType.FLOAT:
+                sensors_list.append(sensor)
+
+        try:
+            self._prometheus.update_sensors_data(sensors_list)
+        except Exception as e:
+            logging.exception("[%s]: Updating Prometheus data for Sensors failed."
+                              % self._log_tag)
+            result = False
+
+        return result
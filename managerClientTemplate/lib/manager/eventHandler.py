@@ -7,7 +7,7 @@
 #
 # Licensed under the GNU Affero General Public License, version 3.
 
-from typing import List, Any
+from typing import List, Dict, Any
 from .core import BaseManagerEventHandler
 from ..globalData.globalData import GlobalData
 from ..globalData.managerObjects import ManagerObjOption, ManagerObjNode, ManagerObjSensor, ManagerObjManager, ManagerObjAlert, \
@@ -100,3 +100,29 @@ class ManagerEventHandler(BaseManagerEventHandler):
         print("ManagerEventHandler: status_update")
 
         return result
+
+    def status_update_delta(self,
+                            msg_time: int,
+                            options: List[ManagerObjOption],
+                            profiles: List[ManagerObjProfile],
+                            nodes: List[ManagerObjNode],
+                            sensors: List[ManagerObjSensor],
+                            managers: List[ManagerObjManager],
+                            alerts: List[ManagerObjAlert],
+                            alert_levels: List[ManagerObjAlertLevel],
+                            deleted: Dict[str, List[Any]]) -> bool:
+
+        result = super().status_update_delta(msg_time,
+                                             options,
+                                             profiles,
+                                             nodes,
+                                             sensors,
+                                             managers,
+                                             alerts,
+                                             alert_levels,
+                                             deleted)
+
+        # DEVELOPERS: add your code here
+        print("ManagerEventHandler: status_update_delta")
+
+        return result
@@ -9,9 +9,13 @@
 
 import sys
 import os
+import signal
 from lib import ConnectionWatchdog, CSVWatchdog
 from lib import ServerSession, ThreadedTCPServer
+from lib import AsyncServer
 from lib import VersionInformerSensor
+from lib import SenderDispatcher
+from lib import StatusTracker
 from lib import SensorAlertExecuter
 from lib import ManagerUpdateExecuter
 from lib import OptionExecuter
@@ -39,6 +43,14 @@ if __name__ == '__main__':
 
     random.seed()
 
+    # start the worker threads that send messages to the clients
+    globalData.logger.info("[%s] Starting sender dispatcher threads." % fileName)
+    globalData.sender_dispatcher = SenderDispatcher(globalData)
+    globalData.sender_dispatcher.start()
+
+    # create the object that keeps track of the status changes for the managers
+    globalData.status_tracker = StatusTracker(globalData.statusDeltaMaxLag)
+
     # start the thread that handles all sensor alerts
     globalData.logger.info("[%s] Starting sensor alert manage thread." % fileName)
     globalData.sensorAlertExecuter = SensorAlertExecuter(globalData)
@@ -71,17 +83,36 @@ if __name__ == '__main__':
     globalData.error_state_executer.daemon = True
     globalData.error_state_executer.start()
 
+    # start the thread that writes the sensor history (if the history is enabled)
+    if globalData.sensor_history is not None:
+        globalData.logger.info("[%s] Starting sensor history thread." % fileName)
+        globalData.sensor_history.start()
+
+    # start the thread that writes the snapshots of the storage (if snapshots are enabled)
+    if globalData.storage_snapshot is not None:
+        globalData.logger.info("[%s] Starting storage snapshot thread." % fileName)
+        globalData.storage_snapshot.start()
+
+    # start the thread that writes the sensor alert journal (if the journal is enabled)
+    if globalData.sensor_alert_journal is not None:
+        globalData.logger.info("[%s] Starting sensor alert journal thread." % fileName)
+        globalData.sensor_alert_journal.start()
+
     # start server process
     while True:
         try:
-            server = ThreadedTCPServer(globalData, ('0.0.0.0', globalData.server_port), ServerSession)
+            if globalData.server_mode == "async":
+                server = AsyncServer(globalData, ('0.0.0.0', globalData.server_port))
+
+            else:
+                server = ThreadedTCPServer(globalData, ('0.0.0.0', globalData.server_port), ServerSession)
             break
 
         except Exception as e:
             globalData.logger.exception("[%s]: Starting server failed. Try again in 5 seconds." % fileName)
             time.sleep(5)
 
-    globalData.logger.info("[%s] Starting server thread." % fileName)
+    globalData.logger.info("[%s] Starting server thread (mode: %s)." % (fileName, globalData.server_mode))
     serverThread = threading.Thread(target=server.serve_forever)
     # set thread to daemon
     # => threads terminates when main thread terminates
@@ -134,6 +165,38 @@ if __name__ == '__main__':
     while not globalData.connectionWatchdog.isInitialized():
         time.sleep(0.5)
 
-    # handle requests in an infinity loop
-    while True:
-        server.handle_request()
+    # Stop the server on SIGTERM the same way as on SIGINT so that the shutdown below is executed.
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+
+    try:
+        # handle requests in an infinity loop
+        if isinstance(server, ThreadedTCPServer):
+            while True:
+                server.handle_request()
+
+        # The async server handles all requests in its own event loop thread.
+        else:
+            serverThread.join()
+
+    finally:
+        # Write all pending changes before the server stops.
+        globalData.logger.info("[%s] Stopping server." % fileName)
+
+        # Stop the persistent instrumentation workers.
+        if globalData.sensorAlertExecuter is not None:
+            globalData.sensorAlertExecuter.exit()
+
+        if globalData.sensor_history is not None:
+            globalData.sensor_history.exit()
+            globalData.sensor_history.close()
+
+        if globalData.sensor_alert_journal is not None:
+            globalData.sensor_alert_journal.exit()
+            globalData.sensor_alert_journal.close()
+
+        # Write the final snapshot before the storage is closed.
+        if globalData.storage_snapshot is not None:
+            globalData.storage_snapshot.exit()
+            globalData.storage_snapshot.close()
+
+        globalData.storage.close()
@@ -8,7 +8,9 @@
 # Licensed under the GNU Affero General Public License, version 3.
 
 from .watchdogs import ConnectionWatchdog, CSVWatchdog
-from .server import ServerSession, ThreadedTCPServer, AsynchronousSender
+from .server import ServerSession, ThreadedTCPServer
+from .asyncServer import AsyncServer, AsyncServerSession
+from .admission import AdmissionController
 from .storage import Sqlite
 from .alert import SensorAlertExecuter
 from .localObjects import Sensor, AlertLevel
@@ -16,6 +18,9 @@ from .internalSensors import VersionInformerSensor
 from .config import parse_config
 from .users import CSVBackend
 from .manager import ManagerUpdateExecuter
+from .sender import SenderDispatcher
+from .status import StatusTracker
+from .tls import TlsContext
 from .option import OptionExecuter
 from .update import Updater
 from .survey import SurveyExecuter
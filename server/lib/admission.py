@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+
+# written by sqall
+# twitter: https://twitter.com/sqall01
+# blog: https://h4des.org
+# github: https://github.com/sqall01
+#
+# Licensed under the GNU Affero General Public License, version 3.
+
+import collections
+import threading
+import time
+from typing import Callable, Dict, Any
+
+
+class AdmissionController:
+    """
+    Limits the number of client sessions that are set up concurrently (TLS/SSL handshake, authentication and
+    registration). If all slots are taken, the sessions are queued and admitted in the order they arrived
+    as soon as a slot is released. This keeps the server responsive if a large number of clients
+    reconnects at the same time (for example, after a restart of the server).
+    """
+
+    def __init__(self, max_concurrent: int):
+        """
+        :param max_concurrent: maximal number of sessions that are set up concurrently
+        """
+        self._max_concurrent = max_concurrent
+        self._lock = threading.Lock()
+        self._active = 0
+        self._queue = collections.deque()
+
+        self._admitted_count = 0
+        self._queued_count = 0
+        self._peak_active = 0
+        self._peak_queued = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    @property
+    def active(self) -> int:
+        return self._active
+
+    @property
+    def queued(self) -> int:
+        return len(self._queue)
+
+    def request(self, callback: Callable[[], None]):
+        """
+        Requests a slot for a session setup. The given function is called as soon as the slot is granted,
+        either directly by this function or by the thread that releases a slot. The slot has to be released
+        via release() after the session setup has finished.
+
+        :param callback: function that is called when the slot is granted
+        """
+        with self._lock:
+            if self._active >= self._max_concurrent:
+                self._queue.append((time.time(), callback))
+                self._queued_count += 1
+                self._peak_queued = max(self._peak_queued, len(self._queue))
+                return
+
+            self._active += 1
+            self._admitted_count += 1
+            self._peak_active = max(self._peak_active, self._active)
+
+        callback()
+
+    def acquire(self):
+        """
+        Blocks until a slot for a session setup is granted. The slot has to be released via release()
+        after the session setup has finished.
+        """
+        event = threading.Event()
+        self.request(event.set)
+        event.wait()
+
+    def release(self):
+        """
+        Releases a slot and hands it over to the next queued session setup.
+        """
+        with self._lock:
+            if not self._queue:
+                self._active -= 1
+                return
+
+            enqueued, callback = self._queue.popleft()
+            wait_time = time.time() - enqueued
+            self._wait_total += wait_time
+            self._wait_max = max(self._wait_max, wait_time)
+            self._admitted_count += 1
+
+        callback()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Gets the statistics of the admission controller.
+
+        :return: dictionary with the number of admitted and queued session setups and the waiting times in seconds
+        """
+        with self._lock:
+            dequeued_count = self._queued_count - len(self._queue)
+            return {"active": self._active,
+                    "queued": len(self._queue),
+                    "admitted": self._admitted_count,
+                    "queued_total": self._queued_count,
+                    "peak_active": self._peak_active,
+                    "peak_queued": self._peak_queued,
+                    "wait_mean": (self._wait_total / dequeued_count) if dequeued_count else 0.0,
+                    "wait_max": self._wait_max}
@@ -7,15 +7,21 @@
 #
 # Licensed under the GNU Affero General Public License, version 3.
 
+import functools
+import heapq
 import logging
 import threading
 import os
 import time
-from typing import List, Tuple, Optional, Any, Dict
-from .instrumentation import Instrumentation, InstrumentationPromise
-from ..server import AsynchronousSender
+from typing import List, Tuple, Optional, Any, Dict, Set, FrozenSet, Union
+from .instrumentation import Instrumentation, InstrumentationPromise, PromiseState
+from .instrumentationFunction import InstrumentationFunctionPool
+from .instrumentationWorker import InstrumentationWorkerPool
+from .rules import AlertLevelRules
+from ..sender import SensorAlertMessage
 from ..localObjects import SensorAlert, AlertLevel
 from ..internalSensors import AlertLevelInstrumentationErrorSensor
+from ..journal import JournalOutcome
 from ..globalData.globalData import GlobalData
 
 
@@ -133,13 +139,19 @@ class SensorAlertState:
         else:
             return self._init_sensor_alert
 
+    @property
+    def time_valid(self) -> int:
+        return self._time_valid
+
     def is_alert_delay_passed(self) -> bool:
         return int(time.time()) >= self._time_valid
 
 
 class SensorAlertExecuter(threading.Thread):
     """
-    This class is woken up if a sensor alert is received and executes all necessary steps
+    This class is woken up if a sensor alert is received and executes all necessary steps. Sensor alerts are only
+    processed when something happens to them: when they are received, when their alert delay has passed (kept in a
+    deadline heap), when their instrumentation has finished or when the system profile has changed.
     """
 
     def __init__(self,
@@ -151,8 +163,21 @@ class SensorAlertExecuter(threading.Thread):
         self._logger = self._global_data.logger
         self._manager_update_executer = self._global_data.managerUpdateExecuter
         self._storage = self._global_data.storage
-        self._alert_levels = self._global_data.alertLevels  # type: List[AlertLevel]
+        # Current system profile and the alert levels that trigger in it for each sensor alert state
+        # (read again only if the profile or the alert levels change).
+        self._curr_profile_id = None  # type: Optional[int]
+        self._curr_profile_rules = dict()  # type: Dict[int, FrozenSet[int]]
+
+        self._alert_levels = None  # type: Optional[List[AlertLevel]]
+        self._alert_levels_by_level = None  # type: Optional[Dict[int, AlertLevel]]
+        self._alert_level_rules = None  # type: Optional[AlertLevelRules]
+        # Pools of persistent instrumentation workers (or threads) for the alert levels using the worker
+        # (or python) mode.
+        self._instrumentation_pools = dict()  # type: Dict[int, Union[InstrumentationWorkerPool, InstrumentationFunctionPool]]
+        self.update_alert_levels()
         self._server_sessions = self._global_data.serverSessions
+        self._sender_dispatcher = self._global_data.sender_dispatcher
+        self._sensor_alert_journal = self._global_data.sensor_alert_journal
 
         # file nme of this file (used for logging)
         self._log_tag = os.path.basename(__file__)
@@ -164,6 +189,18 @@ class SensorAlertExecuter(threading.Thread):
         self._sensor_alert_queue = []
         self._sensor_alert_queue_lock = threading.Lock()
 
+        # Sensor alert states with a finished instrumentation and the flag to process all pending sensor alert states
+        # again (both are protected by the sensor alert queue lock).
+        self._instrumentation_finished_queue = []  # type: List[SensorAlertState]
+        self._reevaluation_needed = False
+
+        # Sensor alert states waiting for their alert delay as heap ordered by the time they are valid
+        # (a running counter keeps the order of states with the same time) and sensor alert states waiting for
+        # their instrumentation to finish. Both are only used by the executer thread.
+        self._deadline_heap = []  # type: List[Tuple[int, int, SensorAlertState]]
+        self._deadline_counter = 0
+        self._instrumentation_waiting = set()  # type: Set[SensorAlertState]
+
         self._exit_flag = False
 
         # Get instance of the internal alert level instrumentation error sensor (if exists).
@@ -187,6 +224,9 @@ class SensorAlertExecuter(threading.Thread):
             # Remove sensor alerts that do not have any suitable alert level.
             if not sensor_alert_state.suitable_alert_levels:
                 dropped_sensor_alerts.append(sensor_alert_state.sensor_alert)
+                self._journal_sensor_alert(sensor_alert_state,
+                                           sensor_alert_state.sensor_alert,
+                                           JournalOutcome.NOT_TRIGGERED)
                 continue
 
             if sensor_alert_state.uses_instrumentation and sensor_alert_state.instrumentation_finished:
@@ -195,17 +235,45 @@ class SensorAlertExecuter(threading.Thread):
                     self._logger.error("[%s]: Instrumentation for Sensor Alert '%s' failed."
                                        % (self._log_tag, sensor_alert_state.init_sensor_alert.description))
                     dropped_sensor_alerts.append(sensor_alert_state.init_sensor_alert)
+                    self._journal_sensor_alert(sensor_alert_state,
+                                               sensor_alert_state.init_sensor_alert,
+                                               JournalOutcome.INSTRUMENTATION_FAILED)
                     continue
 
                 # Still update state/data of sensor if sensor alert was suppressed by instrumentation.
                 elif instrumentation_promise.new_sensor_alert is None:
                     dropped_sensor_alerts.append(sensor_alert_state.init_sensor_alert)
+                    self._journal_sensor_alert(sensor_alert_state,
+                                               sensor_alert_state.init_sensor_alert,
+                                               JournalOutcome.SUPPRESSED)
                     continue
 
             new_sensor_alert_states.append(sensor_alert_state)
 
         return new_sensor_alert_states, dropped_sensor_alerts
 
+    def _journal_sensor_alert(self,
+                              sensor_alert_state: SensorAlertState,
+                              sensor_alert: SensorAlert,
+                              outcome: int):
+        """
+        Adds the processed sensor alert to the sensor alert journal (if the journal is enabled).
+        :param sensor_alert_state:
+        :param sensor_alert: sensor alert that was processed
+        :param outcome: result of the processing (see JournalOutcome)
+        """
+        if self._sensor_alert_journal is None or sensor_alert is None:
+            return
+
+        instrumentation = None
+        if sensor_alert_state.uses_instrumentation and sensor_alert_state.instrumentation_finished:
+            if sensor_alert_state.instrumentation_promise.was_success():
+                instrumentation = PromiseState.SUCCESS
+            else:
+                instrumentation = PromiseState.FAILED
+
+        self._sensor_alert_journal.add(sensor_alert, outcome, instrumentation)
+
     def _process_sensor_alert(self, sensor_alert_states: List[SensorAlertState]) -> List[SensorAlertState]:
         """
         Processes the sensor alert states by triggering them if the conditions are satisfied.
@@ -223,6 +291,15 @@ class SensorAlertExecuter(threading.Thread):
 
         return new_sensor_alert_states
 
+    def _instrumentation_finished(self, sensor_alert_state: SensorAlertState):
+        """
+        Callback of the instrumentation promise that wakes up the executer thread to process the sensor alert state.
+        :param sensor_alert_state:
+        """
+        with self._sensor_alert_queue_lock:
+            self._instrumentation_finished_queue.append(sensor_alert_state)
+        self._sensor_alert_event.set()
+
     def _queue_manager_update(self, sensor_alerts: List[SensorAlert]):
         """
         Adds data and state of sensor alert to the queue for state changes of the manager update executer
@@ -319,37 +396,32 @@ class SensorAlertExecuter(threading.Thread):
                                    % self._log_tag)
             return
 
-        # Send sensor alert to all manager and alert clients.
-        for server_session in self._server_sessions:
-            # Ignore sessions which do not exist yet and that are not alert or manager clients.
-            if server_session.clientComm is None:
-                continue
-            if (server_session.clientComm.nodeType != "manager"
-               and server_session.clientComm.nodeType != "alert"):
-                continue
-            if not server_session.clientComm.clientInitialized:
-                continue
-
-            # Only send a sensor alert to a client that actually handles a triggered alert level.
-            client_alert_levels = server_session.clientComm.clientAlertLevels
-            at_least_one = any(al in client_alert_levels
-                               for al in sensor_alert_state.sensor_alert.triggeredAlertLevels)
-            if not at_least_one:
-                continue
+        self._journal_sensor_alert(sensor_alert_state, sensor_alert, JournalOutcome.TRIGGERED)
 
-            # Sending sensor alert to manager/alert node via a thread to not block the sensor alert executer.
-            sensor_alert_process = AsynchronousSender(self._global_data, server_session.clientComm)
-            # set thread to daemon
-            # => threads terminates when main thread terminates
-            sensor_alert_process.daemon = True
-            sensor_alert_process.sendSensorAlert = True
-            sensor_alert_process.sensorAlert = sensor_alert
+        # Send sensor alert to all initialized manager and alert clients that actually handle a triggered alert level
+        # (looked up in the routing index of the server sessions).
+        for client_comm in self._server_sessions.get_clients_by_alert_levels(sensor_alert.triggeredAlertLevels):
 
+            # Queue sensor alert for manager/alert node to not block the sensor alert executer.
             self._logger.debug("[%s]: Sending Sensor Alert to manager/alert (%s:%d)."
-                               % (self._log_tag,
-                                  server_session.clientComm.clientAddress,
-                                  server_session.clientComm.clientPort))
-            sensor_alert_process.start()
+                               % (self._log_tag, client_comm.clientAddress, client_comm.clientPort))
+            self._sender_dispatcher.queue_message(client_comm, SensorAlertMessage(sensor_alert))
+
+    def _get_profile_rules(self) -> Optional[Dict[int, FrozenSet[int]]]:
+        """
+        Gets the alert levels that trigger in the current system profile for each sensor alert state. The system
+        profile is only read from the database if it is not known yet or has changed.
+        :return: dictionary with the state as key and the set of alert levels as value or None
+        """
+        if self._curr_profile_id is None:
+            option = self._storage.get_option_by_type("profile")
+            if option is None:
+                self._logger.error("[%s]: Unable to get 'profile' option from database." % self._log_tag)
+                return None
+            self._curr_profile_id = option.value
+            self._curr_profile_rules = self._alert_level_rules.get_profile_rules(self._curr_profile_id)
+
+        return self._curr_profile_rules
 
     def _update_suitable_alert_levels(self, sensor_alert_states: List[SensorAlertState]):
         """
@@ -358,85 +430,39 @@ class SensorAlertExecuter(threading.Thread):
         :param sensor_alert_states:
         """
 
-        option = self._storage.get_option_by_type("profile")
-        if option is None:
-            self._logger.error("[%s]: Unable to get 'profile' option from database." % self._log_tag)
+        profile_rules = self._get_profile_rules()
+        if profile_rules is None:
             return
-        curr_profile_id = option.value
 
         for sensor_alert_state in sensor_alert_states:
 
-            # Create a list of currently suitable alert levels.
-            suitable_alert_levels = list()
-            for alert_level in sensor_alert_state.suitable_alert_levels:
-
-                if sensor_alert_state.uses_instrumentation:
-
-                    if not sensor_alert_state.instrumentation_finished:
-                        suitable_alert_levels.append(alert_level)
-                        continue
-
-                    # If an instrumentation is used and it is finished, set it as processed since we now check
-                    # if it would still satisfy trigger conditions (this is important because the instrumentation
-                    # could negate the state of the original sensor alert and we need a state that says it was
-                    # processed).
-                    sensor_alert_state.instrumentation_processed = True
-
-                    # Instrumentation failed, but it is still suitable and will be filtered out later in the process.
-                    if not sensor_alert_state.instrumentation_promise.was_success():
-                        suitable_alert_levels.append(alert_level)
-                        continue
-
-                    # Instrumentation suppresses sensor alert, but it is still suitable
-                    # and will be filtered out later in the process.
-                    if sensor_alert_state.sensor_alert is None:
-                        suitable_alert_levels.append(alert_level)
-                        continue
-
-                    if curr_profile_id in alert_level.profiles:
-
-                        # If the alert level does trigger a sensor alert message for a "triggered" state
-                        # while the sensor alert is for the "triggered" state.
-                        if alert_level.triggerAlertTriggered and sensor_alert_state.sensor_alert.state == 1:
-                            suitable_alert_levels.append(alert_level)
-                            continue
-
-                        # If the alert level does trigger a sensor alert message for a "normal" state
-                        # while the sensor alert is for the "normal" state.
-                        if alert_level.triggerAlertNormal and sensor_alert_state.sensor_alert.state == 0:
-                            suitable_alert_levels.append(alert_level)
-                            continue
+            if sensor_alert_state.uses_instrumentation:
 
-                else:
+                # NOTE: triggered alert levels does not contain the alert level of the instrumentation before it is
+                # finished since the instrumentation script decides if it is actually triggers.
+                if not sensor_alert_state.instrumentation_finished:
+                    continue
 
-                    if curr_profile_id in alert_level.profiles:
+                # If an instrumentation is used and it is finished, set it as processed since we now check
+                # if it would still satisfy trigger conditions (this is important because the instrumentation
+                # could negate the state of the original sensor alert and we need a state that says it was
+                # processed).
+                sensor_alert_state.instrumentation_processed = True
 
-                        # If the alert level does trigger a sensor alert message for a "triggered" state
-                        # while the sensor alert is for the "triggered" state.
-                        if alert_level.triggerAlertTriggered and sensor_alert_state.sensor_alert.state == 1:
-                            suitable_alert_levels.append(alert_level)
-                            continue
+                # Instrumentation failed or suppresses sensor alert, but it is still suitable
+                # and will be filtered out later in the process.
+                if (not sensor_alert_state.instrumentation_promise.was_success()
+                        or sensor_alert_state.sensor_alert is None):
+                    continue
 
-                        # If the alert level does trigger a sensor alert message for a "normal" state
-                        # while the sensor alert is for the "normal" state.
-                        if alert_level.triggerAlertNormal and sensor_alert_state.sensor_alert.state == 0:
-                            suitable_alert_levels.append(alert_level)
-                            continue
+            # Keep the alert levels that trigger in the current profile for the state of the sensor alert.
+            sensor_alert = sensor_alert_state.sensor_alert
+            triggering_alert_levels = profile_rules.get(sensor_alert.state, frozenset())
+            suitable_alert_levels = [al for al in sensor_alert_state.suitable_alert_levels
+                                     if al.level in triggering_alert_levels]
 
             sensor_alert_state.suitable_alert_levels = suitable_alert_levels
-
-            # NOTE: triggered alert levels does not contain the alert level of the instrumentation before it is finished
-            # since the instrumentation script decides if it is actually triggers.
-            if sensor_alert_state.uses_instrumentation:
-                if (sensor_alert_state.instrumentation_finished
-                        and sensor_alert_state.instrumentation_promise.was_success()
-                        and sensor_alert_state.sensor_alert is not None):
-                    sensor_alert_state.sensor_alert.triggeredAlertLevels = \
-                        [al.level for al in sensor_alert_state.suitable_alert_levels]
-
-            else:
-                sensor_alert_state.sensor_alert.triggeredAlertLevels = \
-                    [al.level for al in sensor_alert_state.suitable_alert_levels]
+            sensor_alert.triggeredAlertLevels = [al.level for al in suitable_alert_levels]
 
     def _update_instrumentation(self, sensor_alert_states: List[SensorAlertState]):
         """
@@ -461,8 +487,79 @@ class SensorAlertExecuter(threading.Thread):
             sensor_alert_state.instrumentation = Instrumentation(alert_level,
                                                                  sensor_alert_state.init_sensor_alert,
                                                                  self._logger,
-                                                                 self._internal_sensor)
+                                                                 self._internal_sensor,
+                                                                 self._instrumentation_pools.get(alert_level.level))
             sensor_alert_state.instrumentation_promise = sensor_alert_state.instrumentation.execute()
+            sensor_alert_state.instrumentation_promise.add_finished_callback(
+                functools.partial(self._instrumentation_finished, sensor_alert_state))
+
+    def _get_sensor_alert_states(self) -> List[SensorAlertState]:
+        """
+        Gets all sensor alert states that have to be processed now: received sensor alerts, sensor alert states with
+        a finished instrumentation and sensor alert states whose alert delay has passed (or all pending sensor alert
+        states if a re-evaluation is needed).
+        :return: list of sensor alert states to process
+        """
+        with self._sensor_alert_queue_lock:
+            sensor_alerts = self._sensor_alert_queue
+            self._sensor_alert_queue = []
+            instrumentation_finished = self._instrumentation_finished_queue
+            self._instrumentation_finished_queue = []
+            reevaluation_needed = self._reevaluation_needed
+            self._reevaluation_needed = False
+
+        # Only hand the alert levels of the sensor alert to its state instead of all configured alert levels.
+        sensor_alert_states = list()
+        for sensor_alert in sensor_alerts:
+            alert_levels = [self._alert_levels_by_level[x] for x in sensor_alert.alertLevels
+                            if x in self._alert_levels_by_level.keys()]
+            sensor_alert_states.append(SensorAlertState(sensor_alert, alert_levels))
+
+        if reevaluation_needed:
+            self._curr_profile_id = None
+            sensor_alert_states.extend(x[2] for x in self._deadline_heap)
+            sensor_alert_states.extend(self._instrumentation_waiting)
+            self._deadline_heap = []
+            self._instrumentation_waiting.clear()
+
+        else:
+            # A sensor alert state that is no longer waiting for its instrumentation was already processed after the
+            # instrumentation finished.
+            for sensor_alert_state in instrumentation_finished:
+                if sensor_alert_state in self._instrumentation_waiting:
+                    self._instrumentation_waiting.remove(sensor_alert_state)
+                    sensor_alert_states.append(sensor_alert_state)
+
+            while self._deadline_heap and self._deadline_heap[0][2].is_alert_delay_passed():
+                sensor_alert_states.append(heapq.heappop(self._deadline_heap)[2])
+
+        return sensor_alert_states
+
+    def _get_wait_timeout(self) -> float:
+        """
+        Gets the time until the next alert delay passes.
+        :return: timeout in seconds
+        """
+        # Wake up at least every 10 seconds to make sure we see an exit flag change.
+        if not self._deadline_heap:
+            return 10.0
+        return max(0.0, min(10.0, self._deadline_heap[0][0] - time.time()))
+
+    def _schedule_sensor_alert_states(self, sensor_alert_states: List[SensorAlertState]):
+        """
+        Schedules the sensor alert states that are not triggered yet. A sensor alert state waits either for its
+        instrumentation to finish (the instrumentation promise wakes up the executer) or for its alert delay.
+        :param sensor_alert_states:
+        """
+        for sensor_alert_state in sensor_alert_states:
+            if not sensor_alert_state.instrumentation_finished:
+                self._instrumentation_waiting.add(sensor_alert_state)
+
+            else:
+                heapq.heappush(self._deadline_heap, (sensor_alert_state.time_valid,
+                                                     self._deadline_counter,
+                                                     sensor_alert_state))
+                self._deadline_counter += 1
 
     def add_sensor_alert(self,
                          node_id: int,
@@ -522,12 +619,58 @@ class SensorAlertExecuter(threading.Thread):
         self._sensor_alert_event.set()
         return True
 
+    def force_reevaluation(self):
+        """
+        Reads the system profile again and processes all pending sensor alert states again (e.g., because the system
+        profile has changed and their alert levels might no longer be suitable).
+        """
+        with self._sensor_alert_queue_lock:
+            self._reevaluation_needed = True
+        self._sensor_alert_event.set()
+
+    def update_alert_levels(self):
+        """
+        Compiles the trigger conditions of the configured alert levels (has to be called if the alert levels
+        change, e.g., because the configuration was loaded again).
+        NOTE: not thread safe, has to be called while the executer thread does not process sensor alerts.
+        """
+        self._alert_levels = self._global_data.alertLevels
+        self._alert_levels_by_level = {x.level: x for x in self._alert_levels}
+        self._alert_level_rules = AlertLevelRules(self._alert_levels)
+        self._curr_profile_id = None
+
+        # Start new worker pools for the instrumentation since the settings could have changed.
+        self._close_instrumentation_pools()
+        for alert_level in self._alert_levels:
+            if not alert_level.instrumentation_active:
+                continue
+
+            if alert_level.instrumentation_mode == "worker":
+                self._instrumentation_pools[alert_level.level] = InstrumentationWorkerPool(
+                    alert_level.instrumentation_cmd,
+                    alert_level.instrumentation_workers,
+                    alert_level.instrumentation_max_requests,
+                    self._logger)
+
+            elif alert_level.instrumentation_mode == "python":
+                self._instrumentation_pools[alert_level.level] = InstrumentationFunctionPool(
+                    alert_level.instrumentation_function,
+                    alert_level.instrumentation_workers,
+                    self._logger)
+
+    def _close_instrumentation_pools(self):
+        """
+        Stops the worker pools of the instrumentation.
+        """
+        for instrumentation_pool in self._instrumentation_pools.values():
+            instrumentation_pool.close()
+        self._instrumentation_pools = dict()
+
     def run(self):
         """
         This function starts the endless loop of the alert executer thread.
         """
 
-        curr_sensor_alert_states = list()  # type: List[SensorAlertState]
         while True:
 
             # check if thread should terminate
@@ -539,19 +682,13 @@ class SensorAlertExecuter(threading.Thread):
             if self._manager_update_executer is None:
                 self._manager_update_executer = self._global_data.managerUpdateExecuter
 
-            # Apply a processing state to each sensor alert from the queue.
-            while self._sensor_alert_queue:
-                with self._sensor_alert_queue_lock:
-                    sensor_alert = self._sensor_alert_queue.pop(0)
-
-                sensor_alert_state = SensorAlertState(sensor_alert, self._alert_levels)
-                curr_sensor_alert_states.append(sensor_alert_state)
+            # Clear the event before collecting the sensor alert states so that no wake up is missed.
+            self._sensor_alert_event.clear()
+            curr_sensor_alert_states = self._get_sensor_alert_states()
 
-            # Wait if we do not have any sensor alerts to process.
+            # Wait until a sensor alert is received, an event happens or the next alert delay passes.
             if not curr_sensor_alert_states:
-                # Timeout after 10 seconds to make sure we see an exit flag change.
-                self._sensor_alert_event.wait(10)
-                self._sensor_alert_event.clear()
+                self._sensor_alert_event.wait(self._get_wait_timeout())
                 continue
 
             # Split sensor alert states into separated states for instrumented alert levels
@@ -570,13 +707,16 @@ class SensorAlertExecuter(threading.Thread):
 
             curr_sensor_alert_states = self._process_sensor_alert(curr_sensor_alert_states)
 
+            # Wait for the instrumentation or the alert delay of the remaining sensor alert states.
+            self._schedule_sensor_alert_states(curr_sensor_alert_states)
+
             # Queue dropped sensor alerts for state/data updates to manager clients.
             self._queue_manager_update(dropped_sensor_alerts)
 
-            time.sleep(0.5)
-
     def exit(self):
         """
         sets the exit flag to shut down the thread
         """
         self._exit_flag = True
+        self._sensor_alert_event.set()
+        self._close_instrumentation_pools()
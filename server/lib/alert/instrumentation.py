@@ -13,8 +13,10 @@ import os
 import subprocess
 import threading
 import time
-from typing import Optional, Tuple
+from typing import Callable, List, Optional, Tuple, Union
 from ..localObjects import AlertLevel, SensorAlert
+from .instrumentationFunction import FunctionResult, InstrumentationFunctionPool
+from .instrumentationWorker import InstrumentationWorkerPool, WorkerResult
 from ..internalSensors import AlertLevelInstrumentationErrorSensor
 
 
@@ -37,6 +39,10 @@ class InstrumentationPromise:
         self._state = PromiseState.PENDING
         self._creation_time = int(time.time())
 
+        # Callbacks executed when the instrumentation has finished (protected by the lock).
+        self._finished_callbacks = list()  # type: List[Callable[[], None]]
+        self._finished_callbacks_lock = threading.Lock()
+
     @property
     def new_sensor_alert(self) -> Optional[SensorAlert]:
         """
@@ -59,6 +65,27 @@ class InstrumentationPromise:
     def orig_sensor_alert(self) -> SensorAlert:
         return self._orig_sensor_alert
 
+    def _set_finished(self, state: int):
+        with self._finished_callbacks_lock:
+            self._state = state
+            finished_callbacks = self._finished_callbacks
+            self._finished_callbacks = list()
+
+        for callback in finished_callbacks:
+            callback()
+        self._finished_event.set()
+
+    def add_finished_callback(self, callback: Callable[[], None]):
+        """
+        Adds a callback that is executed when the instrumentation has finished (or immediately if it already has).
+        :param callback:
+        """
+        with self._finished_callbacks_lock:
+            if self._state == PromiseState.PENDING:
+                self._finished_callbacks.append(callback)
+                return
+        callback()
+
     def is_finished(self,
                     blocking: bool = False,
                     timeout: Optional[float] = None) -> bool:
@@ -71,12 +98,10 @@ class InstrumentationPromise:
         return self._state != PromiseState.PENDING
 
     def set_failed(self):
-        self._state = PromiseState.FAILED
-        self._finished_event.set()
+        self._set_finished(PromiseState.FAILED)
 
     def set_success(self):
-        self._state = PromiseState.SUCCESS
-        self._finished_event.set()
+        self._set_finished(PromiseState.SUCCESS)
 
     def was_success(self) -> bool:
         if self._state == PromiseState.SUCCESS:
@@ -95,7 +120,8 @@ class Instrumentation:
                  alert_level: AlertLevel,
                  sensor_alert: SensorAlert,
                  logger: logging.Logger,
-                 internal_sensor: Optional[AlertLevelInstrumentationErrorSensor] = None):
+                 internal_sensor: Optional[AlertLevelInstrumentationErrorSensor] = None,
+                 worker_pool: Optional[Union[InstrumentationWorkerPool, InstrumentationFunctionPool]] = None):
         self._log_tag = os.path.basename(__file__)
         self._logger = logger
         self._alert_level = alert_level
@@ -103,12 +129,13 @@ class Instrumentation:
         self._promise = InstrumentationPromise(self._alert_level, self._sensor_alert)
         self._thread = None  # type: Optional[threading.Thread]
         self._internal_sensor = internal_sensor
+        self._worker_pool = worker_pool
+        self._worker_submitted = False
 
-    def _execute(self) -> InstrumentationPromise:
+    def _create_argument(self) -> str:
         """
-        Execute instrumentation script with sensor alert as first argument in json format and
-        process output of instrumentation script.
-        :return: promise which contains the results after instrumentation finished execution.
+        Creates the argument for the instrumentation (sensor alert in json format).
+        :return: sensor alert in json format
         """
         arg = self._sensor_alert.convert_to_dict()
 
@@ -116,7 +143,15 @@ class Instrumentation:
         arg["instrumentationAlertLevel"] = self._alert_level.level
         del arg["triggeredAlertLevels"]
 
-        temp_execute = [self._alert_level.instrumentation_cmd, json.dumps(arg)]
+        return json.dumps(arg)
+
+    def _execute(self) -> InstrumentationPromise:
+        """
+        Execute instrumentation script with sensor alert as first argument in json format and
+        process output of instrumentation script.
+        :return: promise which contains the results after instrumentation finished execution.
+        """
+        temp_execute = [self._alert_level.instrumentation_cmd, self._create_argument()]
         self._logger.debug("[%s]: Executing command '%s'." % (self._log_tag, " ".join(temp_execute)))
 
         process = None
@@ -131,12 +166,7 @@ class Instrumentation:
                                    % (self._log_tag, self._alert_level.level))
             self._logger.error("[%s]: Command was: %s" % (self._log_tag, " ".join(temp_execute)))
 
-            # Raise sensor alert (if internal sensor configured).
-            if self._internal_sensor is not None:
-                self._internal_sensor.raise_sensor_alert_execution_error(self._alert_level)
-
-            # Set result.
-            self._promise.set_failed()
+            self._set_execution_error()
 
             try:
                 process.stdout.close()
@@ -154,32 +184,23 @@ class Instrumentation:
             process.wait(self._alert_level.instrumentation_timeout)
 
         except subprocess.TimeoutExpired:
-            self._logger.error("[%s]: Instrumentation for Alert Level '%d' timed out."
-                               % (self._log_tag, self._alert_level.level))
-
             process.terminate()
 
-            # Give the process one second to terminate
-            time.sleep(1)
+            # Give the process one second to terminate, kill it if it has not terminated by then.
+            try:
+                process.wait(1)
 
-            # check if the process has terminated
-            # => if not kill it
-            exit_code = process.poll()
-            if exit_code != -15:
+            except subprocess.TimeoutExpired:
                 try:
                     self._logger.error("[%s]: Could not terminate instrumentation for Alert Level '%d'. Killing it."
                                        % (self._log_tag, self._alert_level.level))
 
                     process.kill()
+                    process.wait()
                 except Exception:
                     pass
 
-            # Raise sensor alert (if internal sensor configured).
-            if self._internal_sensor is not None:
-                self._internal_sensor.raise_sensor_alert_timeout(self._alert_level)
-
-            # Set result.
-            self._promise.set_failed()
+            self._set_timeout()
 
             try:
                 process.stdout.close()
@@ -198,6 +219,160 @@ class Instrumentation:
         output = output.decode("ascii").strip()
         err = err.decode("ascii").strip()
 
+        self._process_result(exit_code, output, err)
+
+        try:
+            process.stdout.close()
+        except Exception:
+            pass
+
+        try:
+            process.stderr.close()
+        except Exception:
+            pass
+
+        return self._promise
+
+    def _execute_worker(self):
+        """
+        Execute instrumentation by a persistent worker of the worker pool of the alert level
+        with the sensor alert as request in json format.
+        """
+        self._logger.debug("[%s]: Executing instrumentation for Alert Level '%d' by worker."
+                           % (self._log_tag, self._alert_level.level))
+
+        self._worker_pool.execute(self._create_argument(),
+                                  self._alert_level.instrumentation_timeout,
+                                  self._worker_finished)
+
+    def _worker_finished(self,
+                         result: int,
+                         response: Optional[str],
+                         exit_code: Optional[int]):
+        """
+        Callback of the worker pool that processes the result of the worker.
+        :param result: result of the worker (see WorkerResult)
+        :param response: response of the worker
+        :param exit_code: exit code of the worker if it exited
+        """
+        if result == WorkerResult.SUCCESS:
+            self._process_result(0, response, "")
+
+        elif result == WorkerResult.TIMEOUT:
+            self._set_timeout()
+
+        elif result == WorkerResult.EXECUTION_ERROR:
+            self._logger.error("[%s]: Executing instrumentation for Alert Level '%d' failed."
+                               % (self._log_tag, self._alert_level.level))
+            self._set_execution_error()
+
+        else:
+            # A worker that was killed by a signal has no exit code to report.
+            self._process_result(exit_code if exit_code is not None else -1, "", "")
+
+    def _execute_function(self):
+        """
+        Execute the Python callable of the alert level as instrumentation by the thread pool of the alert level
+        with the sensor alert object as argument.
+        """
+        self._logger.debug("[%s]: Executing instrumentation function '%s' for Alert Level '%d'."
+                           % (self._log_tag, self._alert_level.instrumentation_cmd, self._alert_level.level))
+
+        self._worker_pool.execute(self._sensor_alert,
+                                  self._alert_level.instrumentation_timeout,
+                                  self._function_finished)
+
+    def _function_finished(self,
+                           result: int,
+                           new_sensor_alert: Optional[SensorAlert],
+                           exception: Optional[Exception]):
+        """
+        Callback of the thread pool that processes the result of the Python callable.
+        :param result: result of the callable (see FunctionResult)
+        :param new_sensor_alert: sensor alert object returned by the callable
+        :param exception: exception raised by the callable
+        """
+        if result == FunctionResult.TIMEOUT:
+            self._set_timeout()
+            return
+
+        if result == FunctionResult.EXECUTION_ERROR:
+            self._logger.error("[%s]: Executing instrumentation function '%s' for Alert Level '%d' failed: %s"
+                               % (self._log_tag, self._alert_level.instrumentation_cmd, self._alert_level.level,
+                                  repr(exception)))
+            self._set_execution_error()
+            return
+
+        # Sensor alert was suppressed.
+        if new_sensor_alert is None:
+            self._promise.set_success()
+            return
+
+        try:
+            if not isinstance(new_sensor_alert, SensorAlert):
+                raise ValueError("returned object is not a sensor alert")
+
+            # Manually update Sensor Alert object the same way as the output of an instrumentation script.
+            new_sensor_alert.triggeredAlertLevels = []
+
+            if not SensorAlert.verify_dict(new_sensor_alert.convert_to_dict()):
+                raise ValueError("invalid sensor alert data")
+
+            self._check_new_sensor_alert(new_sensor_alert)
+
+        except Exception:
+            self._logger.exception("[%s]: Unable to process sensor alert returned by instrumentation function "
+                                   % self._log_tag
+                                   + "for Alert Level '%d'."
+                                   % self._alert_level.level)
+
+            # Raise sensor alert (if internal sensor configured).
+            if self._internal_sensor is not None:
+                self._internal_sensor.raise_sensor_alert_invalid_output(self._alert_level)
+
+            # Set result.
+            self._promise.set_failed()
+            return
+
+        # Set result.
+        self._promise.new_sensor_alert = new_sensor_alert
+        self._promise.set_success()
+
+    def _set_execution_error(self):
+        """
+        Sets the result for an instrumentation that could not be executed.
+        """
+        # Raise sensor alert (if internal sensor configured).
+        if self._internal_sensor is not None:
+            self._internal_sensor.raise_sensor_alert_execution_error(self._alert_level)
+
+        # Set result.
+        self._promise.set_failed()
+
+    def _set_timeout(self):
+        """
+        Sets the result for an instrumentation that timed out.
+        """
+        self._logger.error("[%s]: Instrumentation for Alert Level '%d' timed out."
+                           % (self._log_tag, self._alert_level.level))
+
+        # Raise sensor alert (if internal sensor configured).
+        if self._internal_sensor is not None:
+            self._internal_sensor.raise_sensor_alert_timeout(self._alert_level)
+
+        # Set result.
+        self._promise.set_failed()
+
+    def _process_result(self,
+                        exit_code: int,
+                        output: str,
+                        err: str):
+        """
+        Process the result of the finished instrumentation and set the result of the promise.
+        :param exit_code: exit code of the instrumentation
+        :param output: output of the instrumentation
+        :param err: error output of the instrumentation
+        """
         if exit_code == 0:
 
             # Sensor Alert is suppressed if no output is given by instrumentation script.
@@ -254,17 +429,33 @@ class Instrumentation:
             # Set result.
             self._promise.set_failed()
 
-        try:
-            process.stdout.close()
-        except Exception:
-            pass
+    def _check_new_sensor_alert(self, new_sensor_alert: SensorAlert):
+        """
+        Checks that the instrumentation has not changed values of the sensor alert that are not allowed to change.
+        :param new_sensor_alert: sensor alert object created by the instrumentation
+        """
+        # Check that certain sensor alert values have not changed.
+        if self._sensor_alert.nodeId != new_sensor_alert.nodeId:
+            raise ValueError("nodeId not allowed to change")
 
-        try:
-            process.stderr.close()
-        except Exception:
-            pass
+        if self._sensor_alert.sensorId != new_sensor_alert.sensorId:
+            raise ValueError("sensorId not allowed to change")
 
-        return self._promise
+        if self._sensor_alert.description != new_sensor_alert.description:
+            raise ValueError("description not allowed to change")
+
+        if self._sensor_alert.timeReceived != new_sensor_alert.timeReceived:
+            raise ValueError("timeReceived not allowed to change")
+
+        if self._sensor_alert.alertDelay != new_sensor_alert.alertDelay:
+            raise ValueError("alertDelay not allowed to change")
+
+        if (any(map(lambda x: x not in self._sensor_alert.alertLevels, new_sensor_alert.alertLevels))
+                or any(map(lambda x: x not in new_sensor_alert.alertLevels, self._sensor_alert.alertLevels))):
+            raise ValueError("alertLevels not allowed to change")
+
+        if self._sensor_alert.dataType != new_sensor_alert.dataType:
+            raise ValueError("dataType not allowed to change")
 
     def _process_output(self, output: str) -> Tuple[bool, Optional[SensorAlert]]:
         """
@@ -290,29 +481,7 @@ class Instrumentation:
                 raise ValueError("invalid input data")
 
             new_sensor_alert = SensorAlert.convert_from_dict(sensor_alert_dict)
-
-            # Check that certain sensor alert values have not changed.
-            if self._sensor_alert.nodeId != new_sensor_alert.nodeId:
-                raise ValueError("nodeId not allowed to change")
-
-            if self._sensor_alert.sensorId != new_sensor_alert.sensorId:
-                raise ValueError("sensorId not allowed to change")
-
-            if self._sensor_alert.description != new_sensor_alert.description:
-                raise ValueError("description not allowed to change")
-
-            if self._sensor_alert.timeReceived != new_sensor_alert.timeReceived:
-                raise ValueError("timeReceived not allowed to change")
-
-            if self._sensor_alert.alertDelay != new_sensor_alert.alertDelay:
-                raise ValueError("alertDelay not allowed to change")
-
-            if (any(map(lambda x: x not in self._sensor_alert.alertLevels, new_sensor_alert.alertLevels))
-                    or any(map(lambda x: x not in new_sensor_alert.alertLevels, self._sensor_alert.alertLevels))):
-                raise ValueError("alertLevels not allowed to change")
-
-            if self._sensor_alert.dataType != new_sensor_alert.dataType:
-                raise ValueError("dataType not allowed to change")
+            self._check_new_sensor_alert(new_sensor_alert)
 
             if "instrumentationAlertLevel" not in sensor_alert_dict.keys():
                 raise ValueError("instrumentationAlertLevel missing")
@@ -335,7 +504,15 @@ class Instrumentation:
         NOTE: class/function is not thread safe.
         :return: promise which contains the results after instrumentation finished execution.
         """
-        if self._thread is None:
+        if self._worker_pool is not None:
+            if not self._worker_submitted:
+                self._worker_submitted = True
+                if self._alert_level.instrumentation_mode == "python":
+                    self._execute_function()
+                else:
+                    self._execute_worker()
+
+        elif self._thread is None:
             self._thread = threading.Thread(target=self._execute)
             self._thread.daemon = True
             self._thread.start()
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+
+# written by sqall
+# twitter: https://twitter.com/sqall01
+# blog: https://h4des.org
+# github: https://github.com/sqall01
+#
+# Licensed under the GNU Affero General Public License, version 3.
+
+import concurrent.futures
+import heapq
+import importlib
+import logging
+import os
+import threading
+import time
+from typing import Callable, List, Optional, Tuple
+from ..localObjects import SensorAlert
+
+
+class FunctionResult:
+    SUCCESS = 1
+    TIMEOUT = 2
+    EXECUTION_ERROR = 3
+
+
+def load_instrumentation_function(name: str) -> Callable[[SensorAlert], Optional[SensorAlert]]:
+    """
+    Loads the Python callable used as instrumentation.
+
+    :param name: name of the callable in the format "module:function" (e.g., "mypackage.instrumentation:filter")
+    :return: callable
+    """
+    module_name, sep, function_name = name.partition(":")
+    if not sep or not module_name or not function_name:
+        raise ValueError("Instrumentation function '%s' has to be given as 'module:function'." % name)
+
+    function = importlib.import_module(module_name)
+    for attribute in function_name.split("."):
+        function = getattr(function, attribute)
+
+    if not callable(function):
+        raise ValueError("Instrumentation function '%s' is not callable." % name)
+
+    return function
+
+
+class InstrumentationFunctionPool:
+    """
+    Bounded thread pool executing a Python callable as instrumentation of an alert level. The callable gets
+    a copy of the sensor alert and returns the modified sensor alert or None to suppress it.
+    NOTE: a callable that times out can not be stopped and keeps its thread busy until it returns, hence
+    it reduces the number of concurrently executed instrumentations until then.
+    """
+
+    def __init__(self,
+                 function: Callable[[SensorAlert], Optional[SensorAlert]],
+                 worker_count: int,
+                 logger: logging.Logger):
+        """
+        :param function: callable used as instrumentation
+        :param worker_count: maximal number of concurrently executed instrumentations
+        :param logger:
+        """
+        self._log_tag = os.path.basename(__file__)
+        self._logger = logger
+        self._function = function
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=worker_count,
+                                                               thread_name_prefix="InstrumentationFunction")
+
+        # Deadlines of the pending instrumentations as heap ordered by their time (a running counter keeps the order
+        # of instrumentations with the same deadline) which are watched by a single thread.
+        self._deadline_heap = []  # type: List[Tuple[float, int, Callable[[], None]]]
+        self._deadline_counter = 0
+        self._deadline_cond = threading.Condition()
+        self._exit_flag = False
+        self._watchdog = threading.Thread(target=self._watch_deadlines, daemon=True)
+        self._watchdog.start()
+
+    def _execute_function(self, sensor_alert: SensorAlert) -> Optional[SensorAlert]:
+        return self._function(SensorAlert().deepcopy(sensor_alert))
+
+    def _watch_deadlines(self):
+        """
+        Calls the timeout handler of each instrumentation whose deadline has passed.
+        """
+        while True:
+            with self._deadline_cond:
+                while not self._exit_flag:
+                    now = time.monotonic()
+                    if self._deadline_heap and self._deadline_heap[0][0] <= now:
+                        break
+                    timeout = self._deadline_heap[0][0] - now if self._deadline_heap else None
+                    self._deadline_cond.wait(timeout)
+
+                if self._exit_flag:
+                    return
+
+                _, _, timeout_handler = heapq.heappop(self._deadline_heap)
+
+            try:
+                timeout_handler()
+
+            except Exception:
+                self._logger.exception("[%s]: Handling instrumentation timeout failed." % self._log_tag)
+
+    def execute(self,
+                sensor_alert: SensorAlert,
+                timeout: float,
+                callback: Callable[[int, Optional[SensorAlert], Optional[Exception]], None]):
+        """
+        Executes the instrumentation for the sensor alert by the next free thread without blocking.
+
+        :param sensor_alert:
+        :param timeout: time in seconds the instrumentation can take (including the time waiting for a free thread)
+        :param callback: called with the result (see FunctionResult), the sensor alert returned by the callable and
+        the exception raised by it when the instrumentation is finished (exactly once)
+        """
+        lock = threading.Lock()
+        is_done = [False]
+
+        def _done(result: int,
+                  new_sensor_alert: Optional[SensorAlert] = None,
+                  exception: Optional[Exception] = None):
+            with lock:
+                if is_done[0]:
+                    return
+                is_done[0] = True
+            callback(result, new_sensor_alert, exception)
+
+        def _finished(future: concurrent.futures.Future):
+            if future.cancelled():
+                return
+            exception = future.exception()
+            if exception is not None:
+                _done(FunctionResult.EXECUTION_ERROR, None, exception)
+            else:
+                _done(FunctionResult.SUCCESS, future.result())
+
+        def _timeout():
+            # Remove the instrumentation from the queue if it is still waiting for a free thread.
+            future.cancel()
+            _done(FunctionResult.TIMEOUT)
+
+        try:
+            future = self._executor.submit(self._execute_function, sensor_alert)
+
+        except RuntimeError as e:
+            # Pool was already closed.
+            _done(FunctionResult.EXECUTION_ERROR, None, e)
+            return
+
+        # The timeout handler of a finished instrumentation is kept until its deadline and does nothing then.
+        with self._deadline_cond:
+            heapq.heappush(self._deadline_heap, (time.monotonic() + timeout, self._deadline_counter, _timeout))
+            self._deadline_counter += 1
+            self._deadline_cond.notify()
+
+        future.add_done_callback(_finished)
+
+    def close(self):
+        """
+        Stops the threads after the running instrumentations are finished.
+        """
+        with self._deadline_cond:
+            self._exit_flag = True
+            self._deadline_cond.notify()
+        self._executor.shutdown(wait=False)
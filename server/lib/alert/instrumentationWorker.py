@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+
+# written by sqall
+# twitter: https://twitter.com/sqall01
+# blog: https://h4des.org
+# github: https://github.com/sqall01
+#
+# Licensed under the GNU Affero General Public License, version 3.
+
+import collections
+import logging
+import os
+import queue
+import select
+import subprocess
+import threading
+import time
+from typing import Callable, List, Optional, Tuple
+
+
+class WorkerResult:
+    SUCCESS = 1
+    TIMEOUT = 2
+    EXECUTION_ERROR = 3
+    EXITED = 4
+
+
+class InstrumentationWorker:
+    """
+    A persistent instrumentation process. The process is started with the argument "--worker" and handles one request
+    after another: it reads a request as single line of JSON on stdin and writes its response as single line on stdout.
+    """
+
+    def __init__(self,
+                 cmd: str,
+                 logger: logging.Logger):
+        self._log_tag = os.path.basename(__file__)
+        self._logger = logger
+        self._cmd = cmd
+        self._buffer = b""
+        self._request_count = 0
+
+        # Keep the last lines the worker wrote to stderr for error messages.
+        self._stderr_lines = collections.deque(maxlen=20)
+
+        self._process = subprocess.Popen([self._cmd, "--worker"],
+                                         stdin=subprocess.PIPE,
+                                         stdout=subprocess.PIPE,
+                                         stderr=subprocess.PIPE,
+                                         bufsize=0,
+                                         close_fds=True)
+
+        # Read stderr continuously so that a worker writing much to it does not block.
+        self._stderr_thread = threading.Thread(target=self._read_stderr, daemon=True)
+        self._stderr_thread.start()
+
+    @property
+    def request_count(self) -> int:
+        return self._request_count
+
+    @property
+    def pid(self) -> int:
+        return self._process.pid
+
+    @property
+    def stderr(self) -> str:
+        return "\n".join(self._stderr_lines)
+
+    @property
+    def exit_code(self) -> Optional[int]:
+        return self._process.poll()
+
+    def _read_stderr(self):
+        try:
+            for line in iter(self._process.stderr.readline, b""):
+                self._stderr_lines.append(line.decode("ascii", errors="replace").rstrip())
+        except Exception:
+            pass
+
+    def _read_line(self, deadline: float) -> Optional[bytes]:
+        """
+        Reads a line from stdout of the worker.
+        :param deadline: time (monotonic clock) until the line has to be read
+        :return: line without newline or None if the worker closed stdout
+        """
+        fd = self._process.stdout.fileno()
+        while b"\n" not in self._buffer:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise TimeoutError("Worker did not answer in time.")
+
+            readable, _, _ = select.select([fd], [], [], remaining)
+            if not readable:
+                continue
+
+            data = os.read(fd, 65536)
+            if not data:
+                return None
+            self._buffer += data
+
+        line, self._buffer = self._buffer.split(b"\n", 1)
+        return line
+
+    def request(self,
+                request: str,
+                deadline: float) -> Tuple[int, Optional[str]]:
+        """
+        Sends a request to the worker and waits for its response.
+
+        :param request: request as single line of JSON
+        :param deadline: time (monotonic clock) until the response has to be received
+        :return: tuple with the result (see WorkerResult) and the response
+        """
+        self._request_count += 1
+        try:
+            self._process.stdin.write(request.encode("ascii") + b"\n")
+            self._process.stdin.flush()
+            line = self._read_line(deadline)
+
+        except TimeoutError:
+            return WorkerResult.TIMEOUT, None
+
+        except (BrokenPipeError, OSError):
+            return WorkerResult.EXITED, None
+
+        if line is None:
+            return WorkerResult.EXITED, None
+
+        return WorkerResult.SUCCESS, line.decode("ascii").strip()
+
+    def stop(self):
+        """
+        Stops the worker process (closing stdin tells the worker to exit).
+        """
+        for fp in [self._process.stdin, self._process.stdout]:
+            try:
+                fp.close()
+            except Exception:
+                pass
+
+        self._process.terminate()
+
+        # Give the process one second to terminate before killing it.
+        try:
+            self._process.wait(1)
+
+        except subprocess.TimeoutExpired:
+            self._logger.error("[%s]: Could not terminate instrumentation worker '%s'. Killing it."
+                               % (self._log_tag, self._cmd))
+            try:
+                self._process.kill()
+                self._process.wait()
+            except Exception:
+                pass
+
+        self._stderr_thread.join(1)
+
+
+class InstrumentationWorkerPool:
+    """
+    Pool of persistent instrumentation processes for an alert level. Each pool thread owns one worker process that is
+    started when it is needed and handles the requests of the pool one after another, hence the number of threads
+    caps the number of concurrently executed requests. A worker is replaced after it handled the maximal number of
+    requests, timed out or exited.
+    """
+
+    def __init__(self,
+                 cmd: str,
+                 worker_count: int,
+                 max_requests: int,
+                 logger: logging.Logger):
+        """
+        :param cmd: path to the instrumentation script or executable
+        :param worker_count: maximal number of worker processes (and concurrently executed requests)
+        :param max_requests: number of requests a worker handles before it is replaced
+        :param logger:
+        """
+        self._log_tag = os.path.basename(__file__)
+        self._logger = logger
+        self._cmd = cmd
+        self._max_requests = max_requests
+
+        self._queue = queue.Queue()
+
+        self._started_count = 0
+        self._started_count_lock = threading.Lock()
+
+        self._threads = list()  # type: List[threading.Thread]
+        for _ in range(worker_count):
+            thread = threading.Thread(target=self._run, daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    @property
+    def started_count(self) -> int:
+        """
+        :return: number of worker processes started so far
+        """
+        with self._started_count_lock:
+            return self._started_count
+
+    def _run(self):
+        worker = None  # type: Optional[InstrumentationWorker]
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            request, deadline, callback = item
+
+            # The request already waited too long for a free worker.
+            if deadline <= time.monotonic():
+                callback(WorkerResult.TIMEOUT, None, None)
+                continue
+
+            if worker is None:
+                try:
+                    worker = InstrumentationWorker(self._cmd, self._logger)
+
+                except Exception:
+                    self._logger.exception("[%s]: Starting instrumentation worker '%s' failed."
+                                           % (self._log_tag, self._cmd))
+                    callback(WorkerResult.EXECUTION_ERROR, None, None)
+                    continue
+
+                with self._started_count_lock:
+                    self._started_count += 1
+
+            result, response = worker.request(request, deadline)
+
+            exit_code = None
+            if result != WorkerResult.SUCCESS:
+                worker.stop()
+                exit_code = worker.exit_code
+                if worker.stderr:
+                    self._logger.error("[%s]: Instrumentation worker '%s' stderr: %s"
+                                       % (self._log_tag, self._cmd, worker.stderr))
+                worker = None
+
+            elif worker.request_count >= self._max_requests:
+                self._logger.debug("[%s]: Replacing instrumentation worker '%s' after %d requests."
+                                   % (self._log_tag, self._cmd, worker.request_count))
+                worker.stop()
+                worker = None
+
+            callback(result, response, exit_code)
+
+        if worker is not None:
+            worker.stop()
+
+    def execute(self,
+                request: str,
+                timeout: float,
+                callback: Callable[[int, Optional[str], Optional[int]], None]):
+        """
+        Executes a request by the next free worker without blocking.
+
+        :param request: request as single line of JSON
+        :param timeout: time in seconds the request can take (including the time waiting for a free worker)
+        :param callback: called with the result (see WorkerResult), the response and the exit code of the worker
+        (if it exited) when the request is finished
+        """
+        self._queue.put((request, time.monotonic() + timeout, callback))
+
+    def close(self):
+        """
+        Stops the worker processes after the queued requests are handled.
+        """
+        for _ in self._threads:
+            self._queue.put(None)
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+
+# written by sqall
+# twitter: https://twitter.com/sqall01
+# blog: https://h4des.org
+# github: https://github.com/sqall01
+#
+# Licensed under the GNU Affero General Public License, version 3.
+
+from typing import Dict, FrozenSet, List, Set, Tuple
+from ..localObjects import AlertLevel
+
+
+class AlertLevelRules:
+    """
+    Precompiled trigger conditions of the alert levels. Maps each combination of system profile and sensor alert
+    state to the set of alert levels that trigger for it, hence the suitable alert levels of a sensor alert are
+    a set lookup instead of checking the profiles and trigger flags of each alert level.
+    """
+
+    def __init__(self, alert_levels: List[AlertLevel]):
+        """
+        :param alert_levels: configured alert levels
+        """
+        rules = dict()  # type: Dict[Tuple[int, int], Set[int]]
+        for alert_level in alert_levels:
+            for profile_id in set(alert_level.profiles):
+
+                # Alert level triggers a sensor alert message for a "triggered" state.
+                if alert_level.triggerAlertTriggered:
+                    rules.setdefault((profile_id, 1), set()).add(alert_level.level)
+
+                # Alert level triggers a sensor alert message for a "normal" state.
+                if alert_level.triggerAlertNormal:
+                    rules.setdefault((profile_id, 0), set()).add(alert_level.level)
+
+        self._rules = {k: frozenset(v) for k, v in rules.items()}  # type: Dict[Tuple[int, int], FrozenSet[int]]
+
+    def get_alert_levels(self,
+                         profile_id: int,
+                         state: int) -> FrozenSet[int]:
+        """
+        Gets the alert levels that trigger in the given system profile for a sensor alert with the given state.
+
+        :param profile_id:
+        :param state: state of the sensor alert
+        :return: set of alert levels
+        """
+        return self._rules.get((profile_id, state), frozenset())
+
+    def get_profile_rules(self, profile_id: int) -> Dict[int, FrozenSet[int]]:
+        """
+        Gets the alert levels that trigger in the given system profile for each sensor alert state.
+
+        :param profile_id:
+        :return: dictionary with the state as key and the set of alert levels as value
+        """
+        return {state: self.get_alert_levels(profile_id, state) for state in [0, 1]}
@@ -0,0 +1,487 @@
+#!/usr/bin/env python3
+
+# written by sqall
+# twitter: https://twitter.com/sqall01
+# blog: https://h4des.org
+# github: https://github.com/sqall01
+#
+# Licensed under the GNU Affero General Public License, version 3.
+
+import asyncio
+import concurrent.futures
+import functools
+import os
+import selectors
+import socket
+import ssl
+import time
+from typing import Optional, Tuple, Callable
+from .server import ClientCommunication
+from .globalData.globalData import GlobalData
+from .tls import TlsContext
+from .admission import AdmissionController
+from .registration import RegistrationTracker
+
+
+class AsyncServerSession:
+    """
+    Server session of a single client used by the event driven server. In contrast to the threaded
+    server session, no thread is dedicated to the client. The session offers the same interface
+    as the threaded server session (clientComm, clientAddress, clientPort, closeConnection(), setLogger()).
+    """
+
+    def __init__(self,
+                 sock: socket.socket,
+                 clientAddress: Tuple[str, int],
+                 globalData: GlobalData,
+                 tls_context: Optional[TlsContext]):
+
+        # file nme of this file (used for logging)
+        self.fileName = os.path.basename(__file__)
+
+        self.socket = sock
+
+        # File descriptor of the client socket (stays valid for the event loop
+        # even if the socket is wrapped by TLS/SSL).
+        self.fd = sock.fileno()
+
+        # instance of the client communication object
+        self.clientComm = None  # type: Optional[ClientCommunication]
+
+        # get client ip address and port
+        self.clientAddress = clientAddress[0]
+        self.clientPort = clientAddress[1]
+
+        # Get reference to global data object.
+        self.globalData = globalData
+        self.logger = self.globalData.logger
+
+        self._tls_context = tls_context
+
+        # add own server session to the global list of server sessions
+        self.serverSessions = self.globalData.serverSessions
+        self.serverSessions.append(self)
+
+        # Get reference to the connection watchdog object
+        # to inform it about disconnects.
+        self.connectionWatchdog = self.globalData.connectionWatchdog
+
+        # Function that is called if requests of the client were received by a thread sending
+        # a message to the client (they are not signaled by the event loop).
+        self.pending_frames_callback = None  # type: Optional[Callable[[], None]]
+
+        # Start of the TLS/SSL handshake and the timer that aborts it if the client does not finish it in time.
+        self._handshake_start = 0.0
+        self.handshake_timer = None  # type: Optional[asyncio.TimerHandle]
+
+        self.logger.info("[%s]: Client connected (%s:%d)." % (self.fileName, self.clientAddress, self.clientPort))
+
+    def _remove_session(self):
+        """
+        Internal function that removes the own server session from the global list of server sessions.
+        """
+        try:
+            self.serverSessions.remove(self)
+
+        except Exception as e:
+            pass
+
+    def abort(self):
+        """
+        Closes the connection of a session that was not set up (e.g., because the TLS/SSL handshake failed).
+        """
+        try:
+            self.socket.close()
+
+        except Exception as e:
+            pass
+
+        self._remove_session()
+
+    def continue_handshake(self) -> Optional[int]:
+        """
+        Establishes the TLS/SSL connection with the client without blocking (raises an exception if it fails).
+        Is executed by the event loop.
+
+        :return: None if the connection is established, otherwise the event (selectors.EVENT_READ or
+                 selectors.EVENT_WRITE) of the socket the handshake waits for
+        """
+        if not isinstance(self.socket, ssl.SSLSocket):
+            self._handshake_start = time.perf_counter()
+            self.socket = self._tls_context.start_handshake(self.socket)
+
+        try:
+            self.socket.do_handshake()
+
+        except ssl.SSLWantReadError:
+            return selectors.EVENT_READ
+
+        except ssl.SSLWantWriteError:
+            return selectors.EVENT_WRITE
+
+        except Exception:
+            self._tls_context.record_handshake(None, 0.0)
+            raise
+
+        self._tls_context.record_handshake(self.socket, time.perf_counter() - self._handshake_start)
+        self.socket.setblocking(True)
+        return None
+
+    def setup(self) -> bool:
+        """
+        Initializes the session with the client (the TLS/SSL connection is already established by the event loop).
+        Is executed by a worker thread.
+
+        :return: True if the session is ready to handle requests
+        """
+        # Give incoming connection to client communication handler
+        self.clientComm = ClientCommunication(self.socket,
+                                              self.clientAddress,
+                                              self.clientPort,
+                                              self.globalData)
+        self.clientComm.pendingFramesCallback = self.pending_frames_callback
+
+        if not self.clientComm.initialize_session():
+            self.finish()
+            return False
+
+        return True
+
+    def handle_request(self) -> bool:
+        """
+        Handles a request of the client after the event loop signaled that the socket is readable.
+        Is executed by a worker thread.
+
+        :return: True if the session is still alive
+        """
+        if not self.clientComm.handle_pending_request():
+            self.finish()
+            return False
+
+        return True
+
+    def receive_pending_data(self) -> Optional[bool]:
+        """
+        Receives the data that is available on the connection without blocking. Is executed by the event loop.
+
+        :return: True if the connection is open, False if it was closed or failed and None if another thread
+                 currently communicates with the client
+        """
+        return self.clientComm.receive_pending_data()
+
+    def has_buffered_data(self) -> bool:
+        """
+        Checks if the TLS/SSL layer holds already decrypted data or the client communication holds already
+        received messages which are not signaled by the event loop.
+
+        :return:
+        """
+        try:
+            if self.clientComm is not None and self.clientComm.has_pending_messages():
+                return True
+
+            return isinstance(self.socket, ssl.SSLSocket) and self.socket.pending() > 0
+
+        except Exception as e:
+            return False
+
+    def finish(self):
+        """
+        Closes the session after the communication with the client has ended.
+        """
+        try:
+            self.socket.close()
+
+        except Exception as e:
+            self.logger.exception("[%s]: Unable to close connection gracefully with %s:%d."
+                                  % (self.fileName, self.clientAddress, self.clientPort))
+
+        # remove own server session from the global list of server sessions
+        # before closing server session
+        self._remove_session()
+
+        self.logger.info("[%s]: Client disconnected (%s:%d)." % (self.fileName, self.clientAddress, self.clientPort))
+
+        # If client was registered and set as "persistent",
+        # notify the connection watchdog about the disconnect.
+        if self.clientComm is not None and self.clientComm.nodeId is not None and self.clientComm.persistent == 1:
+            self.connectionWatchdog.addNodePreTimeout(self.clientComm.nodeId)
+
+    def closeConnection(self):
+        self.logger.info("[%s]: Closing connection to client (%s:%d)."
+                         % (self.fileName, self.clientAddress, self.clientPort))
+
+        # Only shut the connection down. The event loop notices the closed connection
+        # and the worker thread handling it cleans up and closes the socket
+        # (closing it here could lead to a reuse of the file descriptor while
+        # it is still watched by the event loop).
+        try:
+            self.socket.shutdown(socket.SHUT_RDWR)
+
+        except Exception as e:
+            pass
+
+        self._remove_session()
+
+    def setLogger(self, logger):
+        """
+        Overwrites the used logger instance.
+
+        :param logger:
+        """
+        self.logger = logger
+
+
+class AsyncServer:
+    """
+    Event driven server that watches all client connections with a single asyncio event loop and processes
+    incoming requests with a bounded pool of worker threads instead of using one thread per client.
+    """
+
+    def __init__(self,
+                 globalData: GlobalData,
+                 serverAddress: Tuple[str, int]):
+
+        # file nme of this file (used for logging)
+        self.fileName = os.path.basename(__file__)
+
+        # get reference to global data object
+        self.globalData = globalData
+        self.logger = self.globalData.logger
+
+        self.server_address = serverAddress
+
+        # Create the TLS/SSL context shared by all client connections.
+        if self.globalData.sslEnabled and self.globalData.tls_context is None:
+            self.globalData.tls_context = TlsContext(self.globalData)
+        self._tls_context = self.globalData.tls_context if self.globalData.sslEnabled else None
+
+        # Create the admission controller that limits the number of concurrent session setups
+        # (should be lower than the number of workers to be able to process requests of connected clients).
+        if self.globalData.admission_controller is None:
+            self.globalData.admission_controller = AdmissionController(self.globalData.serverMaxConcurrentSetups)
+        self._admission_controller = self.globalData.admission_controller
+
+        # Create the registration tracker that skips unchanged registrations of reconnecting nodes.
+        if self.globalData.registration_tracker is None:
+            self.globalData.registration_tracker = RegistrationTracker()
+
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=self.globalData.server_async_workers,
+                                                               thread_name_prefix="AsyncServerWorker")
+
+        self._loop = asyncio.new_event_loop()
+
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.socket.bind(self.server_address)
+        self.server_address = self.socket.getsockname()
+        self.socket.listen(socket.SOMAXCONN)
+        self.socket.setblocking(False)
+
+    def _accept(self):
+        """
+        Internal function that accepts all pending client connections. Is executed by the event loop.
+        """
+        while True:
+            try:
+                conn, client_address = self.socket.accept()
+
+            except (BlockingIOError, InterruptedError):
+                return
+
+            except Exception as e:
+                self.logger.exception("[%s]: Accepting client connection failed." % self.fileName)
+                return
+
+            session = AsyncServerSession(conn, client_address, self.globalData, self._tls_context)
+            session.pending_frames_callback = functools.partial(self._loop.call_soon_threadsafe,
+                                                                self._on_pending_frames,
+                                                                session)
+
+            # The TLS/SSL handshake is done by the event loop without blocking a worker thread.
+            if self._tls_context is not None:
+                conn.setblocking(False)
+                session.handshake_timer = self._loop.call_later(self.globalData.serverReceiveTimeout,
+                                                                self._on_handshake_timeout,
+                                                                session)
+                self._on_handshake_ready(session)
+
+            else:
+                conn.setblocking(True)
+                self._request_setup(session)
+
+    def _request_setup(self, session: AsyncServerSession):
+        """
+        Internal function that queues the setup of the session until it is admitted. Is executed by the event loop.
+
+        :param session:
+        """
+        self._admission_controller.request(functools.partial(self._loop.call_soon_threadsafe,
+                                                             self._dispatch_setup,
+                                                             session))
+
+    def _on_handshake_ready(self, session: AsyncServerSession):
+        """
+        Internal function that continues the TLS/SSL handshake of a session if its socket is ready.
+        Is executed by the event loop.
+
+        :param session:
+        """
+        self._loop.remove_reader(session.fd)
+        self._loop.remove_writer(session.fd)
+
+        try:
+            event = session.continue_handshake()
+
+        except Exception as e:
+            self.logger.exception("[%s]: Unable to initialize TLS/SSL connection (%s:%d)."
+                                  % (self.fileName, session.clientAddress, session.clientPort))
+            session.handshake_timer.cancel()
+            session.abort()
+            return
+
+        if event == selectors.EVENT_READ:
+            self._loop.add_reader(session.fd, self._on_handshake_ready, session)
+
+        elif event == selectors.EVENT_WRITE:
+            self._loop.add_writer(session.fd, self._on_handshake_ready, session)
+
+        else:
+            session.handshake_timer.cancel()
+            self._request_setup(session)
+
+    def _on_handshake_timeout(self, session: AsyncServerSession):
+        """
+        Internal function that aborts the TLS/SSL handshake of a session that was not finished in time.
+        Is executed by the event loop.
+
+        :param session:
+        """
+        self._loop.remove_reader(session.fd)
+        self._loop.remove_writer(session.fd)
+
+        self.logger.error("[%s]: TLS/SSL handshake timed out (%s:%d)."
+                          % (self.fileName, session.clientAddress, session.clientPort))
+        if self._tls_context is not None:
+            self._tls_context.record_handshake(None, 0.0)
+        session.abort()
+
+    def _dispatch_setup(self, session: AsyncServerSession):
+        """
+        Internal function that executes the setup of an admitted session in the worker pool.
+        Is executed by the event loop.
+
+        :param session:
+        """
+        future = self._loop.run_in_executor(self._executor, session.setup)
+        future.add_done_callback(functools.partial(self._on_setup_processed, session))
+
+    def _on_setup_processed(self,
+                            session: AsyncServerSession,
+                            future: asyncio.Future):
+        """
+        Internal function that is called by the event loop if a worker thread finished the setup of a session.
+
+        :param session:
+        :param future:
+        """
+        self._admission_controller.release()
+        self._on_processed(session, future)
+
+    def _dispatch(self,
+                  session: AsyncServerSession,
+                  func: Callable[[], bool]):
+        """
+        Internal function that executes the given session function in the worker pool. Is executed by the event loop.
+
+        :param session:
+        :param func:
+        """
+        future = self._loop.run_in_executor(self._executor, func)
+        future.add_done_callback(functools.partial(self._on_processed, session))
+
+    def _on_readable(self, session: AsyncServerSession):
+        """
+        Internal function that is called by the event loop if a client socket is readable.
+
+        :param session:
+        """
+        # Receive the data on the event loop and only hand complete requests to a worker thread. Closed connections
+        # and connections another thread currently communicates with are handed over as well.
+        if session.receive_pending_data() is True and not session.has_buffered_data():
+            return
+
+        # Stop watching the socket while a worker thread processes the request.
+        self._loop.remove_reader(session.fd)
+        self._dispatch(session, session.handle_request)
+
+    def _on_pending_frames(self, session: AsyncServerSession):
+        """
+        Internal function that is called by the event loop if frames of a client were received by another thread.
+
+        :param session:
+        """
+        # Ignore sessions that are not initialized yet or already closed (the file descriptor could be reused).
+        if session.clientComm is None or not session.clientComm.clientInitialized:
+            return
+
+        # If the socket is not watched, a worker thread currently processes the session
+        # and checks for pending frames afterwards.
+        if self._loop.remove_reader(session.fd):
+            self._dispatch(session, session.handle_request)
+
+    def _on_processed(self,
+                      session: AsyncServerSession,
+                      future: asyncio.Future):
+        """
+        Internal function that is called by the event loop if a worker thread finished processing a session.
+
+        :param session:
+        :param future:
+        """
+        try:
+            is_alive = future.result()
+
+        except Exception as e:
+            self.logger.exception("[%s]: Processing client connection failed (%s:%d)."
+                                  % (self.fileName, session.clientAddress, session.clientPort))
+            self._loop.run_in_executor(self._executor, session.finish)
+            return
+
+        if not is_alive:
+            return
+
+        if session.has_buffered_data():
+            self._dispatch(session, session.handle_request)
+
+        else:
+            self._loop.add_reader(session.fd, self._on_readable, session)
+
+    def serve_forever(self):
+        """
+        Runs the event loop until shutdown() is called.
+        """
+        asyncio.set_event_loop(self._loop)
+        self._loop.add_reader(self.socket.fileno(), self._accept)
+        try:
+            self._loop.run_forever()
+
+        finally:
+            self._loop.remove_reader(self.socket.fileno())
+
+    def shutdown(self):
+        """
+        Stops the event loop.
+        """
+        self._loop.call_soon_threadsafe(self._loop.stop)
+
+    def server_close(self):
+        """
+        Closes the listening socket and stops the worker threads.
+        """
+        try:
+            self.socket.close()
+
+        except Exception as e:
+            pass
+
+        self._executor.shutdown(wait=False)
@@ -14,8 +14,11 @@ import ssl
 import time
 import xml.etree.ElementTree
 import logging
+from ..alert.instrumentationFunction import load_instrumentation_function
 from ..users import CSVBackend
-from ..storage import Sqlite
+from ..storage import Sqlite, Postgresql, CachedStorage, StorageSnapshot
+from ..history import SensorHistory
+from ..journal import SensorAlertJournal
 from ..localObjects import AlertLevel, Profile
 from ..internalSensors import NodeTimeoutSensor, ProfileChangeSensor, VersionInformerSensor, \
     AlertLevelInstrumentationErrorSensor
@@ -118,6 +121,12 @@ def parse_main_config(configRoot: xml.etree.ElementTree.Element, global_data: Gl
     if not configure_storage(configRoot, global_data):
         return False
 
+    if not configure_history(configRoot, global_data):
+        return False
+
+    if not configure_journal(configRoot, global_data):
+        return False
+
     if not configure_survey(configRoot, global_data):
         return False
 
@@ -187,10 +196,97 @@ def configure_user_backend(configRoot: xml.etree.ElementTree.Element, global_dat
 
 def configure_storage(configRoot: xml.etree.ElementTree.Element, global_data: GlobalData) -> bool:
 
+    # The storage settings are optional to stay compatible with existing configuration files (uses Sqlite).
+    storage_element = configRoot.find("general").find("storage")
+    if storage_element is not None:
+        try:
+            global_data.logger.debug("[%s]: Parsing storage configuration." % log_tag)
+            global_data.storageBackend = str(storage_element.attrib.get("backend",
+                                                                        global_data.storageBackend)).lower()
+            if global_data.storageBackend not in ["sqlite", "postgresql"]:
+                global_data.logger.error("[%s]: Storage backend '%s' does not exist."
+                                         % (log_tag, global_data.storageBackend))
+                return False
+
+            global_data.storageBackendPostgresqlHost = str(storage_element.attrib.get(
+                "host", global_data.storageBackendPostgresqlHost))
+            global_data.storageBackendPostgresqlPort = int(storage_element.attrib.get(
+                "port", global_data.storageBackendPostgresqlPort))
+            global_data.storageBackendPostgresqlDatabase = str(storage_element.attrib.get(
+                "database", global_data.storageBackendPostgresqlDatabase))
+            global_data.storageBackendPostgresqlUser = str(storage_element.attrib.get(
+                "user", global_data.storageBackendPostgresqlUser))
+            global_data.storageBackendPostgresqlPassword = str(storage_element.attrib.get(
+                "password", global_data.storageBackendPostgresqlPassword))
+            global_data.storageBackendPostgresqlPoolSize = int(storage_element.attrib.get(
+                "poolSize", global_data.storageBackendPostgresqlPoolSize))
+            if global_data.storageBackendPostgresqlPoolSize <= 0:
+                global_data.logger.error("[%s]: Pool size of storage backend has to be greater than 0." % log_tag)
+                return False
+
+            global_data.storageBackendSqliteReaderCount = int(storage_element.attrib.get(
+                "readerCount", global_data.storageBackendSqliteReaderCount))
+            if global_data.storageBackendSqliteReaderCount < 0:
+                global_data.logger.error("[%s]: Reader count of storage backend must not be negative." % log_tag)
+                return False
+
+            global_data.storageBackendSqliteGroupCommitInterval = float(storage_element.attrib.get(
+                "groupCommitInterval", global_data.storageBackendSqliteGroupCommitInterval))
+            global_data.storageBackendSqliteGroupCommitSize = int(storage_element.attrib.get(
+                "groupCommitSize", global_data.storageBackendSqliteGroupCommitSize))
+            if global_data.storageBackendSqliteGroupCommitInterval < 0.0:
+                global_data.logger.error("[%s]: Group commit interval of storage backend must not be negative."
+                                         % log_tag)
+                return False
+            if global_data.storageBackendSqliteGroupCommitSize <= 0:
+                global_data.logger.error("[%s]: Group commit size of storage backend has to be greater than 0."
+                                         % log_tag)
+                return False
+
+            global_data.storageCacheEnabled = (str(storage_element.attrib.get(
+                "cache", global_data.storageCacheEnabled)).upper() == "TRUE")
+
+        except Exception:
+            global_data.logger.exception("[%s]: Parsing storage options failed." % log_tag)
+            return False
+
+    # The snapshot settings are optional to stay compatible with existing configuration files.
+    snapshot_element = configRoot.find("general").find("snapshot")
+    if snapshot_element is not None:
+        try:
+            global_data.logger.debug("[%s]: Parsing storage snapshot configuration." % log_tag)
+            global_data.storageSnapshotEnabled = (str(snapshot_element.attrib["enabled"]).upper() == "TRUE")
+            global_data.storageSnapshotInterval = float(snapshot_element.attrib.get(
+                "interval", global_data.storageSnapshotInterval))
+            if global_data.storageSnapshotInterval <= 0:
+                global_data.logger.error("[%s]: Interval of storage snapshot has to be greater than 0." % log_tag)
+                return False
+
+            if global_data.storageSnapshotEnabled and not global_data.storageCacheEnabled:
+                global_data.logger.error("[%s]: Storage snapshot needs the storage cache." % log_tag)
+                return False
+
+        except Exception:
+            global_data.logger.exception("[%s]: Parsing storage snapshot options failed." % log_tag)
+            return False
+
     # Configure storage backend.
     try:
         global_data.logger.debug("[%s]: Initializing storage backend." % log_tag)
-        global_data.storage = Sqlite(global_data.storageBackendSqliteFile, global_data)
+        if global_data.storageBackend == "postgresql":
+            global_data.storage = Postgresql(global_data)
+
+        else:
+            global_data.storage = Sqlite(global_data.storageBackendSqliteFile, global_data)
+
+        if global_data.storageCacheEnabled:
+            snapshot = None
+            if global_data.storageSnapshotEnabled:
+                snapshot = StorageSnapshot.read(global_data.storageSnapshotFile, global_data.logger)
+            global_data.storage = CachedStorage(global_data.storage, global_data, snapshot)
+
+        if global_data.storageSnapshotEnabled:
+            global_data.storage_snapshot = StorageSnapshot(global_data)
 
     except Exception:
         global_data.logger.exception("[%s]: Configuring storage backend failed." % log_tag)
@@ -218,6 +314,72 @@ def configure_storage(configRoot: xml.etree.ElementTree.Element, global_data: Gl
     return True
 
 
+def configure_history(configRoot: xml.etree.ElementTree.Element, global_data: GlobalData) -> bool:
+
+    # The sensor history is optional to stay compatible with existing configuration files.
+    history_element = configRoot.find("general").find("history")
+    if history_element is None:
+        return True
+
+    try:
+        global_data.logger.debug("[%s]: Parsing sensor history configuration." % log_tag)
+        global_data.sensorHistoryEnabled = (str(history_element.attrib["enabled"]).upper() == "TRUE")
+        if not global_data.sensorHistoryEnabled:
+            return True
+
+        # Retention times are configured in days.
+        global_data.sensorHistoryRawRetention = float(history_element.attrib.get(
+            "rawRetention", global_data.sensorHistoryRawRetention / 86400)) * 86400
+        global_data.sensorHistoryMinuteRetention = float(history_element.attrib.get(
+            "minuteRetention", global_data.sensorHistoryMinuteRetention / 86400)) * 86400
+        global_data.sensorHistoryHourRetention = float(history_element.attrib.get(
+            "hourRetention", global_data.sensorHistoryHourRetention / 86400)) * 86400
+        if (global_data.sensorHistoryRawRetention <= 0
+                or global_data.sensorHistoryMinuteRetention <= 0
+                or global_data.sensorHistoryHourRetention <= 0):
+            global_data.logger.error("[%s]: Retention of sensor history has to be greater than 0." % log_tag)
+            return False
+
+        global_data.logger.debug("[%s]: Initializing sensor history." % log_tag)
+        global_data.sensor_history = SensorHistory(global_data)
+
+    except Exception:
+        global_data.logger.exception("[%s]: Configuring sensor history failed." % log_tag)
+        return False
+
+    return True
+
+
+def configure_journal(configRoot: xml.etree.ElementTree.Element, global_data: GlobalData) -> bool:
+
+    # The sensor alert journal is optional to stay compatible with existing configuration files.
+    journal_element = configRoot.find("general").find("journal")
+    if journal_element is None:
+        return True
+
+    try:
+        global_data.logger.debug("[%s]: Parsing sensor alert journal configuration." % log_tag)
+        global_data.sensorAlertJournalEnabled = (str(journal_element.attrib["enabled"]).upper() == "TRUE")
+        if not global_data.sensorAlertJournalEnabled:
+            return True
+
+        # Retention time is configured in days.
+        global_data.sensorAlertJournalRetention = float(journal_element.attrib.get(
+            "retention", global_data.sensorAlertJournalRetention / 86400)) * 86400
+        if global_data.sensorAlertJournalRetention <= 0:
+            global_data.logger.error("[%s]: Retention of sensor alert journal has to be greater than 0." % log_tag)
+            return False
+
+        global_data.logger.debug("[%s]: Initializing sensor alert journal." % log_tag)
+        global_data.sensor_alert_journal = SensorAlertJournal(global_data)
+
+    except Exception:
+        global_data.logger.exception("[%s]: Configuring sensor alert journal failed." % log_tag)
+        return False
+
+    return True
+
+
 def configure_survey(configRoot: xml.etree.ElementTree.Element, global_data: GlobalData) -> bool:
 
     # Get survey configurations
@@ -240,6 +402,32 @@ def configure_server(configRoot: xml.etree.ElementTree.Element, global_data: Glo
         global_data.logger.debug("[%s]: Parsing server configuration." % log_tag)
         global_data.server_port = int(configRoot.find("general").find("server").attrib["port"])
 
+        # The server mode is optional to stay compatible with existing configuration files.
+        server_element = configRoot.find("general").find("server")
+        global_data.server_mode = str(server_element.attrib.get("mode", global_data.server_mode)).lower()
+        if global_data.server_mode not in ["threaded", "async"]:
+            global_data.logger.error("[%s]: Server mode '%s' not valid."
+                                     % (log_tag, global_data.server_mode))
+            return False
+
+        global_data.server_async_workers = int(server_element.attrib.get("asyncWorkers",
+                                                                         global_data.server_async_workers))
+        if global_data.server_async_workers <= 0:
+            global_data.logger.error("[%s]: Number of async workers has to be greater than 0." % log_tag)
+            return False
+
+        global_data.serverMaxConcurrentSetups = int(server_element.attrib.get("maxConcurrentSetups",
+                                                                              global_data.serverMaxConcurrentSetups))
+        if global_data.serverMaxConcurrentSetups <= 0:
+            global_data.logger.error("[%s]: Number of concurrent session setups has to be greater than 0." % log_tag)
+            return False
+
+        global_data.managerStateChangeFlushWindow = float(server_element.attrib.get(
+            "stateChangeFlushWindow", global_data.managerStateChangeFlushWindow))
+        if global_data.managerStateChangeFlushWindow < 0:
+            global_data.logger.error("[%s]: State change flush window must not be negative." % log_tag)
+            return False
+
     except Exception:
         global_data.logger.exception("[%s]: Configuring server failed." % log_tag)
         return False
@@ -369,6 +557,12 @@ def configure_alert_levels(configRoot: xml.etree.ElementTree.Element, global_dat
             if alertLevel.instrumentation_active:
                 alertLevel.instrumentation_cmd = str(item.find("instrumentation").attrib["cmd"])
                 alertLevel.instrumentation_timeout = int(item.find("instrumentation").attrib["timeout"])
+                alertLevel.instrumentation_mode = str(item.find("instrumentation").attrib.get(
+                    "mode", alertLevel.instrumentation_mode)).lower()
+                alertLevel.instrumentation_workers = int(item.find("instrumentation").attrib.get(
+                    "workers", alertLevel.instrumentation_workers))
+                alertLevel.instrumentation_max_requests = int(item.find("instrumentation").attrib.get(
+                    "maxRequests", alertLevel.instrumentation_max_requests))
 
             alertLevel.profiles = list()
             for profile_xml in item.iterfind("profile"):
@@ -381,12 +575,26 @@ def configure_alert_levels(configRoot: xml.etree.ElementTree.Element, global_dat
                     return False
 
             # Check instrumentation settings for sanity.
-            if alertLevel.instrumentation_active is True and os.path.exists(alertLevel.instrumentation_cmd) is False:
+            # (the command of the "python" mode is a Python callable given as "module:function"
+            # which is loaded once here)
+            if alertLevel.instrumentation_active is True and alertLevel.instrumentation_mode == "python":
+                try:
+                    alertLevel.instrumentation_function = load_instrumentation_function(
+                        alertLevel.instrumentation_cmd)
+
+                except Exception:
+                    global_data.logger.exception("[%s]: Alert Level '%d' instrumentation function '%s' could not "
+                                                 % (log_tag, alertLevel.level, alertLevel.instrumentation_cmd)
+                                                 + "be loaded.")
+                    return False
+
+            elif (alertLevel.instrumentation_active is True
+                  and os.path.exists(alertLevel.instrumentation_cmd) is False):
                 global_data.logger.error("[%s]: Alert Level '%d' instrumentation command '%s' does not exist."
                                          % (log_tag, alertLevel.level, alertLevel.instrumentation_cmd))
                 return False
 
-            if alertLevel.instrumentation_active is True and not os.access(alertLevel.instrumentation_cmd, os.X_OK):
+            elif alertLevel.instrumentation_active is True and not os.access(alertLevel.instrumentation_cmd, os.X_OK):
                 global_data.logger.error("[%s]: Alert Level '%d' instrumentation command '%s' not executable."
                                          % (log_tag, alertLevel.level, alertLevel.instrumentation_cmd))
                 return False
@@ -396,6 +604,24 @@ def configure_alert_levels(configRoot: xml.etree.ElementTree.Element, global_dat
                                          % (log_tag, alertLevel.level))
                 return False
 
+            if alertLevel.instrumentation_active is True and alertLevel.instrumentation_mode not in ["oneshot",
+                                                                                                   "worker",
+                                                                                                   "python"]:
+                global_data.logger.error("[%s]: Alert Level '%d' instrumentation mode '%s' is not supported."
+                                         % (log_tag, alertLevel.level, alertLevel.instrumentation_mode))
+                return False
+
+            if alertLevel.instrumentation_active is True and alertLevel.instrumentation_workers <= 0:
+                global_data.logger.error("[%s]: Alert Level '%d' instrumentation workers has to be greater than 0."
+                                         % (log_tag, alertLevel.level))
+                return False
+
+            if alertLevel.instrumentation_active is True and alertLevel.instrumentation_max_requests <= 0:
+                global_data.logger.error("[%s]: Alert Level '%d' instrumentation maxRequests has to be greater "
+                                         % (log_tag, alertLevel.level)
+                                         + "than 0.")
+                return False
+
             # Check profile settings.
             if not alertLevel.profiles:
                 global_data.logger.error("[%s]: Alert Level '%d' needs at least one profile configured."
@@ -10,7 +10,7 @@
 import threading
 import os
 from typing import List, Tuple, Optional
-from ..server import AsynchronousSender
+from ..sender import SensorErrorStateChangeMessage
 from ..globalData.globalData import GlobalData
 from ..globalData.sensorObjects import SensorErrorState
 from ..internalSensors.sensorErrorState import SensorErrorStateSensor
@@ -30,6 +30,7 @@ class ErrorStateExecuter(threading.Thread):
         self._logger = self._global_data.logger
         self._storage = self._global_data.storage
         self._server_sessions = self._global_data.serverSessions
+        self._sender_dispatcher = self._global_data.sender_dispatcher
 
         # file nme of this file (used for logging)
         self._log_tag = os.path.basename(__file__)
@@ -145,19 +146,13 @@ class ErrorStateExecuter(threading.Thread):
             if not server_session.clientComm.clientInitialized:
                 continue
 
-            # Sending sensor error state change to manager client via a thread to not block this one
-            sender = AsynchronousSender(self._global_data, server_session.clientComm)
-            # set thread to daemon
-            # => threads terminates when main thread terminates
-            sender.daemon = True
-            sender.send_sensor_error_state_change = True
-            sender.sensor_id = sensor_id
-            sender.error_state = error_state
+            # Queue sensor error state change for manager client to not block this one
             self._logger.debug("[%s]: Sending error state change for sensor id %d "
                                % (self._log_tag, sensor_id)
                                + "to manager client (%s:%d)."
                                % (server_session.clientComm.clientAddress, server_session.clientComm.clientPort))
-            sender.start()
+            self._sender_dispatcher.queue_message(server_session.clientComm,
+                                                  SensorErrorStateChangeMessage(sensor_id, error_state))
 
     def _update_sensor_error_state_sensor(self,
                                           node_id: int,
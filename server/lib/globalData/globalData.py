@@ -10,7 +10,7 @@
 import os
 import threading
 import ssl
-from typing import Optional
+from typing import Any, Dict, List, Optional, Set, Iterable
 
 
 # Class implements an iterator that iterates over a copy of the
@@ -38,6 +38,20 @@ class ServerSessions(object):
         self._server_sessions = list()
         self._server_sessions_lock = threading.Lock()
 
+        # Routing index of the initialized clients (client communication objects) by their node type and
+        # by the alert levels alert and manager clients handle (protected by the server sessions lock).
+        self._clients_by_node_type = dict()  # type: Dict[str, Set[Any]]
+        self._clients_by_alert_level = dict()  # type: Dict[int, Set[Any]]
+
+    def _remove_initialized_client(self, client_comm):
+        """
+        Removes the client from the routing index. The server sessions lock has to be held.
+        :param client_comm:
+        """
+        self._clients_by_node_type.get(client_comm.nodeType, set()).discard(client_comm)
+        for alert_level in client_comm.clientAlertLevels:
+            self._clients_by_alert_level.get(alert_level, set()).discard(client_comm)
+
     def append(self, server_session):
         with self._server_sessions_lock:
             self._server_sessions.append(server_session)
@@ -46,6 +60,52 @@ class ServerSessions(object):
         with self._server_sessions_lock:
             self._server_sessions.remove(server_session)
 
+            # A session can be removed without the client being cleaned up (e.g., if the connection broke).
+            client_comm = getattr(server_session, "clientComm", None)
+            if client_comm is not None:
+                self._remove_initialized_client(client_comm)
+
+    def add_initialized_client(self, client_comm):
+        """
+        Adds a client that has finished its initialization to the routing index.
+        :param client_comm: client communication object of the client
+        """
+        with self._server_sessions_lock:
+            self._clients_by_node_type.setdefault(client_comm.nodeType, set()).add(client_comm)
+
+            if client_comm.nodeType in ["alert", "manager"]:
+                for alert_level in client_comm.clientAlertLevels:
+                    self._clients_by_alert_level.setdefault(alert_level, set()).add(client_comm)
+
+    def remove_initialized_client(self, client_comm):
+        """
+        Removes a client from the routing index (e.g., because it disconnects).
+        :param client_comm: client communication object of the client
+        """
+        with self._server_sessions_lock:
+            self._remove_initialized_client(client_comm)
+
+    def get_clients_by_node_type(self, node_type: str) -> List[Any]:
+        """
+        Gets all initialized clients of the given node type.
+        :param node_type:
+        :return: list of client communication objects
+        """
+        with self._server_sessions_lock:
+            return list(self._clients_by_node_type.get(node_type, set()))
+
+    def get_clients_by_alert_levels(self, alert_levels: Iterable[int]) -> List[Any]:
+        """
+        Gets all initialized alert and manager clients that handle at least one of the given alert levels.
+        :param alert_levels:
+        :return: list of client communication objects (each client only once)
+        """
+        with self._server_sessions_lock:
+            clients = set()
+            for alert_level in alert_levels:
+                clients.update(self._clients_by_alert_level.get(alert_level, set()))
+            return list(clients)
+
     def __iter__(self):
         with self._server_sessions_lock:
             return ServerSessionsIterator(self._server_sessions)
@@ -90,6 +150,22 @@ class GlobalData:
         # Object that handles error state updates.
         self.error_state_executer = None
 
+        # Object that sends messages to the clients.
+        self.sender_dispatcher = None
+
+        # Number of worker threads that send messages to the clients.
+        self.sender_worker_count = 32
+
+        # Maximal number of messages queued for a single client before its connection is closed.
+        self.sender_queue_size = 100
+
+        # Object that keeps track of the changes of the alert system status.
+        self.status_tracker = None
+
+        # Number of status versions a manager can fall behind before it
+        # gets a full status update instead of only the changes.
+        self.statusDeltaMaxLag = 100
+
         # this is the time in seconds when the client times out
         self.connectionTimeout = 90
 
@@ -104,6 +180,11 @@ class GlobalData:
         # are sent updates of the clients (at least)
         self.managerUpdateInterval = 60.0
 
+        # This is the time in seconds state changes are collected before
+        # they are sent to the managers (only the latest state change of
+        # a sensor is sent in each window, 0 sends them immediately).
+        self.managerStateChangeFlushWindow = 0.0
+
         # This is the interval in seconds in which the configuration
         # files that can be reloaded during runtime are checked
         # for changes and reloaded if changed.
@@ -130,6 +211,101 @@ class GlobalData:
                                                      "config",
                                                      "database.db")
 
+        # Number of connections used to read from the database in parallel to the connection that writes
+        # (0 uses one connection for reading and writing, more than 0 switches the database to write-ahead logging).
+        self.storageBackendSqliteReaderCount = 0
+
+        # Time in seconds changes to the sqlite database are collected before they are committed together
+        # in one transaction (0 commits each change on its own) and number of collected changes that are
+        # committed immediately.
+        self.storageBackendSqliteGroupCommitInterval = 0.0
+        self.storageBackendSqliteGroupCommitSize = 100
+
+        # Storage backend that is used ("sqlite" or "postgresql").
+        self.storageBackend = "sqlite"
+
+        # Settings of the PostgreSQL database (if postgresql is used as backend).
+        self.storageBackendPostgresqlHost = "localhost"
+        self.storageBackendPostgresqlPort = 5432
+        self.storageBackendPostgresqlDatabase = "alertr"
+        self.storageBackendPostgresqlUser = "alertr"
+        self.storageBackendPostgresqlPassword = ""
+
+        # Maximal number of connections to the PostgreSQL database (each connection writes in parallel).
+        self.storageBackendPostgresqlPoolSize = 8
+
+        # Keep all nodes, sensors, alerts, managers and options in memory in front of the storage backend
+        # (reads are answered from memory, changes are written through to the backend).
+        self.storageCacheEnabled = True
+
+        # Object that writes snapshots of the objects kept in memory (None if snapshots are disabled).
+        self.storage_snapshot = None
+
+        # Write snapshots of the objects kept in memory and load them instead of the whole database at startup
+        # (needs the storage cache).
+        self.storageSnapshotEnabled = False
+
+        # path to the snapshot file
+        self.storageSnapshotFile = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                                "..",
+                                                "..",
+                                                "config",
+                                                "snapshot.bin")
+
+        # Interval in seconds in which snapshots are written.
+        self.storageSnapshotInterval = 300.0
+
+        # Object that records the history of the sensor states and data (None if the history is disabled).
+        self.sensor_history = None
+
+        # Record the history of the sensor states and data in a separate database.
+        self.sensorHistoryEnabled = False
+
+        # path to the sqlite database file of the sensor history
+        self.storageBackendSqliteHistoryFile = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                                            "..",
+                                                            "..",
+                                                            "config",
+                                                            "history.db")
+
+        # Time in seconds the raw entries, the aggregates per minute and the aggregates per hour
+        # of the sensor history are kept.
+        self.sensorHistoryRawRetention = 86400.0
+        self.sensorHistoryMinuteRetention = 2592000.0
+        self.sensorHistoryHourRetention = 31536000.0
+
+        # Interval in seconds in which the collected entries of the sensor history are written
+        # and in which the entries are downsampled and deleted after their retention.
+        self.sensorHistoryFlushInterval = 1.0
+        self.sensorHistoryDownsampleInterval = 60.0
+
+        # Maximal number of collected entries of the sensor history before the oldest entries are dropped.
+        self.sensorHistoryMaxPending = 100000
+
+        # Object that records all processed sensor alerts (None if the journal is disabled).
+        self.sensor_alert_journal = None
+
+        # Record all processed sensor alerts in a separate database.
+        self.sensorAlertJournalEnabled = False
+
+        # path to the sqlite database file of the sensor alert journal
+        self.storageBackendSqliteJournalFile = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                                            "..",
+                                                            "..",
+                                                            "config",
+                                                            "journal.db")
+
+        # Time in seconds the sensor alerts are kept in the journal.
+        self.sensorAlertJournalRetention = 7776000.0
+
+        # Interval in seconds in which the collected sensor alerts are written to the journal
+        # and in which old sensor alerts are deleted from the journal.
+        self.sensorAlertJournalFlushInterval = 1.0
+        self.sensorAlertJournalCompactionInterval = 3600.0
+
+        # Maximal number of collected sensor alerts before the oldest sensor alerts are dropped.
+        self.sensorAlertJournalMaxPending = 10000
+
         # location of the certifiacte file
         self.serverCertFile = None  # type: Optional[str]
 
@@ -151,9 +327,33 @@ class GlobalData:
         self.sslCiphers = "HIGH:!aNULL:!eNULL:!EXPORT:!CAMELLIA:!DES:!MD5:!PSK:!RC4"
         self.sslEnabled = True
 
+        # TLS/SSL context shared by all client connections.
+        self.tls_context = None
+
+        # Interval in seconds in which the certificate files are checked for changes
+        # (the TLS/SSL context is reloaded if they have changed).
+        self.tlsReloadCheckInterval = 60.0
+
         # Port the server is listening on.
         self.server_port = None  # type: Optional[int]
 
+        # Mode the server uses to handle client connections ("threaded" uses one thread per client,
+        # "async" uses an event loop and a bounded pool of worker threads).
+        self.server_mode = "threaded"
+
+        # Number of worker threads that handle client requests in the "async" server mode.
+        self.server_async_workers = 32
+
+        # Maximal number of client sessions that are set up concurrently (TLS/SSL handshake, authentication and
+        # registration). Further clients are queued until a setup has finished.
+        self.serverMaxConcurrentSetups = 16
+
+        # Object that limits the number of concurrent session setups.
+        self.admission_controller = None
+
+        # Object that skips unchanged registrations of reconnecting nodes and counts them.
+        self.registration_tracker = None
+
         # a list of all alert levels that are configured on this server
         self.alertLevels = list()
 
@@ -0,0 +1,481 @@
+#!/usr/bin/env python3
+
+# written by sqall
+# twitter: https://twitter.com/sqall01
+# blog: https://h4des.org
+# github: https://github.com/sqall01
+#
+# Licensed under the GNU Affero General Public License, version 3.
+
+import os
+import sqlite3
+import threading
+import time
+from typing import List, Tuple, Optional
+from ..globalData.globalData import GlobalData
+# noinspection PyProtectedMember
+from ..globalData.sensorObjects import _SensorData, SensorDataInt, SensorDataFloat, SensorDataGPS
+
+
+class SensorHistoryEntry:
+    """
+    A single entry of the history of a sensor. Raw entries contain a single state and/or data value. Downsampled
+    entries aggregate all raw entries of the interval starting at the timestamp.
+    """
+
+    def __init__(self):
+        self.sensor_id = None  # type: Optional[int]
+        self.timestamp = None  # type: Optional[float]
+
+        # Number of raw entries this entry consists of.
+        self.count = None  # type: Optional[int]
+
+        # Last state and average state (share of time the sensor was triggered) in the interval
+        # (None if no state was recorded).
+        self.state = None  # type: Optional[int]
+        self.state_avg = None  # type: Optional[float]
+
+        # Last, minimal, maximal and average value of integer and float data in the interval
+        # (None if no value was recorded).
+        self.value = None  # type: Optional[float]
+        self.value_min = None  # type: Optional[float]
+        self.value_max = None  # type: Optional[float]
+        self.value_avg = None  # type: Optional[float]
+
+        # Last position of GPS data in the interval (None if no position was recorded).
+        self.lat = None  # type: Optional[float]
+        self.lon = None  # type: Optional[float]
+        self.utctime = None  # type: Optional[int]
+
+
+class SensorHistory(threading.Thread):
+    """
+    Append-only history of the states and data of all sensors. The entries are collected in memory and written in
+    batches by this thread to a separate database, so recording them never holds the lock of the storage. The raw
+    entries are downsampled to aggregates of one minute and one hour, and each resolution is deleted after its
+    retention time.
+    """
+
+    resolutions = {"raw": 0, "minute": 60, "hour": 3600}
+
+    def __init__(self,
+                 global_data: GlobalData,
+                 storage_path: Optional[str] = None):
+        """
+        :param global_data:
+        :param storage_path: path to the database file (None uses the configured file)
+        """
+        threading.Thread.__init__(self, daemon=True)
+
+        self._global_data = global_data
+        self._logger = self._global_data.logger
+        self._log_tag = os.path.basename(__file__)
+
+        if storage_path is None:
+            storage_path = self._global_data.storageBackendSqliteHistoryFile
+
+        self._retentions = {"raw": self._global_data.sensorHistoryRawRetention,
+                            "minute": self._global_data.sensorHistoryMinuteRetention,
+                            "hour": self._global_data.sensorHistoryHourRetention}
+        self._flush_interval = self._global_data.sensorHistoryFlushInterval
+        self._downsample_interval = self._global_data.sensorHistoryDownsampleInterval
+        self._max_pending = self._global_data.sensorHistoryMaxPending
+
+        self._exit_flag = False
+        self._exit_event = threading.Event()
+
+        # Entries that are not written to the database yet.
+        self._pending = list()  # type: List[Tuple]
+        self._pending_lock = threading.Lock()
+
+        self._dropped_count = 0
+        self._written_count = 0
+
+        self._db_lock = threading.Lock()
+        self._conn = sqlite3.connect(storage_path, check_same_thread=False)
+        self._cursor = self._conn.cursor()
+        self._cursor.execute("PRAGMA journal_mode=WAL")
+        self._create_tables()
+
+    @property
+    def dropped_count(self) -> int:
+        """
+        Number of entries that were dropped because the database could not keep up.
+        """
+        return self._dropped_count
+
+    @property
+    def written_count(self) -> int:
+        """
+        Number of raw entries written to the database.
+        """
+        return self._written_count
+
+    def _create_tables(self):
+        """
+        Internal function that creates the tables if they do not exist.
+        """
+        with self._db_lock:
+            self._cursor.execute("CREATE TABLE IF NOT EXISTS history_raw ("
+                                 + "sensor_id INTEGER NOT NULL, "
+                                 + "timestamp REAL NOT NULL, "
+                                 + "state INTEGER, "
+                                 + "value REAL, "
+                                 + "lat REAL, "
+                                 + "lon REAL, "
+                                 + "utctime INTEGER)")
+            self._cursor.execute("CREATE INDEX IF NOT EXISTS history_raw_sensor_timestamp "
+                                 + "ON history_raw (sensor_id, timestamp)")
+            self._cursor.execute("CREATE INDEX IF NOT EXISTS history_raw_timestamp "
+                                 + "ON history_raw (timestamp)")
+
+            # The aggregates store sums and counts instead of averages so that they can be aggregated again.
+            for table in ["history_minute", "history_hour"]:
+                self._cursor.execute("CREATE TABLE IF NOT EXISTS " + table + " ("
+                                     + "sensor_id INTEGER NOT NULL, "
+                                     + "timestamp INTEGER NOT NULL, "
+                                     + "count INTEGER NOT NULL, "
+                                     + "state INTEGER, "
+                                     + "state_count INTEGER NOT NULL, "
+                                     + "state_sum INTEGER NOT NULL, "
+                                     + "value REAL, "
+                                     + "value_count INTEGER NOT NULL, "
+                                     + "value_min REAL, "
+                                     + "value_max REAL, "
+                                     + "value_sum REAL NOT NULL, "
+                                     + "lat REAL, "
+                                     + "lon REAL, "
+                                     + "utctime INTEGER, "
+                                     + "PRIMARY KEY(sensor_id, timestamp)) WITHOUT ROWID")
+                self._cursor.execute("CREATE INDEX IF NOT EXISTS " + table + "_timestamp "
+                                     + "ON " + table + " (timestamp)")
+
+            # Start of the first interval of each resolution that is not aggregated yet.
+            self._cursor.execute("CREATE TABLE IF NOT EXISTS history_watermarks ("
+                                 + "resolution TEXT NOT NULL PRIMARY KEY, "
+                                 + "timestamp INTEGER NOT NULL)")
+            self._conn.commit()
+
+    def _get_watermark(self, resolution: str) -> int:
+        """
+        Internal function that gets the start of the first interval that is not aggregated yet.
+        The database lock has to be held by the caller.
+
+        :param resolution:
+        :return:
+        """
+        self._cursor.execute("SELECT timestamp FROM history_watermarks WHERE resolution = ?", (resolution, ))
+        result = self._cursor.fetchall()
+        if result:
+            return result[0][0]
+        return 0
+
+    @staticmethod
+    def _merge(aggregate: Optional[List], row: Tuple) -> List:
+        """
+        Internal function that merges the given row (in the order of the aggregate columns after the timestamp)
+        into the aggregate. Rows have to be merged in the order of their timestamps.
+
+        :param aggregate: aggregate or None to start a new one
+        :param row:
+        :return: merged aggregate
+        """
+        (count, state, state_count, state_sum, value, value_count, value_min, value_max, value_sum,
+         lat, lon, utctime) = row
+
+        if aggregate is None:
+            return list(row)
+
+        aggregate[0] += count
+        if state_count:
+            aggregate[1] = state
+            aggregate[2] += state_count
+            aggregate[3] += state_sum
+        if value_count:
+            aggregate[4] = value
+            aggregate[5] += value_count
+            aggregate[6] = value_min if aggregate[6] is None else min(aggregate[6], value_min)
+            aggregate[7] = value_max if aggregate[7] is None else max(aggregate[7], value_max)
+            aggregate[8] += value_sum
+        if lat is not None:
+            aggregate[9] = lat
+            aggregate[10] = lon
+            aggregate[11] = utctime
+        return aggregate
+
+    def _aggregate(self,
+                   rows: List[Tuple],
+                   interval: int,
+                   target_table: str):
+        """
+        Internal function that aggregates the given rows (sensor id, timestamp and aggregate columns ordered by
+        sensor id and timestamp) to intervals of the given length and writes them to the given table.
+        The database lock has to be held by the caller.
+
+        :param rows:
+        :param interval: length of the aggregated intervals in seconds
+        :param target_table:
+        """
+        aggregates = list()
+        curr_key = None
+        curr_aggregate = None
+        for row in rows:
+            key = (row[0], int(row[1] // interval) * interval)
+            if key != curr_key:
+                if curr_aggregate is not None:
+                    aggregates.append(curr_key + tuple(curr_aggregate))
+                curr_key = key
+                curr_aggregate = None
+            curr_aggregate = self._merge(curr_aggregate, row[2:])
+        if curr_aggregate is not None:
+            aggregates.append(curr_key + tuple(curr_aggregate))
+
+        self._cursor.executemany("INSERT OR REPLACE INTO " + target_table + " ("
+                                 + "sensor_id, timestamp, count, state, state_count, state_sum, "
+                                 + "value, value_count, value_min, value_max, value_sum, lat, lon, utctime) "
+                                 + "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                                 aggregates)
+
+    def add(self,
+            entries: List[Tuple[int, Optional[int], Optional[_SensorData]]],
+            timestamp: Optional[float] = None):
+        """
+        Adds entries to the history. The entries are written to the database by the history thread (or by flush()).
+
+        :param entries: list of tuples of (sensor id, state or None, data or None)
+        :param timestamp: time of the entries (None uses the current time)
+        """
+        if timestamp is None:
+            timestamp = time.time()
+
+        rows = list()
+        for sensor_id, state, data in entries:
+            value = None
+            lat = None
+            lon = None
+            utctime = None
+            if isinstance(data, (SensorDataInt, SensorDataFloat)):
+                value = data.value
+
+            elif isinstance(data, SensorDataGPS):
+                lat = data.lat
+                lon = data.lon
+                utctime = data.utctime
+
+            # Ignore entries without anything to record (for example, sensors without data).
+            elif state is None:
+                continue
+
+            rows.append((sensor_id, timestamp, state, value, lat, lon, utctime))
+
+        with self._pending_lock:
+            self._pending.extend(rows)
+
+            # Drop the oldest entries if the database can not keep up with the entries.
+            if len(self._pending) > self._max_pending:
+                dropped = len(self._pending) - self._max_pending
+                del self._pending[:dropped]
+                self._dropped_count += dropped
+
+    def flush(self):
+        """
+        Writes all collected entries to the database.
+        """
+        with self._pending_lock:
+            rows = self._pending
+            self._pending = list()
+
+        if not rows:
+            return
+
+        with self._db_lock:
+            try:
+                self._cursor.executemany("INSERT INTO history_raw ("
+                                         + "sensor_id, timestamp, state, value, lat, lon, utctime) "
+                                         + "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                                         rows)
+                self._conn.commit()
+                self._written_count += len(rows)
+
+            except Exception as e:
+                self._logger.exception("[%s]: Unable to write %d history entries." % (self._log_tag, len(rows)))
+                self._conn.rollback()
+                self._dropped_count += len(rows)
+
+    def downsample(self,
+                   now: Optional[float] = None):
+        """
+        Aggregates all completed minutes and hours and deletes all entries that are older than their retention.
+
+        :param now: current time (None uses the current time)
+        """
+        if now is None:
+            now = time.time()
+
+        with self._db_lock:
+            try:
+                # Only aggregate minutes whose entries were already written.
+                minute_watermark = self._get_watermark("minute")
+                minute_cutoff = int((now - self._flush_interval) // 60) * 60
+                if minute_cutoff > minute_watermark:
+                    self._cursor.execute("SELECT sensor_id, timestamp, 1, state, "
+                                         + "CASE WHEN state IS NULL THEN 0 ELSE 1 END, IFNULL(state, 0), "
+                                         + "value, CASE WHEN value IS NULL THEN 0 ELSE 1 END, value, value, "
+                                         + "IFNULL(value, 0), lat, lon, utctime "
+                                         + "FROM history_raw "
+                                         + "WHERE timestamp >= ? AND timestamp < ? "
+                                         + "ORDER BY sensor_id, timestamp",
+                                         (minute_watermark, minute_cutoff))
+                    self._aggregate(self._cursor.fetchall(), 60, "history_minute")
+                    minute_watermark = minute_cutoff
+                    self._cursor.execute("INSERT OR REPLACE INTO history_watermarks (resolution, timestamp) "
+                                         + "VALUES (?, ?)",
+                                         ("minute", minute_watermark))
+
+                # Only aggregate hours whose minutes were already aggregated.
+                hour_watermark = self._get_watermark("hour")
+                hour_cutoff = (minute_watermark // 3600) * 3600
+                if hour_cutoff > hour_watermark:
+                    self._cursor.execute("SELECT sensor_id, timestamp, count, state, state_count, state_sum, "
+                                         + "value, value_count, value_min, value_max, value_sum, lat, lon, utctime "
+                                         + "FROM history_minute "
+                                         + "WHERE timestamp >= ? AND timestamp < ? "
+                                         + "ORDER BY sensor_id, timestamp",
+                                         (hour_watermark, hour_cutoff))
+                    self._aggregate(self._cursor.fetchall(), 3600, "history_hour")
+                    hour_watermark = hour_cutoff
+                    self._cursor.execute("INSERT OR REPLACE INTO history_watermarks (resolution, timestamp) "
+                                         + "VALUES (?, ?)",
+                                         ("hour", hour_watermark))
+
+                # Entries are only deleted after they were aggregated.
+                self._cursor.execute("DELETE FROM history_raw WHERE timestamp < ?",
+                                     (min(now - self._retentions["raw"], minute_watermark), ))
+                self._cursor.execute("DELETE FROM history_minute WHERE timestamp < ?",
+                                     (min(now - self._retentions["minute"], hour_watermark), ))
+                self._cursor.execute("DELETE FROM history_hour WHERE timestamp < ?",
+                                     (now - self._retentions["hour"], ))
+
+                self._conn.commit()
+
+            except Exception as e:
+                self._logger.exception("[%s]: Unable to downsample history." % self._log_tag)
+                self._conn.rollback()
+
+    def get_history(self,
+                    sensor_id: int,
+                    start: float,
+                    end: float,
+                    resolution: Optional[str] = None) -> Optional[List[SensorHistoryEntry]]:
+        """
+        Gets the history of a sensor in the given time range ordered by time.
+
+        :param sensor_id:
+        :param start: start of the range (inclusive)
+        :param end: end of the range (exclusive)
+        :param resolution: "raw", "minute" or "hour" (None uses the finest resolution that is still
+        retained at the start of the range)
+        :return: list of history entries or None
+        """
+        if resolution is None:
+            now = time.time()
+            resolution = "hour"
+            for candidate in ["minute", "raw"]:
+                if start >= now - self._retentions[candidate]:
+                    resolution = candidate
+
+        if resolution not in self.resolutions:
+            self._logger.error("[%s]: Unknown history resolution '%s'." % (self._log_tag, resolution))
+            return None
+
+        # Make sure the collected entries are included.
+        self.flush()
+
+        entries = list()
+        with self._db_lock:
+            try:
+                if resolution == "raw":
+                    self._cursor.execute("SELECT timestamp, state, value, lat, lon, utctime "
+                                         + "FROM history_raw "
+                                         + "WHERE sensor_id = ? AND timestamp >= ? AND timestamp < ? "
+                                         + "ORDER BY timestamp",
+                                         (sensor_id, start, end))
+                    for timestamp, state, value, lat, lon, utctime in self._cursor.fetchall():
+                        entry = SensorHistoryEntry()
+                        entry.sensor_id = sensor_id
+                        entry.timestamp = timestamp
+                        entry.count = 1
+                        entry.state = state
+                        entry.state_avg = state
+                        entry.value = value
+                        entry.value_min = value
+                        entry.value_max = value
+                        entry.value_avg = value
+                        entry.lat = lat
+                        entry.lon = lon
+                        entry.utctime = utctime
+                        entries.append(entry)
+
+                else:
+                    self._cursor.execute("SELECT timestamp, count, state, state_count, state_sum, "
+                                         + "value, value_count, value_min, value_max, value_sum, lat, lon, utctime "
+                                         + "FROM history_" + resolution + " "
+                                         + "WHERE sensor_id = ? AND timestamp >= ? AND timestamp < ? "
+                                         + "ORDER BY timestamp",
+                                         (sensor_id, start, end))
+                    for (timestamp, count, state, state_count, state_sum, value, value_count, value_min, value_max,
+                         value_sum, lat, lon, utctime) in self._cursor.fetchall():
+                        entry = SensorHistoryEntry()
+                        entry.sensor_id = sensor_id
+                        entry.timestamp = timestamp
+                        entry.count = count
+                        entry.state = state
+                        entry.state_avg = (state_sum / state_count) if state_count else None
+                        entry.value = value
+                        entry.value_min = value_min
+                        entry.value_max = value_max
+                        entry.value_avg = (value_sum / value_count) if value_count else None
+                        entry.lat = lat
+                        entry.lon = lon
+                        entry.utctime = utctime
+                        entries.append(entry)
+
+            except Exception as e:
+                self._logger.exception("[%s]: Unable to get history for sensor id %d." % (self._log_tag, sensor_id))
+                return None
+
+        return entries
+
+    def close(self):
+        """
+        Writes all collected entries and closes the database.
+        """
+        self.flush()
+        with self._db_lock:
+            self._cursor.close()
+            self._conn.close()
+
+    def exit(self):
+        """
+        Sets the exit flag to shut down the thread.
+        """
+        self._exit_flag = True
+        self._exit_event.set()
+
+    def run(self):
+        """
+        Writes the collected entries in the flush interval and downsamples the history in the downsample interval.
+        """
+        last_downsample = 0.0
+        while True:
+            self._exit_event.wait(self._flush_interval)
+
+            self.flush()
+
+            if self._exit_flag:
+                return
+
+            now = time.time()
+            if (now - last_downsample) >= self._downsample_interval:
+                self.downsample(now)
+                last_downsample = now
@@ -0,0 +1,343 @@
+#!/usr/bin/env python3
+
+# written by sqall
+# twitter: https://twitter.com/sqall01
+# blog: https://h4des.org
+# github: https://github.com/sqall01
+#
+# Licensed under the GNU Affero General Public License, version 3.
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import List, Tuple, Optional
+from ..globalData.globalData import GlobalData
+from ..localObjects import SensorAlert
+
+
+class JournalOutcome:
+    """
+    Result of the processing of a sensor alert.
+    """
+    # Sensor alert was sent to the alert and manager clients.
+    TRIGGERED = 1
+
+    # No alert level of the sensor alert was triggered (for example, because of the current profile).
+    NOT_TRIGGERED = 2
+
+    # Instrumentation of the alert level suppressed the sensor alert.
+    SUPPRESSED = 3
+
+    # Instrumentation of the alert level failed.
+    INSTRUMENTATION_FAILED = 4
+
+
+class SensorAlertJournalEntry:
+
+    def __init__(self):
+        self.id = None  # type: Optional[int]
+
+        # Time the sensor alert was processed.
+        self.timeProcessed = None  # type: Optional[float]
+
+        # Result of the processing (see JournalOutcome).
+        self.outcome = None  # type: Optional[int]
+
+        # Result of the instrumentation (see PromiseState, None if no instrumentation was used).
+        self.instrumentation = None  # type: Optional[int]
+
+        self.sensorAlert = None  # type: Optional[SensorAlert]
+
+
+class SensorAlertJournal(threading.Thread):
+    """
+    Append-only journal of all processed sensor alerts. The sensor alerts are collected in memory and written in
+    batches by this thread to a separate database, so the sensor alert executer never waits for the disk. The
+    journal is indexed by time, sensor and triggered alert level, and sensor alerts are deleted after the retention
+    time.
+    """
+
+    def __init__(self,
+                 global_data: GlobalData,
+                 storage_path: Optional[str] = None):
+        """
+        :param global_data:
+        :param storage_path: path to the database file (None uses the configured file)
+        """
+        threading.Thread.__init__(self, daemon=True)
+
+        self._global_data = global_data
+        self._logger = self._global_data.logger
+        self._log_tag = os.path.basename(__file__)
+
+        if storage_path is None:
+            storage_path = self._global_data.storageBackendSqliteJournalFile
+
+        self._retention = self._global_data.sensorAlertJournalRetention
+        self._flush_interval = self._global_data.sensorAlertJournalFlushInterval
+        self._compaction_interval = self._global_data.sensorAlertJournalCompactionInterval
+        self._max_pending = self._global_data.sensorAlertJournalMaxPending
+
+        self._exit_flag = False
+        self._exit_event = threading.Event()
+
+        # Sensor alerts that are not written to the database yet.
+        self._pending = list()  # type: List[Tuple]
+        self._pending_lock = threading.Lock()
+
+        self._dropped_count = 0
+        self._written_count = 0
+
+        self._db_lock = threading.Lock()
+        self._conn = sqlite3.connect(storage_path, check_same_thread=False)
+        self._cursor = self._conn.cursor()
+
+        # Free pages are only released by the compaction (has to be set before the tables are created).
+        self._cursor.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        self._cursor.execute("PRAGMA journal_mode=WAL")
+        self._create_tables()
+
+    @property
+    def dropped_count(self) -> int:
+        """
+        Number of sensor alerts that were dropped because the database could not keep up.
+        """
+        return self._dropped_count
+
+    @property
+    def written_count(self) -> int:
+        """
+        Number of sensor alerts written to the database.
+        """
+        return self._written_count
+
+    def _create_tables(self):
+        """
+        Internal function that creates the tables if they do not exist.
+        """
+        with self._db_lock:
+            self._cursor.execute("CREATE TABLE IF NOT EXISTS sensorAlerts ("
+                                 + "id INTEGER PRIMARY KEY AUTOINCREMENT, "
+                                 + "timeReceived INTEGER NOT NULL, "
+                                 + "timeProcessed REAL NOT NULL, "
+                                 + "nodeId INTEGER NOT NULL, "
+                                 + "sensorId INTEGER NOT NULL, "
+                                 + "state INTEGER NOT NULL, "
+                                 + "outcome INTEGER NOT NULL, "
+                                 + "instrumentation INTEGER, "
+                                 + "sensorAlert TEXT NOT NULL)")
+            self._cursor.execute("CREATE INDEX IF NOT EXISTS sensorAlerts_timeReceived "
+                                 + "ON sensorAlerts (timeReceived)")
+            self._cursor.execute("CREATE INDEX IF NOT EXISTS sensorAlerts_sensorId_timeReceived "
+                                 + "ON sensorAlerts (sensorId, timeReceived)")
+
+            # Index of the triggered alert levels of the sensor alerts.
+            self._cursor.execute("CREATE TABLE IF NOT EXISTS sensorAlertsAlertLevels ("
+                                 + "alertLevel INTEGER NOT NULL, "
+                                 + "timeReceived INTEGER NOT NULL, "
+                                 + "sensorAlertId INTEGER NOT NULL, "
+                                 + "PRIMARY KEY(alertLevel, timeReceived, sensorAlertId)) WITHOUT ROWID")
+            self._cursor.execute("CREATE INDEX IF NOT EXISTS sensorAlertsAlertLevels_timeReceived "
+                                 + "ON sensorAlertsAlertLevels (timeReceived)")
+            self._conn.commit()
+
+    def add(self,
+            sensor_alert: SensorAlert,
+            outcome: int,
+            instrumentation: Optional[int] = None):
+        """
+        Adds a processed sensor alert to the journal. The sensor alert is written to the database by the journal
+        thread (or by flush()).
+
+        :param sensor_alert:
+        :param outcome: result of the processing (see JournalOutcome)
+        :param instrumentation: result of the instrumentation (see PromiseState, None if no instrumentation was used)
+        """
+        # Serialize the sensor alert immediately since the object can still be changed by the executer.
+        row = (sensor_alert.timeReceived,
+               time.time(),
+               sensor_alert.nodeId,
+               sensor_alert.sensorId,
+               sensor_alert.state,
+               outcome,
+               instrumentation,
+               json.dumps(sensor_alert.convert_to_dict()),
+               list(sensor_alert.triggeredAlertLevels) if outcome == JournalOutcome.TRIGGERED else [])
+
+        with self._pending_lock:
+            self._pending.append(row)
+
+            # Drop the oldest sensor alerts if the database can not keep up with the sensor alerts.
+            if len(self._pending) > self._max_pending:
+                dropped = len(self._pending) - self._max_pending
+                del self._pending[:dropped]
+                self._dropped_count += dropped
+
+    def flush(self):
+        """
+        Writes all collected sensor alerts to the database.
+        """
+        with self._pending_lock:
+            rows = self._pending
+            self._pending = list()
+
+        if not rows:
+            return
+
+        with self._db_lock:
+            try:
+                alert_level_rows = list()
+                for row in rows:
+                    self._cursor.execute("INSERT INTO sensorAlerts ("
+                                         + "timeReceived, timeProcessed, nodeId, sensorId, state, outcome, "
+                                         + "instrumentation, sensorAlert) "
+                                         + "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                                         row[:8])
+                    sensor_alert_id = self._cursor.lastrowid
+                    for alert_level in set(row[8]):
+                        alert_level_rows.append((alert_level, row[0], sensor_alert_id))
+
+                self._cursor.executemany("INSERT INTO sensorAlertsAlertLevels ("
+                                         + "alertLevel, timeReceived, sensorAlertId) "
+                                         + "VALUES (?, ?, ?)",
+                                         alert_level_rows)
+                self._conn.commit()
+                self._written_count += len(rows)
+
+            except Exception as e:
+                self._logger.exception("[%s]: Unable to write %d sensor alerts to journal."
+                                       % (self._log_tag, len(rows)))
+                self._conn.rollback()
+                self._dropped_count += len(rows)
+
+    def compact(self,
+                now: Optional[float] = None):
+        """
+        Deletes all sensor alerts that are older than the retention time and releases the free space of
+        the database.
+
+        :param now: current time (None uses the current time)
+        """
+        if now is None:
+            now = time.time()
+
+        with self._db_lock:
+            try:
+                cutoff = now - self._retention
+                self._cursor.execute("DELETE FROM sensorAlerts WHERE timeReceived < ?", (cutoff, ))
+                deleted = self._cursor.rowcount
+                self._cursor.execute("DELETE FROM sensorAlertsAlertLevels WHERE timeReceived < ?", (cutoff, ))
+                self._conn.commit()
+
+                if deleted > 0:
+                    self._logger.debug("[%s]: Deleted %d sensor alerts from journal." % (self._log_tag, deleted))
+                    self._cursor.execute("PRAGMA incremental_vacuum")
+                    self._cursor.fetchall()
+
+            except Exception as e:
+                self._logger.exception("[%s]: Unable to compact journal." % self._log_tag)
+                self._conn.rollback()
+
+    def get_sensor_alerts(self,
+                          start: Optional[int] = None,
+                          end: Optional[int] = None,
+                          sensor_id: Optional[int] = None,
+                          alert_level: Optional[int] = None,
+                          limit: Optional[int] = None) -> Optional[List[SensorAlertJournalEntry]]:
+        """
+        Gets the journaled sensor alerts that match all given filters ordered from the newest to the oldest one.
+
+        :param start: start of the time range the sensor alerts were received in (inclusive)
+        :param end: end of the time range the sensor alerts were received in (exclusive)
+        :param sensor_id: only sensor alerts of this sensor
+        :param alert_level: only sensor alerts that triggered this alert level
+        :param limit: maximal number of returned sensor alerts
+        :return: list of journal entries or None
+        """
+        # Make sure the collected sensor alerts are included.
+        self.flush()
+
+        query = "SELECT sensorAlerts.id, timeProcessed, outcome, instrumentation, sensorAlert FROM sensorAlerts "
+        conditions = list()
+        args = list()
+        time_column = "sensorAlerts.timeReceived"
+        if alert_level is not None:
+            query += "INNER JOIN sensorAlertsAlertLevels ON sensorAlertsAlertLevels.sensorAlertId = sensorAlerts.id "
+            conditions.append("sensorAlertsAlertLevels.alertLevel = ?")
+            args.append(alert_level)
+            time_column = "sensorAlertsAlertLevels.timeReceived"
+
+        if sensor_id is not None:
+            conditions.append("sensorAlerts.sensorId = ?")
+            args.append(sensor_id)
+
+        if start is not None:
+            conditions.append(time_column + " >= ?")
+            args.append(start)
+
+        if end is not None:
+            conditions.append(time_column + " < ?")
+            args.append(end)
+
+        if conditions:
+            query += "WHERE " + " AND ".join(conditions) + " "
+
+        query += "ORDER BY " + time_column + " DESC, sensorAlerts.id DESC"
+        if limit is not None:
+            query += " LIMIT ?"
+            args.append(limit)
+
+        entries = list()
+        with self._db_lock:
+            try:
+                self._cursor.execute(query, args)
+                for sensor_alert_id, time_processed, outcome, instrumentation, sensor_alert in self._cursor.fetchall():
+                    entry = SensorAlertJournalEntry()
+                    entry.id = sensor_alert_id
+                    entry.timeProcessed = time_processed
+                    entry.outcome = outcome
+                    entry.instrumentation = instrumentation
+                    entry.sensorAlert = SensorAlert.convert_from_dict(json.loads(sensor_alert))
+                    entries.append(entry)
+
+            except Exception as e:
+                self._logger.exception("[%s]: Unable to get sensor alerts from journal." % self._log_tag)
+                return None
+
+        return entries
+
+    def close(self):
+        """
+        Writes all collected sensor alerts and closes the database.
+        """
+        self.flush()
+        with self._db_lock:
+            self._cursor.close()
+            self._conn.close()
+
+    def exit(self):
+        """
+        Sets the exit flag to shut down the thread.
+        """
+        self._exit_flag = True
+        self._exit_event.set()
+
+    def run(self):
+        """
+        Writes the collected sensor alerts in the flush interval and compacts the journal in the compaction interval.
+        """
+        last_compaction = 0.0
+        while True:
+            self._exit_event.wait(self._flush_interval)
+
+            self.flush()
+
+            if self._exit_flag:
+                return
+
+            now = time.time()
+            if (now - last_compaction) >= self._compaction_interval:
+                self.compact(now)
+                last_compaction = now
@@ -8,7 +8,7 @@
 # Licensed under the GNU Affero General Public License, version 3.
 
 import copy
-from typing import Optional, List, Any, Dict
+from typing import Optional, List, Any, Dict, Callable
 # noinspection PyProtectedMember
 from .globalData.sensorObjects import SensorDataType, SensorErrorState, _SensorData
 
@@ -118,6 +118,17 @@ class AlertLevel:
         self.instrumentation_cmd = None  # type: Optional[str]
         self.instrumentation_timeout = None  # type: Optional[int]
 
+        # Instrumentation mode ("oneshot" starts the script for each sensor alert, "worker" sends the sensor alerts
+        # to a pool of persistent worker processes, "python" calls a Python callable in a thread pool),
+        # number of worker processes (or threads) and number of requests after which a worker process is replaced.
+        self.instrumentation_mode = "oneshot"  # type: str
+        self.instrumentation_workers = 2  # type: int
+        self.instrumentation_max_requests = 1000  # type: int
+
+        # Python callable used as instrumentation in the "python" mode (loaded from the "module:function"
+        # given as command when the configuration is parsed).
+        self.instrumentation_function = None  # type: Optional[Callable[[SensorAlert], Optional[SensorAlert]]]
+
         # List of profile ids for which this alert level triggers a sensor alert.
         # Meaning the system has to use one of the profiles in this list before the alert level triggers a sensor alert.
         self.profiles = list()  # type: List[int]
@@ -11,8 +11,8 @@ import threading
 import os
 import time
 import collections
-from typing import Optional
-from .server import AsynchronousSender
+from typing import Optional, Dict, Tuple
+from .sender import StatusUpdateMessage, StateChangeMessage
 from .localObjects import SensorData
 from .globalData.globalData import GlobalData
 
@@ -29,6 +29,8 @@ class ManagerUpdateExecuter(threading.Thread):
         self.logger = self.globalData.logger
         self.managerUpdateInterval = self.globalData.managerUpdateInterval
         self.serverSessions = self.globalData.serverSessions
+        self.senderDispatcher = self.globalData.sender_dispatcher
+        self.statusTracker = self.globalData.status_tracker
 
         # file nme of this file (used for logging)
         self.fileName = os.path.basename(__file__)
@@ -50,8 +52,18 @@ class ManagerUpdateExecuter(threading.Thread):
         self._force_status_update = False
 
         # this is a queue that is used to signalize the state changes
-        # that should be sent to the manager clients
-        self._queue_state_change = collections.deque()
+        # that should be sent to the manager clients (keyed by the sensor id
+        # to only send the latest state and data of a sensor in each flush window)
+        self._queue_state_change = collections.OrderedDict()  # type: Dict[int, Tuple[int, SensorData]]
+        self._queue_state_change_lock = threading.Lock()
+
+        # time in seconds state changes are collected before they are sent to the manager clients
+        self.stateChangeFlushWindow = self.globalData.managerStateChangeFlushWindow
+
+        # number of queued state changes and of state changes that were superseded by
+        # a newer state change of the same sensor before they were sent
+        self.stateChangeQueuedCount = 0
+        self.stateChangeCoalescedCount = 0
 
     def run(self):
 
@@ -85,26 +97,18 @@ class ManagerUpdateExecuter(threading.Thread):
                 # empty current state queue
                 # (because the state changes are also transmitted
                 # during the full state update)
-                self._queue_state_change.clear()
-
-                for serverSession in self.serverSessions:
-                    # ignore sessions which do not exist yet
-                    # and that are not managers
-                    if serverSession.clientComm is None:
-                        continue
-                    if serverSession.clientComm.nodeType != "manager":
-                        continue
-                    if not serverSession.clientComm.clientInitialized:
-                        continue
-
-                    # sending status update to manager via a thread
+                with self._queue_state_change_lock:
+                    self._queue_state_change.clear()
+
+                for clientComm in self.serverSessions.get_clients_by_node_type("manager"):
+                    # queue status update for the manager
                     # to not block the manager update executer
-                    statusUpdateProcess = AsynchronousSender(self.globalData, serverSession.clientComm)
-                    # set thread to daemon
-                    # => threads terminates when main thread terminates
-                    statusUpdateProcess.daemon = True
-                    statusUpdateProcess.sendManagerUpdate = True
-                    statusUpdateProcess.start()
+                    self.senderDispatcher.queue_message(clientComm, StatusUpdateMessage())
+
+                if self.statusTracker is not None:
+                    self.logger.debug("[%s]: Status cache hits: %d, misses: %d, storage reads: %d."
+                                      % (self.fileName, self.statusTracker.hit_count, self.statusTracker.miss_count,
+                                         self.statusTracker.build_count))
 
                 # if status update was sent to manager clients
                 # => ignore state changes (because they are also covered
@@ -112,39 +116,56 @@ class ManagerUpdateExecuter(threading.Thread):
                 continue
 
             # if status change queue is not empty
-            # => send status changes to manager clients
-            while len(self._queue_state_change) != 0:
-                managerStateTuple = self._queue_state_change.popleft()
-                sensorId = managerStateTuple[0]
-                state = managerStateTuple[1]
-                sensorDataObj = managerStateTuple[2]
-
-                for serverSession in self.serverSessions:
-                    # ignore sessions which do not exist yet
-                    # and that are not managers
-                    if serverSession.clientComm is None:
-                        continue
-                    if serverSession.clientComm.nodeType != "manager":
-                        continue
-                    if not serverSession.clientComm.clientInitialized:
-                        continue
-
-                    # sending status update to manager via a thread
+            # => wait for the flush window to collect further state changes
+            # of the same sensors and send them to manager clients
+            if len(self._queue_state_change) == 0:
+                continue
+
+            if self.stateChangeFlushWindow > 0:
+                self._wait_flush_window()
+
+                # a status update forced in the meantime covers the state changes
+                # (or the thread should terminate)
+                if self._force_status_update or self.exitFlag:
+                    continue
+
+            with self._queue_state_change_lock:
+                stateChanges = self._queue_state_change
+                self._queue_state_change = collections.OrderedDict()
+
+            # get the initialized manager clients once for all state changes
+            managerClientComms = self.serverSessions.get_clients_by_node_type("manager")
+
+            for sensorId, (state, sensorDataObj) in stateChanges.items():
+
+                for clientComm in managerClientComms:
+                    # queue state change for the manager
                     # to not block the manager update executer
-                    stateChangeProcess = AsynchronousSender(self.globalData, serverSession.clientComm)
-                    # set thread to daemon
-                    # => threads terminates when main thread terminates
-                    stateChangeProcess.daemon = True
-                    stateChangeProcess.sendManagerStateChange = True
-                    stateChangeProcess.sendManagerStateChangeSensorId = sensorId
-                    stateChangeProcess.sendManagerStateChangeState = state
-                    stateChangeProcess.sendManagerStateChangeDataType = sensorDataObj.dataType
-                    stateChangeProcess.sendManagerStateChangeData = sensorDataObj.data
-                    stateChangeProcess.start()
+                    # (a state change of the sensor still waiting in the queue of the manager
+                    # is replaced, hence only one update per sensor is in-flight for each manager)
+                    stateChangeMessage = StateChangeMessage(sensorId,
+                                                            state,
+                                                            sensorDataObj.dataType,
+                                                            sensorDataObj.data)
+                    self.senderDispatcher.queue_message(clientComm, stateChangeMessage)
+
+    def _wait_flush_window(self):
+        """
+        Waits for the flush window to pass. Further queued state changes do not end the wait,
+        a forced status update or the termination of the thread does.
+        """
+        deadline = time.monotonic() + self.stateChangeFlushWindow
+        while not self._force_status_update and not self.exitFlag:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            self._manager_update_event.wait(remaining)
+            self._manager_update_event.clear()
 
     # sets the exit flag to shut down the thread
     def exit(self):
         self.exitFlag = True
+        self._manager_update_event.set()
 
     def force_status_update(self):
         """
@@ -164,5 +185,9 @@ class ManagerUpdateExecuter(threading.Thread):
         :param state:
         :param sensor_data:
         """
-        self._queue_state_change.append((sensor_id, state, sensor_data))
+        with self._queue_state_change_lock:
+            self.stateChangeQueuedCount += 1
+            if sensor_id in self._queue_state_change:
+                self.stateChangeCoalescedCount += 1
+            self._queue_state_change[sensor_id] = (state, sensor_data)
         self._manager_update_event.set()
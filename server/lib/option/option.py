@@ -13,7 +13,7 @@ import time
 from typing import Optional
 from ..internalSensors import ProfileChangeSensor
 from ..localObjects import Option
-from ..server import AsynchronousSender
+from ..sender import ProfileChangeMessage
 from ..globalData.globalData import GlobalData
 
 
@@ -32,6 +32,7 @@ class OptionExecuter(threading.Thread):
         self._storage = self._global_data.storage
         self._manager_update_executer = self._global_data.managerUpdateExecuter
         self._server_sessions = self._global_data.serverSessions
+        self._sender_dispatcher = self._global_data.sender_dispatcher
         self._profiles = self._global_data.profiles
 
         # file nme of this file (used for logging)
@@ -77,18 +78,11 @@ class OptionExecuter(threading.Thread):
             if not server_session.clientComm.clientInitialized:
                 continue
 
-            # Sending profile change to alert client
-            # via a thread to not block this one
-            sender = AsynchronousSender(self._global_data, server_session.clientComm)
-            # set thread to daemon
-            # => threads terminates when main thread terminates
-            sender.daemon = True
-            sender.send_profile_change = True
-            sender.profile = curr_profile
+            # Queue profile change for alert client to not block this one
             self._logger.debug("[%s]: Sending profile change to alert client (%s:%d)."
                                % (self._log_tag, server_session.clientComm.clientAddress,
                                   server_session.clientComm.clientPort))
-            sender.start()
+            self._sender_dispatcher.queue_message(server_session.clientComm, ProfileChangeMessage(curr_profile))
 
     def _sensor_profile_change(self, option: Option):
         """
@@ -98,6 +92,13 @@ class OptionExecuter(threading.Thread):
         if self._internal_sensor is not None:
             self._internal_sensor.process_option(option)
 
+    def _sensor_alert_profile_change(self):
+        """
+        Internal function that lets the sensor alert executer check its pending sensor alerts against the new profile.
+        """
+        if self._global_data.sensorAlertExecuter is not None:
+            self._global_data.sensorAlertExecuter.force_reevaluation()
+
     def add_option(self,
                    option_type: str,
                    option_value: int,
@@ -172,6 +173,7 @@ class OptionExecuter(threading.Thread):
                 if option.type == "profile":
                     self._send_profile_change(option)
                     self._sensor_profile_change(option)
+                    self._sensor_alert_profile_change()
 
             # Only wake up manager update executer if we have any option changes.
             if has_option_changes:
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+
+# written by sqall
+# twitter: https://twitter.com/sqall01
+# blog: https://h4des.org
+# github: https://github.com/sqall01
+#
+# Licensed under the GNU Affero General Public License, version 3.
+
+import hashlib
+import json
+import threading
+from typing import Any, Dict
+
+
+class RegistrationTracker:
+    """
+    Keeps track of the registrations of the nodes. A content hash of the last registration of each node is
+    persisted with the node, so a node that registers again with the same sensors, alerts or manager does not
+    change the database (only the states of its sensors are updated if they have changed). Nodes with unstable
+    connections reconnect often and would otherwise rewrite their complete registration each time.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._skipped_count = 0
+        self._applied_count = 0
+
+    @staticmethod
+    def get_hash(version: float,
+                 rev: int,
+                 payload: Dict[str, Any]) -> str:
+        """
+        Gets the content hash of a registration. Only the values that are stored as registration are used
+        (the states and data of the sensors change during operation and are not part of the hash).
+
+        :param version: version of the client
+        :param rev: revision of the client
+        :param payload: payload of the registration message
+        :return: content hash
+        """
+        content = {"version": version,
+                   "rev": rev,
+                   "hostname": payload["hostname"],
+                   "nodeType": payload["nodeType"],
+                   "instance": payload["instance"],
+                   "persistent": payload["persistent"]}
+
+        if payload["nodeType"] == "sensor":
+            content["sensors"] = [[x["clientSensorId"], x["description"], x["alertDelay"], x["dataType"],
+                                   x["alertLevels"]]
+                                  for x in payload["sensors"]]
+
+        elif payload["nodeType"] == "alert":
+            content["alerts"] = [[x["clientAlertId"], x["description"], x["alertLevels"]]
+                                 for x in payload["alerts"]]
+
+        elif payload["nodeType"] == "manager":
+            content["manager"] = payload["manager"]
+
+        return hashlib.sha256(json.dumps(content, sort_keys=True).encode("utf-8")).hexdigest()
+
+    def count_skipped(self):
+        """
+        Counts a registration that was identical to the stored one and was not written to the database.
+        """
+        with self._lock:
+            self._skipped_count += 1
+
+    def count_applied(self):
+        """
+        Counts a registration that was new or changed and was written to the database.
+        """
+        with self._lock:
+            self._applied_count += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Gets the statistics of the registration tracker.
+
+        :return: dictionary with the number of skipped and applied registrations
+        """
+        with self._lock:
+            return {"skipped": self._skipped_count,
+                    "applied": self._applied_count}
@@ -0,0 +1,11 @@
+#!/usr/bin/env python3
+
+# written by sqall
+# twitter: https://twitter.com/sqall01
+# blog: https://h4des.org
+# github: https://github.com/sqall01
+#
+# Licensed under the GNU Affero General Public License, version 3.
+
+from .sender import SenderDispatcher, OutboundMessage, StatusUpdateMessage, StateChangeMessage, SensorAlertMessage, \
+    ProfileChangeMessage, SensorErrorStateChangeMessage
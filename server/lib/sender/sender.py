@@ -0,0 +1,432 @@
+#!/usr/bin/env python3
+
+# written by sqall
+# twitter: https://twitter.com/sqall01
+# blog: https://h4des.org
+# github: https://github.com/sqall01
+#
+# Licensed under the GNU Affero General Public License, version 3.
+
+import collections
+import logging
+import os
+import queue
+import threading
+from typing import Optional, Dict, Any, List, Tuple, Hashable
+from ..localObjects import SensorAlert, Profile
+from ..globalData.globalData import GlobalData
+from ..globalData.sensorObjects import SensorErrorState
+from ..server import ClientCommunication
+
+log_tag = os.path.basename(__file__)
+
+
+class OutboundMessage:
+    """
+    Base class of a message that is sent to a client by the sender dispatcher.
+    """
+
+    # Node types the message can be sent to.
+    node_types = tuple()  # type: Tuple[str, ...]
+
+    # Flag that states if the message is covered by a full status update (and can be discarded if one is queued).
+    covered_by_status_update = False
+
+    @property
+    def coalesce_key(self) -> Optional[Hashable]:
+        """
+        Key of the message. A queued message is superseded by a newer message with the same key.
+        None if the message can never be superseded.
+        """
+        return None
+
+    def send(self, client_comm: ClientCommunication, logger: logging.Logger) -> bool:
+        """
+        Sends the message to the client.
+
+        :param client_comm:
+        :param logger:
+        :return: success or failure
+        """
+        raise NotImplementedError("Abstract class")
+
+
+class StatusUpdateMessage(OutboundMessage):
+    """
+    Full status update for a manager client.
+    """
+
+    node_types = ("manager",)
+    covered_by_status_update = True
+
+    @property
+    def coalesce_key(self) -> Optional[Hashable]:
+        return "status_update"
+
+    def send(self, client_comm: ClientCommunication, logger: logging.Logger) -> bool:
+        if not client_comm.sendManagerUpdate():
+            logger.error("[%s]: Sending status update to manager failed (%s:%d)."
+                         % (log_tag, client_comm.clientAddress, client_comm.clientPort))
+            return False
+        return True
+
+
+class StateChangeMessage(OutboundMessage):
+    """
+    State change of a sensor for a manager client.
+    """
+
+    node_types = ("manager",)
+    covered_by_status_update = True
+
+    def __init__(self,
+                 sensor_id: int,
+                 state: int,
+                 data_type: int,
+                 data: Any):
+        self.sensor_id = sensor_id
+        self.state = state
+        self.data_type = data_type
+        self.data = data
+
+    @property
+    def coalesce_key(self) -> Optional[Hashable]:
+        return "state_change", self.sensor_id
+
+    def send(self, client_comm: ClientCommunication, logger: logging.Logger) -> bool:
+        if not client_comm.sendManagerStateChange(self.sensor_id, self.state, self.data_type, self.data):
+            logger.error("[%s]: Sending state change to manager failed (%s:%d)."
+                         % (log_tag, client_comm.clientAddress, client_comm.clientPort))
+            return False
+        return True
+
+
+class SensorAlertMessage(OutboundMessage):
+    """
+    Sensor alert for an alert or manager client. Sensor alerts are never superseded.
+    """
+
+    node_types = ("manager", "alert")
+
+    def __init__(self, sensor_alert: SensorAlert):
+        self.sensor_alert = sensor_alert
+
+    def send(self, client_comm: ClientCommunication, logger: logging.Logger) -> bool:
+        if not client_comm.sendSensorAlert(self.sensor_alert):
+            logger.error("[%s]: Sending sensor alert to manager/alert failed (%s:%d)."
+                         % (log_tag, client_comm.clientAddress, client_comm.clientPort))
+            return False
+        return True
+
+
+class ProfileChangeMessage(OutboundMessage):
+    """
+    Profile change for an alert client.
+    """
+
+    node_types = ("alert",)
+
+    def __init__(self, profile: Profile):
+        self.profile = profile
+
+    @property
+    def coalesce_key(self) -> Optional[Hashable]:
+        return "profile_change"
+
+    def send(self, client_comm: ClientCommunication, logger: logging.Logger) -> bool:
+        if not client_comm.send_profile_change(self.profile):
+            logger.error("[%s]: Sending profile change to alert client failed (%s:%d)."
+                         % (log_tag, client_comm.clientAddress, client_comm.clientPort))
+            return False
+        return True
+
+
+class SensorErrorStateChangeMessage(OutboundMessage):
+    """
+    Sensor error state change for a manager client.
+    """
+
+    node_types = ("manager",)
+    covered_by_status_update = True
+
+    def __init__(self,
+                 sensor_id: int,
+                 error_state: SensorErrorState):
+        self.sensor_id = sensor_id
+        self.error_state = error_state
+
+    @property
+    def coalesce_key(self) -> Optional[Hashable]:
+        return "sensor_error_state_change", self.sensor_id
+
+    def send(self, client_comm: ClientCommunication, logger: logging.Logger) -> bool:
+        if not client_comm.send_sensor_error_state_change(self.sensor_id, self.error_state):
+            logger.error("[%s]: Sending sensor error state to manager client failed (%s:%d)."
+                         % (log_tag, client_comm.clientAddress, client_comm.clientPort))
+            return False
+        return True
+
+
+class _ClientQueue:
+    """
+    Outbound queue of a single client.
+    """
+
+    def __init__(self, client_comm: ClientCommunication):
+        self.client_comm = client_comm
+        self.messages = collections.deque()
+
+        # Flag that states if the queue is waiting for or processed by a worker thread
+        # (at most one worker thread sends to a client at the same time).
+        self.is_scheduled = False
+
+        # Flag that states if the connection to the client was closed because it could not keep up.
+        self.is_disconnected = False
+
+
+class SenderDispatcher:
+    """
+    Sends messages to the clients with a bounded pool of worker threads. Each client has its own outbound queue
+    in which superseded messages are coalesced. Messages are never dropped from the queue of a connected client and
+    the producers are never blocked. If a client can not keep up and its queue is full, its connection is closed
+    so that it reconnects and gets the current state again.
+    """
+
+    def __init__(self,
+                 global_data: GlobalData):
+
+        # file nme of this file (used for logging)
+        self._log_tag = os.path.basename(__file__)
+
+        # get global configured data
+        self._global_data = global_data
+        self._logger = self._global_data.logger
+        self._worker_count = self._global_data.sender_worker_count
+        self._queue_size = self._global_data.sender_queue_size
+
+        # Maximal number of messages a worker sends to one client before giving other clients a chance.
+        self._batch_size = 10
+
+        # Outbound queues of all clients with pending messages (keyed by the id of the client communication object).
+        self._client_queues = dict()  # type: Dict[int, _ClientQueue]
+        self._client_queues_lock = threading.Lock()
+
+        # Queue of client queues that are ready to be processed by a worker thread.
+        self._ready_queue = queue.Queue()
+
+        self._workers = list()  # type: List[threading.Thread]
+
+        self._sent_count = 0
+        self._failed_count = 0
+        self._coalesced_count = 0
+        self._dropped_count = 0
+        self._disconnected_count = 0
+
+    @property
+    def queue_depth(self) -> int:
+        """
+        Number of messages that are currently queued for all clients.
+        """
+        with self._client_queues_lock:
+            return sum(len(client_queue.messages) for client_queue in self._client_queues.values())
+
+    @property
+    def sent_count(self) -> int:
+        return self._sent_count
+
+    @property
+    def failed_count(self) -> int:
+        return self._failed_count
+
+    @property
+    def coalesced_count(self) -> int:
+        return self._coalesced_count
+
+    @property
+    def dropped_count(self) -> int:
+        return self._dropped_count
+
+    @property
+    def disconnected_count(self) -> int:
+        """
+        Number of times the connection to a client was closed because its queue was full.
+        """
+        return self._disconnected_count
+
+    def get_queue_depth(self, client_comm: ClientCommunication) -> int:
+        """
+        Returns the number of messages that are currently queued for the given client.
+
+        :param client_comm:
+        :return:
+        """
+        with self._client_queues_lock:
+            client_queue = self._client_queues.get(id(client_comm))
+            if client_queue is None:
+                return 0
+            return len(client_queue.messages)
+
+    def _add_message(self,
+                     client_queue: _ClientQueue,
+                     message: OutboundMessage) -> bool:
+        """
+        Internal function that adds the message to the queue of the client. The lock has to be held by the caller.
+
+        :param client_queue:
+        :param message:
+        :return: True if the message was added or False if the queue is full
+        """
+        messages = client_queue.messages
+
+        # A full status update covers all queued status updates, state changes and sensor error state changes.
+        if isinstance(message, StatusUpdateMessage):
+            remaining = collections.deque(m for m in messages if not m.covered_by_status_update)
+            self._coalesced_count += len(messages) - len(remaining)
+            client_queue.messages = messages = remaining
+
+        # Replace a superseded message at its position in the queue.
+        elif message.coalesce_key is not None:
+            for i in range(len(messages)):
+                if messages[i].coalesce_key == message.coalesce_key:
+                    messages[i] = message
+                    self._coalesced_count += 1
+                    return True
+
+        if len(messages) >= self._queue_size and not self._handle_full_queue(client_queue):
+            return False
+
+        client_queue.messages.append(message)
+        return True
+
+    def _handle_full_queue(self, client_queue: _ClientQueue) -> bool:
+        """
+        Internal function that makes room in the full queue of a slow client without discarding information
+        the client needs. The lock has to be held by the caller.
+
+        :param client_queue:
+        :return: True if there is room in the queue
+        """
+        messages = client_queue.messages
+        client_comm = client_queue.client_comm
+
+        # A manager client gets a single full status update instead of all the state information it could not receive.
+        if client_comm.nodeType == "manager":
+            remaining = collections.deque(m for m in messages if not m.covered_by_status_update)
+            if len(remaining) < len(messages):
+                self._coalesced_count += len(messages) - len(remaining)
+                remaining.append(StatusUpdateMessage())
+                client_queue.messages = remaining
+                return len(remaining) < self._queue_size
+
+        return False
+
+    def _disconnect_client(self, client_queue: _ClientQueue):
+        """
+        Internal function that closes the connection to a client that can not keep up. The lock has to be held
+        by the caller.
+
+        :param client_queue:
+        """
+        client_comm = client_queue.client_comm
+        client_queue.is_disconnected = True
+        self._disconnected_count += 1
+        self._logger.error("[%s]: Outbound queue of client full. Closing connection (%s:%d)."
+                           % (self._log_tag, client_comm.clientAddress, client_comm.clientPort))
+        client_comm.close_connection()
+
+    def _worker(self):
+        """
+        Internal function executed by each worker thread that processes the client queues.
+        """
+        while True:
+            client_queue = self._ready_queue.get()
+            if client_queue is None:
+                return
+
+            client_comm = client_queue.client_comm
+            for _ in range(self._batch_size):
+                with self._client_queues_lock:
+                    if not client_queue.messages:
+                        break
+
+                    # Discard all pending messages if the client is gone.
+                    if not client_comm.clientInitialized:
+                        self._dropped_count += len(client_queue.messages)
+                        client_queue.messages.clear()
+                        break
+
+                    message = client_queue.messages.popleft()
+
+                try:
+                    result = message.send(client_comm, self._logger)
+
+                except Exception as e:
+                    self._logger.exception("[%s]: Sending message failed (%s:%d)."
+                                           % (self._log_tag, client_comm.clientAddress, client_comm.clientPort))
+                    result = False
+
+                with self._client_queues_lock:
+                    if result:
+                        self._sent_count += 1
+                    else:
+                        self._failed_count += 1
+
+            with self._client_queues_lock:
+                if client_queue.messages:
+                    # Give the other clients a chance before processing the remaining messages.
+                    self._ready_queue.put(client_queue)
+
+                else:
+                    client_queue.is_scheduled = False
+                    del self._client_queues[id(client_comm)]
+
+    def start(self):
+        """
+        Starts the worker threads.
+        """
+        for i in range(self._worker_count):
+            worker = threading.Thread(target=self._worker, name="SenderDispatcher-%d" % i, daemon=True)
+            worker.start()
+            self._workers.append(worker)
+
+    def exit(self):
+        """
+        Stops the worker threads after they finished their current message.
+        """
+        for _ in self._workers:
+            self._ready_queue.put(None)
+
+    def queue_message(self,
+                      client_comm: ClientCommunication,
+                      message: OutboundMessage) -> bool:
+        """
+        Queues the message for the given client.
+
+        :param client_comm:
+        :param message:
+        :return: success or failure
+        """
+        if client_comm.nodeType not in message.node_types:
+            self._logger.error("[%s]: Sending %s failed. Client is not a '%s' node (%s:%d)."
+                               % (self._log_tag, message.__class__.__name__, "'/'".join(message.node_types),
+                                  client_comm.clientAddress, client_comm.clientPort))
+            return False
+
+        with self._client_queues_lock:
+            client_queue = self._client_queues.get(id(client_comm))
+            if client_queue is None:
+                client_queue = _ClientQueue(client_comm)
+                self._client_queues[id(client_comm)] = client_queue
+
+            if not self._add_message(client_queue, message):
+                # Do not block the producer (which sends to all clients) because of a single slow client.
+                # The queued messages are discarded by the worker thread as soon as the session is closed.
+                if not client_queue.is_disconnected and client_comm.clientInitialized:
+                    self._disconnect_client(client_queue)
+                client_queue.messages.append(message)
+
+            if not client_queue.is_scheduled:
+                client_queue.is_scheduled = True
+                self._ready_queue.put(client_queue)
+
+        return True
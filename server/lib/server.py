@@ -7,6 +7,7 @@
 #
 # Licensed under the GNU Affero General Public License, version 3.
 
+import select
 import ssl
 import socket
 import threading
@@ -16,16 +17,226 @@ import logging
 import os
 import random
 import json
-from typing import Optional, Dict, Tuple, Any, List, Type
+import collections
+import re
+from typing import Optional, Dict, Tuple, Any, List, Type, Callable
 from .localObjects import Sensor, SensorData, SensorAlert, Option, Alert, Manager, Node, AlertLevel, \
     Profile
 from .globalData.globalData import GlobalData
 from .globalData.sensorObjects import SensorDataType, SensorErrorState
 # noinspection PyProtectedMember
 from .storage.core import _Storage
+from .tls import TlsContext
+from .admission import AdmissionController
+from .registration import RegistrationTracker
 
 BUFSIZE = 4096
 
+# Size of the header of a frame used in pipelining mode
+# (8 hex digits payload length, 8 hex digits transaction id, 1 digit frame type).
+FRAME_HEADER_SIZE = 17
+
+
+class FrameType:
+    REQUEST = 1
+    RESPONSE = 2
+
+
+def build_frame(frame_type: int,
+                transaction_id: int,
+                data: str) -> str:
+    """
+    Builds a frame used in pipelining mode. Each frame is prefixed by the length of the payload and carries
+    the transaction id that is used to match responses to their requests.
+
+    :param frame_type: type of the frame (request or response)
+    :param transaction_id:
+    :param data: payload of the frame (a message of the classic protocol)
+    :return: frame as string
+    """
+    return "%08x%08x%d%s" % (len(data), transaction_id, frame_type, data)
+
+
+class ReceiveBuffer:
+    """
+    Buffers the data received on a connection and splits it into complete messages. Received data can contain
+    multiple messages or only a part of a message. The buffer yields the JSON messages of the classic protocol,
+    messages of a known size (announced by a RTS message) and frames of the pipelining mode.
+    """
+
+    # Characters that are relevant to find the end of a JSON object outside and inside of strings.
+    _object_chars = re.compile(rb'[{}"]')
+    _string_chars = re.compile(rb'["\\]')
+
+    # Number of consumed bytes at the start of the buffer that trigger moving the unread data to the front.
+    _compact_size = 65536
+
+    def __init__(self):
+        # NOTE: Use bytearray since bytes are immutable and for each += operator a new allocation is done.
+        # Consumed data is not removed from the front of the buffer for each message but only from time to time.
+        self._buffer = bytearray()
+        self._start = 0
+
+        # State of the scan for the end of the JSON message at the start of the buffer
+        # (kept between received chunks so that each byte is only scanned once).
+        self._scan_pos = 0
+        self._scan_depth = 0
+        self._scan_in_string = False
+
+    def __len__(self) -> int:
+        return len(self._buffer) - self._start
+
+    def _reset_scan(self):
+        self._scan_pos = self._start
+        self._scan_depth = 0
+        self._scan_in_string = False
+
+    def _consume(self, size: int) -> str:
+        """
+        Internal function that removes the given number of bytes from the start of the buffer.
+
+        :param size:
+        :return: removed data as string
+        """
+        end = self._start + size
+        # Decode directly from the buffer without copying the data into an intermediate bytes object.
+        with memoryview(self._buffer) as view:
+            data = str(view[self._start:end], "ascii")
+        self._start = end
+
+        if self._start == len(self._buffer):
+            self._buffer.clear()
+            self._start = 0
+
+        elif self._start >= self._compact_size and self._start * 2 >= len(self._buffer):
+            del self._buffer[0:self._start]
+            self._start = 0
+
+        self._reset_scan()
+        return data
+
+    def _scan_message(self) -> Optional[int]:
+        """
+        Internal function that searches the end of the JSON message at the start of the buffer.
+
+        :return: size of the message or None if the message is not received completely
+        """
+        if self._scan_depth == 0:
+            # Skip whitespaces between messages.
+            while self._start < len(self._buffer) and self._buffer[self._start] in b" \t\r\n":
+                self._start += 1
+            if self._start == len(self._buffer):
+                return None
+            if self._buffer[self._start] != ord("{"):
+                raise ValueError("Received data is not a JSON message.")
+            self._scan_pos = self._start
+
+        pos = self._scan_pos
+        while True:
+            if self._scan_in_string:
+                match = self._string_chars.search(self._buffer, pos)
+            else:
+                match = self._object_chars.search(self._buffer, pos)
+            if match is None:
+                self._scan_pos = len(self._buffer)
+                return None
+
+            char = self._buffer[match.start()]
+            pos = match.end()
+            if self._scan_in_string:
+                if char == ord("\\"):
+                    # Scan the escape sequence again if the escaped character is not received yet.
+                    if pos == len(self._buffer):
+                        self._scan_pos = match.start()
+                        return None
+                    pos += 1
+
+                else:
+                    self._scan_in_string = False
+
+            elif char == ord('"'):
+                self._scan_in_string = True
+
+            elif char == ord("{"):
+                self._scan_depth += 1
+
+            else:
+                self._scan_depth -= 1
+                if self._scan_depth == 0:
+                    self._scan_pos = pos
+                    return pos - self._start
+
+    def clear(self):
+        self._buffer.clear()
+        self._start = 0
+        self._reset_scan()
+
+    def feed(self, data: bytes):
+        """
+        Adds received data to the buffer.
+
+        :param data:
+        """
+        self._buffer.extend(data)
+
+    def has_message(self) -> bool:
+        """
+        Checks if the buffer holds at least one complete JSON message.
+
+        :return:
+        """
+        return self._scan_message() is not None
+
+    def pop_message(self) -> Optional[str]:
+        """
+        Removes the first complete JSON message from the buffer.
+
+        :return: message or None if no complete message is buffered
+        """
+        size = self._scan_message()
+        if size is None:
+            return None
+        return self._consume(size)
+
+    def pop_data(self, size: int) -> Optional[str]:
+        """
+        Removes a message of the given size from the buffer.
+
+        :param size:
+        :return: message or None if the message is not buffered completely
+        """
+        if len(self) < size:
+            return None
+        return self._consume(size)
+
+    def has_frame(self) -> bool:
+        """
+        Checks if the buffer holds at least one complete frame.
+
+        :return:
+        """
+        if len(self) < FRAME_HEADER_SIZE:
+            return False
+        return len(self) >= FRAME_HEADER_SIZE + int(self._buffer[self._start:self._start + 8], 16)
+
+    def pop_frame(self) -> Optional[Tuple[int, int, str]]:
+        """
+        Removes the first complete frame from the buffer.
+
+        :return: tuple of frame type, transaction id and payload or None if no complete frame is buffered
+        """
+        if not self.has_frame():
+            return None
+
+        header = self._consume(FRAME_HEADER_SIZE)
+        length = int(header[0:8], 16)
+        transaction_id = int(header[8:16], 16)
+        frame_type = int(header[16])
+        if frame_type not in (FrameType.REQUEST, FrameType.RESPONSE):
+            raise ValueError("Frame type %d not known." % frame_type)
+
+        return frame_type, transaction_id, self._consume(length)
+
 
 # this class handles the communication with the incoming client connection
 class ClientCommunication:
@@ -53,6 +264,8 @@ class ClientCommunication:
         self.serverSessions = self.globalData.serverSessions
         self._option_executer = self.globalData.option_executer
         self._error_state_executer = self.globalData.error_state_executer
+        self._status_tracker = self.globalData.status_tracker
+        self._registration_tracker = self.globalData.registration_tracker
 
         # Time the last message was received by the server. Since the 
         # connection counts as a message, set it to the current time
@@ -112,6 +325,35 @@ class ClientCommunication:
         # is of type "sensor").
         self.sensors = list()  # type: List[Sensor]
 
+        # Flag that indicates if the client is able to process status updates
+        # that only contain the changes (is only used if the client is of type "manager").
+        self.statusDeltaSupported = False
+
+        # Status version the client has acknowledged last
+        # (None if the next status update has to be a full one).
+        self.statusVersion = None  # type: Optional[int]
+
+        # Status version of the status message that is currently sent to the client.
+        self._sent_status_version = None  # type: Optional[int]
+
+        # Flag that indicates if the pipelining mode was negotiated with the client. In pipelining mode each
+        # message is sent as frame with a transaction id without the RTS/CTS round trip.
+        self.pipelining = False
+
+        # Buffer for the received data that is split into complete messages (or frames in pipelining mode).
+        self._recv_buffer = ReceiveBuffer()
+
+        # Frame type and transaction id all messages are currently sent with in pipelining mode
+        # (the response to a request of the client or a request of the server).
+        self._frame_context = None  # type: Optional[Tuple[int, int]]
+
+        # Requests of the client received while the server waited for the response to its own request.
+        self._queued_frames = collections.deque()
+
+        # Function that is called if requests of the client were received by another thread than the one
+        # handling the requests (used by the event driven server to process them).
+        self.pendingFramesCallback = None  # type: Optional[Callable[[], None]]
+
         # Needed for logging.
         self.logger = self.globalData.logger
         self.loggerFileHandler = None
@@ -126,23 +368,142 @@ class ClientCommunication:
         """
         internal function that releases the lock
         """
+        self._frame_context = None
         self.connectionLock.release()
 
     def _send(self, data: str):
         """
-        Wrapper around socket send to handle bytes/string encoding.
+        Wrapper around socket send to handle bytes/string encoding
+        (and the framing of the message in pipelining mode).
 
         :param data:
         """
+        if self.pipelining and self._frame_context is not None:
+            data = build_frame(self._frame_context[0], self._frame_context[1], data)
         self.socket.send(data.encode("ascii"))
 
-    def _recv(self, bufsize: int = BUFSIZE) -> str:
+    def _recv(self) -> str:
+        """
+        Wrapper around socket recv that returns the next complete message as string
+        (or the response to the own request in pipelining mode).
+
+        :return: message or an empty string if the connection was closed
+        """
+        if self.pipelining and self._frame_context is not None:
+            return self._recv_response_frame()
+
+        while True:
+            data = self._recv_buffer.pop_message()
+            if data is not None:
+                return data
+
+            if not self._fill_recv_buffer():
+                return ""
+
+    def _recv_data(self, size: int) -> str:
+        """
+        Internal function that receives a message of the given size (announced by the RTS message).
+
+        :param size:
+        :return: message or an empty string if the connection was closed
+        """
+        while True:
+            data = self._recv_buffer.pop_data(size)
+            if data is not None:
+                return data
+
+            if not self._fill_recv_buffer():
+                return ""
+
+    def _fill_recv_buffer(self) -> bool:
+        """
+        Internal function that receives the next chunk of data from the connection into the receive buffer.
+
+        :return: False if the connection was closed
+        """
+        data = self.socket.recv(BUFSIZE)
+        if not data:
+            return False
+        self._recv_buffer.feed(data)
+        return True
+
+    def _recv_frame(self) -> Optional[Tuple[int, int, str]]:
+        """
+        Internal function that receives the next frame from the connection in pipelining mode.
+
+        :return: tuple of frame type, transaction id and payload or None if the connection was closed
         """
-        Wrapper around socket recv to handle bytes/string encoding.
+        while True:
+            frame = self._recv_buffer.pop_frame()
+            if frame is not None:
+                return frame
+
+            if not self._fill_recv_buffer():
+                return None
+
+    def _recv_response_frame(self) -> str:
+        """
+        Internal function that receives the response to the request of the server in pipelining mode.
+        Requests the client sent in the meantime are queued.
+
+        :return: payload of the response or an empty string if the connection was closed
+        """
+        transaction_id = self._frame_context[1]
+        try:
+            while True:
+                frame = self._recv_frame()
+                if frame is None:
+                    return ""
+
+                frame_type, received_transaction_id, data = frame
+                if frame_type == FrameType.REQUEST:
+                    self._queued_frames.append(frame)
+                    continue
+
+                if received_transaction_id != transaction_id:
+                    self.logger.warning("[%s]: Received response for unknown transaction %d (%s:%d)."
+                                        % (self.fileName, received_transaction_id, self.clientAddress,
+                                           self.clientPort))
+                    continue
+
+                # Errors are sent back as response to the request.
+                self._frame_context = (FrameType.RESPONSE, transaction_id)
+                return data
+
+        finally:
+            if self.has_pending_messages() and self.pendingFramesCallback is not None:
+                self.pendingFramesCallback()
+
+    def _next_frame(self) -> Optional[Tuple[int, int, str]]:
+        """
+        Internal function that returns the next frame that has to be handled in pipelining mode.
+
+        :return: tuple of frame type, transaction id and payload or None if the connection was closed
+        """
+        if self._queued_frames:
+            return self._queued_frames.popleft()
+        return self._recv_frame()
+
+    def has_pending_messages(self) -> bool:
+        """
+        Checks if messages (or frames in pipelining mode) were already received that have not been handled yet.
 
         :return:
         """
-        return self.socket.recv(bufsize).decode("ascii")
+        if self.pipelining:
+            return bool(self._queued_frames) or self._recv_buffer.has_frame()
+        return self._recv_buffer.has_message()
+
+    def close_connection(self):
+        """
+        Shuts the connection to the client down. The server session handling the client notices the closed
+        connection and cleans up (the client reconnects and gets the current state again).
+        """
+        try:
+            self.socket.shutdown(socket.SHUT_RDWR)
+
+        except Exception as e:
+            pass
 
     def _checkMsgAlertDelay(self,
                             alertDelay: int,
@@ -546,6 +907,30 @@ class ClientCommunication:
 
         return True
 
+    def _checkMsgPipelining(self,
+                            pipelining: bool,
+                            messageType: str) -> bool:
+        """
+        Internal function to check sanity of the pipelining flag.
+
+        :param pipelining:
+        :param messageType:
+        :return:
+        """
+        if not isinstance(pipelining, bool):
+            # send error message back
+            try:
+                message = {"message": messageType,
+                           "error": "pipelining not valid"}
+                self._send(json.dumps(message))
+
+            except Exception as e:
+                pass
+
+            return False
+
+        return True
+
     def _checkMsgRegAlertsList(self,
                                alerts: Dict[str, Any],
                                messageType: str) -> bool:
@@ -631,6 +1016,10 @@ class ClientCommunication:
                                                messageType):
                 isCorrect = False
 
+            # Optional flag that states that the manager is able to process status deltas.
+            elif "statusDelta" in manager.keys() and not isinstance(manager["statusDelta"], bool):
+                isCorrect = False
+
         if not isCorrect:
             # send error message back
             try:
@@ -830,6 +1219,85 @@ class ClientCommunication:
 
         return True
 
+    def _checkMsgSensorEvents(self,
+                              sensorEvents: bool,
+                              messageType: str) -> bool:
+        """
+        Internal function to check sanity of the sensor events flag.
+
+        :param sensorEvents:
+        :param messageType:
+        :return:
+        """
+        if not isinstance(sensorEvents, bool):
+            # send error message back
+            try:
+                message = {"message": messageType,
+                           "error": "sensorEvents not valid"}
+                self._send(json.dumps(message))
+
+            except Exception as e:
+                pass
+
+            return False
+
+        return True
+
+    def _checkMsgSensorEventsList(self,
+                                  events: List[Dict[str, Any]],
+                                  messageType: str) -> bool:
+        """
+        Internal function to check sanity of the sensor events list.
+
+        :param events:
+        :param messageType:
+        :return:
+        """
+        isCorrect = True
+        if not isinstance(events, list):
+            isCorrect = False
+
+        elif not events:
+            isCorrect = False
+
+        else:
+            # Check each event if correct.
+            for event in events:
+
+                if not isinstance(event, dict):
+                    isCorrect = False
+                    break
+
+                if "message" not in event.keys():
+                    isCorrect = False
+                    break
+
+                elif event["message"] not in ["sensoralert", "statechange", "sensorerrorstatechange"]:
+                    isCorrect = False
+                    break
+
+                if "payload" not in event.keys():
+                    isCorrect = False
+                    break
+
+                elif not isinstance(event["payload"], dict):
+                    isCorrect = False
+                    break
+
+        if not isCorrect:
+            # send error message back
+            try:
+                message = {"message": messageType,
+                           "error": "events list not valid"}
+                self._send(json.dumps(message))
+
+            except Exception as e:
+                pass
+
+            return False
+
+        return True
+
     def _checkMsgStatusSensorsList(self,
                                    sensors: Dict[str, Any],
                                    messageType: str) -> bool:
@@ -954,6 +1422,7 @@ class ClientCommunication:
         # set flag that the initialization process of
         # the client is finished as false
         self.clientInitialized = False
+        self.serverSessions.remove_initialized_client(self)
 
         # wake up manager update executer
         self.managerUpdateExecuter.force_status_update()
@@ -971,6 +1440,18 @@ class ClientCommunication:
         :param acquireLock:
         :return:
         """
+        # In pipelining mode the message is directly sent as request frame
+        # (the lock guarantees the exclusive use of the connection).
+        if self.pipelining:
+            if acquireLock:
+                self._acquireLock()
+
+            transactionId = random.randint(0, 0xffffffff)
+            self.logger.debug("[%s]: Sending request frame %d (%s:%d)."
+                              % (self.fileName, transactionId, self.clientAddress, self.clientPort))
+            self._frame_context = (FrameType.REQUEST, transactionId)
+            return True
+
         # try to get the exclusive state to be allowed to initiate a
         # transaction with the client
         while True:
@@ -1201,9 +1682,9 @@ class ClientCommunication:
 
         return json.dumps(message)
 
-    def _buildAlertSystemStateMessage(self) -> Optional[str]:
+    def _build_alert_system_state(self) -> Optional[Dict[str, List[Dict[str, Any]]]]:
         """
-        Internal function that builds the alert system state message.
+        Internal function that builds the lists of all objects of the alert system state.
 
         :return:
         """
@@ -1309,22 +1790,51 @@ class ClientCommunication:
                         "instrumentation_timeout": self.alertLevels[i].instrumentation_timeout}
             alertLevels.append(tempDict)
 
+        return {"options": options,
+                "profiles": profiles,
+                "nodes": nodes,
+                "sensors": sensors,
+                "managers": managers,
+                "alerts": alerts,
+                "alertLevels": alertLevels}
+
+    def _buildAlertSystemStateMessage(self) -> Optional[str]:
+        """
+        Internal function that builds the alert system state message. If the client supports it, only the
+        changes since the status version acknowledged by the client are sent. The payload is shared
+        with all other manager clients that get the same status version.
+
+        :return:
+        """
+        self._sent_status_version = None
+
+        # Without a status tracker (e.g., server components used outside of the server) the full status
+        # is built and encoded for this client only.
+        if self._status_tracker is None:
+            status_objects = self._build_alert_system_state()
+            if status_objects is None:
+                return None
+            payload = {"type": "request"}
+            payload.update(status_objects)
+            encoded_payload = json.dumps(payload)
+
+        else:
+            result = self._status_tracker.get_encoded_payload(self._build_alert_system_state,
+                                                              self.statusDeltaSupported,
+                                                              self.statusVersion)
+            if result is None:
+                return None
+            status_version, encoded_payload = result
+
+            if self.statusDeltaSupported:
+                self._sent_status_version = status_version
+
         self.logger.debug("[%s]: Sending status message (%s:%d)." % (self.fileName, self.clientAddress, self.clientPort))
 
-        payload = {"type": "request",
-                   "options": options,
-                   "profiles": profiles,
-                   "nodes": nodes,
-                   "sensors": sensors,
-                   "managers": managers,
-                   "alerts": alerts,
-                   "alertLevels": alertLevels}
+        # Embed the already encoded payload instead of encoding it again for each client
+        # (same result as json.dumps() of the message dictionary).
         utc_time = int(time.time())
-        message = {"msgTime": utc_time,
-                   "message": "status",
-                   "payload": payload}
-
-        return json.dumps(message)
+        return '{"msgTime": %d, "message": "status", "payload": %s}' % (utc_time, encoded_payload)
 
     def _initializeCommunication(self) -> bool:
         """
@@ -1589,6 +2099,50 @@ class ClientCommunication:
 
         return True, messageSize
 
+    def _update_registered_sensor_states(self) -> bool:
+        """
+        Internal function that updates the states, data and error states of the registered sensors that differ
+        from the ones in the database (used if the registration of the node is unchanged).
+
+        :return: success or failure (the sensors in the database do not match the registration)
+        """
+        stored_sensors = self.storage.get_sensors(self.nodeId,
+                                                  logger=self.logger)
+        if stored_sensors is None:
+            return False
+
+        stored_sensors = {x.clientSensorId: x for x in stored_sensors}
+        if set(stored_sensors.keys()) != set(x.clientSensorId for x in self.sensors):
+            self.logger.info("[%s]: Sensors in database do not match unchanged registration (%s:%d)."
+                             % (self.fileName, self.clientAddress, self.clientPort))
+            return False
+
+        state_list = list()
+        data_list = list()
+        for sensor in self.sensors:
+            stored_sensor = stored_sensors[sensor.clientSensorId]
+            if sensor.state != stored_sensor.state:
+                state_list.append((sensor.clientSensorId, sensor.state))
+            if sensor.dataType != SensorDataType.NONE and sensor.data != stored_sensor.data:
+                data_list.append((sensor.clientSensorId, sensor.data))
+
+        if state_list or data_list:
+            if not self.storage.updateSensorStateAndData(self.nodeId,
+                                                         state_list,
+                                                         data_list,
+                                                         logger=self.logger):
+                return False
+
+        for sensor in self.sensors:
+            if sensor.error_state != stored_sensors[sensor.clientSensorId].error_state:
+                if not self.storage.update_sensor_error_state(self.nodeId,
+                                                              sensor.clientSensorId,
+                                                              sensor.error_state,
+                                                              logger=self.logger):
+                    return False
+
+        return True
+
     def _registerClient(self,
                         messageSize: int) -> bool:
         """
@@ -1599,23 +2153,11 @@ class ClientCommunication:
         """
         # get registration from client
         try:
-            data = ""
-            lastSize = 0
-            while len(data) < messageSize:
-                # NOTE: Receiving should use bytearray as in client implementation. Change during refactor.
-                data += self._recv()
-
-                # Check if the size of the received data has changed.
-                # If not we detected a possible dead lock.
-                if lastSize != len(data):
-                    lastSize = len(data)
-
-                else:
-                    self.logger.error("[%s]: Possible dead lock detected while receiving data. Closing "
-                                      % self.fileName
-                                      + "connection to client (%s:%d)."
-                                      % (self.clientAddress, self.clientPort))
-                    return False
+            data = self._recv_data(messageSize)
+            if not data:
+                self.logger.error("[%s]: Connection closed while receiving registration (%s:%d)."
+                                  % (self.fileName, self.clientAddress, self.clientPort))
+                return False
 
             message = json.loads(data)
             # check if an error was received
@@ -1703,6 +2245,26 @@ class ClientCommunication:
                                   % (self.fileName, self.clientAddress, self.clientPort))
                 return False
 
+            # Pipelining is an optional protocol extension (not requested by older clients).
+            pipelining = False
+            if "pipelining" in message["payload"].keys():
+                if not self._checkMsgPipelining(message["payload"]["pipelining"],
+                                                message["message"]):
+                    self.logger.error("[%s]: Received pipelining invalid (%s:%d)."
+                                      % (self.fileName, self.clientAddress, self.clientPort))
+                    return False
+                pipelining = message["payload"]["pipelining"]
+
+            # Batched sensor events are an optional protocol extension of sensor nodes.
+            sensorEvents = False
+            if "sensorEvents" in message["payload"].keys():
+                if not self._checkMsgSensorEvents(message["payload"]["sensorEvents"],
+                                                  message["message"]):
+                    self.logger.error("[%s]: Received sensorEvents invalid (%s:%d)."
+                                      % (self.fileName, self.clientAddress, self.clientPort))
+                    return False
+                sensorEvents = message["payload"]["sensorEvents"]
+
             self.hostname = message["payload"]["hostname"]
             self.nodeType = message["payload"]["nodeType"]
             self.instance = message["payload"]["instance"]
@@ -1743,43 +2305,100 @@ class ClientCommunication:
         self.logger.debug("[%s]: Received node registration %s:%s (%s:%d)."
                           % (self.fileName, self.hostname, self.nodeType, self.clientAddress, self.clientPort))
 
-        # add node to database
-        if not self.storage.addNode(self.username,
-                                    self.hostname,
-                                    self.nodeType,
-                                    self.instance,
-                                    self.clientVersion,
-                                    self.clientRev,
-                                    self.persistent,
-                                    logger=self.logger):
-            self.logger.error("[%s]: Unable to add node to database." % self.fileName)
-
-            # send error message back
+        # A node that registers again with the same registration does not change the database
+        # (only the states of its sensors are updated).
+        registration_hash = None
+        stored_registration_hash = None
+        registration_unchanged = False
+        if self._registration_tracker is not None:
             try:
-                message = {"message": message["message"],
-                           "error": "unable to add node to database"}
-                self._send(json.dumps(message))
+                registration_hash = self._registration_tracker.get_hash(self.clientVersion,
+                                                                        self.clientRev,
+                                                                        message["payload"])
 
             except Exception as e:
+                # Invalid registrations are rejected by the checks below.
                 pass
 
-            return False
-
-        # Get the node id from the database for this client.
-        self.nodeId = self.storage.getNodeId(self.username,
-                                             logger=self.logger)
-        if self.nodeId is None:
-            self.logger.error("[%s]: Getting node id failed (%s:%d)."
-                              % (self.fileName, self.clientAddress, self.clientPort))
+            node_id = None
+            if registration_hash is not None:
+                node_id = self.storage.getNodeId(self.username,
+                                                 logger=self.logger)
+                if node_id is None:
+                    self.logger.debug("[%s]: Not able to get node id of '%s'. Applying complete registration (%s:%d)."
+                                      % (self.fileName, self.username, self.clientAddress, self.clientPort))
+
+            if node_id is not None:
+                stored_registration_hash = self.storage.get_registration_hash(node_id,
+                                                                              logger=self.logger)
+                if stored_registration_hash is None:
+                    self.logger.debug("[%s]: Not able to get registration hash of node %d. "
+                                      % (self.fileName, node_id)
+                                      + "Applying complete registration (%s:%d)."
+                                      % (self.clientAddress, self.clientPort))
 
-            # send error message back
-            try:
-                message = {"message": message["message"],
-                           "error": "unable to get node id from database"}
-                self._send(json.dumps(message))
+                registration_unchanged = (registration_hash == stored_registration_hash)
 
-            except Exception as e:
-                pass
+                # The registration is written in multiple steps
+                # => mark it as not applied completely until all steps have succeeded.
+                if (not registration_unchanged
+                        and stored_registration_hash is not None
+                        and not self.storage.set_registration_hash(node_id,
+                                                                   None,
+                                                                   logger=self.logger)):
+                    self.logger.error("[%s]: Unable to reset registration hash of node %d (%s:%d)."
+                                      % (self.fileName, node_id, self.clientAddress, self.clientPort))
+
+                    # send error message back
+                    try:
+                        message = {"message": message["message"],
+                                   "error": "unable to update registration in database"}
+                        self._send(json.dumps(message))
+
+                    except Exception as e:
+                        pass
+
+                    return False
+
+        if not registration_unchanged:
+
+            # add node to database
+            if not self.storage.addNode(self.username,
+                                        self.hostname,
+                                        self.nodeType,
+                                        self.instance,
+                                        self.clientVersion,
+                                        self.clientRev,
+                                        self.persistent,
+                                        logger=self.logger):
+                self.logger.error("[%s]: Unable to add node to database." % self.fileName)
+
+                # send error message back
+                try:
+                    message = {"message": message["message"],
+                               "error": "unable to add node to database"}
+                    self._send(json.dumps(message))
+
+                except Exception as e:
+                    pass
+
+                return False
+
+        # Get the node id from the database for this client.
+        self.nodeId = self.storage.getNodeId(self.username,
+                                             logger=self.logger)
+        if self.nodeId is None:
+            self.logger.error("[%s]: Getting node id failed (%s:%d)."
+                              % (self.fileName, self.clientAddress, self.clientPort))
+
+            # send error message back
+            try:
+                message = {"message": message["message"],
+                           "error": "unable to get node id from database"}
+                self._send(json.dumps(message))
+
+            except Exception as e:
+                pass
 
             return False
 
@@ -1887,8 +2506,29 @@ class ClientCommunication:
 
                 self.sensors.append(tempSensor)
 
+            # Only update the states of the sensors if the registration is unchanged
+            # (all sensors are written if the sensors in the database do not match the registration).
+            if registration_unchanged and not self._update_registered_sensor_states():
+                registration_unchanged = False
+                if not self.storage.set_registration_hash(self.nodeId,
+                                                          None,
+                                                          logger=self.logger):
+                    self.logger.error("[%s]: Unable to reset registration hash of node %d (%s:%d)."
+                                      % (self.fileName, self.nodeId, self.clientAddress, self.clientPort))
+
+                    # send error message back
+                    try:
+                        message = {"message": message["message"],
+                                   "error": "unable to update registration in database"}
+                        self._send(json.dumps(message))
+
+                    except Exception as e:
+                        pass
+
+                    return False
+
             # Add sensors to database
-            if not self.storage.upsert_sensors(self.sensors, self.logger):
+            if not registration_unchanged and not self.storage.upsert_sensors(self.sensors, self.logger):
                 self.logger.error("[%s]: Unable to add sensors to database (%s:%d)."
                                   % (self.fileName, self.clientAddress, self.clientPort))
 
@@ -2018,23 +2658,25 @@ class ClientCommunication:
                 self.logger.debug("[%s]: Received alert: %d:'%s' (%s:%d)."
                                   % (self.fileName, alertId, description, self.clientAddress, self.clientPort))
 
-            # add alerts to database
-            if not self.storage.addAlerts(self.username,
-                                          alerts,
-                                          logger=self.logger):
-                self.logger.error("[%s]: Unable to add alerts to database (%s:%d)."
-                                  % (self.fileName, self.clientAddress, self.clientPort))
+            if not registration_unchanged:
 
-                # send error message back
-                try:
-                    message = {"message": message["message"],
-                               "error": "unable to add alerts to database"}
-                    self._send(json.dumps(message))
+                # add alerts to database
+                if not self.storage.addAlerts(self.username,
+                                              alerts,
+                                              logger=self.logger):
+                    self.logger.error("[%s]: Unable to add alerts to database (%s:%d)."
+                                      % (self.fileName, self.clientAddress, self.clientPort))
 
-                except Exception as e:
-                    pass
+                    # send error message back
+                    try:
+                        message = {"message": message["message"],
+                                   "error": "unable to add alerts to database"}
+                        self._send(json.dumps(message))
 
-                return False
+                    except Exception as e:
+                        pass
+
+                    return False
 
             # Update alert levels the client handles
             # (alert clients handle only alert levels the alerts respond to).
@@ -2073,6 +2715,7 @@ class ClientCommunication:
             # extraction manager data
             try:
                 description = manager["description"]
+                self.statusDeltaSupported = manager.get("statusDelta", False)
 
             except Exception as e:
                 self.logger.exception("[%s]: Manager data invalid (%s:%d)."
@@ -2092,23 +2735,25 @@ class ClientCommunication:
             self.logger.debug("[%s]: Received manager information (%s:%d)."
                               % (self.fileName, self.clientAddress, self.clientPort))
 
-            # add manager to database
-            if not self.storage.addManager(self.username,
-                                           manager,
-                                           logger=self.logger):
-                self.logger.error("[%s]: Unable to add manager to database (%s:%d)."
-                                  % (self.fileName, self.clientAddress, self.clientPort))
+            if not registration_unchanged:
 
-                # send error message back
-                try:
-                    message = {"message": message["message"],
-                               "error": "unable to add manager to database"}
-                    self._send(json.dumps(message))
+                # add manager to database
+                if not self.storage.addManager(self.username,
+                                               manager,
+                                               logger=self.logger):
+                    self.logger.error("[%s]: Unable to add manager to database (%s:%d)."
+                                      % (self.fileName, self.clientAddress, self.clientPort))
 
-                except Exception as e:
-                    pass
+                    # send error message back
+                    try:
+                        message = {"message": message["message"],
+                                   "error": "unable to add manager to database"}
+                        self._send(json.dumps(message))
 
-                return False
+                    except Exception as e:
+                        pass
+
+                    return False
 
             # Update alert levels the client handles
             # (manager clients handle all alert levels).
@@ -2130,10 +2775,29 @@ class ClientCommunication:
 
             return False
 
+        if self._registration_tracker is not None:
+            if registration_unchanged:
+                self._registration_tracker.count_skipped()
+
+            else:
+                # The registration is applied nevertheless, only the next registration of the node
+                # is written completely again.
+                if (registration_hash is not None
+                        and not self.storage.set_registration_hash(self.nodeId,
+                                                                   registration_hash,
+                                                                   logger=self.logger)):
+                    self.logger.warning("[%s]: Unable to store registration hash of node %d (%s:%d)."
+                                        % (self.fileName, self.nodeId, self.clientAddress, self.clientPort))
+                self._registration_tracker.count_applied()
+
         # send registration response
         try:
             payload = {"type": "response",
                        "result": "ok"}
+            if pipelining:
+                payload["pipelining"] = True
+            if sensorEvents and self.nodeType == "sensor":
+                payload["sensorEvents"] = True
             message = {"message": "initialization",
                        "payload": payload}
             self._send(json.dumps(message))
@@ -2143,6 +2807,12 @@ class ClientCommunication:
                                   % (self.fileName, self.clientAddress, self.clientPort))
             return False
 
+        # All following messages are sent as frames.
+        if pipelining:
+            self.logger.debug("[%s]: Using pipelining mode (%s:%d)."
+                              % (self.fileName, self.clientAddress, self.clientPort))
+            self.pipelining = True
+
         return True
 
     def _optionHandler(self,
@@ -2425,127 +3095,249 @@ class ClientCommunication:
 
         return True
 
-    def _sensorAlertHandler(self,
-                            incomingMessage: Dict[str, Any]) -> bool:
+    def _get_client_sensor(self,
+                           clientSensorId: int,
+                           messageType: str) -> Optional[Sensor]:
         """
-        this internal function handles received sensor alerts
-        (adds them to the database and wakes up the sensor alert executer)
+        Internal function that gets the sensor of the client with the given client sensor id
+        (sends an error message back if the sensor is unknown).
 
-        :param incomingMessage:
-        :return:
+        :param clientSensorId:
+        :param messageType:
+        :return: sensor object or None
         """
-        # extract sensor alert values
-        sensor = None
+        for sensor in self.sensors:
+            if sensor.clientSensorId == clientSensorId:
+                return sensor
+
+        self.logger.error("[%s]: Unknown client sensor id %d (%s:%d)."
+                          % (self.fileName, clientSensorId, self.clientAddress, self.clientPort))
+
+        # send error message back
         try:
-            if not self._checkMsgClientSensorId(incomingMessage["payload"]["clientSensorId"],
-                                                incomingMessage["message"]):
-                self.logger.error("[%s]: Received clientSensorId invalid (%s:%d)."
-                                  % (self.fileName, self.clientAddress, self.clientPort))
-                return False
+            message = {"message": messageType,
+                       "error": "unknown client sensor id"}
+            self._send(json.dumps(message))
 
-            if not self._checkMsgState(incomingMessage["payload"]["state"],
-                                       incomingMessage["message"]):
-                self.logger.error("[%s]: Received state invalid (%s:%d)."
-                                  % (self.fileName, self.clientAddress, self.clientPort))
-                return False
+        except Exception as e:
+            pass
 
-            if not self._checkMsgChangeState(incomingMessage["payload"]["changeState"],
-                                             incomingMessage["message"]):
-                self.logger.error("[%s]: Received changeState invalid (%s:%d)."
-                                  % (self.fileName, self.clientAddress, self.clientPort))
-                return False
+        return None
 
-            if not self._checkMsgHasLatestData(incomingMessage["payload"]["hasLatestData"],
-                                               incomingMessage["message"]):
-                self.logger.error("[%s]: Received hasLatestData invalid (%s:%d)."
-                                  % (self.fileName, self.clientAddress, self.clientPort))
-                return False
+    def _parse_sensor_state_and_data(self,
+                                     payload: Dict[str, Any],
+                                     messageType: str) -> Optional[Tuple[Sensor, Dict[str, Any]]]:
+        """
+        Internal function that checks and extracts the sensor, state and data of a received sensor alert
+        or state change (sends an error message back if they are invalid).
 
-            if not self._checkMsgSensorDataType(incomingMessage["payload"]["dataType"],
-                                                incomingMessage["message"]):
-                self.logger.error("[%s]: Received dataType invalid (%s:%d)."
-                                  % (self.fileName, self.clientAddress, self.clientPort))
-                return False
+        :param payload:
+        :param messageType:
+        :return: tuple of (sensor, dict with the extracted values) or None
+        """
+        if not self._checkMsgClientSensorId(payload["clientSensorId"],
+                                            messageType):
+            self.logger.error("[%s]: Received clientSensorId invalid (%s:%d)."
+                              % (self.fileName, self.clientAddress, self.clientPort))
+            return None
 
-            if not self._checkMsgSensorData(incomingMessage["payload"]["data"],
-                                            incomingMessage["payload"]["dataType"],
-                                            incomingMessage["message"]):
-                self.logger.error("[%s]: Received data invalid (%s:%d)."
-                                  % (self.fileName, self.clientAddress, self.clientPort))
-                return False
+        if not self._checkMsgState(payload["state"],
+                                   messageType):
+            self.logger.error("[%s]: Received state invalid (%s:%d)."
+                              % (self.fileName, self.clientAddress, self.clientPort))
+            return None
 
-            clientSensorId = incomingMessage["payload"]["clientSensorId"]
-            state = incomingMessage["payload"]["state"]
-            changeState = incomingMessage["payload"]["changeState"]
-            hasLatestData = incomingMessage["payload"]["hasLatestData"]
-            sensorDataType = incomingMessage["payload"]["dataType"]
+        if not self._checkMsgSensorDataType(payload["dataType"],
+                                            messageType):
+            self.logger.error("[%s]: Received dataType invalid (%s:%d)."
+                              % (self.fileName, self.clientAddress, self.clientPort))
+            return None
 
-            sensor_data_class = SensorDataType.get_sensor_data_class(sensorDataType)
-            sensor_data = sensor_data_class.copy_from_dict(incomingMessage["payload"]["data"])
+        if not self._checkMsgSensorData(payload["data"],
+                                        payload["dataType"],
+                                        messageType):
+            self.logger.error("[%s]: Received data invalid (%s:%d)."
+                              % (self.fileName, self.clientAddress, self.clientPort))
+            return None
 
-            # Check if client sensor is known.
-            for currentSensor in self.sensors:
-                if currentSensor.clientSensorId == clientSensorId:
-                    sensor = currentSensor
-                    break
-            if sensor is None:
-                self.logger.error("[%s]: Unknown client sensor id %d (%s:%d)."
-                                  % (self.fileName, clientSensorId, self.clientAddress, self.clientPort))
+        clientSensorId = payload["clientSensorId"]
+        sensor = self._get_client_sensor(clientSensorId, messageType)
+        if sensor is None:
+            return None
 
-                # send error message back
-                try:
-                    message = {"message": incomingMessage["message"],
-                               "error": "unknown client sensor id"}
-                    self._send(json.dumps(message))
+        # Check if received message contains the correct data type.
+        if payload["dataType"] != sensor.dataType:
+            self.logger.error("[%s]: Received sensor data type for client sensor %d invalid (%s:%d)."
+                              % (self.fileName, clientSensorId, self.clientAddress, self.clientPort))
 
-                except Exception as e:
-                    pass
+            # send error message back
+            try:
+                message = {"message": messageType,
+                           "error": "received sensor data type wrong"}
+                self._send(json.dumps(message))
 
-                return False
+            except Exception as e:
+                pass
+
+            return None
+
+        sensor_data_class = SensorDataType.get_sensor_data_class(payload["dataType"])
+        values = {"state": payload["state"],
+                  "dataType": payload["dataType"],
+                  "data": sensor_data_class.copy_from_dict(payload["data"])}
 
-            # Check if received message contains the correct data type.
-            if sensorDataType != sensor.dataType:
-                self.logger.error("[%s]: Received sensor data type for client sensor %d invalid (%s:%d)."
-                                  % (self.fileName, clientSensorId, self.clientAddress, self.clientPort))
+        return sensor, values
 
+    def _parse_sensor_alert(self,
+                            payload: Dict[str, Any],
+                            messageType: str) -> Optional[Tuple[Sensor, Dict[str, Any]]]:
+        """
+        Internal function that checks and extracts the values of a received sensor alert
+        (sends an error message back if they are invalid).
+
+        :param payload:
+        :param messageType:
+        :return: tuple of (sensor, dict with the extracted values) or None
+        """
+        if not self._checkMsgChangeState(payload["changeState"],
+                                         messageType):
+            self.logger.error("[%s]: Received changeState invalid (%s:%d)."
+                              % (self.fileName, self.clientAddress, self.clientPort))
+            return None
+
+        if not self._checkMsgHasLatestData(payload["hasLatestData"],
+                                           messageType):
+            self.logger.error("[%s]: Received hasLatestData invalid (%s:%d)."
+                              % (self.fileName, self.clientAddress, self.clientPort))
+            return None
+
+        result = self._parse_sensor_state_and_data(payload, messageType)
+        if result is None:
+            return None
+        sensor, values = result
+
+        values["changeState"] = payload["changeState"]
+        values["hasLatestData"] = payload["hasLatestData"]
+
+        # Get optional data of sensor alert if it is activated.
+        values["optionalData"] = None
+        if bool(payload["hasOptionalData"]):
+            values["optionalData"] = payload["optionalData"]
+
+            # check if data is of type dict
+            if not isinstance(values["optionalData"], dict):
                 # send error message back
                 try:
-                    message = {"message": incomingMessage["message"],
-                               "error": "received sensor data type wrong"}
+                    message = {"message": messageType,
+                               "error": "optionalData not of type dict"}
                     self._send(json.dumps(message))
 
                 except Exception as e:
                     pass
 
-                return False
+                return None
 
-            # Get optional data of sensor alert if it is activated.
-            optionalData = None
-            hasOptionalData = bool(incomingMessage["payload"]["hasOptionalData"])
-            if hasOptionalData:
-                optionalData = incomingMessage["payload"]["optionalData"]
+        return sensor, values
 
-                # check if data is of type dict
-                if not isinstance(optionalData, dict):
-                    # send error message back
-                    try:
-                        message = {"message": incomingMessage["message"],
-                                   "error": "optionalData not of type dict"}
-                        self._send(json.dumps(message))
+    def _parse_sensor_error_state_change(self,
+                                         payload: Dict[str, Any],
+                                         messageType: str) -> Optional[Tuple[Sensor, Dict[str, Any]]]:
+        """
+        Internal function that checks and extracts the values of a received sensor error state change
+        (sends an error message back if they are invalid).
 
-                    except Exception as e:
-                        pass
+        :param payload:
+        :param messageType:
+        :return: tuple of (sensor, dict with the extracted values) or None
+        """
+        if not self._checkMsgClientSensorId(payload["clientSensorId"],
+                                            messageType):
+            self.logger.error("[%s]: Received clientSensorId invalid (%s:%d)."
+                              % (self.fileName, self.clientAddress, self.clientPort))
+            return None
 
-                    return False
+        if not self._checkMsgSensorErrorState(payload["error_state"],
+                                              messageType):
+            self.logger.error("[%s]: Received error_state invalid (%s:%d)."
+                              % (self.fileName, self.clientAddress, self.clientPort))
+            return None
 
-        except Exception as e:
-            self.logger.exception("[%s]: Received sensor alert invalid (%s:%d)."
-                                  % (self.fileName, self.clientAddress, self.clientPort))
+        sensor = self._get_client_sensor(payload["clientSensorId"], messageType)
+        if sensor is None:
+            return None
+
+        return sensor, {"error_state": SensorErrorState.copy_from_dict(payload["error_state"])}
+
+    def _parse_sensor_event(self,
+                            eventType: str,
+                            payload: Dict[str, Any],
+                            messageType: str) -> Optional[Tuple[Sensor, Dict[str, Any]]]:
+        """
+        Internal function that checks and extracts the values of a received sensor alert, state change or
+        sensor error state change (sends an error message back if they are invalid).
+
+        :param eventType: "sensoralert", "statechange" or "sensorerrorstatechange"
+        :param payload:
+        :param messageType: type of the received message the event is part of
+        :return: tuple of (sensor, dict with the extracted values) or None
+        """
+        if eventType == "sensoralert":
+            return self._parse_sensor_alert(payload, messageType)
+
+        elif eventType == "statechange":
+            return self._parse_sensor_state_and_data(payload, messageType)
+
+        return self._parse_sensor_error_state_change(payload, messageType)
+
+    def _store_sensor_events(self,
+                             events: List[Tuple[str, Sensor, Dict[str, Any]]],
+                             messageType: str) -> bool:
+        """
+        Internal function that stores the states and data of the sensors changed by the given events in one
+        transaction (sends an error message back if it fails).
+
+        :param events: list of tuples of (event type, sensor, dict with the extracted values)
+        :param messageType:
+        :return: success or failure
+        """
+        # Only the last state and data of each sensor has to be stored since all events are stored in
+        # one transaction (the dictionaries keep the order of the client sensor ids). The sensor history
+        # nevertheless records each event on its own.
+        states = dict()  # type: Dict[int, int]
+        data = dict()  # type: Dict[int, Any]
+        history = list()  # type: List[Tuple[int, Optional[int], Any]]
+        for eventType, sensor, values in events:
+            if eventType == "statechange":
+                states[sensor.clientSensorId] = values["state"]
+                if values["dataType"] != SensorDataType.NONE:
+                    data[sensor.clientSensorId] = values["data"]
+                history.append((sensor.clientSensorId, values["state"], values["data"]))
+
+            elif eventType == "sensoralert":
+                if values["changeState"]:
+                    states[sensor.clientSensorId] = values["state"]
+                if values["hasLatestData"]:
+                    data[sensor.clientSensorId] = values["data"]
+                if values["changeState"] or values["hasLatestData"]:
+                    history.append((sensor.clientSensorId,
+                                    values["state"] if values["changeState"] else None,
+                                    values["data"] if values["hasLatestData"] else None))
+
+        if not states and not data:
+            return True
+
+        if not self.storage.updateSensorStateAndData(self.nodeId,
+                                                     list(states.items()),
+                                                     list(data.items()),
+                                                     logger=self.logger,
+                                                     historyList=history):
+            self.logger.error("[%s]: Not able to update sensor states and data (%s:%d)."
+                              % (self.fileName, self.clientAddress, self.clientPort))
 
             # send error message back
             try:
-                message = {"message": incomingMessage["message"],
-                           "error": "received sensor alert invalid"}
+                message = {"message": messageType,
+                           "error": "not able to update sensor states and data in database"}
                 self._send(json.dumps(message))
 
             except Exception as e:
@@ -2553,24 +3345,47 @@ class ClientCommunication:
 
             return False
 
-        self.logger.info("[%s]: Sensor alert for client sensor id %d and state %d."
-                         % (self.fileName, clientSensorId, state))
-
-        # Update state of the sensor if sensor alert updates the state.
-        if changeState:
-            sensor.state = state
+        return True
 
-            if not self.storage.updateSensorState(self.nodeId,
-                                                  [(clientSensorId, state)],
-                                                  logger=self.logger):
+    def _apply_sensor_event(self,
+                            eventType: str,
+                            sensor: Sensor,
+                            values: Dict[str, Any],
+                            messageType: str) -> bool:
+        """
+        Internal function that applies a stored event to the sensor object and hands it to the responsible
+        executer (sends an error message back if it fails).
 
-                self.logger.error("[%s]: Not able to update sensor state (%s:%d)."
-                                  % (self.fileName, self.clientAddress, self.clientPort))
+        :param eventType: "sensoralert", "statechange" or "sensorerrorstatechange"
+        :param sensor:
+        :param values: dict with the extracted values of the event
+        :param messageType:
+        :return: success or failure
+        """
+        if eventType == "sensoralert":
+            self.logger.info("[%s]: Sensor alert for client sensor id %d and state %d."
+                             % (self.fileName, sensor.clientSensorId, values["state"]))
+
+            # Update state and data of the sensor if sensor alert updates them.
+            if values["changeState"]:
+                sensor.state = values["state"]
+            if values["hasLatestData"]:
+                sensor.data = values["data"]
+
+            if not self.sensorAlertExecuter.add_sensor_alert(self.nodeId,
+                                                             sensor.sensorId,
+                                                             values["state"],
+                                                             values["optionalData"],
+                                                             values["changeState"],
+                                                             values["hasLatestData"],
+                                                             values["dataType"],
+                                                             values["data"],
+                                                             self.logger):
 
                 # send error message back
                 try:
-                    message = {"message": incomingMessage["message"],
-                               "error": "not able to update sensor state in database"}
+                    message = {"message": messageType,
+                               "error": "not able to add sensor alert for processing"}
                     self._send(json.dumps(message))
 
                 except Exception as e:
@@ -2578,42 +3393,52 @@ class ClientCommunication:
 
                 return False
 
-        # Update data of the sensor if sensor alert carries latest
-        # sensor data.
-        if hasLatestData:
-            sensor.data = sensor_data
+        elif eventType == "statechange":
+            self.logger.debug("[%s]: State change for client sensor id %d and state %d and data (%s) (%s:%d)."
+                              % (self.fileName, sensor.clientSensorId, values["state"], str(values["data"]),
+                                 self.clientAddress, self.clientPort))
 
-            if not self.storage.updateSensorData(self.nodeId,
-                                                 [(clientSensorId, sensor_data)],
-                                                 logger=self.logger):
-                self.logger.error("[%s]: Not able to update sensor data (%s:%d)."
-                                  % (self.fileName, self.clientAddress, self.clientPort))
+            sensor.state = values["state"]
+            sensor.data = values["data"]
 
-                # send error message back
-                try:
-                    message = {"message": incomingMessage["message"],
-                               "error": "not able to update sensor data in database"}
-                    self._send(json.dumps(message))
+            sensorDataObj = SensorData()
+            sensorDataObj.dataType = sensor.dataType
+            sensorDataObj.data = sensor.data
 
-                except Exception as e:
-                    pass
+            # add state change to queue and wake up manager update executer
+            self.managerUpdateExecuter.queue_state_change(sensor.sensorId, sensor.state, sensorDataObj)
 
-                return False
+        else:
+            sensor.error_state = values["error_state"]
+            self._error_state_executer.add_error_state(self.nodeId,
+                                                       sensor.clientSensorId,
+                                                       values["error_state"])
+
+        return True
+
+    def _handle_sensor_event(self,
+                             incomingMessage: Dict[str, Any],
+                             description: str) -> bool:
+        """
+        Internal function that handles a single received sensor alert, state change or sensor error state change
+        (stores it, hands it to the responsible executer and sends the response).
+
+        :param incomingMessage:
+        :param description: description of the event used in the log and error messages (e.g., "sensor alert")
+        :return: success or failure
+        """
+        eventType = incomingMessage["message"]
+        try:
+            result = self._parse_sensor_event(eventType, incomingMessage["payload"], eventType)
 
-        if not self.sensorAlertExecuter.add_sensor_alert(self.nodeId,
-                                                         sensor.sensorId,
-                                                         state,
-                                                         optionalData,
-                                                         changeState,
-                                                         hasLatestData,
-                                                         sensorDataType,
-                                                         sensor_data,
-                                                         self.logger):
+        except Exception as e:
+            self.logger.exception("[%s]: Received %s invalid (%s:%d)."
+                                  % (self.fileName, description, self.clientAddress, self.clientPort))
 
             # send error message back
             try:
-                message = {"message": incomingMessage["message"],
-                           "error": "not able to add sensor alert for processing"}
+                message = {"message": eventType,
+                           "error": "received %s invalid" % description}
                 self._send(json.dumps(message))
 
             except Exception as e:
@@ -2621,21 +3446,42 @@ class ClientCommunication:
 
             return False
 
-        # send sensor alert response
+        if result is None:
+            return False
+        sensor, values = result
+
+        if not self._store_sensor_events([(eventType, sensor, values)], eventType):
+            return False
+
+        if not self._apply_sensor_event(eventType, sensor, values, eventType):
+            return False
+
+        # send response
         try:
             payload = {"type": "response",
                        "result": "ok"}
-            message = {"message": "sensoralert",
+            message = {"message": eventType,
                        "payload": payload}
             self._send(json.dumps(message))
 
         except Exception as e:
-            self.logger.exception("[%s]: Sending sensor alert response failed (%s:%d)."
-                                  % (self.fileName, self.clientAddress, self.clientPort))
+            self.logger.exception("[%s]: Sending %s response failed (%s:%d)."
+                                  % (self.fileName, description, self.clientAddress, self.clientPort))
             return False
 
         return True
 
+    def _sensorAlertHandler(self,
+                            incomingMessage: Dict[str, Any]) -> bool:
+        """
+        this internal function handles received sensor alerts
+        (adds them to the database and wakes up the sensor alert executer)
+
+        :param incomingMessage:
+        :return:
+        """
+        return self._handle_sensor_event(incomingMessage, "sensor alert")
+
     def _stateChangeHandler(self,
                             incomingMessage: Dict[str, Any]) -> bool:
         """
@@ -2645,182 +3491,7 @@ class ClientCommunication:
         :param incomingMessage:
         :return:
         """
-        # Extract state change values.
-        sensor = None
-        try:
-            if not self._checkMsgClientSensorId(incomingMessage["payload"]["clientSensorId"],
-                                                incomingMessage["message"]):
-                self.logger.error("[%s]: Received clientSensorId invalid (%s:%d)."
-                                  % (self.fileName, self.clientAddress, self.clientPort))
-                return False
-
-            if not self._checkMsgState(incomingMessage["payload"]["state"],
-                                       incomingMessage["message"]):
-                self.logger.error("[%s]: Received state invalid (%s:%d)."
-                                  % (self.fileName, self.clientAddress, self.clientPort))
-                return False
-
-            if not self._checkMsgSensorDataType(incomingMessage["payload"]["dataType"],
-                                                incomingMessage["message"]):
-                self.logger.error("[%s]: Received dataType invalid (%s:%d)."
-                                  % (self.fileName, self.clientAddress, self.clientPort))
-                return False
-
-            if not self._checkMsgSensorData(incomingMessage["payload"]["data"],
-                                            incomingMessage["payload"]["dataType"],
-                                            incomingMessage["message"]):
-                self.logger.error("[%s]: Received data invalid (%s:%d)."
-                                  % (self.fileName, self.clientAddress, self.clientPort))
-                return False
-
-            clientSensorId = incomingMessage["payload"]["clientSensorId"]
-            state = incomingMessage["payload"]["state"]
-            sensorDataType = incomingMessage["payload"]["dataType"]
-
-            sensor_data_class = SensorDataType.get_sensor_data_class(sensorDataType)
-            sensor_data = sensor_data_class.copy_from_dict(incomingMessage["payload"]["data"])
-
-            # Check if client sensor is known.
-            for currentSensor in self.sensors:
-                if currentSensor.clientSensorId == clientSensorId:
-                    sensor = currentSensor
-                    break
-            if sensor is None:
-                self.logger.error("[%s]: Unknown client sensor id %d (%s:%d)."
-                                  % (self.fileName, clientSensorId, self.clientAddress, self.clientPort))
-
-                # send error message back
-                try:
-                    message = {"message": incomingMessage["message"],
-                               "error": "unknown client sensor id"}
-                    self._send(json.dumps(message))
-
-                except Exception as e:
-                    pass
-
-                return False
-
-            # Check if received message contains the correct data type.
-            if sensorDataType != sensor.dataType:
-                self.logger.error("[%s]: Received sensor data type for client sensor %d invalid (%s:%d)."
-                                  % (self.fileName, clientSensorId, self.clientAddress, self.clientPort))
-
-                # send error message back
-                try:
-                    message = {"message": incomingMessage["message"],
-                               "error": "received sensor data type wrong"}
-                    self._send(json.dumps(message))
-
-                except Exception as e:
-                    pass
-
-                return False
-
-            # Update sensor object.
-            sensor.state = state
-            sensor.data = sensor_data
-
-        except Exception as e:
-            self.logger.exception("[%s]: Received state change invalid (%s:%d)."
-                                  % (self.fileName, self.clientAddress, self.clientPort))
-
-            # send error message back
-            try:
-                message = {"message": incomingMessage["message"],
-                           "error": "received state change invalid"}
-                self._send(json.dumps(message))
-
-            except Exception as e:
-                pass
-
-            return False
-
-        self.logger.debug("[%s]: State change for client sensor id %d and state %d and data (%s) (%s:%d)."
-                          % (self.fileName, clientSensorId, state, str(sensor_data), self.clientAddress, self.clientPort))
-
-        # update sensor state
-        stateTuple = (clientSensorId, state)
-        stateList = [stateTuple]
-        if not self.storage.updateSensorState(self.nodeId,
-                                              stateList,
-                                              logger=self.logger):
-            self.logger.error("[%s]: Not able to change sensor state (%s:%d)."
-                              % (self.fileName, self.clientAddress, self.clientPort))
-
-            # send error message back
-            try:
-                message = {"message": incomingMessage["message"],
-                           "error": "not able to change sensor state in database"}
-                self._send(json.dumps(message))
-
-            except Exception as e:
-                pass
-
-            return False
-
-        # Update sensor data if it holds data.
-        if sensorDataType != SensorDataType.NONE:
-            dataTuple = (clientSensorId, sensor_data)
-            dataList = [dataTuple]
-
-            if not self.storage.updateSensorData(self.nodeId,
-                                                 dataList,
-                                                 logger=self.logger):
-                self.logger.error("[%s]: Not able to change sensor data (%s:%d)."
-                                  % (self.fileName, self.clientAddress, self.clientPort))
-
-                # send error message back
-                try:
-                    message = {"message": incomingMessage["message"],
-                               "error": "not able to change sensor data in database"}
-                    self._send(json.dumps(message))
-
-                except Exception as e:
-                    pass
-
-                return False
-
-        # get sensorId from database => append to state change queue
-        # => wake up manager update executer
-        sensorId = self.storage.getSensorId(self.nodeId,
-                                            clientSensorId,
-                                            logger=self.logger)
-        if sensorId is None:
-            self.logger.error("[%s]: Not able to get sensorId (%s:%d)."
-                              % (self.fileName, self.clientAddress, self.clientPort))
-
-            # send error message back
-            try:
-                message = {"message": incomingMessage["message"],
-                           "error": "not able to get sensor id from database"}
-                self._send(json.dumps(message))
-
-            except Exception as e:
-                pass
-
-            return False
-
-        # send state change response
-        try:
-            payload = {"type": "response",
-                       "result": "ok"}
-            message = {"message": "statechange",
-                       "payload": payload}
-            self._send(json.dumps(message))
-
-        except Exception as e:
-            self.logger.exception("[%s]: Sending state change response failed (%s:%d)."
-                                  % (self.fileName, self.clientAddress, self.clientPort))
-            return False
-
-        sensorDataObj = SensorData()
-        sensorDataObj.dataType = sensor.dataType
-        sensorDataObj.data = sensor.data
-
-        # add state change to queue and wake up manager update executer
-        self.managerUpdateExecuter.queue_state_change(sensor.sensorId, sensor.state, sensorDataObj)
-
-        return True
+        return self._handle_sensor_event(incomingMessage, "state change")
 
     def _sensorErrorStateChangeHandler(self,
                                        incomingMessage: Dict[str, Any]) -> bool:
@@ -2831,58 +3502,41 @@ class ClientCommunication:
         :param incomingMessage:
         :return: success or failure
         """
-        # Extract state change values.
-        try:
-            if not self._checkMsgClientSensorId(incomingMessage["payload"]["clientSensorId"],
-                                                incomingMessage["message"]):
-                self.logger.error("[%s]: Received clientSensorId invalid (%s:%d)."
-                                  % (self.fileName, self.clientAddress, self.clientPort))
-                return False
+        return self._handle_sensor_event(incomingMessage, "sensor error state change")
 
-            if not self._checkMsgSensorErrorState(incomingMessage["payload"]["error_state"],
+    def _sensorEventsHandler(self,
+                             incomingMessage: Dict[str, Any]) -> bool:
+        """
+        this internal function handles a batch of sensor alerts, state changes and error state changes
+        (updates the database in one transaction and hands the events in their order to the executers)
+
+        :param incomingMessage:
+        :return: success or failure
+        """
+        # Extract all events before anything is changed so that an invalid event discards the whole batch.
+        # Each parsed event is a tuple of (message type, sensor, dict with the extracted values).
+        parsedEvents = list()  # type: List[Tuple[str, Sensor, Dict[str, Any]]]
+        try:
+            if not self._checkMsgSensorEventsList(incomingMessage["payload"]["events"],
                                                   incomingMessage["message"]):
-                self.logger.error("[%s]: Received error_state invalid (%s:%d)."
+                self.logger.error("[%s]: Received events invalid (%s:%d)."
                                   % (self.fileName, self.clientAddress, self.clientPort))
                 return False
 
-            client_sensor_id = incomingMessage["payload"]["clientSensorId"]
-            error_state = SensorErrorState.copy_from_dict(incomingMessage["payload"]["error_state"])
-
-            # Get sensor object.
-            sensor = None
-            for sensor_obj in self.sensors:
-                if sensor_obj.clientSensorId == client_sensor_id:
-                    sensor = sensor_obj
-                    break
-            if sensor is None:
-                self.logger.error("[%s]: Unknown client sensor id %d (%s:%d)."
-                                  % (self.fileName, client_sensor_id, self.clientAddress, self.clientPort))
-
-                # send error message back
-                try:
-                    message = {"message": incomingMessage["message"],
-                               "error": "unknown client sensor id"}
-                    self._send(json.dumps(message))
-
-                except Exception as e:
-                    pass
-
-                return False
-
-            # Update error state.
-            sensor.error_state = error_state
-            self._error_state_executer.add_error_state(self.nodeId,
-                                                       client_sensor_id,
-                                                       error_state)
+            for event in incomingMessage["payload"]["events"]:
+                result = self._parse_sensor_event(event["message"], event["payload"], incomingMessage["message"])
+                if result is None:
+                    return False
+                parsedEvents.append((event["message"], result[0], result[1]))
 
         except Exception as e:
-            self.logger.exception("[%s]: Received sensor error state change invalid (%s:%d)."
+            self.logger.exception("[%s]: Received sensor events invalid (%s:%d)."
                                   % (self.fileName, self.clientAddress, self.clientPort))
 
             # send error message back
             try:
                 message = {"message": incomingMessage["message"],
-                           "error": "received sensor error state change invalid"}
+                           "error": "received sensor events invalid"}
                 self._send(json.dumps(message))
 
             except Exception as e:
@@ -2890,16 +3544,27 @@ class ClientCommunication:
 
             return False
 
-        # send state change response
+        self.logger.debug("[%s]: Received %d sensor events (%s:%d)."
+                          % (self.fileName, len(parsedEvents), self.clientAddress, self.clientPort))
+
+        if not self._store_sensor_events(parsedEvents, incomingMessage["message"]):
+            return False
+
+        # Process events in the order they were sent by the client.
+        for eventType, sensor, values in parsedEvents:
+            if not self._apply_sensor_event(eventType, sensor, values, incomingMessage["message"]):
+                return False
+
+        # send sensor events response
         try:
             payload = {"type": "response",
                        "result": "ok"}
-            message = {"message": "sensorerrorstatechange",
+            message = {"message": "sensorevents",
                        "payload": payload}
             self._send(json.dumps(message))
 
         except Exception as e:
-            self.logger.exception("[%s]: Sending sensor error state change response failed (%s:%d)."
+            self.logger.exception("[%s]: Sending sensor events response failed (%s:%d)."
                                   % (self.fileName, self.clientAddress, self.clientPort))
             return False
 
@@ -2922,6 +3587,7 @@ class ClientCommunication:
         except Exception as e:
             self.logger.exception("[%s]: Sending status message failed (%s:%d)."
                                   % (self.fileName, self.clientAddress, self.clientPort))
+            self.statusVersion = None
             return False
 
         # get status acknowledgement
@@ -2972,14 +3638,22 @@ class ClientCommunication:
             if str(message["payload"]["result"]).upper() == "EXPIRED":
                 self.logger.warning("[%s]: Client reported 'status' messages as expired." % self.fileName)
 
+                # The client discarded the status message, hence the next one has to be a full one.
+                self.statusVersion = None
+
             elif str(message["payload"]["result"]).upper() != "OK":
                 self.logger.error("[%s]: Result not ok: '%s' (%s:%d)."
                                   % (self.fileName, message["payload"]["result"], self.clientAddress, self.clientPort))
+                self.statusVersion = None
                 return False
 
+            else:
+                self.statusVersion = self._sent_status_version
+
         except Exception as e:
             self.logger.exception("[%s]: Receiving status message response failed (%s:%d)."
                                   % (self.fileName, self.clientAddress, self.clientPort))
+            self.statusVersion = None
             return False
 
         self.lastRecv = int(time.time())
@@ -3412,14 +4086,14 @@ class ClientCommunication:
         self._releaseLock()
         return True
 
-    def handleCommunication(self):
+    def _initialize_session(self) -> bool:
         """
-        this function handles the communication with the client and receives the commands
+        Internal function that initializes the session with the client (authentication, version verification,
+        registration and initial status update). The connection lock has to be held by the caller and
+        is not released by this function. On failure the session is cleaned up.
 
-        :return:
+        :return: success or failure
         """
-        self._acquireLock()
-
         # set timeout of the socket to configured seconds
         self.socket.settimeout(self.serverReceiveTimeout)
 
@@ -3428,8 +4102,7 @@ class ClientCommunication:
         if not self._initializeCommunication():
             self.logger.error("[%s]: Communication initialization failed (%s:%d)."
                               % (self.fileName, self.clientAddress, self.clientPort))
-            self._releaseLock()
-            return
+            return False
 
         # Now that the communication is initialized, we can switch to our
         # own logger instance for the client.
@@ -3451,25 +4124,22 @@ class ClientCommunication:
             if self.sensorCount is None:
                 self.logger.error("[%s]: Could not get node with id %d from database."
                                   % (self.fileName, self.nodeId))
-                self._releaseLock()
                 self._finalizeLogger()
-                return
+                return False
 
             if self.sensorCount == 0:
                 self.logger.error("[%s]: Getting sensor count failed (%s:%d)."
                                   % (self.fileName, self.clientAddress, self.clientPort))
-                self._releaseLock()
                 self._finalizeLogger()
-                return
+                return False
 
         # mark node as connected in the database
         if not self.storage.markNodeAsConnected(self.nodeId,
                                                 logger=self.logger):
             self.logger.error("[%s]: Not able to mark node as connected (%s:%d)."
                               % (self.fileName, self.clientAddress, self.clientPort))
-            self._releaseLock()
             self._finalizeLogger()
-            return
+            return False
 
         # check if the type of the node is manager
         # => send all current node information to the manager
@@ -3480,9 +4150,8 @@ class ClientCommunication:
                                   % (self.fileName, self.clientAddress, self.clientPort))
                 # clean up session before exiting
                 self._cleanUpSessionForClosing()
-                self._releaseLock()
                 self._finalizeLogger()
-                return
+                return False
 
             if not self._initiateTransaction("status",
                                              len(alertSystemStateMessage),
@@ -3491,18 +4160,16 @@ class ClientCommunication:
                                   % (self.fileName, self.clientAddress, self.clientPort))
                 # clean up session before exiting
                 self._cleanUpSessionForClosing()
-                self._releaseLock()
                 self._finalizeLogger()
-                return
+                return False
 
             if not self._sendManagerAllInformation(alertSystemStateMessage):
                 self.logger.error("[%s]: Not able send status update message (%s:%d)."
                                   % (self.fileName, self.clientAddress, self.clientPort))
                 # clean up session before exiting
                 self._cleanUpSessionForClosing()
-                self._releaseLock()
                 self._finalizeLogger()
-                return
+                return False
 
         # if node is no manager
         # => send full status update to all manager clients
@@ -3510,8 +4177,10 @@ class ClientCommunication:
             # wake up manager update executer
             self.managerUpdateExecuter.force_status_update()
 
-        # Set flag that the initialization process of the client is finished.
+        # Set flag that the initialization process of the client is finished
+        # and route messages for its node type and alert levels to it.
         self.clientInitialized = True
+        self.serverSessions.add_initialized_client(self)
 
         # If client has registered itself,
         # notify the connection watchdog about the reconnect.
@@ -3519,276 +4188,483 @@ class ClientCommunication:
         # because it could changed its configuration since the last time seen.
         self.connectionWatchdog.removeNodeTimeout(self.nodeId)
 
-        # handle commands
-        while True:
-            messageSize = 0
-            try:
-                # set timeout of the socket to 0.5 seconds
-                self.socket.settimeout(0.5)
-
-                data = self._recv()
-                if not data:
+        return True
 
-                    # clean up session before exiting
-                    self._cleanUpSessionForClosing()
-                    self._releaseLock()
-                    self._finalizeLogger()
-                    return
+    def _handle_request(self, data: str) -> bool:
+        """
+        Internal function that handles a single request of the client. The given data is the
+        first message received from the client which has to be the RTS of the transaction.
+        The connection lock has to be held by the caller and is not released by this function.
+        On failure the session is cleaned up.
 
-                # change timeout of the socket back to configured seconds
-                self.socket.settimeout(self.serverReceiveTimeout)
+        :param data: first message of the transaction received from the client
+        :return: True if the session is still alive, False if it has to be closed
+        """
+        messageSize = 0
+        try:
+            # change timeout of the socket back to configured seconds
+            self.socket.settimeout(self.serverReceiveTimeout)
 
-                data = data.strip()
-                message = json.loads(data)
-                # check if an error was received
-                if "error" in message.keys():
-                    self.logger.error("[%s]: Error received: '%s' (%s:%d)."
-                                      % (self.fileName, message["error"], self.clientAddress, self.clientPort))
-                    # clean up session before exiting
-                    self._cleanUpSessionForClosing()
-                    self._releaseLock()
-                    self._finalizeLogger()
-                    return
+            data = data.strip()
+            message = json.loads(data)
+            # check if an error was received
+            if "error" in message.keys():
+                self.logger.error("[%s]: Error received: '%s' (%s:%d)."
+                                  % (self.fileName, message["error"], self.clientAddress, self.clientPort))
+                # clean up session before exiting
+                self._cleanUpSessionForClosing()
+                self._finalizeLogger()
+                return False
 
-                # check if RTS was received
-                # => acknowledge it
-                if str(message["payload"]["type"]).upper() == "rts".upper():
-                    receivedTransactionId = int(message["payload"]["id"])
-                    messageSize = int(message["size"])
-
-                    # received RTS (request to send) message
-                    self.logger.debug("[%s]: Received RTS %d message (%s:%d)."
-                                      % (self.fileName, receivedTransactionId, self.clientAddress, self.clientPort))
-                    self.logger.debug("[%s]: Sending CTS %d message (%s:%d)."
-                                      % (self.fileName, receivedTransactionId, self.clientAddress, self.clientPort))
-
-                    # send CTS (clear to send) message
-                    payload = {"type": "cts",
-                               "id": receivedTransactionId}
-                    message = {"message": str(message["message"]),
-                               "payload": payload}
-                    self._send(json.dumps(message))
+            # check if RTS was received
+            # => acknowledge it
+            if str(message["payload"]["type"]).upper() == "rts".upper():
+                receivedTransactionId = int(message["payload"]["id"])
+                messageSize = int(message["size"])
+
+                # received RTS (request to send) message
+                self.logger.debug("[%s]: Received RTS %d message (%s:%d)."
+                                  % (self.fileName, receivedTransactionId, self.clientAddress, self.clientPort))
+                self.logger.debug("[%s]: Sending CTS %d message (%s:%d)."
+                                  % (self.fileName, receivedTransactionId, self.clientAddress, self.clientPort))
+
+                # send CTS (clear to send) message
+                payload = {"type": "cts",
+                           "id": receivedTransactionId}
+                message = {"message": str(message["message"]),
+                           "payload": payload}
+                self._send(json.dumps(message))
 
-                    # After initiating transaction receive actual command.
-                    data = ""
-                    lastSize = 0
-                    while len(data) < messageSize:
-                        # NOTE: Receiving should use bytearray as in client implementation. Change during refactor.
-                        data += self._recv(messageSize - len(data))
-
-                        # Check if the size of the received data has changed.
-                        # If not we detected a possible dead lock.
-                        if lastSize != len(data):
-                            lastSize = len(data)
-
-                        else:
-                            self.logger.error("[%s]: Possible dead lock detected while receiving data. Closing "
-                                              % self.fileName
-                                              + "connection to client (%s:%d)."
-                                              % (self.clientAddress, self.clientPort))
-                            # clean up session before exiting
-                            self._cleanUpSessionForClosing()
-                            self._releaseLock()
-                            self._finalizeLogger()
-                            return
-
-                # if no RTS was received
-                # => client does not stick to protocol
-                # => terminate session
-                else:
-                    self.logger.error("[%s]: Did not receive RTS. Client sent: '%s' (%s:%d)."
-                                      % (self.fileName, data, self.clientAddress, self.clientPort))
+                # After initiating transaction receive actual command.
+                data = self._recv_data(messageSize)
+                if not data:
+                    self.logger.error("[%s]: Connection closed while receiving data (%s:%d)."
+                                      % (self.fileName, self.clientAddress, self.clientPort))
                     # clean up session before exiting
                     self._cleanUpSessionForClosing()
-                    self._releaseLock()
                     self._finalizeLogger()
-                    return
-
-            except socket.timeout as e:
-                # change timeout of the socket back to configured seconds
-                # before releasing the lock
-                self.socket.settimeout(self.serverReceiveTimeout)
-
-                # release lock and acquire to let other threads send
-                # data to the client
-                # (wait 0.5 seconds in between, because semaphore
-                # are released in random order => other threads could be
-                # unlucky and not be chosen => this has happened when
-                # loglevel was not debug => hdd I/O has slowed this process
-                # down)
-                self._releaseLock()
-                time.sleep(0.5)
-                self._acquireLock()
-
-                # continue receiving
-                continue
-
-            except Exception as e:
-                self.logger.exception("[%s]: Receiving failed (%s:%d)."
-                                      % (self.fileName, self.clientAddress, self.clientPort))
+                    return False
 
+            # if no RTS was received
+            # => client does not stick to protocol
+            # => terminate session
+            else:
+                self.logger.error("[%s]: Did not receive RTS. Client sent: '%s' (%s:%d)."
+                                  % (self.fileName, data, self.clientAddress, self.clientPort))
                 # clean up session before exiting
                 self._cleanUpSessionForClosing()
-                self._releaseLock()
                 self._finalizeLogger()
-                return
+                return False
 
-            # extract message type
-            try:
-                message = json.loads(data)
-                # check if an error was received
-                if "error" in message.keys():
-                    self.logger.error("[%s]: Error received: '%s' (%s:%d)."
-                                      % (self.fileName, message["error"], self.clientAddress, self.clientPort))
+        except socket.timeout:
+            raise
 
-                    # clean up session before exiting
-                    self._cleanUpSessionForClosing()
-                    self._releaseLock()
-                    self._finalizeLogger()
-                    return
+        except Exception as e:
+            self.logger.exception("[%s]: Receiving failed (%s:%d)."
+                                  % (self.fileName, self.clientAddress, self.clientPort))
 
-                # check if the received type is the correct one
-                if str(message["payload"]["type"]).upper() != "REQUEST":
-                    self.logger.error("[%s]: request expected (%s:%d)."
-                                      % (self.fileName, self.clientAddress, self.clientPort))
+            # clean up session before exiting
+            self._cleanUpSessionForClosing()
+            self._finalizeLogger()
+            return False
 
-                    # send error message back
-                    try:
-                        message = {"message": message["message"],
-                                   "error": "request expected"}
-                        self._send(json.dumps(message))
+        return self._process_request(data)
 
-                    except Exception as e:
-                        pass
+    def _handle_frame(self, frame: Tuple[int, int, str]) -> bool:
+        """
+        Internal function that handles a single frame received in pipelining mode. The connection lock
+        has to be held by the caller and is not released by this function. On failure the session is cleaned up.
 
-                    # clean up session before exiting
-                    self._cleanUpSessionForClosing()
-                    self._releaseLock()
-                    self._finalizeLogger()
-                    return
+        :param frame: tuple of frame type, transaction id and payload
+        :return: True if the session is still alive, False if it has to be closed
+        """
+        frame_type, transaction_id, data = frame
 
-                # extract the command/message type of the message
-                command = str(message["message"]).upper()
+        # Response to a request of the server that was already given up.
+        if frame_type == FrameType.RESPONSE:
+            self.logger.warning("[%s]: Received response for unknown transaction %d (%s:%d)."
+                                % (self.fileName, transaction_id, self.clientAddress, self.clientPort))
+            return True
+
+        self.logger.debug("[%s]: Received request frame %d (%s:%d)."
+                          % (self.fileName, transaction_id, self.clientAddress, self.clientPort))
+
+        # All messages sent while processing the request are responses to it.
+        self._frame_context = (FrameType.RESPONSE, transaction_id)
+        try:
+            return self._process_request(data)
+
+        finally:
+            self._frame_context = None
+
+    def _process_request(self, data: str) -> bool:
+        """
+        Internal function that processes the received request message of the client and sends the response.
+        The connection lock has to be held by the caller and is not released by this function.
+        On failure the session is cleaned up.
+
+        :param data: request message
+        :return: True if the session is still alive, False if it has to be closed
+        """
+        # extract message type
+        try:
+            message = json.loads(data)
+            # check if an error was received
+            if "error" in message.keys():
+                self.logger.error("[%s]: Error received: '%s' (%s:%d)."
+                                  % (self.fileName, message["error"], self.clientAddress, self.clientPort))
 
-            except Exception as e:
-                self.logger.exception("[%s]: Received data not valid: '%s' (%s:%d)."
-                                      % (self.fileName, data, self.clientAddress, self.clientPort))
                 # clean up session before exiting
                 self._cleanUpSessionForClosing()
-                self._releaseLock()
                 self._finalizeLogger()
-                return
+                return False
 
-            # check if PING was received => send PONG back
-            if command == "PING":
-                self.logger.debug("[%s]: Received ping request (%s:%d)."
-                                  % (self.fileName, self.clientAddress, self.clientPort))
-                self.logger.debug("[%s]: Sending ping response (%s:%d)."
+            # check if the received type is the correct one
+            if str(message["payload"]["type"]).upper() != "REQUEST":
+                self.logger.error("[%s]: request expected (%s:%d)."
                                   % (self.fileName, self.clientAddress, self.clientPort))
 
+                # send error message back
                 try:
-                    payload = {"type": "response",
-                               "result": "ok"}
-                    message = {"message": "ping",
-                               "payload": payload}
+                    message = {"message": message["message"],
+                               "error": "request expected"}
                     self._send(json.dumps(message))
 
                 except Exception as e:
-                    self.logger.exception("[%s]: Sending ping response to client failed (%s:%d)."
-                                          % (self.fileName, self.clientAddress, self.clientPort))
-                    # clean up session before exiting
-                    self._cleanUpSessionForClosing()
-                    self._releaseLock()
-                    self._finalizeLogger()
-                    return
+                    pass
 
-            # check if SENSORALERT was received
-            # => add to database and wake up alertExecuter
-            elif command == "SENSORALERT" and self.nodeType == "sensor":
-                self.logger.debug("[%s]: Received sensor alert message (%s:%d)."
-                                  % (self.fileName, self.clientAddress, self.clientPort))
+                # clean up session before exiting
+                self._cleanUpSessionForClosing()
+                self._finalizeLogger()
+                return False
+
+            # extract the command/message type of the message
+            command = str(message["message"]).upper()
+
+        except Exception as e:
+            self.logger.exception("[%s]: Received data not valid: '%s' (%s:%d)."
+                                  % (self.fileName, data, self.clientAddress, self.clientPort))
+            # clean up session before exiting
+            self._cleanUpSessionForClosing()
+            self._finalizeLogger()
+            return False
+
+        # check if PING was received => send PONG back
+        if command == "PING":
+            self.logger.debug("[%s]: Received ping request (%s:%d)."
+                              % (self.fileName, self.clientAddress, self.clientPort))
+            self.logger.debug("[%s]: Sending ping response (%s:%d)."
+                              % (self.fileName, self.clientAddress, self.clientPort))
+
+            try:
+                payload = {"type": "response",
+                           "result": "ok"}
+                message = {"message": "ping",
+                           "payload": payload}
+                self._send(json.dumps(message))
 
-                if not self._sensorAlertHandler(message):
-                    self.logger.error("[%s]: Handling sensor alert failed (%s:%d)."
+            except Exception as e:
+                self.logger.exception("[%s]: Sending ping response to client failed (%s:%d)."
                                       % (self.fileName, self.clientAddress, self.clientPort))
-                    # clean up session before exiting
-                    self._cleanUpSessionForClosing()
-                    self._releaseLock()
-                    self._finalizeLogger()
-                    return
+                # clean up session before exiting
+                self._cleanUpSessionForClosing()
+                self._finalizeLogger()
+                return False
 
-            # check if STATECHANGE was received
-            # => change state of sensor in database
-            elif command == "STATECHANGE" and self.nodeType == "sensor":
-                self.logger.debug("[%s]: Received state change message (%s:%d)."
+        # check if SENSORALERT was received
+        # => add to database and wake up alertExecuter
+        elif command == "SENSORALERT" and self.nodeType == "sensor":
+            self.logger.debug("[%s]: Received sensor alert message (%s:%d)."
+                              % (self.fileName, self.clientAddress, self.clientPort))
+
+            if not self._sensorAlertHandler(message):
+                self.logger.error("[%s]: Handling sensor alert failed (%s:%d)."
                                   % (self.fileName, self.clientAddress, self.clientPort))
+                # clean up session before exiting
+                self._cleanUpSessionForClosing()
+                self._finalizeLogger()
+                return False
 
-                if not self._stateChangeHandler(message):
-                    self.logger.error("[%s]: Handling sensor state change failed (%s:%d)."
-                                      % (self.fileName, self.clientAddress, self.clientPort))
-                    # clean up session before exiting
-                    self._cleanUpSessionForClosing()
-                    self._releaseLock()
-                    self._finalizeLogger()
-                    return
+        # check if STATECHANGE was received
+        # => change state of sensor in database
+        elif command == "STATECHANGE" and self.nodeType == "sensor":
+            self.logger.debug("[%s]: Received state change message (%s:%d)."
+                              % (self.fileName, self.clientAddress, self.clientPort))
 
-            # check if STATUS was received
-            # => add new state to the database
-            elif command == "STATUS" and self.nodeType == "sensor":
-                self.logger.debug("[%s]: Received status message (%s:%d)."
+            if not self._stateChangeHandler(message):
+                self.logger.error("[%s]: Handling sensor state change failed (%s:%d)."
                                   % (self.fileName, self.clientAddress, self.clientPort))
+                # clean up session before exiting
+                self._cleanUpSessionForClosing()
+                self._finalizeLogger()
+                return False
 
-                if not self._statusHandler(message):
-                    self.logger.error("[%s]: Handling status failed (%s:%d)."
-                                      % (self.fileName, self.clientAddress, self.clientPort))
+        # check if SENSOREVENTS was received
+        # => update database in one transaction and process all events in order
+        elif command == "SENSOREVENTS" and self.nodeType == "sensor":
+            self.logger.debug("[%s]: Received sensor events message (%s:%d)."
+                              % (self.fileName, self.clientAddress, self.clientPort))
+
+            if not self._sensorEventsHandler(message):
+                self.logger.error("[%s]: Handling sensor events failed (%s:%d)."
+                                  % (self.fileName, self.clientAddress, self.clientPort))
+                # clean up session before exiting
+                self._cleanUpSessionForClosing()
+                self._finalizeLogger()
+                return False
+
+        # check if STATUS was received
+        # => add new state to the database
+        elif command == "STATUS" and self.nodeType == "sensor":
+            self.logger.debug("[%s]: Received status message (%s:%d)."
+                              % (self.fileName, self.clientAddress, self.clientPort))
+
+            if not self._statusHandler(message):
+                self.logger.error("[%s]: Handling status failed (%s:%d)."
+                                  % (self.fileName, self.clientAddress, self.clientPort))
+                # clean up session before exiting
+                self._cleanUpSessionForClosing()
+                self._finalizeLogger()
+                return False
+
+        # check if OPTION was received (for manager only)
+        # => change option in the database
+        elif command == "OPTION" and self.nodeType == "manager":
+            self.logger.debug("[%s]: Received option message (%s:%d)."
+                              % (self.fileName, self.clientAddress, self.clientPort))
+
+            if not self._optionHandler(message):
+                self.logger.error("[%s]: Handling option failed (%s:%d)."
+                                  % (self.fileName, self.clientAddress, self.clientPort))
+                # clean up session before exiting
+                self._cleanUpSessionForClosing()
+                self._finalizeLogger()
+                return False
+
+        # check if SENSORERRORSTATECHANGE was received (for sensor only)
+        # => add new state to the database
+        elif command == "SENSORERRORSTATECHANGE" and self.nodeType == "sensor":
+            self.logger.debug("[%s]: Received sensor error state change message (%s:%d)."
+                              % (self.fileName, self.clientAddress, self.clientPort))
+
+            if not self._sensorErrorStateChangeHandler(message):
+                self.logger.error("[%s]: Handling sensor error state change failed (%s:%d)."
+                                  % (self.fileName, self.clientAddress, self.clientPort))
+                # clean up session before exiting
+                self._cleanUpSessionForClosing()
+                self._finalizeLogger()
+                return False
+
+        # command is unknown => close connection
+        else:
+            self.logger.error("[%s]: Received unknown command. Client sent: '%s' (%s:%d)."
+                              % (self.fileName, data, self.clientAddress, self.clientPort))
+
+            try:
+                message = {"message": message["message"],
+                           "error": "unknown command/message type"}
+                self._send(json.dumps(message))
+
+            except Exception as e:
+                pass
+
+            # clean up session before exiting
+            self._cleanUpSessionForClosing()
+            self._finalizeLogger()
+            return False
+
+        self.lastRecv = int(time.time())
+        return True
+
+    def _has_pending_data(self) -> bool:
+        """
+        Internal function that checks without blocking if data of the client is waiting to be received.
+
+        :return:
+        """
+        # TLS/SSL sockets can hold already decrypted data that is not visible to select.
+        if isinstance(self.socket, ssl.SSLSocket) and self.socket.pending() > 0:
+            return True
+
+        # Use poll instead of select since select can not handle file descriptors above 1024.
+        poller = select.poll()
+        poller.register(self.socket, select.POLLIN)
+        return len(poller.poll(0)) != 0
+
+    def initialize_session(self) -> bool:
+        """
+        Initializes the session with the client (used by the event driven server which does not
+        dedicate a thread to each client).
+
+        :return: success or failure
+        """
+        self._acquireLock()
+        result = self._initialize_session()
+        self._releaseLock()
+        return result
+
+    def handle_pending_request(self) -> bool:
+        """
+        Handles one request of the client after the socket signaled that data is available
+        (used by the event driven server which does not dedicate a thread to each client).
+
+        :return: True if the session is still alive, False if it was closed
+        """
+        self._acquireLock()
+
+        try:
+            # Another thread could have already consumed the data while
+            # waiting for the lock (e.g., the CTS of a transaction initiated by the server).
+            if not self._has_pending_data() and not self.has_pending_messages():
+                self._releaseLock()
+                return True
+
+            self.socket.settimeout(self.serverReceiveTimeout)
+            if self.pipelining:
+                frame = self._next_frame()
+                if frame is None:
                     # clean up session before exiting
                     self._cleanUpSessionForClosing()
                     self._releaseLock()
                     self._finalizeLogger()
-                    return
+                    return False
 
-            # check if OPTION was received (for manager only)
-            # => change option in the database
-            elif command == "OPTION" and self.nodeType == "manager":
-                self.logger.debug("[%s]: Received option message (%s:%d)."
-                                  % (self.fileName, self.clientAddress, self.clientPort))
+                result = self._handle_frame(frame)
 
-                if not self._optionHandler(message):
-                    self.logger.error("[%s]: Handling option failed (%s:%d)."
-                                      % (self.fileName, self.clientAddress, self.clientPort))
+            else:
+                data = self._recv()
+                if not data:
                     # clean up session before exiting
                     self._cleanUpSessionForClosing()
                     self._releaseLock()
                     self._finalizeLogger()
-                    return
+                    return False
 
-            # check if SENSORERRORSTATECHANGE was received (for sensor only)
-            # => add new state to the database
-            elif command == "SENSORERRORSTATECHANGE" and self.nodeType == "sensor":
-                self.logger.debug("[%s]: Received sensor error state change message (%s:%d)."
+                result = self._handle_request(data)
+
+        except Exception as e:
+            self.logger.exception("[%s]: Receiving failed (%s:%d)."
                                   % (self.fileName, self.clientAddress, self.clientPort))
 
-                if not self._sensorErrorStateChangeHandler(message):
-                    self.logger.error("[%s]: Handling sensor error state change failed (%s:%d)."
-                                      % (self.fileName, self.clientAddress, self.clientPort))
+            # clean up session before exiting
+            self._cleanUpSessionForClosing()
+            self._releaseLock()
+            self._finalizeLogger()
+            return False
+
+        self._releaseLock()
+        return result
+
+    def receive_pending_data(self) -> Optional[bool]:
+        """
+        Receives the data that is available on the connection into the receive buffer without blocking
+        (used by the event driven server to hand only complete requests to its worker threads).
+
+        :return: True if the connection is open, False if it was closed or failed and None if another thread
+                 currently communicates with the client
+        """
+        if not self.connectionLock.acquire(blocking=False):
+            return None
+
+        timeout = self.socket.gettimeout()
+        try:
+            self.socket.setblocking(False)
+            while True:
+                data = self.socket.recv(BUFSIZE)
+                if not data:
+                    return False
+                self._recv_buffer.feed(data)
+
+                # TLS/SSL sockets can hold already decrypted data that is not visible to the event loop.
+                if not isinstance(self.socket, ssl.SSLSocket) or self.socket.pending() == 0:
+                    return True
+
+        except (BlockingIOError, ssl.SSLWantReadError, ssl.SSLWantWriteError):
+            return True
+
+        except Exception as e:
+            # The thread handling the closed connection logs the error and cleans up.
+            return False
+
+        finally:
+            try:
+                self.socket.settimeout(timeout)
+
+            except Exception as e:
+                pass
+
+            self._releaseLock()
+
+    def handleCommunication(self):
+        """
+        this function handles the communication with the client and receives the commands
+
+        :return:
+        """
+        self._acquireLock()
+
+        # The session could already be initialized by the server session.
+        if not self.clientInitialized and not self._initialize_session():
+            self._releaseLock()
+            return
+
+        # handle commands
+        while True:
+            try:
+                # set timeout of the socket to 0.5 seconds
+                self.socket.settimeout(0.5)
+
+                if self.pipelining:
+                    frame = self._next_frame()
+                    if frame is None:
+
+                        # clean up session before exiting
+                        self._cleanUpSessionForClosing()
+                        self._releaseLock()
+                        self._finalizeLogger()
+                        return
+
+                    if not self._handle_frame(frame):
+                        self._releaseLock()
+                        return
+
+                    continue
+
+                data = self._recv()
+                if not data:
+
                     # clean up session before exiting
                     self._cleanUpSessionForClosing()
                     self._releaseLock()
                     self._finalizeLogger()
                     return
 
-            # command is unknown => close connection
-            else:
-                self.logger.error("[%s]: Received unknown command. Client sent: '%s' (%s:%d)."
-                                  % (self.fileName, data, self.clientAddress, self.clientPort))
+                if not self._handle_request(data):
+                    self._releaseLock()
+                    return
 
-                try:
-                    message = {"message": message["message"],
-                               "error": "unknown command/message type"}
-                    self._send(json.dumps(message))
+            except socket.timeout as e:
+                # change timeout of the socket back to configured seconds
+                # before releasing the lock
+                self.socket.settimeout(self.serverReceiveTimeout)
 
-                except Exception as e:
-                    pass
+                # release lock and acquire to let other threads send
+                # data to the client
+                # (wait 0.5 seconds in between, because semaphore
+                # are released in random order => other threads could be
+                # unlucky and not be chosen => this has happened when
+                # loglevel was not debug => hdd I/O has slowed this process
+                # down)
+                self._releaseLock()
+                time.sleep(0.5)
+                self._acquireLock()
+
+                # continue receiving
+                continue
+
+            except Exception as e:
+                self.logger.exception("[%s]: Receiving failed (%s:%d)."
+                                      % (self.fileName, self.clientAddress, self.clientPort))
 
                 # clean up session before exiting
                 self._cleanUpSessionForClosing()
@@ -3796,8 +4672,6 @@ class ClientCommunication:
                 self._finalizeLogger()
                 return
 
-            self.lastRecv = int(time.time())
-
 
 # this class is used for the threaded tcp server and extends the constructor
 # to pass the global configured data to all threads
@@ -3812,6 +4686,18 @@ class ThreadedTCPServer(socketserver.ThreadingMixIn,
         # get reference to global data object
         self.globalData = globalData
 
+        # Create the TLS/SSL context shared by all client connections.
+        if self.globalData.sslEnabled and self.globalData.tls_context is None:
+            self.globalData.tls_context = TlsContext(self.globalData)
+
+        # Create the admission controller that limits the number of concurrent session setups.
+        if self.globalData.admission_controller is None:
+            self.globalData.admission_controller = AdmissionController(self.globalData.serverMaxConcurrentSetups)
+
+        # Create the registration tracker that skips unchanged registrations of reconnecting nodes.
+        if self.globalData.registration_tracker is None:
+            self.globalData.registration_tracker = RegistrationTracker()
+
         socketserver.TCPServer.__init__(self,
                                         serverAddress,
                                         RequestHandlerClass)
@@ -3841,19 +4727,12 @@ class ServerSession(socketserver.BaseRequestHandler):
         self.globalData = server.globalData
         self.logger = self.globalData.logger
 
-        # get server certificate/key file
-        self.serverCertFile = self.globalData.serverCertFile
-        self.serverKeyFile = self.globalData.serverKeyFile
-
-        # get client certificate settings
-        self.useClientCertificates = self.globalData.useClientCertificates
-        self.clientCAFile = self.globalData.clientCAFile
-
         # Get TLS/SSL setting.
-        self.sslProtocol = self.globalData.sslProtocol
-        self.sslCiphers = self.globalData.sslCiphers
-        self.sslOptions = self.globalData.sslOptions
         self.sslEnabled = self.globalData.sslEnabled
+        self.tlsContext = self.globalData.tls_context
+
+        # Get reference to the admission controller that limits the number of concurrent session setups.
+        self.admissionController = self.globalData.admission_controller
 
         # add own server session to the global list of server sessions
         self.serverSessions = self.globalData.serverSessions
@@ -3872,44 +4751,45 @@ class ServerSession(socketserver.BaseRequestHandler):
 
         self.logger.info("[%s]: Client connected (%s:%d)." % (self.fileName, self.clientAddress, self.clientPort))
 
-        # Set TLS context.
-        if self.sslEnabled:
-            ssl_context = ssl.SSLContext(self.sslProtocol)
-            ssl_context.load_cert_chain(certfile=self.serverCertFile,
-                                        keyfile=self.serverKeyFile)
-            ssl_context.set_ciphers(self.sslCiphers)
-            ssl_context.options = self.sslOptions
+        # Wait until the setup of the session is admitted (limits the number of concurrent TLS handshakes and
+        # registrations, for example, if all clients reconnect at the same time after a server restart).
+        self.admissionController.acquire()
+        try:
+            # Use the TLS context shared by all client connections.
+            if self.sslEnabled:
 
-            # If activated, require a client certificate.
-            if self.useClientCertificates:
-                ssl_context.verify_mode = ssl.CERT_REQUIRED
-                ssl_context.load_verify_locations(cafile=self.clientCAFile)
+                # try to initiate ssl with client
+                try:
+                    # Do not let a client block the admission slot forever during the handshake.
+                    self.request.settimeout(self.globalData.serverReceiveTimeout)
+                    self.socket = self.tlsContext.wrap_socket(self.request)
 
-            # try to initiate ssl with client
-            try:
-                self.socket = ssl_context.wrap_socket(self.request,
-                                                      server_side=True)
+                except Exception as e:
+                    self.logger.exception("[%s]: Unable to initialize TLS/SSL connection (%s:%d)."
+                                          % (self.fileName, self.clientAddress, self.clientPort))
 
-            except Exception as e:
-                self.logger.exception("[%s]: Unable to initialize TLS/SSL connection (%s:%d)."
-                                      % (self.fileName, self.clientAddress, self.clientPort))
+                    # remove own server session from the global list of server sessions
+                    # before closing server session
+                    try:
+                        self.serverSessions.remove(self)
 
-                # remove own server session from the global list of server sessions
-                # before closing server session
-                try:
-                    self.serverSessions.remove(self)
+                    except Exception as e:
+                        pass
 
-                except Exception as e:
-                    pass
+                    return
 
-                return
+            # Give incoming connection to client communication handler
+            self.clientComm = ClientCommunication(self.socket,
+                                                  self.clientAddress,
+                                                  self.clientPort,
+                                                  self.globalData)
+            isInitialized = self.clientComm.initialize_session()
+
+        finally:
+            self.admissionController.release()
 
-        # Give incoming connection to client communication handler
-        self.clientComm = ClientCommunication(self.socket,
-                                              self.clientAddress,
-                                              self.clientPort,
-                                              self.globalData)
-        self.clientComm.handleCommunication()
+        if isInitialized:
+            self.clientComm.handleCommunication()
 
         try:
             self.socket.close()
@@ -3959,127 +4839,3 @@ class ServerSession(socketserver.BaseRequestHandler):
         :param logger:
         """
         self.logger = logger
-
-
-# this class is used to send messages to the client
-# in an asynchronous way to avoid blockings
-class AsynchronousSender(threading.Thread):
-
-    def __init__(self,
-                 globalData: GlobalData,
-                 clientComm: ClientCommunication):
-        threading.Thread.__init__(self)
-
-        # file nme of this file (used for logging)
-        self.fileName = os.path.basename(__file__)
-
-        # get global configured data
-        self.globalData = globalData
-        self.logger = self.globalData.logger
-
-        # the communication instance to the client
-        self.clientComm = clientComm
-
-        # this option is used when the thread should
-        # send a manager update
-        self.sendManagerUpdate = False
-
-        # this options are used when the thread should
-        # send a sensor alert to the client
-        self.sendSensorAlert = False
-        self.sensorAlert = None
-
-        # this options are used when the thread should
-        # send a state change to a manager client
-        self.sendManagerStateChange = False
-        self.sendManagerStateChangeSensorId = None
-        self.sendManagerStateChangeState = None
-        self.sendManagerStateChangeDataType = None
-        self.sendManagerStateChangeData = None
-
-        # This option is used when the thread should
-        # send a change profile to the client
-        self.send_profile_change = False
-        self.profile = None
-
-        # This option is used when the thread should
-        # send a sensor error state change to the client
-        self.send_sensor_error_state_change = False
-        self.sensor_id = None
-        self.error_state = None
-
-    def run(self):
-
-        # check if a status update to a manager should be sent
-        if self.sendManagerUpdate:
-            if self.clientComm.nodeType != "manager":
-                self.logger.error("[%s]: Sending status update to manager client failed. Client is not a "
-                                  % self.fileName
-                                  + "'manager' node (%s:%d)."
-                                  % (self.clientComm.clientAddress, self.clientComm.clientPort))
-                return
-
-            # sending status update to manager
-            if not self.clientComm.sendManagerUpdate():
-                self.logger.error("[%s]: Sending status update to manager failed (%s:%d)."
-                                  % (self.fileName, self.clientComm.clientAddress, self.clientComm.clientPort))
-                return
-
-        # check if a sensor alert to a manager/alert should be sent
-        elif self.sendSensorAlert:
-            if self.clientComm.nodeType != "manager" and self.clientComm.nodeType != "alert":
-                self.logger.error("[%s]: Sending sensor alert failed. Client is not a 'manager'/'alert' node (%s:%d)."
-                                  % (self.fileName, self.clientComm.clientAddress, self.clientComm.clientPort))
-                return
-
-            if not self.clientComm.sendSensorAlert(self.sensorAlert):
-                self.logger.error("[%s]: Sending sensor alert to manager/alert failed (%s:%d)."
-                                  % (self.fileName, self.clientComm.clientAddress, self.clientComm.clientPort))
-
-        # check if a state change to a manager should be sent
-        elif self.sendManagerStateChange:
-            if self.clientComm.nodeType != "manager":
-                self.logger.error("[%s]: Sending state change to manager client failed. Client is not a "
-                                  % self.fileName
-                                  + "'manager' node (%s:%d)."
-                                  % (self.clientComm.clientAddress, self.clientComm.clientPort))
-                return
-
-            # sending state change to manager
-            if not self.clientComm.sendManagerStateChange(self.sendManagerStateChangeSensorId,
-                                                          self.sendManagerStateChangeState,
-                                                          self.sendManagerStateChangeDataType,
-                                                          self.sendManagerStateChangeData):
-                self.logger.error("[%s]: Sending state change to manager failed (%s:%d)."
-                                  % (self.fileName, self.clientComm.clientAddress, self.clientComm.clientPort))
-                return
-
-        # check if a profile change to an alert client should be sent
-        elif self.send_profile_change:
-            if self.clientComm.nodeType != "alert":
-                self.logger.error("[%s]: Sending profile change to alert client failed. Client is not a "
-                                  % self.fileName
-                                  + "'alert' node (%s:%d)."
-                                  % (self.clientComm.clientAddress, self.clientComm.clientPort))
-                return
-
-            # sending profile change to alert client
-            if not self.clientComm.send_profile_change(self.profile):
-                self.logger.error("[%s]: Sending profile change to alert client failed (%s:%d)."
-                                  % (self.fileName, self.clientComm.clientAddress, self.clientComm.clientPort))
-                return
-
-        # check if a sensor error state to a manager client should be sent
-        elif self.send_sensor_error_state_change:
-            if self.clientComm.nodeType != "manager":
-                self.logger.error("[%s]: Sending sensor error state change to manager client failed. Client is not a "
-                                  % self.fileName
-                                  + "'manager' node (%s:%d)."
-                                  % (self.clientComm.clientAddress, self.clientComm.clientPort))
-                return
-
-            # sending sensor error state to manager client
-            if not self.clientComm.send_sensor_error_state_change(self.sensor_id, self.error_state):
-                self.logger.error("[%s]: Sending sensor error state to alert client failed (%s:%d)."
-                                  % (self.fileName, self.clientComm.clientAddress, self.clientComm.clientPort))
-                return
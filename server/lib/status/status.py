@@ -0,0 +1,307 @@
+#!/usr/bin/env python3
+
+# written by sqall
+# twitter: https://twitter.com/sqall01
+# blog: https://h4des.org
+# github: https://github.com/sqall01
+#
+# Licensed under the GNU Affero General Public License, version 3.
+
+import copy
+import json
+import threading
+from typing import Optional, Dict, Any, List, Callable, Tuple
+
+
+class StatusUpdate:
+    """
+    Status of the alert system that is sent to a manager client. Either a full snapshot or a delta that only contains
+    the objects changed since the base version and the ids of the deleted objects.
+    """
+
+    def __init__(self,
+                 version: int,
+                 base_version: Optional[int],
+                 objects: Dict[str, List[Dict[str, Any]]],
+                 deleted: Optional[Dict[str, List[Any]]]):
+        self.version = version
+        self.base_version = base_version
+        self.objects = objects
+        self.deleted = deleted
+
+    @property
+    def is_delta(self) -> bool:
+        return self.base_version is not None
+
+
+class StatusTracker:
+    """
+    Keeps track of the changes of the alert system status. Each change increases the status version and each object
+    of the status remembers the version it was changed last. This allows to build a delta for each manager client
+    that only contains the objects changed since the version the manager has acknowledged.
+
+    The status is also cached: it is only read anew after the storage invalidated it and each status message payload
+    is only encoded once per version and shared by all manager clients.
+    """
+
+    # Key that identifies an object in each list of the status message.
+    id_keys = {"options": "type",
+               "profiles": "profileId",
+               "nodes": "nodeId",
+               "sensors": "sensorId",
+               "managers": "managerId",
+               "alerts": "alertId",
+               "alertLevels": "alertLevel"}
+
+    def __init__(self,
+                 max_lag: int):
+        """
+        :param max_lag: number of versions a manager can fall behind before it gets a full snapshot again
+        """
+        self._max_lag = max_lag
+
+        self._lock = threading.Lock()
+
+        # Current version of the status.
+        self._version = 0
+
+        # Version a delta can be built for at the earliest (older deletions are already forgotten).
+        self._min_base_version = 0
+
+        # Last known state of all objects (object id -> (version, object)).
+        self._objects = dict()  # type: Dict[str, Dict[Any, Tuple[int, Dict[str, Any]]]]
+
+        # Deleted objects (object id -> version of deletion).
+        self._deleted = dict()  # type: Dict[str, Dict[Any, int]]
+
+        for category in self.id_keys.keys():
+            self._objects[category] = dict()
+            self._deleted[category] = dict()
+
+        # Last status read from the storage (None if none was read yet).
+        self._status = None  # type: Optional[Dict[str, List[Dict[str, Any]]]]
+
+        # Set by the storage if the status changed and has to be read anew.
+        # NOTE: The event is not protected by the lock since it is set while the storage lock is held
+        # and the lock is held while reading from the storage (which would dead lock).
+        self._invalidated = threading.Event()
+
+        # Encoded status message payloads of the current version
+        # (keyed by the flag if the payload contains versions and the base version of the delta).
+        self._encoded_payloads = dict()  # type: Dict[Tuple[bool, Optional[int]], str]
+
+        self._hit_count = 0
+        self._miss_count = 0
+        self._build_count = 0
+
+    @property
+    def version(self) -> int:
+        with self._lock:
+            return self._version
+
+    @property
+    def hit_count(self) -> int:
+        """
+        Number of status message payloads that were served from the cache.
+        """
+        return self._hit_count
+
+    @property
+    def miss_count(self) -> int:
+        """
+        Number of status message payloads that had to be encoded.
+        """
+        return self._miss_count
+
+    @property
+    def build_count(self) -> int:
+        """
+        Number of times the status was read from the storage.
+        """
+        return self._build_count
+
+    def _update(self, status: Dict[str, List[Dict[str, Any]]]):
+        """
+        Internal function that compares the given status with the last known one and increases the version
+        if anything changed. The lock has to be held by the caller.
+
+        :param status:
+        """
+        new_version = self._version + 1
+        changed = False
+        for category, id_key in self.id_keys.items():
+            objects = self._objects[category]
+            deleted = self._deleted[category]
+
+            current_ids = set()
+            for obj in status[category]:
+                obj_id = obj[id_key]
+                current_ids.add(obj_id)
+
+                tracked = objects.get(obj_id)
+                if tracked is None or tracked[1] != obj:
+                    # Store a copy since the object can reference lists that are changed in place.
+                    objects[obj_id] = (new_version, copy.deepcopy(obj))
+                    deleted.pop(obj_id, None)
+                    changed = True
+
+            for obj_id in list(objects.keys()):
+                if obj_id not in current_ids:
+                    del objects[obj_id]
+                    deleted[obj_id] = new_version
+                    changed = True
+
+        if not changed:
+            return
+
+        self._version = new_version
+        self._encoded_payloads.clear()
+
+        # Forget deletions that are too old to be part of a delta.
+        if self._version - self._max_lag > self._min_base_version:
+            self._min_base_version = self._version - self._max_lag
+            for deleted in self._deleted.values():
+                for obj_id in [k for k, v in deleted.items() if v <= self._min_base_version]:
+                    del deleted[obj_id]
+
+    def _build_delta(self,
+                     status: Dict[str, List[Dict[str, Any]]],
+                     base_version: int) -> Optional[StatusUpdate]:
+        """
+        Internal function that builds the delta since the given version. The lock has to be held by the caller.
+
+        :param status:
+        :param base_version:
+        :return: delta or None if a full snapshot has to be sent
+        """
+        if base_version < self._min_base_version or base_version > self._version:
+            return None
+
+        total_count = 0
+        delta_count = 0
+        objects = dict()
+        deleted = dict()
+        for category, id_key in self.id_keys.items():
+            tracked = self._objects[category]
+            objects[category] = [obj for obj in status[category] if tracked[obj[id_key]][0] > base_version]
+            deleted[category] = [k for k, v in self._deleted[category].items() if v > base_version]
+            total_count += len(status[category])
+            delta_count += len(objects[category]) + len(deleted[category])
+
+        # A delta that contains most of the objects does not save anything.
+        if delta_count > total_count // 2:
+            return None
+
+        return StatusUpdate(self._version, base_version, objects, deleted)
+
+    def _refresh(self, builder: Callable[[], Optional[Dict[str, List[Dict[str, Any]]]]]) -> bool:
+        """
+        Internal function that reads the status anew from the given builder function if the cached status
+        is invalidated. The lock has to be held by the caller.
+
+        :param builder:
+        :return: success or failure
+        """
+        if self._status is not None and not self._invalidated.is_set():
+            return True
+
+        # Clear the flag before reading so that changes during the read invalidate the status again.
+        self._invalidated.clear()
+        status = builder()
+        if status is None:
+            self._invalidated.set()
+            return False
+
+        self._build_count += 1
+        self._update(status)
+        self._status = status
+        return True
+
+    def _get_status_update(self, base_version: Optional[int]) -> StatusUpdate:
+        """
+        Internal function that returns either the delta since the given version or a full snapshot of the cached
+        status. The lock has to be held by the caller.
+
+        :param base_version:
+        :return:
+        """
+        if base_version is not None:
+            status_update = self._build_delta(self._status, base_version)
+            if status_update is not None:
+                return status_update
+
+        return StatusUpdate(self._version, None, self._status, None)
+
+    def get_status_update(self,
+                          builder: Callable[[], Optional[Dict[str, List[Dict[str, Any]]]]],
+                          base_version: Optional[int]) -> Optional[StatusUpdate]:
+        """
+        Gets the current status (from the given builder function if the cached status is invalidated) and returns
+        either the delta since the given version or a full snapshot (if no base version is given or it is too old).
+
+        :param builder: function that returns the current status of the alert system (or None on failure)
+        :param base_version: version the manager has acknowledged last
+        :return: status update or None on failure
+        """
+        with self._lock:
+            if not self._refresh(builder):
+                return None
+
+            return self._get_status_update(base_version)
+
+    def get_encoded_payload(self,
+                            builder: Callable[[], Optional[Dict[str, List[Dict[str, Any]]]]],
+                            is_versioned: bool,
+                            base_version: Optional[int]) -> Optional[Tuple[int, str]]:
+        """
+        Gets the encoded payload of the status message. The payload is only encoded once per version
+        and shared by all callers.
+
+        :param builder: function that returns the current status of the alert system (or None on failure)
+        :param is_versioned: flag if the payload contains the versions (only for managers that support deltas)
+        :param base_version: version the manager has acknowledged last
+        :return: tuple of status version and encoded payload or None on failure
+        """
+        if not is_versioned:
+            base_version = None
+
+        with self._lock:
+            if not self._refresh(builder):
+                return None
+
+            key = (is_versioned, base_version)
+            encoded_payload = self._encoded_payloads.get(key)
+            if encoded_payload is not None:
+                self._hit_count += 1
+                return self._version, encoded_payload
+
+            status_update = self._get_status_update(base_version)
+
+            # A base version that is too old results in a full snapshot that might be encoded already.
+            full_key = (is_versioned, None)
+            if not status_update.is_delta and full_key in self._encoded_payloads.keys():
+                self._hit_count += 1
+                encoded_payload = self._encoded_payloads[full_key]
+                self._encoded_payloads[key] = encoded_payload
+                return self._version, encoded_payload
+
+            self._miss_count += 1
+            payload = {"type": "request"}
+            if is_versioned:
+                payload["statusVersion"] = status_update.version
+            payload.update(status_update.objects)
+            if status_update.is_delta:
+                payload["baseVersion"] = status_update.base_version
+                payload["deleted"] = status_update.deleted
+
+            encoded_payload = json.dumps(payload)
+            self._encoded_payloads[key] = encoded_payload
+            if not status_update.is_delta:
+                self._encoded_payloads[full_key] = encoded_payload
+            return self._version, encoded_payload
+
+    def invalidate(self):
+        """
+        Marks the status as changed so that it is read anew for the next status message.
+        """
+        self._invalidated.set()
@@ -8,3 +8,6 @@
 # Licensed under the GNU Affero General Public License, version 3.
 
 from .sqlite import Sqlite
+from .postgresql import Postgresql
+from .cache import CachedStorage
+from .snapshot import StorageSnapshot
@@ -0,0 +1,1257 @@
+#!/usr/bin/env python3
+
+# written by sqall
+# twitter: https://twitter.com/sqall01
+# blog: https://h4des.org
+# github: https://github.com/sqall01
+#
+# Licensed under the GNU Affero General Public License, version 3.
+
+import concurrent.futures
+import contextlib
+import copy
+import os
+import logging
+import threading
+import uuid
+from typing import Any, Callable, Optional, List, Union, Tuple, Dict, Set, Hashable, Iterable
+from .core import _Storage
+from ..localObjects import Node, Alert, Manager, Sensor, SensorData, Option
+from ..globalData.globalData import GlobalData
+# noinspection PyProtectedMember
+from ..globalData.sensorObjects import _SensorData, SensorDataType, SensorErrorState
+
+
+class _SharedExclusiveLock:
+    """
+    Lock that is either held by any number of threads in shared mode or by a single thread in exclusive mode.
+    Threads waiting for the exclusive mode are preferred.
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._shared_count = 0
+        self._exclusive = False
+        self._exclusive_waiting = 0
+
+    @contextlib.contextmanager
+    def shared(self):
+        with self._cond:
+            while self._exclusive or self._exclusive_waiting > 0:
+                self._cond.wait()
+            self._shared_count += 1
+        try:
+            yield
+
+        finally:
+            with self._cond:
+                self._shared_count -= 1
+                if self._shared_count == 0:
+                    self._cond.notify_all()
+
+    @contextlib.contextmanager
+    def exclusive(self):
+        with self._cond:
+            self._exclusive_waiting += 1
+            while self._exclusive or self._shared_count > 0:
+                self._cond.wait()
+            self._exclusive_waiting -= 1
+            self._exclusive = True
+        try:
+            yield
+
+        finally:
+            with self._cond:
+                self._exclusive = False
+                self._cond.notify_all()
+
+
+class CachedStorage(_Storage):
+    """
+    Storage that keeps all nodes, sensors, alerts, managers and options in memory in front of a storage backend.
+    The objects are loaded from the backend once and every change is written through to the backend before it is
+    applied to the objects in memory. Since the server is the only one changing the database, the objects in
+    memory always represent the state of the database and all reads are answered without accessing the backend.
+    Changes of the same node are serialized so that its objects in memory are changed in the same order as in
+    the backend, while changes of different nodes are written to the backend in parallel.
+    """
+
+    def __init__(self,
+                 backend: _Storage,
+                 globalData: GlobalData,
+                 snapshot: Optional[Dict[str, Any]] = None):
+        """
+        :param backend: storage backend all changes are written to
+        :param globalData:
+        :param snapshot: content of a snapshot the objects are loaded from instead of the backend
+                         (only used if the backend was not changed after the snapshot was exported)
+        """
+        self._log_tag = os.path.basename(__file__)
+        self._backend = backend
+        self._global_data = globalData
+        self._logger = self._global_data.logger
+
+        # Held in shared mode by every change and in exclusive mode while all objects are read anew from
+        # the backend or exported (no change is written in the meantime).
+        self._global_lock = _SharedExclusiveLock()
+
+        # Locks that serialize the changes of a single node (keyed by the node id, None for the options
+        # and the username for nodes that are not added yet).
+        self._node_locks = dict()  # type: Dict[Hashable, threading.Lock]
+        self._node_locks_lock = threading.Lock()
+
+        # Serializes the invalidation of the last exported snapshot.
+        self._snapshot_lock = threading.Lock()
+
+        # Protects the objects in memory (only held while reading or changing them, never while
+        # accessing the backend).
+        self._model_lock = threading.Lock()
+
+        self._options = dict()  # type: Dict[str, Option]
+        self._nodes = dict()  # type: Dict[int, Node]
+        self._sensors = dict()  # type: Dict[int, Sensor]
+        self._alerts = dict()  # type: Dict[int, Alert]
+        self._managers = dict()  # type: Dict[int, Manager]
+
+        # Indexes used to look up the objects by the values the nodes use to reference them.
+        self._node_ids = dict()  # type: Dict[str, int]
+        self._sensor_ids = dict()  # type: Dict[Tuple[int, int], int]
+        self._alert_ids = dict()  # type: Dict[Tuple[int, int], int]
+
+        # Ids of the objects that belong to a node (node id -> set of ids).
+        self._node_sensor_ids = dict()  # type: Dict[int, Set[int]]
+        self._node_alert_ids = dict()  # type: Dict[int, Set[int]]
+        self._node_manager_ids = dict()  # type: Dict[int, Set[int]]
+
+        # Registration hashes of the nodes (read from the backend when they are needed the first time).
+        self._registration_hashes = dict()  # type: Dict[int, Optional[str]]
+
+        # Token of the last exported snapshot as long as the backend was not changed afterwards.
+        self._snapshot_token = None  # type: Optional[str]
+
+        if snapshot is not None and self._import_snapshot(snapshot):
+            return
+
+        if not self._load():
+            raise ValueError("Unable to load objects from storage backend.")
+
+    @property
+    def backend(self) -> _Storage:
+        return self._backend
+
+    @staticmethod
+    def _copy_alert(alert: Alert) -> Alert:
+        alert_copy = copy.copy(alert)
+        alert_copy.alertLevels = list(alert.alertLevels)
+        return alert_copy
+
+    @staticmethod
+    def _copy_sensor(sensor: Sensor) -> Sensor:
+        sensor_copy = copy.copy(sensor)
+        sensor_copy.alertLevels = list(sensor.alertLevels)
+        sensor_copy.error_state = SensorErrorState(sensor.error_state.state, sensor.error_state.msg)
+        sensor_copy.data = SensorDataType.get_sensor_data_class(sensor.dataType).deepcopy(sensor.data)
+        return sensor_copy
+
+    def _get_node_lock(self, key: Hashable) -> threading.Lock:
+        """
+        Internal function that gets the lock that serializes the changes of a node.
+
+        :param key: node id (None for the options or the username for a node that is not added yet)
+        :return:
+        """
+        with self._node_locks_lock:
+            lock = self._node_locks.get(key)
+            if lock is None:
+                lock = threading.Lock()
+                self._node_locks[key] = lock
+            return lock
+
+    @contextlib.contextmanager
+    def _lock_nodes(self, keys: Iterable[Hashable]):
+        """
+        Internal context manager that serializes a change with all other changes of the given nodes
+        (changes of other nodes are written in parallel).
+
+        :param keys: node ids (None for the options or the username for a node that is not added yet)
+        """
+        with self._global_lock.shared():
+            with contextlib.ExitStack() as stack:
+                for key in keys:
+                    stack.enter_context(self._get_node_lock(key))
+                yield
+
+    def _add_alert(self, alert: Alert):
+        """
+        Internal function that adds the alert to the objects in memory. The model lock has to be held by the caller.
+
+        :param alert:
+        """
+        self._alerts[alert.alertId] = alert
+        self._alert_ids[(alert.nodeId, alert.clientAlertId)] = alert.alertId
+        self._node_alert_ids.setdefault(alert.nodeId, set()).add(alert.alertId)
+
+    def _add_manager(self, manager: Manager):
+        """
+        Internal function that adds the manager to the objects in memory. The model lock has to be held by the caller.
+
+        :param manager:
+        """
+        self._managers[manager.managerId] = manager
+        self._node_manager_ids.setdefault(manager.nodeId, set()).add(manager.managerId)
+
+    def _add_node(self, node: Node):
+        """
+        Internal function that adds the node to the objects in memory. The model lock has to be held by the caller.
+
+        :param node:
+        """
+        self._nodes[node.id] = node
+        self._node_ids[node.username] = node.id
+
+    def _add_sensor(self, sensor: Sensor):
+        """
+        Internal function that adds the sensor to the objects in memory. The model lock has to be held by the caller.
+
+        :param sensor:
+        """
+        self._sensors[sensor.sensorId] = sensor
+        self._sensor_ids[(sensor.nodeId, sensor.clientSensorId)] = sensor.sensorId
+        self._node_sensor_ids.setdefault(sensor.nodeId, set()).add(sensor.sensorId)
+
+    def _remove_node(self, node_id: int):
+        """
+        Internal function that removes the node and all its sensors, alerts and managers from the objects in memory.
+        The model lock has to be held by the caller.
+
+        :param node_id:
+        """
+        node = self._nodes.pop(node_id, None)
+        if node is not None and self._node_ids.get(node.username) == node_id:
+            del self._node_ids[node.username]
+
+        for sensor_id in self._node_sensor_ids.pop(node_id, set()):
+            sensor = self._sensors.pop(sensor_id)
+            del self._sensor_ids[(sensor.nodeId, sensor.clientSensorId)]
+
+        for alert_id in self._node_alert_ids.pop(node_id, set()):
+            alert = self._alerts.pop(alert_id)
+            del self._alert_ids[(alert.nodeId, alert.clientAlertId)]
+
+        for manager_id in self._node_manager_ids.pop(node_id, set()):
+            del self._managers[manager_id]
+
+        self._registration_hashes.pop(node_id, None)
+
+    def _remove_sensor(self, sensor_id: int):
+        """
+        Internal function that removes the sensor from the objects in memory. The model lock has to be held by
+        the caller.
+
+        :param sensor_id:
+        """
+        sensor = self._sensors.pop(sensor_id, None)
+        if sensor is None:
+            return
+        del self._sensor_ids[(sensor.nodeId, sensor.clientSensorId)]
+        self._node_sensor_ids[sensor.nodeId].discard(sensor_id)
+
+    def _get_sensor(self,
+                    node_id: int,
+                    client_sensor_id: int) -> Sensor:
+        """
+        Internal function that gets the sensor object in memory. The model lock has to be held by the caller.
+
+        :param node_id:
+        :param client_sensor_id:
+        :return: sensor object (raises KeyError if it does not exist)
+        """
+        return self._sensors[self._sensor_ids[(node_id, client_sensor_id)]]
+
+    def _set_sensor_data(self,
+                         sensor: Sensor,
+                         data: _SensorData):
+        """
+        Internal function that sets the data of the sensor object in memory. The model lock has to be held by
+        the caller.
+
+        :param sensor:
+        :param data:
+        """
+        # Sensors without data do not store any data in the backend.
+        if sensor.dataType == SensorDataType.NONE:
+            return
+
+        sensor_data_class = SensorDataType.get_sensor_data_class(sensor.dataType)
+        if not isinstance(data, sensor_data_class):
+            raise ValueError("Data type does not match data type of sensor id %d." % sensor.sensorId)
+        sensor.data = sensor_data_class.deepcopy(data)
+
+    def _load(self,
+              logger: logging.Logger = None) -> bool:
+        """
+        Internal function that loads all objects from the backend.
+
+        :param logger:
+        :return: success or failure
+        """
+        # Set logger instance to use.
+        if not logger:
+            logger = self._logger
+
+        alert_system_information = self._backend.getAlertSystemInformation(logger)
+        if alert_system_information is None:
+            logger.error("[%s]: Unable to load objects from storage backend." % self._log_tag)
+            return False
+
+        options, nodes, sensors, managers, alerts = alert_system_information
+        self._set_objects(options, nodes, sensors, managers, alerts)
+
+        return True
+
+    def _set_objects(self,
+                     options: List[Option],
+                     nodes: List[Node],
+                     sensors: List[Sensor],
+                     managers: List[Manager],
+                     alerts: List[Alert]):
+        """
+        Internal function that replaces all objects in memory with the given objects.
+
+        :param options:
+        :param nodes:
+        :param sensors:
+        :param managers:
+        :param alerts:
+        """
+        with self._model_lock:
+            self._options.clear()
+            self._nodes.clear()
+            self._sensors.clear()
+            self._alerts.clear()
+            self._managers.clear()
+            self._node_ids.clear()
+            self._sensor_ids.clear()
+            self._alert_ids.clear()
+            self._node_sensor_ids.clear()
+            self._node_alert_ids.clear()
+            self._node_manager_ids.clear()
+            self._registration_hashes.clear()
+
+            for option in options:
+                self._options[option.type] = option
+            for node in nodes:
+                self._add_node(node)
+            for sensor in sensors:
+                self._add_sensor(sensor)
+            for manager in managers:
+                self._add_manager(manager)
+            for alert in alerts:
+                self._add_alert(alert)
+
+    def _import_snapshot(self,
+                         snapshot: Dict[str, Any],
+                         logger: logging.Logger = None) -> bool:
+        """
+        Internal function that loads all objects from the content of a snapshot (see export_snapshot()).
+        The snapshot is only used if the backend was not changed after it was exported.
+
+        :param snapshot:
+        :param logger:
+        :return: success or failure (the objects have to be loaded from the backend)
+        """
+        # Set logger instance to use.
+        if not logger:
+            logger = self._logger
+
+        token = self._backend.get_snapshot_token(logger)
+        if token is None or token != snapshot.get("token"):
+            logger.info("[%s]: Storage backend was changed after the snapshot was exported. Ignoring snapshot."
+                        % self._log_tag)
+            return False
+
+        try:
+            options = list()
+            for option_type, value in snapshot["options"]:
+                option = Option()
+                option.type = option_type
+                option.value = value
+                options.append(option)
+
+            nodes = list()
+            for node_id, hostname, username, node_type, instance, connected, version, rev, persistent \
+                    in snapshot["nodes"]:
+                node = Node()
+                node.id = node_id
+                node.hostname = hostname
+                node.username = username
+                node.nodeType = node_type
+                node.instance = instance
+                node.connected = connected
+                node.version = version
+                node.rev = rev
+                node.persistent = persistent
+                nodes.append(node)
+
+            sensors = list()
+            for sensor_id, node_id, client_sensor_id, description, state, error_state, alert_levels, alert_delay, \
+                    data_type, data in snapshot["sensors"]:
+                sensor = Sensor()
+                sensor.sensorId = sensor_id
+                sensor.nodeId = node_id
+                sensor.clientSensorId = client_sensor_id
+                sensor.description = description
+                sensor.state = state
+                sensor.error_state = SensorErrorState.copy_from_dict(error_state)
+                sensor.alertLevels = alert_levels
+                sensor.alertDelay = alert_delay
+                sensor.dataType = data_type
+                sensor.data = SensorDataType.get_sensor_data_class(data_type).copy_from_dict(data)
+                sensors.append(sensor)
+
+            managers = list()
+            for manager_id, node_id, description in snapshot["managers"]:
+                manager = Manager()
+                manager.managerId = manager_id
+                manager.nodeId = node_id
+                manager.description = description
+                managers.append(manager)
+
+            alerts = list()
+            for alert_id, node_id, client_alert_id, description, alert_levels in snapshot["alerts"]:
+                alert = Alert()
+                alert.alertId = alert_id
+                alert.nodeId = node_id
+                alert.clientAlertId = client_alert_id
+                alert.description = description
+                alert.alertLevels = alert_levels
+                alerts.append(alert)
+
+        except Exception as e:
+            logger.exception("[%s]: Snapshot content invalid. Ignoring snapshot." % self._log_tag)
+            return False
+
+        self._set_objects(options, nodes, sensors, managers, alerts)
+        self._snapshot_token = token
+
+        logger.info("[%s]: Loaded %d nodes and %d sensors from snapshot."
+                    % (self._log_tag, len(nodes), len(sensors)))
+        return True
+
+    def _invalidate_snapshot(self,
+                             logger: logging.Logger):
+        """
+        Internal function that marks in the backend that the last exported snapshot does not represent the
+        backend anymore. It has to be called before the first change after the export is written to the backend.
+
+        :param logger:
+        """
+        with self._snapshot_lock:
+            if self._snapshot_token is None:
+                return
+
+            if not self._backend.set_snapshot_token(None, logger):
+                logger.error("[%s]: Unable to invalidate snapshot." % self._log_tag)
+                return
+
+            self._snapshot_token = None
+
+    def _reload(self,
+                logger: logging.Logger):
+        """
+        Internal function that reads all objects anew from the backend while no change is written.
+        It is used if the objects of a node could not be read anew.
+
+        :param logger:
+        """
+        with self._global_lock.exclusive():
+            self._load(logger)
+            self._invalidate_status()
+
+    def _refresh(self,
+                 node_id: Optional[int],
+                 logger: logging.Logger = None) -> bool:
+        """
+        Internal function that reads the objects of a node anew from the backend. It is used after structural
+        changes and if a change could not be applied to the objects in memory. The lock of the node has to be
+        held by the caller.
+
+        :param node_id:
+        :param logger:
+        :return: False if the objects could not be read and all objects have to be read anew (see _reload())
+        """
+        # Set logger instance to use.
+        if not logger:
+            logger = self._logger
+
+        if node_id is None:
+            return False
+
+        node = self._backend.getNodeById(node_id, logger)
+        sensors = self._backend.get_sensors(node_id, logger)
+        alerts = self._backend.get_alerts(node_id, logger)
+        managers = self._backend.get_managers(node_id, logger)
+
+        # The backend also returns no node if reading it failed, hence only a node that is missing
+        # from all nodes does not exist anymore.
+        node_missing = False
+        if node is None:
+            nodes = self._backend.getNodes(logger)
+            node_missing = nodes is not None and all(x.id != node_id for x in nodes)
+
+        if sensors is None or alerts is None or managers is None or (node is None and not node_missing):
+            logger.error("[%s]: Unable to read node with id %d from storage backend. Reloading all objects."
+                         % (self._log_tag, node_id))
+            return False
+
+        with self._model_lock:
+            self._remove_node(node_id)
+
+            # The node does not exist in the backend anymore.
+            if node is None:
+                return True
+
+            self._add_node(node)
+            for sensor in sensors:
+                self._add_sensor(sensor)
+            for alert in alerts:
+                self._add_alert(alert)
+            for manager in managers:
+                self._add_manager(manager)
+
+        return True
+
+    def _invalidate_status(self):
+        """
+        Internal function that invalidates the cached alert system status. The backend already invalidates
+        it when committing, but the status could have been read again before the change was applied to
+        the objects in memory.
+        """
+        status_tracker = self._global_data.status_tracker
+        if status_tracker is not None:
+            status_tracker.invalidate()
+
+    def _write_through(self,
+                       node_id: Optional[int],
+                       write: Callable[[], bool],
+                       update: Callable[[], None],
+                       logger: logging.Logger) -> bool:
+        """
+        Internal function that writes a change to the backend and applies it to the objects in memory afterwards.
+        If the backend fails (which can leave a part of the change in the database) or the change can not be
+        applied, the objects of the given node are read anew from the backend.
+
+        :param node_id: id of the node affected by the change (None if the options are affected)
+        :param write: function that writes the change to the backend
+        :param update: function that applies the change to the objects in memory
+        :param logger:
+        :return: success or failure
+        """
+        result = True
+        refreshed = True
+        with self._lock_nodes([node_id]):
+            self._invalidate_snapshot(logger)
+            if not write():
+                result = False
+                refreshed = self._refresh(node_id, logger)
+
+            else:
+                try:
+                    with self._model_lock:
+                        update()
+
+                except Exception as e:
+                    logger.exception("[%s]: Unable to apply change to objects in memory. Reading them anew."
+                                     % self._log_tag)
+                    refreshed = self._refresh(node_id, logger)
+
+            self._invalidate_status()
+
+        if not refreshed:
+            self._reload(logger)
+        return result
+
+    def checkVersionAndClearConflict(self,
+                                     logger: logging.Logger = None):
+
+        # Set logger instance to use.
+        if not logger:
+            logger = self._logger
+
+        with self._global_lock.exclusive():
+            self._invalidate_snapshot(logger)
+            try:
+                self._backend.checkVersionAndClearConflict(logger)
+
+            finally:
+                self._load(logger)
+                self._invalidate_status()
+
+    def addNode(self,
+                username: str,
+                hostname: str,
+                nodeType: str,
+                instance: str,
+                version: float,
+                rev: int,
+                persistent: int,
+                logger: logging.Logger = None) -> bool:
+
+        # Set logger instance to use.
+        if not logger:
+            logger = self._logger
+
+        # A newly added node is not known yet and its changes are serialized by its username.
+        node_id = self.getNodeId(username)
+        refreshed = True
+        with self._lock_nodes([node_id if node_id is not None else username]):
+            self._invalidate_snapshot(logger)
+            result = self._backend.addNode(username,
+                                           hostname,
+                                           nodeType,
+                                           instance,
+                                           version,
+                                           rev,
+                                           persistent,
+                                           logger)
+
+            if node_id is not None:
+                refreshed = self._refresh(node_id, logger)
+
+            elif result:
+                node_id = self._backend.getNodeId(username, logger)
+                if node_id is None:
+                    refreshed = False
+                else:
+                    with self._get_node_lock(node_id):
+                        refreshed = self._refresh(node_id, logger)
+            self._invalidate_status()
+
+        if not refreshed:
+            self._reload(logger)
+        return result
+
+    def addAlerts(self,
+                  username: str,
+                  alerts: List[Dict[str, Any]],
+                  logger: logging.Logger = None) -> bool:
+
+        # Set logger instance to use.
+        if not logger:
+            logger = self._logger
+
+        node_id = self.getNodeId(username)
+        refreshed = True
+        with self._lock_nodes([node_id if node_id is not None else username]):
+            self._invalidate_snapshot(logger)
+            result = self._backend.addAlerts(username, alerts, logger)
+
+            if node_id is not None:
+                refreshed = self._refresh(node_id, logger)
+            self._invalidate_status()
+
+        if not refreshed:
+            self._reload(logger)
+        return result
+
+    def addManager(self,
+                   username: str,
+                   manager: Dict[str, Any],
+                   logger: logging.Logger = None) -> bool:
+
+        # Set logger instance to use.
+        if not logger:
+            logger = self._logger
+
+        node_id = self.getNodeId(username)
+        refreshed = True
+        with self._lock_nodes([node_id if node_id is not None else username]):
+            self._invalidate_snapshot(logger)
+            result = self._backend.addManager(username, manager, logger)
+
+            if node_id is not None:
+                refreshed = self._refresh(node_id, logger)
+            self._invalidate_status()
+
+        if not refreshed:
+            self._reload(logger)
+        return result
+
+    def getNodeId(self,
+                  username: str,
+                  logger: logging.Logger = None) -> Optional[int]:
+
+        with self._model_lock:
+            return self._node_ids.get(username)
+
+    def getNodeIds(self,
+                   logger: logging.Logger = None) -> List[int]:
+
+        with self._model_lock:
+            return sorted(self._nodes.keys())
+
+    def getSensorCount(self,
+                       nodeId: int,
+                       logger: logging.Logger = None) -> Optional[int]:
+
+        with self._model_lock:
+            return len(self._node_sensor_ids.get(nodeId, ()))
+
+    def getSensorId(self,
+                    nodeId: int,
+                    clientSensorId: int,
+                    logger: logging.Logger = None) -> Optional[int]:
+
+        with self._model_lock:
+            return self._sensor_ids.get((nodeId, clientSensorId))
+
+    def getSurveyData(self,
+                      logger: logging.Logger = None) -> Optional[List[Tuple[str, float, int]]]:
+
+        with self._model_lock:
+            return [(node.instance, node.version, node.rev)
+                    for _, node in sorted(self._nodes.items())]
+
+    def getUniqueID(self,
+                    logger: logging.Logger = None) -> Optional[str]:
+        return self._backend.getUniqueID(logger)
+
+    def getAlertId(self,
+                   nodeId: int,
+                   clientAlertId: int,
+                   logger: logging.Logger = None) -> Optional[int]:
+
+        with self._model_lock:
+            return self._alert_ids.get((nodeId, clientAlertId))
+
+    def getSensorAlertLevels(self,
+                             sensorId: int,
+                             logger: logging.Logger = None) -> Optional[List[int]]:
+
+        with self._model_lock:
+            sensor = self._sensors.get(sensorId)
+            if sensor is None:
+                return []
+            return list(sensor.alertLevels)
+
+    def getAlertAlertLevels(self,
+                            alertId: int,
+                            logger: logging.Logger = None) -> Optional[List[int]]:
+
+        with self._model_lock:
+            alert = self._alerts.get(alertId)
+            if alert is None:
+                return []
+            return list(alert.alertLevels)
+
+    def getAllAlertsAlertLevels(self,
+                                logger: logging.Logger = None) -> Optional[List[int]]:
+
+        with self._model_lock:
+            return [alert_level for _, alert in sorted(self._alerts.items()) for alert_level in alert.alertLevels]
+
+    def getAllSensorsAlertLevels(self,
+                                 logger: logging.Logger = None) -> Optional[List[int]]:
+
+        with self._model_lock:
+            return [alert_level for _, sensor in sorted(self._sensors.items()) for alert_level in sensor.alertLevels]
+
+    def getAllConnectedNodeIds(self,
+                               logger: logging.Logger = None) -> Optional[List[int]]:
+
+        with self._model_lock:
+            return sorted(node_id for node_id, node in self._nodes.items() if node.connected == 1)
+
+    def getAllPersistentNodeIds(self,
+                                logger: logging.Logger = None) -> Optional[List[int]]:
+
+        with self._model_lock:
+            return sorted(node_id for node_id, node in self._nodes.items() if node.persistent == 1)
+
+    def getAlertById(self,
+                     alertId: int,
+                     logger: logging.Logger = None) -> Optional[Alert]:
+
+        with self._model_lock:
+            alert = self._alerts.get(alertId)
+            if alert is None:
+                return None
+            return self._copy_alert(alert)
+
+    def getManagerById(self,
+                       managerId: int,
+                       logger: logging.Logger = None) -> Optional[Manager]:
+
+        with self._model_lock:
+            manager = self._managers.get(managerId)
+            if manager is None:
+                return None
+            return copy.copy(manager)
+
+    def getNodeById(self,
+                    nodeId: int,
+                    logger: logging.Logger = None) -> Optional[Node]:
+
+        with self._model_lock:
+            node = self._nodes.get(nodeId)
+            if node is None:
+                return None
+            return copy.copy(node)
+
+    def getSensorById(self,
+                      sensorId: int,
+                      logger: logging.Logger = None) -> Optional[Sensor]:
+
+        with self._model_lock:
+            sensor = self._sensors.get(sensorId)
+            if sensor is None:
+                return None
+            return self._copy_sensor(sensor)
+
+    def getNodes(self,
+                 logger: logging.Logger = None) -> Optional[List[Node]]:
+
+        with self._model_lock:
+            return [copy.copy(node) for _, node in sorted(self._nodes.items())]
+
+    def getAlertSystemInformation(self,
+                                  logger: logging.Logger = None) -> Optional[List[List[Union[Option,
+                                                                                             Node,
+                                                                                             Sensor,
+                                                                                             Manager,
+                                                                                             Alert]]]]:
+
+        with self._model_lock:
+            return [[copy.copy(option) for option in self._options.values()],
+                    [copy.copy(node) for _, node in sorted(self._nodes.items())],
+                    [self._copy_sensor(sensor) for _, sensor in sorted(self._sensors.items())],
+                    [copy.copy(manager) for _, manager in sorted(self._managers.items())],
+                    [self._copy_alert(alert) for _, alert in sorted(self._alerts.items())]]
+
+    def getSensorState(self,
+                       sensorId: int,
+                       logger: logging.Logger = None) -> Optional[int]:
+
+        # Set logger instance to use.
+        if not logger:
+            logger = self._logger
+
+        with self._model_lock:
+            sensor = self._sensors.get(sensorId)
+            if sensor is not None:
+                return sensor.state
+
+        logger.error("[%s]: Sensor was not found." % self._log_tag)
+        return None
+
+    def getSensorData(self,
+                      sensorId: int,
+                      logger: logging.Logger = None) -> Optional[SensorData]:
+
+        # Set logger instance to use.
+        if not logger:
+            logger = self._logger
+
+        with self._model_lock:
+            sensor = self._sensors.get(sensorId)
+            if sensor is not None:
+                data = SensorData()
+                data.sensorId = sensorId
+                data.dataType = sensor.dataType
+                data.data = SensorDataType.get_sensor_data_class(sensor.dataType).deepcopy(sensor.data)
+                return data
+
+        logger.error("[%s]: Sensor was not found." % self._log_tag)
+        return None
+
+    def markNodeAsNotConnected(self,
+                               nodeId: int,
+                               logger: logging.Logger = None) -> bool:
+
+        # Set logger instance to use.
+        if not logger:
+            logger = self._logger
+
+        def _update():
+            if nodeId in self._nodes:
+                self._nodes[nodeId].connected = 0
+
+        return self._write_through(nodeId,
+                                   lambda: self._backend.markNodeAsNotConnected(nodeId, logger),
+                                   _update,
+                                   logger)
+
+    def markNodeAsConnected(self,
+                            nodeId: int,
+                            logger: logging.Logger = None) -> bool:
+
+        # Set logger instance to use.
+        if not logger:
+            logger = self._logger
+
+        def _update():
+            if nodeId in self._nodes:
+                self._nodes[nodeId].connected = 1
+
+        return self._write_through(nodeId,
+                                   lambda: self._backend.markNodeAsConnected(nodeId, logger),
+                                   _update,
+                                   logger)
+
+    def deleteNode(self,
+                   nodeId: int,
+                   logger: logging.Logger = None) -> bool:
+
+        # Set logger instance to use.
+        if not logger:
+            logger = self._logger
+
+        return self._write_through(nodeId,
+                                   lambda: self._backend.deleteNode(nodeId, logger),
+                                   lambda: self._remove_node(nodeId),
+                                   logger)
+
+    def updateSensorState(self,
+                          nodeId: int,
+                          stateList: List[Tuple[int, int]],
+                          logger: logging.Logger = None) -> bool:
+
+        # Set logger instance to use.
+        if not logger:
+            logger = self._logger
+
+        def _update():
+            for client_sensor_id, state in stateList:
+                self._get_sensor(nodeId, client_sensor_id).state = state
+
+        return self._write_through(nodeId,
+                                   lambda: self._backend.updateSensorState(nodeId, stateList, logger),
+                                   _update,
+                                   logger)
+
+    def updateSensorData(self,
+                         nodeId: int,
+                         dataList: List[Tuple[int, _SensorData]],
+                         logger: logging.Logger = None) -> bool:
+
+        # Set logger instance to use.
+        if not logger:
+            logger = self._logger
+
+        def _update():
+            for client_sensor_id, data in dataList:
+                self._set_sensor_data(self._get_sensor(nodeId, client_sensor_id), data)
+
+        return self._write_through(nodeId,
+                                   lambda: self._backend.updateSensorData(nodeId, dataList, logger),
+                                   _update,
+                                   logger)
+
+    def updateSensorStateAndData(self,
+                                 nodeId: int,
+                                 stateList: List[Tuple[int, int]],
+                                 dataList: List[Tuple[int, _SensorData]],
+                                 logger: logging.Logger = None,
+                                 historyList: List[Tuple[int, Optional[int], Optional[_SensorData]]] = None) -> bool:
+
+        # Set logger instance to use.
+        if not logger:
+            logger = self._logger
+
+        def _update():
+            for client_sensor_id, state in stateList:
+                self._get_sensor(nodeId, client_sensor_id).state = state
+            for client_sensor_id, data in dataList:
+                self._set_sensor_data(self._get_sensor(nodeId, client_sensor_id), data)
+
+        return self._write_through(nodeId,
+                                   lambda: self._backend.updateSensorStateAndData(nodeId,
+                                                                                  stateList,
+                                                                                  dataList,
+                                                                                  logger,
+                                                                                  historyList),
+                                   _update,
+                                   logger)
+
+    def close(self,
+              logger: logging.Logger = None):
+
+        with self._global_lock.exclusive():
+            self._backend.close(logger)
+
+    def get_commit_future(self,
+                          logger: logging.Logger = None) -> concurrent.futures.Future:
+        return self._backend.get_commit_future(logger)
+
+    def get_registration_hash(self,
+                              node_id: int,
+                              logger: logging.Logger = None) -> Optional[str]:
+
+        with self._model_lock:
+            if node_id in self._registration_hashes:
+                return self._registration_hashes[node_id]
+
+        # Read the hash while no change of the node is written so that it can not be changed in the meantime.
+        with self._lock_nodes([node_id]):
+            registration_hash = self._backend.get_registration_hash(node_id, logger)
+            with self._model_lock:
+                if node_id in self._nodes:
+                    self._registration_hashes[node_id] = registration_hash
+
+        return registration_hash
+
+    def set_registration_hash(self,
+                              node_id: int,
+                              registration_hash: Optional[str],
+                              logger: logging.Logger = None) -> bool:
+
+        with self._lock_nodes([node_id]):
+            result = self._backend.set_registration_hash(node_id, registration_hash, logger)
+            with self._model_lock:
+                if result:
+                    self._registration_hashes[node_id] = registration_hash
+
+                else:
+                    self._registration_hashes.pop(node_id, None)
+
+        return result
+
+    def get_snapshot_token(self,
+                           logger: logging.Logger = None) -> Optional[str]:
+        return self._backend.get_snapshot_token(logger)
+
+    def set_snapshot_token(self,
+                           token: Optional[str],
+                           logger: logging.Logger = None) -> bool:
+
+        with self._global_lock.exclusive():
+            if not self._backend.set_snapshot_token(token, logger):
+                return False
+            self._snapshot_token = token
+        return True
+
+    def export_snapshot(self,
+                        logger: logging.Logger = None) -> Optional[Dict[str, Any]]:
+        """
+        Exports all objects in memory as content of a snapshot and marks in the backend that the snapshot
+        represents it (until the next change).
+
+        :param logger:
+        :return: content of the snapshot or None
+        """
+        # Set logger instance to use.
+        if not logger:
+            logger = self._logger
+
+        token = uuid.uuid4().hex
+        with self._global_lock.exclusive():
+            with self._model_lock:
+                snapshot = {"token": token,
+                            "options": [[x.type, x.value] for x in self._options.values()],
+                            "nodes": [[x.id, x.hostname, x.username, x.nodeType, x.instance, x.connected, x.version,
+                                       x.rev, x.persistent]
+                                      for x in self._nodes.values()],
+                            "sensors": [[x.sensorId, x.nodeId, x.clientSensorId, x.description, x.state,
+                                         x.error_state.copy_to_dict(), list(x.alertLevels), x.alertDelay, x.dataType,
+                                         x.data.copy_to_dict()]
+                                        for x in self._sensors.values()],
+                            "managers": [[x.managerId, x.nodeId, x.description] for x in self._managers.values()],
+                            "alerts": [[x.alertId, x.nodeId, x.clientAlertId, x.description, list(x.alertLevels)]
+                                       for x in self._alerts.values()]}
+
+            if not self._backend.set_snapshot_token(token, logger):
+                logger.error("[%s]: Unable to set snapshot token." % self._log_tag)
+                return None
+            self._snapshot_token = token
+
+        return snapshot
+
+    # region Alert API
+
+    def get_alerts(self,
+                   node_id: int,
+                   logger: logging.Logger = None) -> Optional[List[Alert]]:
+
+        with self._model_lock:
+            return [self._copy_alert(self._alerts[alert_id])
+                    for alert_id in sorted(self._node_alert_ids.get(node_id, ()))]
+
+    # endregion
+
+    # region Manager API
+
+    def get_managers(self,
+                     node_id: int,
+                     logger: logging.Logger = None) -> Optional[List[Manager]]:
+
+        with self._model_lock:
+            return [copy.copy(self._managers[manager_id])
+                    for manager_id in sorted(self._node_manager_ids.get(node_id, ()))]
+
+    # endregion
+
+    # region Option API
+
+    def delete_option_by_type(self,
+                              option_type: str,
+                              logger: logging.Logger = None) -> bool:
+
+        # Set logger instance to use.
+        if not logger:
+            logger = self._logger
+
+        return self._write_through(None,
+                                   lambda: self._backend.delete_option_by_type(option_type, logger),
+                                   lambda: self._options.pop(option_type, None),
+                                   logger)
+
+    def get_option_by_type(self,
+                           option_type: str,
+                           logger: logging.Logger = None) -> Optional[Option]:
+
+        with self._model_lock:
+            option = self._options.get(option_type)
+            if option is None:
+                return None
+            return copy.copy(option)
+
+    def get_options_list(self, logger: logging.Logger = None) -> Optional[List[Option]]:
+
+        with self._model_lock:
+            return [copy.copy(option) for option in self._options.values()]
+
+    def update_option(self,
+                      option_type: str,
+                      option_value: int,
+                      logger: logging.Logger = None) -> bool:
+
+        option = Option()
+        option.type = option_type
+        option.value = option_value
+        return self.update_option_by_obj(option, logger)
+
+    def update_option_by_obj(self,
+                             option: Option,
+                             logger: logging.Logger = None) -> bool:
+
+        # Set logger instance to use.
+        if not logger:
+            logger = self._logger
+
+        def _update():
+            if option.type in self._options:
+                self._options[option.type].value = option.value
+            else:
+                self._options[option.type] = copy.copy(option)
+
+        return self._write_through(None,
+                                   lambda: self._backend.update_option_by_obj(option, logger),
+                                   _update,
+                                   logger)
+
+    # endregion
+
+    # region Sensor API
+
+    def delete_sensor(self,
+                      sensor_id: int,
+                      logger: logging.Logger = None) -> bool:
+
+        # Set logger instance to use.
+        if not logger:
+            logger = self._logger
+
+        with self._model_lock:
+            sensor = self._sensors.get(sensor_id)
+            node_id = sensor.nodeId if sensor is not None else None
+
+        return self._write_through(node_id,
+                                   lambda: self._backend.delete_sensor(sensor_id, logger),
+                                   lambda: self._remove_sensor(sensor_id),
+                                   logger)
+
+    def get_sensor_error_state(self,
+                               sensor_id: int,
+                               logger: logging.Logger = None) -> Optional[SensorErrorState]:
+
+        with self._model_lock:
+            sensor = self._sensors.get(sensor_id)
+            if sensor is None:
+                return None
+            return SensorErrorState(sensor.error_state.state, sensor.error_state.msg)
+
+    def get_sensor_ids_in_error_state(self,
+                                      logger: logging.Logger = None) -> List[int]:
+
+        with self._model_lock:
+            return sorted(sensor_id for sensor_id, sensor in self._sensors.items()
+                          if sensor.error_state.state != SensorErrorState.OK)
+
+    def get_sensors(self,
+                    node_id: int,
+                    logger: logging.Logger = None) -> Optional[List[Sensor]]:
+
+        with self._model_lock:
+            return [self._copy_sensor(self._sensors[sensor_id])
+                    for sensor_id in sorted(self._node_sensor_ids.get(node_id, ()))]
+
+    def update_sensor_error_state(self,
+                                  node_id: int,
+                                  client_sensor_id: int,
+                                  error_state: SensorErrorState,
+                                  logger: logging.Logger = None) -> bool:
+
+        # Set logger instance to use.
+        if not logger:
+            logger = self._logger
+
+        def _update():
+            sensor = self._get_sensor(node_id, client_sensor_id)
+            sensor.error_state = SensorErrorState(error_state.state, error_state.msg)
+
+        return self._write_through(node_id,
+                                   lambda: self._backend.update_sensor_error_state(node_id,
+                                                                                   client_sensor_id,
+                                                                                   error_state,
+                                                                                   logger),
+                                   _update,
+                                   logger)
+
+    def upsert_sensor(self,
+                      sensor: Sensor,
+                      logger: logging.Logger = None) -> bool:
+
+        # Set logger instance to use.
+        if not logger:
+            logger = self._logger
+
+        with self._lock_nodes([sensor.nodeId]):
+            self._invalidate_snapshot(logger)
+            result = self._backend.upsert_sensor(sensor, logger)
+            refreshed = self._refresh(sensor.nodeId, logger)
+            self._invalidate_status()
+
+        if not refreshed:
+            self._reload(logger)
+        return result
+
+    def upsert_sensors(self,
+                       sensors: List[Sensor],
+                       logger: logging.Logger = None) -> bool:
+
+        # Set logger instance to use.
+        if not logger:
+            logger = self._logger
+
+        node_ids = sorted(set(sensor.nodeId for sensor in sensors))
+        with self._lock_nodes(node_ids):
+            self._invalidate_snapshot(logger)
+            result = self._backend.upsert_sensors(sensors, logger)
+            refreshed = all([self._refresh(node_id, logger) for node_id in node_ids])
+            self._invalidate_status()
+
+        if not refreshed:
+            self._reload(logger)
+        return result
+
+    # endregion
@@ -7,6 +7,7 @@
 #
 # Licensed under the GNU Affero General Public License, version 3.
 
+import concurrent.futures
 import logging
 from typing import Any, Optional, List, Union, Tuple, Dict
 from ..localObjects import Node, Alert, Manager, Sensor, Option, SensorData
@@ -392,6 +393,28 @@ class _Storage:
         """
         raise NotImplementedError("Abstract class")
 
+    def updateSensorStateAndData(self,
+                                 nodeId: int,
+                                 stateList: List[Tuple[int, int]],
+                                 dataList: List[Tuple[int, Any]],
+                                 logger: logging.Logger = None,
+                                 historyList: List[Tuple[int, Optional[int], Optional[Any]]] = None) -> bool:
+        """
+        Updates the states and the data of the sensors of a node in the database in one transaction
+        (given in tuples of (clientSensorId, state) and (clientSensorId, data)). Either all changes are stored
+        or none.
+
+        :param nodeId:
+        :param stateList:
+        :param dataList:
+        :param logger:
+        :param historyList: changes recorded in the sensor history instead of the merged state and data of each
+                            sensor (given in tuples of (clientSensorId, state or None, data or None), e.g., every
+                            event of a batch whose state and data are only stored once per sensor)
+        :return Success or Failure
+        """
+        raise NotImplementedError("Abstract class")
+
     def close(self,
               logger: logging.Logger = None):
         """
@@ -401,6 +424,99 @@ class _Storage:
         """
         raise NotImplementedError("Abstract class")
 
+    def get_commit_future(self,
+                          logger: logging.Logger = None) -> concurrent.futures.Future:
+        """
+        Gets a future that is resolved as soon as all changes made so far are durably committed
+        (storage backends that commit each change on its own return an already resolved future).
+
+        :param logger:
+        :return future resolved with True or with the exception that prevented the commit
+        """
+        raise NotImplementedError("Abstract class")
+
+    def get_registration_hash(self,
+                              node_id: int,
+                              logger: logging.Logger = None) -> Optional[str]:
+        """
+        Gets the content hash of the last registration of the node that was applied to the database.
+
+        :param node_id:
+        :param logger:
+        :return hash or None if the node does not exist or no registration was applied completely
+        """
+        raise NotImplementedError("Abstract class")
+
+    def set_registration_hash(self,
+                              node_id: int,
+                              registration_hash: Optional[str],
+                              logger: logging.Logger = None) -> bool:
+        """
+        Sets the content hash of the last registration of the node that was applied to the database
+        (None marks that the registration of the node is not applied completely).
+
+        :param node_id:
+        :param registration_hash:
+        :param logger:
+        :return Success or Failure
+        """
+        raise NotImplementedError("Abstract class")
+
+    def get_snapshot_token(self,
+                           logger: logging.Logger = None) -> Optional[str]:
+        """
+        Gets the token of the snapshot that represents the current content of the database.
+
+        :param logger:
+        :return token or None if no snapshot represents the current content
+        """
+        raise NotImplementedError("Abstract class")
+
+    def set_snapshot_token(self,
+                           token: Optional[str],
+                           logger: logging.Logger = None) -> bool:
+        """
+        Sets the token of the snapshot that represents the current content of the database
+        (None marks that no snapshot represents it anymore).
+
+        :param token:
+        :param logger:
+        :return Success or Failure
+        """
+        raise NotImplementedError("Abstract class")
+
+    # region Alert API
+
+    def get_alerts(self,
+                   node_id: int,
+                   logger: logging.Logger = None) -> Optional[List[Alert]]:
+        """
+        Gets all alerts for the given node id.
+
+        :param node_id:
+        :param logger:
+        :return: list of alerts or None
+        """
+        raise NotImplementedError("Abstract class")
+
+    # endregion
+
+    # region Manager API
+
+    def get_managers(self,
+                     node_id: int,
+                     logger: logging.Logger = None) -> Optional[List[Manager]]:
+        """
+        Gets all managers for the given node id.
+
+        :param node_id:
+        :param logger:
+        :return: list of managers or None
+        """
+        raise NotImplementedError("Abstract class")
+
+    # endregion
+
     # region Option API
 
     def delete_option_by_type(self,
@@ -499,13 +615,13 @@ class _Storage:
 
     def get_sensors(self,
                     node_id: int,
-                    logger: logging.Logger = None) -> List[Sensor]:
+                    logger: logging.Logger = None) -> Optional[List[Sensor]]:
         """
         Gets all sensors for the given node id.
 
         :param node_id:
         :param logger:
-        :return: list of sensors
+        :return: list of sensors or None
         """
         raise NotImplementedError("Abstract class")
 
@@ -0,0 +1,2119 @@
+#!/usr/bin/env python3
+
+# written by sqall
+# twitter: https://twitter.com/sqall01
+# blog: https://h4des.org
+# github: https://github.com/sqall01
+#
+# Licensed under the GNU Affero General Public License, version 3.
+
+import collections
+import concurrent.futures
+import os
+import threading
+import time
+import socket
+import struct
+import hashlib
+import logging
+from typing import Any, Optional, List, Union, Tuple, Dict, cast
+from .core import _Storage
+from ..localObjects import Node, Alert, Manager, Sensor, SensorData, Option
+from ..globalData.globalData import GlobalData
+# noinspection PyProtectedMember
+from ..globalData.sensorObjects import SensorDataGPS, SensorDataNone, SensorDataFloat, SensorDataInt, _SensorData, \
+    SensorDataType, SensorErrorState
+
+# PostgreSQL is an optional storage backend => only needed if it is configured.
+try:
+    import psycopg2
+    import psycopg2.extras
+    import psycopg2.pool
+except ImportError:
+    psycopg2 = None
+
+
+class _Transaction:
+    """
+    Context manager that takes a connection from the pool and executes all queries of the block in one transaction.
+    The transaction is committed if the block finishes and rolled back if the block raises an exception
+    (transactions that only read are always rolled back).
+    """
+
+    def __init__(self, storage: "Postgresql", write: bool):
+        self._storage = storage
+        self._write = write
+        self._conn = None
+        self._cursor = None
+
+    def __enter__(self):
+        self._conn = self._storage._getConnection()
+        try:
+            self._cursor = self._conn.cursor()
+
+        except Exception:
+            self._storage._putConnection(self._conn, True)
+            raise
+
+        return self._cursor
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        broken = False
+        try:
+            self._cursor.close()
+            if exc_type is None and self._write:
+                self._storage._commit(self._conn)
+
+            else:
+                self._conn.rollback()
+
+        except Exception:
+            # Close connections that can not end the transaction (e.g., because the database was restarted).
+            broken = True
+            if exc_type is None:
+                raise
+
+        finally:
+            self._storage._putConnection(self._conn, broken or bool(self._conn.closed))
+
+        return False
+
+
+class Postgresql(_Storage):
+    """
+    Storage backend that stores the alert system in a PostgreSQL database. In contrast to the Sqlite backend,
+    changes are not serialized by a single lock: each call takes a connection from a pool and runs in its own
+    transaction. Changes to the objects of a node lock the row of the node, so changes to different nodes are
+    written in parallel. Changes of many sensors at once (status updates and sensor registrations) are sent
+    as one statement per table.
+    """
+
+    def __init__(self,
+                 globalData: GlobalData,
+                 host: Optional[str] = None,
+                 port: Optional[int] = None,
+                 database: Optional[str] = None,
+                 user: Optional[str] = None,
+                 password: Optional[str] = None,
+                 pool_size: Optional[int] = None):
+        """
+        :param globalData:
+        :param host: host of the database server (None uses the configured host)
+        :param port: port of the database server (None uses the configured port)
+        :param database: name of the database (None uses the configured database)
+        :param user: user used to log into the database (None uses the configured user)
+        :param password: password of the user (None uses the configured password)
+        :param pool_size: maximal number of connections to the database (None uses the configured pool size)
+        """
+
+        if psycopg2 is None:
+            raise ValueError("PostgreSQL storage backend requires pip package 'psycopg2'. "
+                             + "Please install it by executing 'pip3 install psycopg2'.")
+
+        self.globalData = globalData
+        self.logger = self.globalData.logger
+
+        # version of server
+        self.version = self.globalData.version
+        self.rev = self.globalData.rev
+
+        # Used database layout version.
+        self.dbVersion = 9
+
+        # file nme of this file (used for logging)
+        self.log_tag = os.path.basename(__file__)
+
+        if host is None:
+            host = self.globalData.storageBackendPostgresqlHost
+        if port is None:
+            port = self.globalData.storageBackendPostgresqlPort
+        if database is None:
+            database = self.globalData.storageBackendPostgresqlDatabase
+        if user is None:
+            user = self.globalData.storageBackendPostgresqlUser
+        if password is None:
+            password = self.globalData.storageBackendPostgresqlPassword
+        if pool_size is None:
+            pool_size = self.globalData.storageBackendPostgresqlPoolSize
+
+        self._pool_size = pool_size
+
+        # The pool raises an error if all connections are in use
+        # => let the threads wait for a free connection instead.
+        self._pool_semaphore = threading.BoundedSemaphore(self._pool_size)
+
+        self.logger.info("[%s]: Connecting to database '%s' on '%s:%d'." % (self.log_tag, database, host, port))
+        self._pool = psycopg2.pool.ThreadedConnectionPool(1,
+                                                          self._pool_size,
+                                                          host=host,
+                                                          port=port,
+                                                          dbname=database,
+                                                          user=user,
+                                                          password=password)
+
+        # check if the versions are compatible (creates the database if it does not exist)
+        self.checkVersionAndClearConflict()
+
+    def _getConnection(self):
+        """
+        Internal function that takes a connection from the pool (waits if all connections are in use).
+
+        :return: connection
+        """
+        self._pool_semaphore.acquire()
+        try:
+            return self._pool.getconn()
+
+        except Exception:
+            self._pool_semaphore.release()
+            raise
+
+    def _putConnection(self,
+                       conn,
+                       close: bool = False):
+        """
+        Internal function that returns a connection to the pool.
+
+        :param conn:
+        :param close: closes the connection instead of reusing it
+        """
+        try:
+            self._pool.putconn(conn, close=close)
+
+        finally:
+            self._pool_semaphore.release()
+
+    def _transaction(self,
+                     write: bool = False) -> _Transaction:
+        """
+        Internal function that returns a context manager that executes all queries of the block in one transaction.
+
+        :param write: commit the changes of the block
+        :return: context manager that returns a cursor
+        """
+        return _Transaction(self, write)
+
+    def _commit(self, conn):
+        """
+        Internal function that commits the changes to the database and invalidates the cached alert system status.
+
+        :param conn:
+        """
+        conn.commit()
+
+        status_tracker = self.globalData.status_tracker
+        if status_tracker is not None:
+            status_tracker.invalidate()
+
+    def _generateUniqueId(self) -> str:
+        """
+        Internal function that generates a unique id for this server instance.
+
+        :return: freshly generated unique ID
+        """
+        # generate unique id for this installation
+        utcTimestamp = int(time.time())
+        uniqueString = socket.gethostname().encode("ascii") \
+                       + struct.pack("d", utcTimestamp) \
+                       + os.urandom(200)
+        sha256 = hashlib.sha256()
+        sha256.update(uniqueString)
+        uniqueID = sha256.hexdigest()
+
+        return uniqueID
+
+    def _convertNodeTupleToObj(self,
+                               nodeTuple: List[Any]) -> Node:
+        """
+        Internal function that converts a tuple that is fetched from the
+        database by "SELECT id, hostname, username, ... FROM nodes" to an node object.
+
+        :param nodeTuple:
+        :return: a node object
+        """
+        node = Node()
+        node.id = nodeTuple[0]
+        node.hostname = nodeTuple[1]
+        node.username = nodeTuple[2]
+        node.nodeType = nodeTuple[3]
+        node.instance = nodeTuple[4]
+        node.connected = nodeTuple[5]
+        node.version = nodeTuple[6]
+        node.rev = nodeTuple[7]
+        node.persistent = nodeTuple[8]
+        return node
+
+    def _createStorage(self,
+                       cursor,
+                       uniqueID: str):
+        """
+        Internal function that creates the database tables (should only be called if they do not exist).
+        No return value but raise exception if it fails.
+
+        :param cursor:
+        :param uniqueID:
+        """
+        cursor.execute("CREATE TABLE internals ("
+                       + "type TEXT NOT NULL PRIMARY KEY, "
+                       + "value TEXT NOT NULL)")
+
+        cursor.execute("INSERT INTO internals (type, value) VALUES (%s, %s), (%s, %s), (%s, %s)",
+                       ("version", str(self.version),
+                        "dbversion", str(self.dbVersion),
+                        "uniqueID", uniqueID))
+
+        cursor.execute("CREATE TABLE options ("
+                       + "type TEXT NOT NULL PRIMARY KEY, "
+                       + "value INTEGER NOT NULL)")
+
+        # Insert option which profile is currently used by the system.
+        # NOTE: at least one profile with id 0 is enforced during configuration parsing.
+        cursor.execute("INSERT INTO options (type, value) VALUES (%s, %s)", ("profile", 0))
+
+        cursor.execute("CREATE TABLE nodes ("
+                       + "id SERIAL PRIMARY KEY, "
+                       + "hostname TEXT NOT NULL, "
+                       + "username TEXT NOT NULL UNIQUE, "
+                       + "nodeType TEXT NOT NULL, "
+                       + "instance TEXT NOT NULL, "
+                       + "connected INTEGER NOT NULL, "
+                       + "version DOUBLE PRECISION NOT NULL, "
+                       + "rev INTEGER NOT NULL, "
+                       + "persistent INTEGER NOT NULL, "
+                       + "registrationHash TEXT)")
+
+        cursor.execute("CREATE TABLE sensors ("
+                       + "id SERIAL PRIMARY KEY, "
+                       + "nodeId INTEGER NOT NULL REFERENCES nodes(id), "
+                       + "clientSensorId INTEGER NOT NULL, "
+                       + "description TEXT NOT NULL, "
+                       + "state INTEGER NOT NULL, "
+                       + "alertDelay INTEGER NOT NULL, "
+                       + "dataType INTEGER NOT NULL, "
+                       + "error_state INTEGER NOT NULL, "
+                       + "error_msg TEXT NOT NULL)")
+
+        cursor.execute("CREATE TABLE sensorsAlertLevels ("
+                       + "sensorId INTEGER NOT NULL REFERENCES sensors(id), "
+                       + "alertLevel INTEGER NOT NULL, "
+                       + "PRIMARY KEY(sensorId, alertLevel))")
+
+        cursor.execute("CREATE TABLE sensorsDataInt ("
+                       + "sensorId INTEGER NOT NULL PRIMARY KEY REFERENCES sensors(id), "
+                       + "value BIGINT NOT NULL, "
+                       + "unit TEXT NOT NULL)")
+
+        cursor.execute("CREATE TABLE sensorsDataFloat ("
+                       + "sensorId INTEGER NOT NULL PRIMARY KEY REFERENCES sensors(id), "
+                       + "value DOUBLE PRECISION NOT NULL, "
+                       + "unit TEXT NOT NULL)")
+
+        cursor.execute("CREATE TABLE sensorsDataGPS ("
+                       + "sensorId INTEGER NOT NULL PRIMARY KEY REFERENCES sensors(id), "
+                       + "lat DOUBLE PRECISION NOT NULL, "
+                       + "lon DOUBLE PRECISION NOT NULL, "
+                       + "utctime BIGINT NOT NULL)")
+
+        cursor.execute("CREATE TABLE alerts ("
+                       + "id SERIAL PRIMARY KEY, "
+                       + "nodeId INTEGER NOT NULL REFERENCES nodes(id), "
+                       + "clientAlertId INTEGER NOT NULL, "
+                       + "description TEXT NOT NULL)")
+
+        cursor.execute("CREATE TABLE alertsAlertLevels ("
+                       + "alertId INTEGER NOT NULL REFERENCES alerts(id), "
+                       + "alertLevel INTEGER NOT NULL, "
+                       + "PRIMARY KEY(alertId, alertLevel))")
+
+        cursor.execute("CREATE TABLE managers ("
+                       + "id SERIAL PRIMARY KEY, "
+                       + "nodeId INTEGER NOT NULL REFERENCES nodes(id), "
+                       + "description TEXT NOT NULL)")
+
+        # Same indexes as the Sqlite backend for the queries for the objects of a node.
+        cursor.execute("CREATE INDEX sensorsNodeIdClientSensorId ON sensors (nodeId, clientSensorId)")
+        cursor.execute("CREATE INDEX alertsNodeIdClientAlertId ON alerts (nodeId, clientAlertId)")
+        cursor.execute("CREATE INDEX managersNodeId ON managers (nodeId)")
+
+    def _deleteStorage(self,
+                       cursor):
+        """
+        Internal function that deletes the database tables.
+        No return value but raise exception if it fails.
+
+        :param cursor:
+        """
+        cursor.execute("DROP TABLE IF EXISTS "
+                       + "internals, "
+                       + "options, "
+                       + "sensorsAlertLevels, "
+                       + "sensorsDataInt, "
+                       + "sensorsDataFloat, "
+                       + "sensorsDataGPS, "
+                       + "sensors, "
+                       + "alertsAlertLevels, "
+                       + "alerts, "
+                       + "managers, "
+                       + "nodes CASCADE")
+
+    def _lockNode(self,
+                  cursor,
+                  nodeId: int) -> Optional[str]:
+        """
+        Internal function that locks the node until the end of the transaction. All changes to the objects of
+        a node lock the node first, so they are serialized per node and can not deadlock each other.
+
+        :param cursor:
+        :param nodeId:
+        :return: type of the node or None if the node does not exist
+        """
+        cursor.execute("SELECT nodeType FROM nodes WHERE id = %s FOR UPDATE", (nodeId, ))
+        result = cursor.fetchall()
+        return result[0][0] if result else None
+
+    def _getNodeId(self,
+                   cursor,
+                   username: str) -> int:
+        """
+        Internal function that gets the id of a node when a username is given.
+
+        :param cursor:
+        :param username:
+        :return: node id corresponding to username or raised Exception
+        """
+        cursor.execute("SELECT id FROM nodes WHERE username = %s", (username, ))
+        result = cursor.fetchall()
+
+        if len(result) != 1:
+            raise ValueError("Node id was not found.")
+
+        return result[0][0]
+
+    def _getUniqueID(self,
+                     cursor) -> str:
+        """
+        Internal function that gets the unique id from the database.
+
+        :param cursor:
+        :return: unique id (throws exception in error case)
+        """
+        # if unique id already cached => return it
+        if self.globalData.uniqueID is not None:
+            return self.globalData.uniqueID
+
+        cursor.execute("SELECT value FROM internals WHERE type = %s", ("uniqueID", ))
+        self.globalData.uniqueID = cursor.fetchall()[0][0]
+
+        return self.globalData.uniqueID
+
+    def _getClientSensorIds(self,
+                            cursor,
+                            nodeId: int) -> Dict[int, Tuple[int, int]]:
+        """
+        Internal function that gets the sensor ids and data types of all sensors of a node with one query.
+
+        :param cursor:
+        :param nodeId:
+        :return: dictionary of client sensor id -> (sensor id, data type) (throws exception in error case)
+        """
+        cursor.execute("SELECT clientSensorId, id, dataType FROM sensors WHERE nodeId = %s", (nodeId, ))
+        return {x[0]: (x[1], x[2]) for x in cursor.fetchall()}
+
+    def _getNodes(self,
+                  cursor,
+                  condition: str = "",
+                  args: Tuple = ()) -> List[Node]:
+        """
+        Internal function that gets the nodes that match the given condition.
+
+        :param cursor:
+        :param condition: WHERE clause of the query
+        :param args: arguments of the WHERE clause
+        :return: list of nodes (throws exception in error case)
+        """
+        cursor.execute("SELECT id, hostname, username, nodeType, instance, connected, version, rev, persistent "
+                       + "FROM nodes "
+                       + condition
+                       + " ORDER BY id ASC",
+                       args)
+        return [self._convertNodeTupleToObj(x) for x in cursor.fetchall()]
+
+    def _getAlerts(self,
+                   cursor,
+                   condition: str = "",
+                   args: Tuple = ()) -> List[Alert]:
+        """
+        Internal function that gets the alerts that match the given condition together with their alert levels.
+
+        :param cursor:
+        :param condition: WHERE clause of the query
+        :param args: arguments of the WHERE clause
+        :return: list of alerts (throws exception in error case)
+        """
+        cursor.execute("SELECT id, nodeId, clientAlertId, description FROM alerts "
+                       + condition
+                       + " ORDER BY id ASC",
+                       args)
+
+        alerts = collections.OrderedDict()  # type: Dict[int, Alert]
+        for alert_tuple in cursor.fetchall():
+            alert = Alert()
+            alert.alertId = alert_tuple[0]
+            alert.nodeId = alert_tuple[1]
+            alert.clientAlertId = alert_tuple[2]
+            alert.description = alert_tuple[3]
+            alerts[alert.alertId] = alert
+
+        if alerts:
+            cursor.execute("SELECT alertId, alertLevel FROM alertsAlertLevels "
+                           + "WHERE alertId = ANY(%s) ORDER BY alertLevel ASC",
+                           (list(alerts.keys()), ))
+            for alert_id, alert_level in cursor.fetchall():
+                alerts[alert_id].alertLevels.append(alert_level)
+
+        return list(alerts.values())
+
+    def _getManagers(self,
+                     cursor,
+                     condition: str = "",
+                     args: Tuple = ()) -> List[Manager]:
+        """
+        Internal function that gets the managers that match the given condition.
+
+        :param cursor:
+        :param condition: WHERE clause of the query
+        :param args: arguments of the WHERE clause
+        :return: list of managers (throws exception in error case)
+        """
+        cursor.execute("SELECT id, nodeId, description FROM managers "
+                       + condition
+                       + " ORDER BY id ASC",
+                       args)
+
+        managers = list()
+        for manager_tuple in cursor.fetchall():
+            manager = Manager()
+            manager.managerId = manager_tuple[0]
+            manager.nodeId = manager_tuple[1]
+            manager.description = manager_tuple[2]
+            managers.append(manager)
+
+        return managers
+
+    def _getSensors(self,
+                    cursor,
+                    condition: str = "",
+                    args: Tuple = ()) -> List[Sensor]:
+        """
+        Internal function that gets the sensors that match the given condition together with their alert levels
+        and data (with one query per table regardless of the number of sensors).
+
+        :param cursor:
+        :param condition: WHERE clause of the query
+        :param args: arguments of the WHERE clause
+        :return: list of sensors (throws exception in error case)
+        """
+        cursor.execute("SELECT id, "
+                       + "nodeId, "
+                       + "clientSensorId, "
+                       + "description, "
+                       + "state, "
+                       + "alertDelay, "
+                       + "dataType, "
+                       + "error_state, "
+                       + "error_msg "
+                       + "FROM sensors "
+                       + condition
+                       + " ORDER BY id ASC",
+                       args)
+
+        sensors = collections.OrderedDict()  # type: Dict[int, Sensor]
+        for sensor_tuple in cursor.fetchall():
+            sensor = Sensor()
+            sensor.sensorId = sensor_tuple[0]
+            sensor.nodeId = sensor_tuple[1]
+            sensor.clientSensorId = sensor_tuple[2]
+            sensor.description = sensor_tuple[3]
+            sensor.state = sensor_tuple[4]
+            sensor.alertDelay = sensor_tuple[5]
+            sensor.dataType = sensor_tuple[6]
+            sensor.error_state = SensorErrorState(sensor_tuple[7], sensor_tuple[8])
+            if sensor.dataType == SensorDataType.NONE:
+                sensor.data = SensorDataNone()
+            sensors[sensor.sensorId] = sensor
+
+        if not sensors:
+            return []
+
+        sensor_ids = list(sensors.keys())
+        cursor.execute("SELECT sensorId, alertLevel FROM sensorsAlertLevels "
+                       + "WHERE sensorId = ANY(%s) ORDER BY alertLevel ASC",
+                       (sensor_ids, ))
+        for sensor_id, alert_level in cursor.fetchall():
+            sensors[sensor_id].alertLevels.append(alert_level)
+
+        cursor.execute("SELECT sensorId, value, unit FROM sensorsDataInt WHERE sensorId = ANY(%s)", (sensor_ids, ))
+        for sensor_id, value, unit in cursor.fetchall():
+            if sensors[sensor_id].dataType == SensorDataType.INT:
+                sensors[sensor_id].data = SensorDataInt(value, unit)
+
+        cursor.execute("SELECT sensorId, value, unit FROM sensorsDataFloat WHERE sensorId = ANY(%s)", (sensor_ids, ))
+        for sensor_id, value, unit in cursor.fetchall():
+            if sensors[sensor_id].dataType == SensorDataType.FLOAT:
+                sensors[sensor_id].data = SensorDataFloat(value, unit)
+
+        cursor.execute("SELECT sensorId, lat, lon, utctime FROM sensorsDataGPS WHERE sensorId = ANY(%s)",
+                       (sensor_ids, ))
+        for sensor_id, lat, lon, utctime in cursor.fetchall():
+            if sensors[sensor_id].dataType == SensorDataType.GPS:
+                sensors[sensor_id].data = SensorDataGPS(lat, lon, utctime)
+
+        for sensor in sensors.values():
+            if sensor.data is None:
+                raise ValueError("Unable to get data for sensor id %d." % sensor.sensorId)
+
+        return list(sensors.values())
+
+    def _deleteSensors(self,
+                       cursor,
+                       sensorIds: List[int],
+                       data_only: bool = False):
+        """
+        Internal function that deletes the sensors given by their ids together with their alert levels and data.
+
+        :param cursor:
+        :param sensorIds:
+        :param data_only: only delete the alert levels and data of the sensors
+        """
+        if not sensorIds:
+            return
+
+        for table in ["sensorsDataInt", "sensorsDataFloat", "sensorsDataGPS", "sensorsAlertLevels"]:
+            cursor.execute("DELETE FROM " + table + " WHERE sensorId = ANY(%s)", (sensorIds, ))
+
+        if not data_only:
+            cursor.execute("DELETE FROM sensors WHERE id = ANY(%s)", (sensorIds, ))
+
+    def _deleteObjectsForNodeId(self,
+                                cursor,
+                                nodeId: int,
+                                nodeType: str):
+        """
+        Internal function that deletes all sensors, alerts or the manager of a node depending on its type.
+
+        :param cursor:
+        :param nodeId:
+        :param nodeType:
+        """
+        # Nodes of type "server" have the internal sensors.
+        if nodeType in ["sensor", "server"]:
+            cursor.execute("SELECT id FROM sensors WHERE nodeId = %s", (nodeId, ))
+            self._deleteSensors(cursor, [x[0] for x in cursor.fetchall()])
+
+        elif nodeType == "alert":
+            cursor.execute("DELETE FROM alertsAlertLevels "
+                           + "WHERE alertId IN (SELECT id FROM alerts WHERE nodeId = %s)",
+                           (nodeId, ))
+            cursor.execute("DELETE FROM alerts WHERE nodeId = %s", (nodeId, ))
+
+        elif nodeType == "manager":
+            cursor.execute("DELETE FROM managers WHERE nodeId = %s", (nodeId, ))
+
+        else:
+            raise ValueError("Unknown node type '%s' for node with id %d." % (nodeType, nodeId))
+
+    def _updateSensorState(self,
+                           cursor,
+                           stateList: List[Tuple[int, int]],
+                           clientSensorIds: Dict[int, Tuple[int, int]]):
+        """
+        Internal function that updates the states of the sensors of a node with one statement.
+
+        :param cursor:
+        :param stateList:
+        :param clientSensorIds: sensor ids of the node (see _getClientSensorIds())
+        """
+        if not stateList:
+            return
+
+        # stateList is a list of tuples of (clientSensorId, state)
+        # (if a sensor is given multiple times, the last state is stored).
+        updates = dict()
+        for clientSensorId, state in stateList:
+            if clientSensorId not in clientSensorIds:
+                raise ValueError("Sensor with client id %d does not exist in database." % clientSensorId)
+
+            updates[clientSensorIds[clientSensorId][0]] = state
+
+        sensorIds = sorted(updates.keys())
+        cursor.execute("UPDATE sensors SET state = data.state "
+                       + "FROM unnest(%s::integer[], %s::integer[]) AS data (id, state) "
+                       + "WHERE sensors.id = data.id",
+                       (sensorIds, [updates[x] for x in sensorIds]))
+
+    def _updateSensorData(self,
+                          cursor,
+                          dataList: List[Tuple[int, _SensorData]],
+                          clientSensorIds: Dict[int, Tuple[int, int]]):
+        """
+        Internal function that updates the data of the sensors of a node with one statement per data table.
+
+        :param cursor:
+        :param dataList:
+        :param clientSensorIds: sensor ids of the node (see _getClientSensorIds())
+        """
+        if not dataList:
+            return
+
+        # Collect the updates for each data table to update all sensors of a data type at once.
+        intUpdates = dict()
+        floatUpdates = dict()
+        gpsUpdates = dict()
+
+        # dataList is a list of tuples of (clientSensorId, data)
+        for clientSensorId, data in dataList:
+            if clientSensorId not in clientSensorIds:
+                raise ValueError("Sensor with client id %d does not exist in database." % clientSensorId)
+
+            sensorId, dataType = clientSensorIds[clientSensorId]
+
+            if dataType == SensorDataType.INT:
+                # noinspection PyUnresolvedReferences
+                intUpdates[sensorId] = (sensorId, data.value, data.unit)
+
+            elif dataType == SensorDataType.FLOAT:
+                # noinspection PyUnresolvedReferences
+                floatUpdates[sensorId] = (sensorId, data.value, data.unit)
+
+            elif dataType == SensorDataType.GPS:
+                # noinspection PyUnresolvedReferences
+                gpsUpdates[sensorId] = (sensorId, data.lat, data.lon, data.utctime)
+
+        if intUpdates:
+            cursor.execute("UPDATE sensorsDataInt SET value = data.value, unit = data.unit "
+                           + "FROM unnest(%s::integer[], %s::bigint[], %s::text[]) AS data (sensorId, value, unit) "
+                           + "WHERE sensorsDataInt.sensorId = data.sensorId",
+                           [list(x) for x in zip(*sorted(intUpdates.values()))])
+
+        if floatUpdates:
+            cursor.execute("UPDATE sensorsDataFloat SET value = data.value, unit = data.unit "
+                           + "FROM unnest(%s::integer[], %s::double precision[], %s::text[]) "
+                           + "AS data (sensorId, value, unit) "
+                           + "WHERE sensorsDataFloat.sensorId = data.sensorId",
+                           [list(x) for x in zip(*sorted(floatUpdates.values()))])
+
+        if gpsUpdates:
+            cursor.execute("UPDATE sensorsDataGPS SET lat = data.lat, lon = data.lon, utctime = data.utctime "
+                           + "FROM unnest(%s::integer[], %s::double precision[], %s::double precision[], "
+                           + "%s::bigint[]) AS data (sensorId, lat, lon, utctime) "
+                           + "WHERE sensorsDataGPS.sensorId = data.sensorId",
+                           [list(x) for x in zip(*sorted(gpsUpdates.values()))])
+
+    def _addSensorHistory(self,
+                          clientSensorIds: Dict[int, Tuple[int, int]],
+                          stateList: List[Tuple[int, int]],
+                          dataList: List[Tuple[int, _SensorData]],
+                          historyList: Optional[List[Tuple[int, Optional[int], Optional[_SensorData]]]] = None):
+        """
+        Internal function that adds the updated states and data of the sensors of a node to the sensor history.
+
+        :param clientSensorIds: sensor ids of the node (see _getClientSensorIds())
+        :param stateList:
+        :param dataList:
+        :param historyList: changes that are recorded each on its own instead of the merged state and data
+        """
+        if historyList is not None:
+            historyEntries = list()
+            for clientSensorId, state, data in historyList:
+                sensorId, dataType = clientSensorIds[clientSensorId]
+                if dataType == SensorDataType.NONE:
+                    data = None
+                historyEntries.append((sensorId, state, data))
+
+            self.globalData.sensor_history.add(historyEntries)
+            return
+
+        # Merge the state and data of each sensor into one entry.
+        entries = collections.OrderedDict()
+        for clientSensorId, state in stateList:
+            entries[clientSensorIds[clientSensorId][0]] = [state, None]
+
+        for clientSensorId, data in dataList:
+            sensorId, dataType = clientSensorIds[clientSensorId]
+            if dataType == SensorDataType.NONE:
+                continue
+            entries.setdefault(sensorId, [None, None])[1] = data
+
+        self.globalData.sensor_history.add([(sensorId, state, data) for sensorId, (state, data) in entries.items()])
+
+    def _upsertSensors(self,
+                       cursor,
+                       node_id: int,
+                       sensors: List[Sensor],
+                       delete_missing: bool,
+                       logger: logging.Logger):
+        """
+        Internal function that inserts/updates sensors of a node with one statement per table regardless of the
+        number of sensors. The node has to be locked by the caller.
+
+        :param cursor:
+        :param node_id:
+        :param sensors:
+        :param delete_missing: delete all sensors of the node that are not part of the given sensors
+        :param logger:
+        """
+        # If a sensor is given multiple times, the last one is stored (as if each sensor was upserted on its own).
+        sensors_by_client_id = collections.OrderedDict()  # type: Dict[int, Sensor]
+        for sensor in sensors:
+            sensors_by_client_id[sensor.clientSensorId] = sensor
+
+        for sensor in sensors_by_client_id.values():
+            if sensor.dataType not in [SensorDataType.NONE,
+                                       SensorDataType.INT,
+                                       SensorDataType.FLOAT,
+                                       SensorDataType.GPS]:
+                raise ValueError("Data type unknown. Unable to add data for sensor with client id %d."
+                                 % sensor.clientSensorId)
+
+        client_sensor_ids = self._getClientSensorIds(cursor, node_id)
+
+        # Update existing sensors.
+        existing_sensors = [x for x in sensors_by_client_id.values() if x.clientSensorId in client_sensor_ids]
+        if existing_sensors:
+            psycopg2.extras.execute_values(cursor,
+                                           "UPDATE sensors SET "
+                                           + "description = data.description, "
+                                           + "state = data.state, "
+                                           + "alertDelay = data.alertDelay, "
+                                           + "dataType = data.dataType, "
+                                           + "error_state = data.error_state, "
+                                           + "error_msg = data.error_msg "
+                                           + "FROM (VALUES %s) AS data "
+                                           + "(id, description, state, alertDelay, dataType, error_state, error_msg) "
+                                           + "WHERE sensors.id = data.id",
+                                           [(client_sensor_ids[x.clientSensorId][0],
+                                             x.description,
+                                             x.state,
+                                             x.alertDelay,
+                                             x.dataType,
+                                             x.error_state.state,
+                                             x.error_state.msg) for x in existing_sensors],
+                                           template="(%s::integer, %s::text, %s::integer, %s::integer, "
+                                                    + "%s::integer, %s::integer, %s::text)",
+                                           page_size=len(existing_sensors))
+
+        # Add new sensors.
+        new_sensors = [x for x in sensors_by_client_id.values() if x.clientSensorId not in client_sensor_ids]
+        if new_sensors:
+            for sensor in new_sensors:
+                logger.info("[%s]: Sensor on node id %d with client id %d does not exist in database. Adding it."
+                            % (self.log_tag, node_id, sensor.clientSensorId))
+
+            result = psycopg2.extras.execute_values(cursor,
+                                                    "INSERT INTO sensors ("
+                                                    + "nodeId, "
+                                                    + "clientSensorId, "
+                                                    + "description, "
+                                                    + "state, "
+                                                    + "alertDelay, "
+                                                    + "dataType, "
+                                                    + "error_state, "
+                                                    + "error_msg) VALUES %s "
+                                                    + "RETURNING clientSensorId, id, dataType",
+                                                    [(node_id,
+                                                      x.clientSensorId,
+                                                      x.description,
+                                                      x.state,
+                                                      x.alertDelay,
+                                                      x.dataType,
+                                                      x.error_state.state,
+                                                      x.error_state.msg) for x in new_sensors],
+                                                    page_size=len(new_sensors),
+                                                    fetch=True)
+            for client_sensor_id, sensor_id, data_type in result:
+                client_sensor_ids[client_sensor_id] = (sensor_id, data_type)
+
+        # Remove alert levels and data of existing sensors and all sensors that were not part of
+        # the given sensors.
+        self._deleteSensors(cursor,
+                            [client_sensor_ids[x.clientSensorId][0] for x in existing_sensors],
+                            data_only=True)
+        if delete_missing:
+            self._deleteSensors(cursor,
+                                [sensor_id for client_sensor_id, (sensor_id, _) in client_sensor_ids.items()
+                                 if client_sensor_id not in sensors_by_client_id])
+
+        # Add alert levels and data of all given sensors.
+        alert_levels = set()
+        int_data = list()
+        float_data = list()
+        gps_data = list()
+        for sensor in sensors_by_client_id.values():
+            sensor_id = client_sensor_ids[sensor.clientSensorId][0]
+            for alert_level in sensor.alertLevels:
+                alert_levels.add((sensor_id, alert_level))
+
+            if sensor.dataType == SensorDataType.INT:
+                data = cast(SensorDataInt, sensor.data)
+                int_data.append((sensor_id, data.value, data.unit))
+
+            elif sensor.dataType == SensorDataType.FLOAT:
+                data = cast(SensorDataFloat, sensor.data)
+                float_data.append((sensor_id, data.value, data.unit))
+
+            elif sensor.dataType == SensorDataType.GPS:
+                data = cast(SensorDataGPS, sensor.data)
+                gps_data.append((sensor_id, data.lat, data.lon, data.utctime))
+
+        for table, columns, rows in [("sensorsAlertLevels", "(sensorId, alertLevel)", sorted(alert_levels)),
+                                     ("sensorsDataInt", "(sensorId, value, unit)", int_data),
+                                     ("sensorsDataFloat", "(sensorId, value, unit)", float_data),
+                                     ("sensorsDataGPS", "(sensorId, lat, lon, utctime)", gps_data)]:
+            if rows:
+                psycopg2.extras.execute_values(cursor,
+                                               "INSERT INTO " + table + " " + columns + " VALUES %s",
+                                               rows,
+                                               page_size=len(rows))
+
+    def checkVersionAndClearConflict(self,
+                                     logger: logging.Logger = None):
+
+        # Set logger instance to use.
+        if not logger:
+            logger = self.logger
+
+        with self._transaction(write=True) as cursor:
+
+            # Serialize the check in case multiple servers are started at the same time.
+            cursor.execute("SELECT pg_advisory_xact_lock(%s)", (self.dbVersion, ))
+
+            cursor.execute("SELECT to_regclass(%s)", ("internals", ))
+            if cursor.fetchall()[0][0] is None:
+                logger.info("[%s]: No database found. Creating new one." % self.log_tag)
+                self._createStorage(cursor, self._generateUniqueId())
+                return
+
+            # get version from the current database
+            cursor.execute("SELECT value FROM internals WHERE type = %s", ("dbversion", ))
+            result = cursor.fetchall()
+
+            # In case the current database does not have any db version
+            # set it.
+            if result:
+                currDbVersion = int(result[0][0])
+
+            else:
+                currDbVersion = -1
+
+            # Version 8 only lacks the registration hashes of the nodes
+            # => add them without clearing the database.
+            if currDbVersion == 8:
+                logger.info("[%s]: Adding registration hashes to database layout version '%d'."
+                            % (self.log_tag, currDbVersion))
+                cursor.execute("ALTER TABLE nodes ADD COLUMN IF NOT EXISTS registrationHash TEXT")
+                cursor.execute("UPDATE internals SET value = %s WHERE type = %s", (str(self.dbVersion), "dbversion"))
+
+            # If the versions are not compatible
+            # => update database schema.
+            elif currDbVersion < self.dbVersion:
+
+                logger.info("[%s]: Needed database version '%d' not compatible "
+                            % (self.log_tag, self.dbVersion)
+                            + "with current database layout version '%d'. Updating database." % currDbVersion)
+
+                # get old uniqueId to keep it
+                try:
+                    uniqueID = self._getUniqueID(cursor)
+
+                except Exception as e:
+                    uniqueID = self._generateUniqueId()
+
+                self._deleteStorage(cursor)
+                self._createStorage(cursor, uniqueID)
+
+            # Raise an exception if database layout version
+            # is newer than the one we need.
+            elif currDbVersion > self.dbVersion:
+                raise ValueError("Current database layout version ('%d') newer than the one this server uses ('%d')."
+                                 % (currDbVersion, self.dbVersion))
+
+    def addNode(self,
+                username: str,
+                hostname: str,
+                nodeType: str,
+                instance: str,
+                version: float,
+                rev: int,
+                persistent: int,
+                logger: logging.Logger = None) -> bool:
+
+        # Set logger instance to use.
+        if not logger:
+            logger = self.logger
+
+        try:
+            with self._transaction(write=True) as cursor:
+
+                # NOTE: connection state is changed later on in the registration process
+                # (a node that is added in parallel by another connection is updated below).
+                cursor.execute("INSERT INTO nodes ("
+                               + "hostname, "
+                               + "username, "
+                               + "nodeType, "
+                               + "instance, "
+                               + "connected, "
+                               + "version, "
+                               + "rev, "
+                               + "persistent) VALUES (%s, %s, %s, %s, %s, %s, %s, %s) "
+                               + "ON CONFLICT (username) DO NOTHING "
+                               + "RETURNING id",
+                               (hostname, username, nodeType, instance, 0, version, rev, persistent))
+                if cursor.fetchall():
+                    logger.info("[%s]: Node with username '%s' does not exist in database. Added it."
+                                % (self.log_tag, username))
+                    return True
+
+                logger.info("[%s]: Node with username '%s' already exists in database."
+                            % (self.log_tag, username))
+
+                cursor.execute("SELECT id, "
+                               + "hostname, "
+                               + "nodeType, "
+                               + "instance, "
+                               + "version, "
+                               + "rev, "
+                               + "persistent "
+                               + "FROM nodes WHERE username = %s FOR UPDATE",
+                               (username, ))
+                nodeId, dbHostname, dbNodeType, dbInstance, dbVersion, dbRev, dbPersistent = cursor.fetchall()[0]
+
+                if dbHostname != hostname:
+                    logger.info("[%s]: Hostname of node has changed from '%s' to '%s'. Updating database."
+                                % (self.log_tag, dbHostname, hostname))
+
+                if dbInstance != instance:
+                    logger.info("[%s]: Instance of node has changed from '%s' to '%s'. Updating database."
+                                % (self.log_tag, dbInstance, instance))
+
+                if dbVersion != version:
+                    logger.info("[%s]: Version of node has changed from '%.3f' to '%.3f'. Updating database."
+                                % (self.log_tag, dbVersion, version))
+
+                if dbRev != rev:
+                    logger.info("[%s]: Revision of node has changed from '%d' to '%d'. Updating database."
+                                % (self.log_tag, dbRev, rev))
+
+                if dbPersistent != persistent:
+                    logger.info("[%s]: Persistent flag of node has changed from '%d' to '%d'. Updating database."
+                                % (self.log_tag, dbPersistent, persistent))
+
+                # if node type has changed
+                # => delete sensors/alerts/manager information of old node
+                if dbNodeType != nodeType:
+                    logger.info("[%s]: Type of node has changed from '%s' to '%s'. Updating database."
+                                % (self.log_tag, dbNodeType, nodeType))
+                    self._deleteObjectsForNodeId(cursor, nodeId, dbNodeType)
+
+                if (dbHostname, dbNodeType, dbInstance, dbVersion, dbRev, dbPersistent) \
+                        != (hostname, nodeType, instance, version, rev, persistent):
+                    cursor.execute("UPDATE nodes SET "
+                                   + "hostname = %s, "
+                                   + "nodeType = %s, "
+                                   + "instance = %s, "
+                                   + "version = %s, "
+                                   + "rev = %s, "
+                                   + "persistent = %s "
+                                   + "WHERE id = %s",
+                                   (hostname, nodeType, instance, version, rev, persistent, nodeId))
+
+        except Exception as e:
+            logger.exception("[%s]: Unable to add node with username '%s'." % (self.log_tag, username))
+            return False
+
+        return True
+
+    def addAlerts(self,
+                  username: str,
+                  alerts: List[Dict[str, Any]],
+                  logger: logging.Logger = None) -> bool:
+
+        # Set logger instance to use.
+        if not logger:
+            logger = self.logger
+
+        try:
+            with self._transaction(write=True) as cursor:
+                nodeId = self._getNodeId(cursor, username)
+                self._lockNode(cursor, nodeId)
+
+                cursor.execute("SELECT clientAlertId, id, description FROM alerts WHERE nodeId = %s", (nodeId, ))
+                dbAlerts = {x[0]: (x[1], x[2]) for x in cursor.fetchall()}
+
+                clientAlertIds = set()
+                for alert in alerts:
+                    clientAlertId = int(alert["clientAlertId"])
+                    description = str(alert["description"])
+                    alertLevels = set(alert["alertLevels"])
+                    clientAlertIds.add(clientAlertId)
+
+                    # if the alert does not exist
+                    # => add it
+                    if clientAlertId not in dbAlerts:
+                        logger.info("[%s]: Alert with client id '%d' does not exist in database. Adding it."
+                                    % (self.log_tag, clientAlertId))
+
+                        cursor.execute("INSERT INTO alerts ("
+                                       + "nodeId, "
+                                       + "clientAlertId, "
+                                       + "description) VALUES (%s, %s, %s) "
+                                       + "RETURNING id",
+                                       (nodeId, clientAlertId, description))
+                        alertId = cursor.fetchall()[0][0]
+                        dbAlerts[clientAlertId] = (alertId, description)
+                        dbAlertLevels = set()
+
+                    # if the alert does already exist
+                    # => check if everything is the same
+                    else:
+                        logger.info("[%s]: Alert with client id '%d' already exists in database."
+                                    % (self.log_tag, clientAlertId))
+
+                        alertId, dbDescription = dbAlerts[clientAlertId]
+                        if dbDescription != description:
+                            logger.info("[%s]: Description of alert has changed from '%s' to '%s'. "
+                                        % (self.log_tag, dbDescription, description)
+                                        + "Updating database.")
+                            cursor.execute("UPDATE alerts SET description = %s WHERE id = %s",
+                                           (description, alertId))
+
+                        cursor.execute("SELECT alertLevel FROM alertsAlertLevels WHERE alertId = %s", (alertId, ))
+                        dbAlertLevels = set([x[0] for x in cursor.fetchall()])
+
+                    for alertLevel in sorted(alertLevels - dbAlertLevels):
+                        cursor.execute("INSERT INTO alertsAlertLevels (alertId, alertLevel) VALUES (%s, %s)",
+                                       (alertId, alertLevel))
+
+                    removedAlertLevels = dbAlertLevels - alertLevels
+                    if removedAlertLevels:
+                        logger.info("[%s]: Alert levels %s in database do not exist anymore for alert. Deleting them."
+                                    % (self.log_tag, sorted(removedAlertLevels)))
+                        cursor.execute("DELETE FROM alertsAlertLevels WHERE alertId = %s AND alertLevel = ANY(%s)",
+                                       (alertId, list(removedAlertLevels)))
+
+                # check if the alerts from the database
+                # do still exist for the node
+                # => delete alert if it does not
+                removedAlertIds = list()
+                for clientAlertId, (alertId, _) in dbAlerts.items():
+                    if clientAlertId not in clientAlertIds:
+                        logger.info("[%s]: Alert with client id '%d' in database does not exist anymore "
+                                    % (self.log_tag, clientAlertId)
+                                    + "for the node. Deleting it.")
+                        removedAlertIds.append(alertId)
+
+                if removedAlertIds:
+                    cursor.execute("DELETE FROM alertsAlertLevels WHERE alertId = ANY(%s)", (removedAlertIds, ))
+                    cursor.execute("DELETE FROM alerts WHERE id = ANY(%s)", (removedAlertIds, ))
+
+        except Exception as e:
+            logger.exception("[%s]: Unable to add alerts of node with username '%s'." % (self.log_tag, username))
+            return False
+
+        return True
+
+    def addManager(self,
+                   username: str,
+                   manager: Dict[str, Any],
+                   logger: logging.Logger = None) -> bool:
+
+        # Set logger instance to use.
+        if not logger:
+            logger = self.logger
+
+        try:
+            with self._transaction(write=True) as cursor:
+                nodeId = self._getNodeId(cursor, username)
+                self._lockNode(cursor, nodeId)
+
+                description = str(manager["description"])
+                cursor.execute("SELECT id, description FROM managers WHERE nodeId = %s", (nodeId, ))
+                result = cursor.fetchall()
+
+                # if the manager does not exist
+                # => add it
+                if not result:
+                    logger.info("[%s]: Manager does not exist in database. Adding it." % self.log_tag)
+                    cursor.execute("INSERT INTO managers (nodeId, description) VALUES (%s, %s)",
+                                   (nodeId, description))
+
+                # if the manager does already exist
+                # => check if everything is the same
+                else:
+                    logger.info("[%s]: Manager already exists in database." % self.log_tag)
+
+                    managerId, dbDescription = result[0]
+                    if dbDescription != description:
+                        logger.info("[%s]: Description of manager has changed from '%s' to '%s'. Updating database."
+                                    % (self.log_tag, dbDescription, description))
+                        cursor.execute("UPDATE managers SET description = %s WHERE id = %s",
+                                       (description, managerId))
+
+        except Exception as e:
+            logger.exception("[%s]: Unable to add manager of node with username '%s'." % (self.log_tag, username))
+            return False
+
+        return True
+
+    def getNodeId(self,
+                  username: str,
+                  logger: logging.Logger = None) -> Optional[int]:
+
+        # Set logger instance to use.
+        if not logger:
+            logger = self.logger
+
+        try:
+            with self._transaction() as cursor:
+                return self._getNodeId(cursor, username)
+
+        except Exception as e:
+            logger.exception("[%s]: Unable to get node id." % self.log_tag)
+
+        return None
+
+    def getNodeIds(self,
+                   logger: logging.Logger = None) -> List[int]:
+
+        # Set logger instance to use.
+        if not logger:
+            logger = self.logger
+
+        try:
+            with self._transaction() as cursor:
+                cursor.execute("SELECT id FROM nodes ORDER BY id ASC")
+                return [x[0] for x in cursor.fetchall()]
+
+        except Exception as e:
+            logger.exception("[%s]: Unable to get node ids." % self.log_tag)
+
+        return list()
+
+    def getSensorCount(self,
+                       nodeId: int,
+                       logger: logging.Logger = None) -> Optional[int]:
+
+        # Set logger instance to use.
+        if not logger:
+            logger = self.logger
+
+        try:
+            with self._transaction() as cursor:
+                cursor.execute("SELECT COUNT(*) FROM sensors WHERE nodeId = %s", (nodeId, ))
+                return cursor.fetchall()[0][0]
+
+        except Exception as e:
+            logger.exception("[%s]: Unable to get sensor count." % self.log_tag)
+
+        return None
+
+    def getSensorId(self,
+                    nodeId: int,
+                    clientSensorId: int,
+                    logger: logging.Logger = None) -> Optional[int]:
+
+        # Set logger instance to use.
+        if not logger:
+            logger = self.logger
+
+        try:
+            with self._transaction() as cursor:
+                cursor.execute("SELECT id FROM sensors WHERE nodeId = %s AND clientSensorId = %s",
+                               (nodeId, clientSensorId))
+                result = cursor.fetchall()
+
+        except Exception as e:
+            logger.exception("[%s]: Unable to get sensorId from database." % self.log_tag)
+            return None
+
+        if len(result) != 1:
+            logger.error("[%s]: Sensor on node id %d with client id %d does not exist in database."
+                         % (self.log_tag, nodeId, clientSensorId))
+            return None
+
+        return result[0][0]
+
+    def getSurveyData(self,
+                      logger: logging.Logger = None) -> Optional[List[Tuple[str, float, int]]]:
+
+        # Set logger instance to use.
+        if not logger:
+            logger = self.logger
+
+        try:
+            with self._transaction() as cursor:
+                cursor.execute("SELECT instance, version, rev FROM nodes")
+                return cursor.fetchall()
+
+        except Exception as e:
+            logger.exception("[%s]: Unable to get survey data." % self.log_tag)
+
+        return None
+
+    def getUniqueID(self,
+                    logger: logging.Logger = None) -> Optional[str]:
+
+        # Set logger instance to use.
+        if not logger:
+            logger = self.logger
+
+        try:
+            with self._transaction() as cursor:
+                return self._getUniqueID(cursor)
+
+        except Exception as e:
+            logger.exception("[%s]: Unable to get the unique id." % self.log_tag)
+
+        return None
+
+    def getAlertId(self,
+                   nodeId: int,
+                   clientAlertId: int,
+                   logger: logging.Logger = None) -> Optional[int]:
+
+        # Set logger instance to use.
+        if not logger:
+            logger = self.logger
+
+        try:
+            with self._transaction() as cursor:
+                cursor.execute("SELECT id FROM alerts WHERE nodeId = %s AND clientAlertId = %s",
+                               (nodeId, clientAlertId))
+                result = cursor.fetchall()
+
+        except Exception as e:
+            logger.exception("[%s]: Unable to get alertId from database." % self.log_tag)
+            return None
+
+        if len(result) != 1:
+            logger.error("[%s]: Alert on node id %d with client id %d does not exist in database."
+                         % (self.log_tag, nodeId, clientAlertId))
+            return None
+
+        return result[0][0]
+
+    def getSensorAlertLevels(self,
+                             sensorId: int,
+                             logger: logging.Logger = None) -> Optional[List[int]]:
+
+        # Set logger instance to use.
+        if not logger:
+            logger = self.logger
+
+        try:
+            with self._transaction() as cursor:
+                cursor.execute("SELECT alertLevel FROM sensorsAlertLevels WHERE sensorId = %s", (sensorId, ))
+                return [x[0] for x in cursor.fetchall()]
+
+        except Exception as e:
+            logger.exception("[%s]: Unable to get alert levels for sensor with id %d." % (self.log_tag, sensorId))
+
+        return None
+
+    def getAlertAlertLevels(self,
+                            alertId: int,
+                            logger: logging.Logger = None) -> Optional[List[int]]:
+
+        # Set logger instance to use.
+        if not logger:
+            logger = self.logger
+
+        try:
+            with self._transaction() as cursor:
+                cursor.execute("SELECT alertLevel FROM alertsAlertLevels WHERE alertId = %s", (alertId, ))
+                return [x[0] for x in cursor.fetchall()]
+
+        except Exception as e:
+            logger.exception("[%s]: Unable to get alert levels for alert with id %d." % (self.log_tag, alertId))
+
+        return None
+
+    def getAllAlertsAlertLevels(self,
+                                logger: logging.Logger = None) -> Optional[List[int]]:
+
+        # Set logger instance to use.
+        if not logger:
+            logger = self.logger
+
+        try:
+            with self._transaction() as cursor:
+                cursor.execute("SELECT alertLevel FROM alertsAlertLevels")
+                return [x[0] for x in cursor.fetchall()]
+
+        except Exception as e:
+            logger.exception("[%s]: Unable to get all alert levels for alert clients." % self.log_tag)
+
+        return None
+
+    def getAllSensorsAlertLevels(self,
+                                 logger: logging.Logger = None) -> Optional[List[int]]:
+
+        # Set logger instance to use.
+        if not logger:
+            logger = self.logger
+
+        try:
+            with self._transaction() as cursor:
+                cursor.execute("SELECT alertLevel FROM sensorsAlertLevels")
+                return [x[0] for x in cursor.fetchall()]
+
+        except Exception as e:
+            logger.exception("[%s]: Unable to get all alert levels for sensors." % self.log_tag)
+
+        return None
+
+    def getAllConnectedNodeIds(self,
+                               logger: logging.Logger = None) -> Optional[List[int]]:
+
+        # Set logger instance to use.
+        if not logger:
+            logger = self.logger
+
+        try:
+            with self._transaction() as cursor:
+                cursor.execute("SELECT id FROM nodes WHERE connected = %s", (1, ))
+                return [x[0] for x in cursor.fetchall()]
+
+        except Exception as e:
+            logger.exception("[%s]: Unable to get all connected node ids." % self.log_tag)
+
+        return None
+
+    def getAllPersistentNodeIds(self,
+                                logger: logging.Logger = None) -> Optional[List[int]]:
+
+        # Set logger instance to use.
+        if not logger:
+            logger = self.logger
+
+        try:
+            with self._transaction() as cursor:
+                cursor.execute("SELECT id FROM nodes WHERE persistent = %s", (1, ))
+                return [x[0] for x in cursor.fetchall()]
+
+        except Exception as e:
+            logger.exception("[%s]: Unable to get all persistent node ids." % self.log_tag)
+
+        return None
+
+    def getAlertById(self,
+                     alertId: int,
+                     logger: logging.Logger = None) -> Optional[Alert]:
+
+        # Set logger instance to use.
+        if not logger:
+            logger = self.logger
+
+        try:
+            with self._transaction() as cursor:
+                alerts = self._getAlerts(cursor, "WHERE id = %s", (alertId, ))
+                return alerts[0] if alerts else None
+
+        except Exception as e:
+            logger.exception("[%s]: Unable to get alert with id %d." % (self.log_tag, alertId))
+
+        return None
+
+    def getManagerById(self,
+                       managerId: int,
+                       logger: logging.Logger = None) -> Optional[Manager]:
+
+        # Set logger instance to use.
+        if not logger:
+            logger = self.logger
+
+        try:
+            with self._transaction() as cursor:
+                managers = self._getManagers(cursor, "WHERE id = %s", (managerId, ))
+                return managers[0] if managers else None
+
+        except Exception as e:
+            logger.exception("[%s]: Unable to get manager with id %d." % (self.log_tag, managerId))
+
+        return None
+
+    def getNodeById(self,
+                    nodeId: int,
+                    logger: logging.Logger = None) -> Optional[Node]:
+
+        # Set logger instance to use.
+        if not logger:
+            logger = self.logger
+
+        try:
+            with self._transaction() as cursor:
+                nodes = self._getNodes(cursor, "WHERE id = %s", (nodeId, ))
+                return nodes[0] if nodes else None
+
+        except Exception as e:
+            logger.exception("[%s]: Unable to get node with id %d." % (self.log_tag, nodeId))
+
+        return None
+
+    def getSensorById(self,
+                      sensorId: int,
+                      logger: logging.Logger = None) -> Optional[Sensor]:
+
+        # Set logger instance to use.
+        if not logger:
+            logger = self.logger
+
+        try:
+            with self._transaction() as cursor:
+                sensors = self._getSensors(cursor, "WHERE id = %s", (sensorId, ))
+                return sensors[0] if sensors else None
+
+        except Exception as e:
+            logger.exception("[%s]: Unable to get sensor with id %d." % (self.log_tag, sensorId))
+
+        return None
+
+    def getNodes(self,
+                 logger: logging.Logger = None) -> Optional[List[Node]]:
+
+        # Set logger instance to use.
+        if not logger:
+            logger = self.logger
+
+        try:
+            with self._transaction() as cursor:
+                return self._getNodes(cursor)
+
+        except Exception as e:
+            logger.exception("[%s]: Unable to get nodes from database." % self.log_tag)
+
+        return None
+
+    def getAlertSystemInformation(self,
+                                  logger: logging.Logger = None) -> Optional[List[List[Union[Option,
+                                                                                             Node,
+                                                                                             Sensor,
+                                                                                             Manager,
+                                                                                             Alert]]]]:
+
+        # Set logger instance to use.
+        if not logger:
+            logger = self.logger
+
+        try:
+            # All objects are read in one transaction to get a consistent state of the alert system.
+            with self._transaction() as cursor:
+                cursor.execute("SELECT type, value FROM options")
+                optionList = list()
+                for resultTuple in cursor.fetchall():
+                    optionObj = Option()
+                    optionObj.type = resultTuple[0]
+                    optionObj.value = resultTuple[1]
+                    optionList.append(optionObj)
+
+                # return a list of
+                # list[0] = list(option objects)
+                # list[1] = list(node objects)
+                # list[2] = list(sensor objects)
+                # list[3] = list(manager objects)
+                # list[4] = list(alert objects)
+                return [optionList,
+                        self._getNodes(cursor),
+                        self._getSensors(cursor),
+                        self._getManagers(cursor),
+                        self._getAlerts(cursor)]
+
+        except Exception as e:
+            logger.exception("[%s]: Unable to get complete system information from database." % self.log_tag)
+
+        return None
+
+    def getSensorState(self,
+                       sensorId: int,
+                       logger: logging.Logger = None) -> Optional[int]:
+
+        # Set logger instance to use.
+        if not logger:
+            logger = self.logger
+
+        try:
+            with self._transaction() as cursor:
+                cursor.execute("SELECT state FROM sensors WHERE id = %s", (sensorId, ))
+                result = cursor.fetchall()
+
+        except Exception as e:
+            logger.exception("[%s]: Unable to get sensor state from database." % self.log_tag)
+            return None
+
+        if len(result) != 1:
+            logger.error("[%s]: Sensor was not found." % self.log_tag)
+            return None
+
+        return result[0][0]
+
+    def getSensorData(self,
+                      sensorId: int,
+                      logger: logging.Logger = None) -> Optional[SensorData]:
+
+        # Set logger instance to use.
+        if not logger:
+            logger = self.logger
+
+        try:
+            with self._transaction() as cursor:
+                sensors = self._getSensors(cursor, "WHERE id = %s", (sensorId, ))
+
+        except Exception as e:
+            logger.exception("[%s]: Unable to get sensor data from database." % self.log_tag)
+            return None
+
+        if not sensors:
+            logger.error("[%s]: Sensor was not found." % self.log_tag)
+            return None
+
+        data = SensorData()
+        data.sensorId = sensorId
+        data.dataType = sensors[0].dataType
+        data.data = sensors[0].data
+
+        # return a sensor data object
+        return data
+
+    def markNodeAsNotConnected(self,
+                               nodeId: int,
+                               logger: logging.Logger = None) -> bool:
+
+        # Set logger instance to use.
+        if not logger:
+            logger = self.logger
+
+        try:
+            with self._transaction(write=True) as cursor:
+                cursor.execute("UPDATE nodes SET connected = %s WHERE id = %s", (0, nodeId))
+
+        except Exception as e:
+            logger.exception("[%s]: Unable to mark node '%d' as not connected." % (self.log_tag, nodeId))
+            return False
+
+        return True
+
+    def markNodeAsConnected(self,
+                            nodeId: int,
+                            logger: logging.Logger = None) -> bool:
+
+        # Set logger instance to use.
+        if not logger:
+            logger = self.logger
+
+        try:
+            with self._transaction(write=True) as cursor:
+                cursor.execute("UPDATE nodes SET connected = %s WHERE id = %s", (1, nodeId))
+
+        except Exception as e:
+            logger.exception("[%s]: Unable to mark node '%d' as connected." % (self.log_tag, nodeId))
+            return False
+
+        return True
+
+    def deleteNode(self,
+                   nodeId: int,
+                   logger: logging.Logger = None) -> bool:
+
+        # Set logger instance to use.
+        if not logger:
+            logger = self.logger
+
+        try:
+            with self._transaction(write=True) as cursor:
+                nodeType = self._lockNode(cursor, nodeId)
+                if nodeType is None:
+                    raise ValueError("Node with id %d does not exist." % nodeId)
+
+                self._deleteObjectsForNodeId(cursor, nodeId, nodeType)
+                cursor.execute("DELETE FROM nodes WHERE id = %s", (nodeId, ))
+
+        except Exception as e:
+            logger.exception("[%s]: Unable to delete node with id %d." % (self.log_tag, nodeId))
+            return False
+
+        return True
+
+    def updateSensorState(self,
+                          nodeId: int,
+                          stateList: List[Tuple[int, int]],
+                          logger: logging.Logger = None) -> bool:
+
+        # Set logger instance to use.
+        if not logger:
+            logger = self.logger
+
+        return self.updateSensorStateAndData(nodeId, stateList, [], logger)
+
+    def updateSensorData(self,
+                         nodeId: int,
+                         dataList: List[Tuple[int, _SensorData]],
+                         logger: logging.Logger = None) -> bool:
+
+        # Set logger instance to use.
+        if not logger:
+            logger = self.logger
+
+        return self.updateSensorStateAndData(nodeId, [], dataList, logger)
+
+    def updateSensorStateAndData(self,
+                                 nodeId: int,
+                                 stateList: List[Tuple[int, int]],
+                                 dataList: List[Tuple[int, _SensorData]],
+                                 logger: logging.Logger = None,
+                                 historyList: List[Tuple[int, Optional[int], Optional[_SensorData]]] = None) -> bool:
+
+        # Set logger instance to use.
+        if not logger:
+            logger = self.logger
+
+        try:
+            # All changes are applied in one transaction either completely or not at all.
+            with self._transaction(write=True) as cursor:
+                self._lockNode(cursor, nodeId)
+                clientSensorIds = self._getClientSensorIds(cursor, nodeId)
+                self._updateSensorState(cursor, stateList, clientSensorIds)
+                self._updateSensorData(cursor, dataList, clientSensorIds)
+
+        except Exception as e:
+            logger.exception("[%s]: Unable to update sensors of node with id %d." % (self.log_tag, nodeId))
+            return False
+
+        # Record the changes in the history after the transaction is committed.
+        if self.globalData.sensor_history is not None:
+            self._addSensorHistory(clientSensorIds, stateList, dataList, historyList)
+
+        return True
+
+    def close(self,
+              logger: logging.Logger = None):
+
+        # Set logger instance to use.
+        if not logger:
+            logger = self.logger
+
+        # Wait until all connections are returned to the pool.
+        for _ in range(self._pool_size):
+            self._pool_semaphore.acquire()
+
+        self._pool.closeall()
+
+        for _ in range(self._pool_size):
+            self._pool_semaphore.release()
+
+    def get_commit_future(self,
+                          logger: logging.Logger = None) -> concurrent.futures.Future:
+
+        # Each change is committed by the transaction that made it.
+        future = concurrent.futures.Future()
+        future.set_result(True)
+        return future
+
+    def get_registration_hash(self,
+                              node_id: int,
+                              logger: logging.Logger = None) -> Optional[str]:
+
+        # Set logger instance to use.
+        if not logger:
+            logger = self.logger
+
+        try:
+            with self._transaction() as cursor:
+                cursor.execute("SELECT registrationHash FROM nodes WHERE id = %s", (node_id, ))
+                result = cursor.fetchall()
+
+        except Exception as e:
+            logger.exception("[%s]: Unable to get registration hash of node with id %d." % (self.log_tag, node_id))
+            return None
+
+        if not result:
+            return None
+        return result[0][0]
+
+    def set_registration_hash(self,
+                              node_id: int,
+                              registration_hash: Optional[str],
+                              logger: logging.Logger = None) -> bool:
+
+        # Set logger instance to use.
+        if not logger:
+            logger = self.logger
+
+        try:
+            with self._transaction(write=True) as cursor:
+                cursor.execute("UPDATE nodes SET registrationHash = %s WHERE id = %s", (registration_hash, node_id))
+
+        except Exception as e:
+            logger.exception("[%s]: Unable to set registration hash of node with id %d." % (self.log_tag, node_id))
+            return False
+
+        return True
+
+    def get_snapshot_token(self,
+                           logger: logging.Logger = None) -> Optional[str]:
+
+        # Set logger instance to use.
+        if not logger:
+            logger = self.logger
+
+        try:
+            with self._transaction() as cursor:
+                cursor.execute("SELECT value FROM internals WHERE type = %s", ("snapshotToken", ))
+                result = cursor.fetchall()
+
+        except Exception as e:
+            logger.exception("[%s]: Unable to get snapshot token." % self.log_tag)
+            return None
+
+        if not result:
+            return None
+        return result[0][0]
+
+    def set_snapshot_token(self,
+                           token: Optional[str],
+                           logger: logging.Logger = None) -> bool:
+
+        # Set logger instance to use.
+        if not logger:
+            logger = self.logger
+
+        try:
+            with self._transaction(write=True) as cursor:
+                cursor.execute("DELETE FROM internals WHERE type = %s", ("snapshotToken", ))
+                if token is not None:
+                    cursor.execute("INSERT INTO internals (type, value) VALUES (%s, %s)", ("snapshotToken", token))
+
+        except Exception as e:
+            logger.exception("[%s]: Unable to set snapshot token." % self.log_tag)
+            return False
+
+        return True
+
+    # region Alert API
+
+    def get_alerts(self,
+                   node_id: int,
+                   logger: logging.Logger = None) -> Optional[List[Alert]]:
+
+        # Set logger instance to use.
+        if not logger:
+            logger = self.logger
+
+        try:
+            with self._transaction() as cursor:
+                return self._getAlerts(cursor, "WHERE nodeId = %s", (node_id, ))
+
+        except Exception as e:
+            logger.exception("[%s]: Unable to get alerts for node id %d." % (self.log_tag, node_id))
+
+        return None
+
+    # endregion
+
+    # region Manager API
+
+    def get_managers(self,
+                     node_id: int,
+                     logger: logging.Logger = None) -> Optional[List[Manager]]:
+
+        # Set logger instance to use.
+        if not logger:
+            logger = self.logger
+
+        try:
+            with self._transaction() as cursor:
+                return self._getManagers(cursor, "WHERE nodeId = %s", (node_id, ))
+
+        except Exception as e:
+            logger.exception("[%s]: Unable to get managers for node id %d." % (self.log_tag, node_id))
+
+        return None
+
+    # endregion
+
+    # region Option API
+
+    def delete_option_by_type(self,
+                              option_type: str,
+                              logger: logging.Logger = None) -> bool:
+
+        # Set logger instance to use.
+        if not logger:
+            logger = self.logger
+
+        try:
+            with self._transaction(write=True) as cursor:
+                cursor.execute("DELETE FROM options WHERE type = %s", (option_type, ))
+
+        except Exception as e:
+            logger.exception("[%s]: Unable to delete option with type '%s'." % (self.log_tag, option_type))
+            return False
+
+        return True
+
+    def get_option_by_type(self,
+                           option_type: str,
+                           logger: logging.Logger = None) -> Optional[Option]:
+
+        # Set logger instance to use.
+        if not logger:
+            logger = self.logger
+
+        try:
+            with self._transaction() as cursor:
+                cursor.execute("SELECT type, value FROM options WHERE type = %s", (option_type, ))
+                result = cursor.fetchall()
+
+        except Exception as e:
+            logger.exception("[%s]: Unable to get option with type %s." % (self.log_tag, option_type))
+            return None
+
+        if len(result) != 1:
+            return None
+
+        option = Option()
+        option.type = result[0][0]
+        option.value = result[0][1]
+        return option
+
+    def get_options_list(self, logger: logging.Logger = None) -> Optional[List[Option]]:
+
+        # Set logger instance to use.
+        if not logger:
+            logger = self.logger
+
+        try:
+            with self._transaction() as cursor:
+                cursor.execute("SELECT type, value FROM options")
+                result = cursor.fetchall()
+
+        except Exception as e:
+            logger.exception("[%s]: Unable to get options." % self.log_tag)
+            return None
+
+        options = list()
+        for option_tuple in result:
+            option = Option()
+            option.type = option_tuple[0]
+            option.value = option_tuple[1]
+            options.append(option)
+
+        return options
+
+    def update_option(self,
+                      option_type: str,
+                      option_value: int,
+                      logger: logging.Logger = None) -> bool:
+
+        # Set logger instance to use.
+        if not logger:
+            logger = self.logger
+
+        option = Option()
+        option.type = option_type
+        option.value = option_value
+
+        return self.update_option_by_obj(option, logger)
+
+    def update_option_by_obj(self,
+                             option: Option,
+                             logger: logging.Logger = None) -> bool:
+
+        # Set logger instance to use.
+        if not logger:
+            logger = self.logger
+
+        try:
+            with self._transaction(write=True) as cursor:
+                cursor.execute("INSERT INTO options (type, value) VALUES (%s, %s) "
+                               + "ON CONFLICT (type) DO UPDATE SET value = excluded.value",
+                               (option.type, option.value))
+
+        except Exception as e:
+            logger.exception("[%s]: Unable to update option with type '%s' in database."
+                             % (self.log_tag, option.type))
+            return False
+
+        return True
+
+    # endregion
+
+    # region Sensor API
+
+    def delete_sensor(self,
+                      sensor_id: int,
+                      logger: logging.Logger = None) -> bool:
+
+        # Set logger instance to use.
+        if not logger:
+            logger = self.logger
+
+        try:
+            with self._transaction(write=True) as cursor:
+                cursor.execute("SELECT nodeId FROM sensors WHERE id = %s", (sensor_id, ))
+                result = cursor.fetchall()
+                if result:
+                    self._lockNode(cursor, result[0][0])
+                    self._deleteSensors(cursor, [sensor_id])
+
+        except Exception as e:
+            logger.exception("[%s]: Unable to delete sensor id %d." % (self.log_tag, sensor_id))
+            return False
+
+        return True
+
+    def get_sensor_error_state(self,
+                               sensor_id: int,
+                               logger: logging.Logger = None) -> Optional[SensorErrorState]:
+
+        # Set logger instance to use.
+        if not logger:
+            logger = self.logger
+
+        try:
+            with self._transaction() as cursor:
+                cursor.execute("SELECT error_state, error_msg FROM sensors WHERE id = %s", (sensor_id, ))
+                result = cursor.fetchall()
+
+                if result:
+                    return SensorErrorState(result[0][0], result[0][1])
+
+        except Exception as e:
+            logger.exception("[%s]: Unable to get sensor error state for sensor id %d."
+                             % (self.log_tag, sensor_id))
+
+        return None
+
+    def get_sensor_ids_in_error_state(self,
+                                      logger: logging.Logger = None) -> List[int]:
+
+        # Set logger instance to use.
+        if not logger:
+            logger = self.logger
+
+        try:
+            with self._transaction() as cursor:
+                cursor.execute("SELECT id FROM sensors WHERE error_state != %s ORDER BY id ASC",
+                               (SensorErrorState.OK, ))
+                return [x[0] for x in cursor.fetchall()]
+
+        except Exception as e:
+            logger.exception("[%s]: Unable to get sensor ids for sensors in an error state." % self.log_tag)
+
+        return []
+
+    def get_sensors(self,
+                    node_id: int,
+                    logger: logging.Logger = None) -> Optional[List[Sensor]]:
+
+        # Set logger instance to use.
+        if not logger:
+            logger = self.logger
+
+        try:
+            with self._transaction() as cursor:
+                return self._getSensors(cursor, "WHERE nodeId = %s", (node_id, ))
+
+        except Exception as e:
+            logger.exception("[%s]: Unable to get sensors for node id %d." % (self.log_tag, node_id))
+
+        return None
+
+    def update_sensor_error_state(self,
+                                  node_id: int,
+                                  client_sensor_id: int,
+                                  error_state: SensorErrorState,
+                                  logger: logging.Logger = None) -> bool:
+
+        # Set logger instance to use.
+        if not logger:
+            logger = self.logger
+
+        logger.debug("[%s]: Updating sensor error state for node id %d with client id %d: %s"
+                     % (self.log_tag, node_id, client_sensor_id, str(error_state)))
+
+        try:
+            with self._transaction(write=True) as cursor:
+                cursor.execute("UPDATE sensors SET "
+                               + "error_state = %s, "
+                               + "error_msg = %s "
+                               + "WHERE nodeId = %s AND clientSensorId = %s",
+                               (error_state.state,
+                                error_state.msg,
+                                node_id,
+                                client_sensor_id))
+
+                if cursor.rowcount == 0:
+                    logger.error("[%s]: Sensor on node id %d with client id %d does not exist in database."
+                                 % (self.log_tag, node_id, client_sensor_id))
+                    return False
+
+        except Exception as e:
+            logger.exception("[%s]: Unable to update sensor error state for node id %d with client id %d."
+                             % (self.log_tag, node_id, client_sensor_id))
+            return False
+
+        return True
+
+    def upsert_sensor(self,
+                      sensor: Sensor,
+                      logger: logging.Logger = None) -> bool:
+
+        # Set logger instance to use.
+        if not logger:
+            logger = self.logger
+
+        try:
+            with self._transaction(write=True) as cursor:
+                if self._lockNode(cursor, sensor.nodeId) is None:
+                    raise ValueError("Node with id %d does not exist." % sensor.nodeId)
+
+                self._upsertSensors(cursor, sensor.nodeId, [sensor], False, logger)
+
+        except Exception as e:
+            logger.exception("[%s]: Unable to upsert sensor with client id %d for node id %d."
+                             % (self.log_tag, sensor.clientSensorId, sensor.nodeId))
+            return False
+
+        return True
+
+    def upsert_sensors(self,
+                       sensors: List[Sensor],
+                       logger: logging.Logger = None) -> bool:
+
+        # Set logger instance to use.
+        if not logger:
+            logger = self.logger
+
+        if not sensors:
+            logger.warning("[%s]: No sensors given. Nothing to do." % self.log_tag)
+            return False
+
+        node_id = sensors[0].nodeId
+        if any(node_id != obj.nodeId for obj in sensors):
+            logger.error("[%s]: Some sensors do not have node id %d." % (self.log_tag, node_id))
+            return False
+
+        try:
+            # The sensors are upserted either completely or not at all.
+            with self._transaction(write=True) as cursor:
+                if self._lockNode(cursor, node_id) is None:
+                    raise ValueError("Node with id %d does not exist." % node_id)
+
+                self._upsertSensors(cursor, node_id, sensors, True, logger)
+
+        except Exception as e:
+            logger.exception("[%s]: Unable to upsert sensors for node id %d." % (self.log_tag, node_id))
+            return False
+
+        return True
+
+    # endregion
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+
+# written by sqall
+# twitter: https://twitter.com/sqall01
+# blog: https://h4des.org
+# github: https://github.com/sqall01
+#
+# Licensed under the GNU Affero General Public License, version 3.
+
+import json
+import logging
+import os
+import struct
+import threading
+import zlib
+from typing import Any, Dict, Optional
+from ..globalData.globalData import GlobalData
+
+
+class StorageSnapshot(threading.Thread):
+    """
+    Writes snapshots of all nodes, sensors, alerts, managers and options kept in memory by the cached storage
+    periodically and when the server stops. At startup, the cached storage loads its objects from the snapshot
+    instead of reading the whole database if the database was not changed after the snapshot was written.
+    """
+
+    # Header of the snapshot file (magic, format version and length of the compressed content).
+    _HEADER = struct.Struct(">4sHI")
+    _MAGIC = b"ARSS"
+    _VERSION = 1
+
+    def __init__(self,
+                 global_data: GlobalData,
+                 snapshot_path: Optional[str] = None):
+        """
+        :param global_data:
+        :param snapshot_path: path to the snapshot file (None uses the configured file)
+        """
+        threading.Thread.__init__(self, daemon=True)
+
+        self._global_data = global_data
+        self._logger = self._global_data.logger
+        self._log_tag = os.path.basename(__file__)
+
+        if snapshot_path is None:
+            snapshot_path = self._global_data.storageSnapshotFile
+        self._snapshot_path = snapshot_path
+
+        self._interval = self._global_data.storageSnapshotInterval
+
+        # Serializes the writing of the snapshot file.
+        self._write_lock = threading.Lock()
+
+        self._exit_flag = False
+        self._exit_event = threading.Event()
+
+    @staticmethod
+    def encode(snapshot: Dict[str, Any]) -> bytes:
+        """
+        Encodes the content of a snapshot into the binary format of the snapshot file.
+
+        :param snapshot:
+        :return: encoded snapshot
+        """
+        content = zlib.compress(json.dumps(snapshot, separators=(",", ":")).encode("utf-8"))
+        return StorageSnapshot._HEADER.pack(StorageSnapshot._MAGIC, StorageSnapshot._VERSION, len(content)) + content
+
+    @staticmethod
+    def decode(data: bytes) -> Dict[str, Any]:
+        """
+        Decodes the binary format of the snapshot file. Raises ValueError if the data is not a valid snapshot.
+
+        :param data:
+        :return: content of the snapshot
+        """
+        if len(data) < StorageSnapshot._HEADER.size:
+            raise ValueError("Snapshot too short.")
+
+        magic, version, length = StorageSnapshot._HEADER.unpack_from(data)
+        if magic != StorageSnapshot._MAGIC:
+            raise ValueError("Not a snapshot.")
+        if version != StorageSnapshot._VERSION:
+            raise ValueError("Snapshot version %d not supported." % version)
+        if len(data) != StorageSnapshot._HEADER.size + length:
+            raise ValueError("Snapshot truncated.")
+
+        try:
+            snapshot = json.loads(zlib.decompress(data[StorageSnapshot._HEADER.size:]).decode("utf-8"))
+
+        except (zlib.error, UnicodeDecodeError) as e:
+            raise ValueError("Snapshot corrupted: %s" % str(e))
+
+        if not isinstance(snapshot, dict):
+            raise ValueError("Snapshot content invalid.")
+        return snapshot
+
+    @staticmethod
+    def read(snapshot_path: str,
+             logger: logging.Logger) -> Optional[Dict[str, Any]]:
+        """
+        Reads the content of the snapshot file.
+
+        :param snapshot_path:
+        :param logger:
+        :return: content of the snapshot or None if the file does not exist or is not valid
+        """
+        if not os.path.isfile(snapshot_path):
+            return None
+
+        try:
+            with open(snapshot_path, "rb") as fp:
+                return StorageSnapshot.decode(fp.read())
+
+        except Exception as e:
+            logger.exception("[%s]: Unable to read snapshot '%s'."
+                             % (os.path.basename(__file__), snapshot_path))
+
+        return None
+
+    def write(self) -> bool:
+        """
+        Writes a snapshot of the storage to the snapshot file.
+
+        :return: success or failure
+        """
+        with self._write_lock:
+            snapshot = self._global_data.storage.export_snapshot(self._logger)
+            if snapshot is None:
+                self._logger.error("[%s]: Unable to export snapshot of storage." % self._log_tag)
+                return False
+
+            # Replace the snapshot file atomically so that an interrupted write never leaves a broken snapshot.
+            temp_path = self._snapshot_path + ".tmp"
+            try:
+                with open(temp_path, "wb") as fp:
+                    fp.write(self.encode(snapshot))
+                    fp.flush()
+                    os.fsync(fp.fileno())
+                os.replace(temp_path, self._snapshot_path)
+
+            except Exception as e:
+                self._logger.exception("[%s]: Unable to write snapshot '%s'." % (self._log_tag, self._snapshot_path))
+                return False
+
+        self._logger.debug("[%s]: Wrote snapshot with %d nodes and %d sensors."
+                           % (self._log_tag, len(snapshot["nodes"]), len(snapshot["sensors"])))
+        return True
+
+    def close(self):
+        """
+        Writes the final snapshot.
+        """
+        self.write()
+
+    def exit(self):
+        """
+        Sets the exit flag to shut down the thread.
+        """
+        self._exit_flag = True
+        self._exit_event.set()
+
+    def run(self):
+        """
+        Writes a snapshot in the snapshot interval.
+        """
+        while True:
+            self._exit_event.wait(self._interval)
+
+            if self._exit_flag:
+                return
+
+            self.write()
@@ -7,7 +7,10 @@
 #
 # Licensed under the GNU Affero General Public License, version 3.
 
+import collections
+import concurrent.futures
 import os
+import queue
 import threading
 import time
 import socket
@@ -24,12 +27,31 @@ from ..globalData.sensorObjects import SensorDataGPS, SensorDataNone, SensorData
     SensorDataType, SensorErrorState
 
 
+class _ReadLock:
+    """
+    Context manager that acquires a database connection for reading (analogous to using the database lock
+    as context manager for writing).
+    """
+
+    def __init__(self, storage: "Sqlite"):
+        self._storage = storage
+
+    def __enter__(self):
+        self._storage._acquireReadLock()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self._storage._releaseReadLock()
+
+
 class Sqlite(_Storage):
 
     def __init__(self,
                  storagePath: str,
                  globalData: GlobalData,
-                 read_only: bool = False):
+                 read_only: bool = False,
+                 reader_count: Optional[int] = None,
+                 group_commit_interval: Optional[float] = None,
+                 group_commit_size: Optional[int] = None):
 
         self.globalData = globalData
         self.logger = self.globalData.logger
@@ -39,17 +61,63 @@ class Sqlite(_Storage):
         self.rev = self.globalData.rev
 
         # Used database layout version.
-        self.dbVersion = 7
+        self.dbVersion = 9
+
+        # Number of compiled statements kept by each connection (large enough to hold every statement
+        # of this class, so the statements are only compiled once per connection).
+        self._cached_statements = 256
 
         # file nme of this file (used for logging)
         self.log_tag = os.path.basename(__file__)
 
         # path to the sqlite database
         self.storagePath = storagePath
+        self._read_only = read_only
 
         # sqlite is not thread safe => use lock
+        # (all changes are written by a single connection that is protected by this lock)
         self.dbLock = threading.Lock()
 
+        # Changes are committed in groups by the group commit thread every interval or as soon as the given
+        # number of changes is pending (an interval of 0 commits each change on its own).
+        if group_commit_interval is None:
+            group_commit_interval = self.globalData.storageBackendSqliteGroupCommitInterval
+        if group_commit_size is None:
+            group_commit_size = self.globalData.storageBackendSqliteGroupCommitSize
+        if read_only:
+            group_commit_interval = 0.0
+
+        # Number of connections that are used for reading in parallel to the writing connection
+        # (0 reads with the writing connection under the lock).
+        if reader_count is None:
+            reader_count = self.globalData.storageBackendSqliteReaderCount
+        if read_only:
+            reader_count = 0
+        if group_commit_interval > 0:
+            # Reading connections would not see the changes that are not committed yet.
+            reader_count = 0
+        self._reader_count = reader_count
+        self._reader_pool = None  # type: Optional[queue.Queue]
+        self.dbReadLock = _ReadLock(self)
+
+        # Connection and cursor used by the current thread if it acquired a reading connection.
+        self._local = threading.local()
+
+        self._group_commit_interval = group_commit_interval
+        self._group_commit_size = group_commit_size
+        self._group_commit_thread = None  # type: Optional[threading.Thread]
+        self._group_commit_event = threading.Event()
+        self._group_commit_exit = False
+
+        # Number of changes that are not committed yet and futures of the callers waiting for them
+        # (only used with group commits, protected by the database lock).
+        self._pending_changes = 0
+        self._commit_futures = list()  # type: List[concurrent.futures.Future]
+
+        # Number of commits (and therefore fsyncs) saved by committing changes in groups.
+        self._saved_commits = 0
+        self._closed = False
+
         mode = ""
         if read_only:
             mode = "?mode=ro"
@@ -62,10 +130,16 @@ class Sqlite(_Storage):
             create_new = True
 
         self.logger.info("[%s]: Opening database '%s'." % (self.log_tag, uri))
-        self.conn = sqlite3.connect(uri,
-                                    check_same_thread=False,
-                                    uri=True)
-        self.cursor = self.conn.cursor()
+        self._conn = sqlite3.connect(uri,
+                                     check_same_thread=False,
+                                     uri=True,
+                                     cached_statements=self._cached_statements)
+        self._cursor = self._conn.cursor()
+
+        if self._reader_count > 0:
+            # Write-ahead logging lets the reading connections read the last committed state
+            # while the writing connection writes.
+            self._cursor.execute("PRAGMA journal_mode=WAL")
 
         if create_new:
             uniqueID = self._generateUniqueId()
@@ -74,6 +148,42 @@ class Sqlite(_Storage):
         # check if the versions are compatible
         self.checkVersionAndClearConflict()
 
+        if self._reader_count > 0:
+            self._reader_pool = queue.Queue()
+            for _ in range(self._reader_count):
+                reader_conn = sqlite3.connect("file:" + self.storagePath + "?mode=ro",
+                                              check_same_thread=False,
+                                              uri=True,
+                                              cached_statements=self._cached_statements)
+                self._reader_pool.put((reader_conn, reader_conn.cursor()))
+
+        if self._group_commit_interval > 0:
+            self._group_commit_thread = threading.Thread(target=self._runGroupCommit, daemon=True)
+            self._group_commit_thread.start()
+
+    @property
+    def saved_commits(self) -> int:
+        """
+        Number of commits (and therefore fsyncs) saved by committing changes in groups.
+        """
+        return self._saved_commits
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        """
+        Connection of the current thread (the reading connection if the thread acquired one,
+        otherwise the writing connection).
+        """
+        return getattr(self._local, "conn", None) or self._conn
+
+    @property
+    def cursor(self) -> sqlite3.Cursor:
+        """
+        Cursor of the current thread (the cursor of the reading connection if the thread acquired one,
+        otherwise the cursor of the writing connection).
+        """
+        return getattr(self._local, "cursor", None) or self._cursor
+
     def _usernameInDb(self,
                       username: str) -> bool:
         """
@@ -83,7 +193,7 @@ class Sqlite(_Storage):
         :return: Success or Failure
         """
         # check if the username does exist => if not node is not known
-        self.cursor.execute("SELECT id FROM nodes WHERE username = ? ", (username, ))
+        self.cursor.execute("SELECT id FROM nodes WHERE username = ?", (username, ))
         result = self.cursor.fetchall()
 
         # return if username was found or not
@@ -142,7 +252,7 @@ class Sqlite(_Storage):
         # check if the username does exist
         if self._usernameInDb(username):
             # get id of username
-            self.cursor.execute("SELECT id FROM nodes WHERE username = ? ", (username, ))
+            self.cursor.execute("SELECT id FROM nodes WHERE username = ?", (username, ))
             result = self.cursor.fetchall()
             return result[0][0]
 
@@ -313,6 +423,161 @@ class Sqlite(_Storage):
 
         return sensor
 
+    def _getClientSensorIds(self,
+                            nodeId: int) -> Dict[int, Tuple[int, int]]:
+        """
+        Internal function that gets the sensor ids and data types of all sensors of a node with one query.
+
+        :param nodeId:
+        :return: dictionary of client sensor id -> (sensor id, data type) (throws exception in error case)
+        """
+        self.cursor.execute("SELECT clientSensorId, id, dataType FROM sensors WHERE nodeId = ?", (nodeId, ))
+        return {x[0]: (x[1], x[2]) for x in self.cursor.fetchall()}
+
+    def _updateSensorState(self,
+                           nodeId: int,
+                           stateList: List[Tuple[int, int]],
+                           logger: logging.Logger,
+                           clientSensorIds: Optional[Dict[int, Tuple[int, int]]] = None) -> bool:
+        """
+        Internal function that updates the states of the sensors of a node in the database without committing
+        the changes. The lock has to be held by the caller.
+
+        :param nodeId:
+        :param stateList:
+        :param logger:
+        :param clientSensorIds: sensor ids of the node if already queried (see _getClientSensorIds())
+        :return Success or Failure
+        """
+        if not stateList:
+            return True
+
+        try:
+            if clientSensorIds is None:
+                clientSensorIds = self._getClientSensorIds(nodeId)
+
+            # stateList is a list of tuples of (clientSensorId, state)
+            updates = list()
+            for clientSensorId, state in stateList:
+                if clientSensorId not in clientSensorIds:
+                    logger.error("[%s]: Sensor does not exist in database." % self.log_tag)
+                    return False
+
+                updates.append((state, clientSensorIds[clientSensorId][0]))
+
+            self.cursor.executemany("UPDATE sensors SET state = ? WHERE id = ?", updates)
+
+        except Exception as e:
+            logger.exception("[%s]: Unable to update sensor state." % self.log_tag)
+            return False
+
+        return True
+
+    def _updateSensorData(self,
+                          nodeId: int,
+                          dataList: List[Tuple[int, _SensorData]],
+                          logger: logging.Logger,
+                          clientSensorIds: Optional[Dict[int, Tuple[int, int]]] = None) -> bool:
+        """
+        Internal function that updates the data of the sensors of a node in the database without committing
+        the changes. The lock has to be held by the caller.
+
+        :param nodeId:
+        :param dataList:
+        :param logger:
+        :param clientSensorIds: sensor ids of the node if already queried (see _getClientSensorIds())
+        :return Success or Failure
+        """
+        if not dataList:
+            return True
+
+        try:
+            if clientSensorIds is None:
+                clientSensorIds = self._getClientSensorIds(nodeId)
+
+            # Collect the updates for each data table to update all sensors of a data type at once.
+            intUpdates = list()
+            floatUpdates = list()
+            gpsUpdates = list()
+
+            # dataList is a list of tuples of (clientSensorId, data)
+            for clientSensorId, data in dataList:
+                if clientSensorId not in clientSensorIds:
+                    logger.error("[%s]: Sensor does not exist in database." % self.log_tag)
+                    return False
+
+                sensorId, dataType = clientSensorIds[clientSensorId]
+
+                if dataType == SensorDataType.NONE:
+                    pass
+
+                elif dataType == SensorDataType.INT:
+                    # noinspection PyUnresolvedReferences
+                    intUpdates.append((data.value, data.unit, sensorId))
+
+                elif dataType == SensorDataType.FLOAT:
+                    # noinspection PyUnresolvedReferences
+                    floatUpdates.append((data.value, data.unit, sensorId))
+
+                elif dataType == SensorDataType.GPS:
+                    # noinspection PyUnresolvedReferences
+                    gpsUpdates.append((data.lat, data.lon, data.utctime, sensorId))
+
+            if intUpdates:
+                self.cursor.executemany("UPDATE sensorsDataInt SET value = ?, unit = ? WHERE sensorId = ?",
+                                        intUpdates)
+
+            if floatUpdates:
+                self.cursor.executemany("UPDATE sensorsDataFloat SET value = ?, unit = ? WHERE sensorId = ?",
+                                        floatUpdates)
+
+            if gpsUpdates:
+                self.cursor.executemany("UPDATE sensorsDataGPS SET lat = ?, lon = ?, utctime = ? WHERE sensorId = ?",
+                                        gpsUpdates)
+
+        except Exception as e:
+            logger.exception("[%s]: Unable to update sensor data." % self.log_tag)
+            return False
+
+        return True
+
+    def _addSensorHistory(self,
+                          clientSensorIds: Dict[int, Tuple[int, int]],
+                          stateList: List[Tuple[int, int]],
+                          dataList: List[Tuple[int, _SensorData]],
+                          historyList: Optional[List[Tuple[int, Optional[int], Optional[_SensorData]]]] = None):
+        """
+        Internal function that adds the updated states and data of the sensors of a node to the sensor history.
+
+        :param clientSensorIds: sensor ids of the node (see _getClientSensorIds())
+        :param stateList:
+        :param dataList:
+        :param historyList: changes that are recorded each on its own instead of the merged state and data
+        """
+        if historyList is not None:
+            historyEntries = list()
+            for clientSensorId, state, data in historyList:
+                sensorId, dataType = clientSensorIds[clientSensorId]
+                if dataType == SensorDataType.NONE:
+                    data = None
+                historyEntries.append((sensorId, state, data))
+
+            self.globalData.sensor_history.add(historyEntries)
+            return
+
+        # Merge the state and data of each sensor into one entry.
+        entries = collections.OrderedDict()
+        for clientSensorId, state in stateList:
+            entries[clientSensorIds[clientSensorId][0]] = [state, None]
+
+        for clientSensorId, data in dataList:
+            sensorId, dataType = clientSensorIds[clientSensorId]
+            if dataType == SensorDataType.NONE:
+                continue
+            entries.setdefault(sensorId, [None, None])[1] = data
+
+        self.globalData.sensor_history.add([(sensorId, state, data) for sensorId, (state, data) in entries.items()])
+
     def _getSensorId(self,
                      nodeId: int,
                      clientSensorId: int) -> int:
@@ -424,6 +689,158 @@ class Sqlite(_Storage):
 
         self.dbLock.release()
 
+    def _acquireReadLock(self,
+                         logger: logging.Logger = None):
+        """
+        Internal function that acquires a connection for reading. If reading connections are used, the
+        connection is taken from the pool and a read transaction is started so that all queries see the
+        same state of the database. Otherwise, the lock of the writing connection is acquired.
+
+        :param logger:
+        """
+        if self._reader_pool is None:
+            self._acquireLock(logger)
+            return
+
+        reader_conn, reader_cursor = self._reader_pool.get()
+        self._local.conn = reader_conn
+        self._local.cursor = reader_cursor
+        reader_cursor.execute("BEGIN")
+
+    def _releaseReadLock(self,
+                         logger: logging.Logger = None):
+        """
+        Internal function that releases the connection for reading.
+
+        :param logger:
+        """
+        if self._reader_pool is None:
+            self._releaseLock(logger)
+            return
+
+        reader_conn = self._local.conn
+        reader_cursor = self._local.cursor
+        self._local.conn = None
+        self._local.cursor = None
+
+        try:
+            # Ends the read transaction.
+            reader_conn.rollback()
+
+        except Exception as e:
+            # Set logger instance to use.
+            if not logger:
+                logger = self.logger
+            logger.exception("[%s]: Unable to end read transaction." % self.log_tag)
+
+        self._reader_pool.put((reader_conn, reader_cursor))
+
+    def _commit(self):
+        """
+        Internal function that commits the changes to the database and invalidates the cached alert system status.
+        If group commits are used, the changes are only committed if enough changes are pending (otherwise they are
+        committed by the group commit thread). The lock has to be held by the caller.
+        """
+        if self._group_commit_thread is None:
+            self.conn.commit()
+
+        else:
+            self._pending_changes += 1
+            if self._pending_changes >= self._group_commit_size:
+                self._commitPending()
+
+        status_tracker = self.globalData.status_tracker
+        if status_tracker is not None:
+            status_tracker.invalidate()
+
+    def _commitPending(self,
+                       logger: logging.Logger = None):
+        """
+        Internal function that commits all pending changes in one transaction and resolves the futures of the callers
+        waiting for them. The lock has to be held by the caller.
+
+        :param logger:
+        """
+        # Set logger instance to use.
+        if not logger:
+            logger = self.logger
+
+        if self._pending_changes == 0:
+            futures = self._commit_futures
+            self._commit_futures = list()
+            for future in futures:
+                future.set_result(True)
+            return
+
+        pending_changes = self._pending_changes
+        futures = self._commit_futures
+        self._pending_changes = 0
+        self._commit_futures = list()
+
+        try:
+            self._conn.commit()
+
+        except Exception as e:
+            logger.exception("[%s]: Unable to commit %d pending changes." % (self.log_tag, pending_changes))
+            for future in futures:
+                future.set_exception(e)
+            return
+
+        self._saved_commits += pending_changes - 1
+
+        # The reading connections see the changes only now.
+        status_tracker = self.globalData.status_tracker
+        if status_tracker is not None:
+            status_tracker.invalidate()
+
+        for future in futures:
+            future.set_result(True)
+
+    def _runGroupCommit(self):
+        """
+        Internal function that is executed by the group commit thread and commits the pending changes
+        in the group commit interval.
+        """
+        while not self._group_commit_exit:
+            self._group_commit_event.wait(self._group_commit_interval)
+
+            with self.dbLock:
+                if self._group_commit_exit:
+                    return
+
+                self._commitPending()
+
+    def _beginAtomic(self):
+        """
+        Internal function that marks the start of a change that is applied either completely or not at all
+        (see _rollbackAtomic()). The lock has to be held by the caller.
+        """
+        if self._group_commit_thread is not None:
+            if not self._conn.in_transaction:
+                self._cursor.execute("BEGIN")
+            self._cursor.execute("SAVEPOINT atomic_change")
+
+    def _releaseAtomic(self):
+        """
+        Internal function that marks the successful end of a change started by _beginAtomic().
+        The lock has to be held by the caller.
+        """
+        if self._group_commit_thread is not None:
+            self._cursor.execute("RELEASE SAVEPOINT atomic_change")
+
+    def _rollbackAtomic(self):
+        """
+        Internal function that discards a change started by _beginAtomic(). If group commits are used, only this
+        change is discarded and the pending changes of the other callers are kept. The lock has to be held
+        by the caller.
+        """
+        if self._group_commit_thread is not None:
+            self._cursor.execute("ROLLBACK TO SAVEPOINT atomic_change")
+            self._cursor.execute("RELEASE SAVEPOINT atomic_change")
+
+        else:
+            self.conn.rollback()
+
     def _createStorage(self,
                        uniqueID: str):
         """
@@ -473,7 +890,8 @@ class Sqlite(_Storage):
                             + "connected INTEGER NOT NULL, "
                             + "version REAL NOT NULL, "
                             + "rev INTEGER NOT NULL, "
-                            + "persistent INTEGER NOT NULL)")
+                            + "persistent INTEGER NOT NULL, "
+                            + "registrationHash TEXT)")
 
         # create sensors table
         self.cursor.execute("CREATE TABLE sensors ("
@@ -539,8 +957,23 @@ class Sqlite(_Storage):
                             + "description TEXT NOT NULL, "
                             + "FOREIGN KEY(nodeId) REFERENCES nodes(id))")
 
+        self._createIndexes()
+
         # commit all changes
-        self.conn.commit()
+        self._commit()
+
+    def _createIndexes(self):
+        """
+        Internal function that creates the indexes used by the queries for the objects of a node
+        (the lookups by username and by the ids of the alert levels use the unique and primary keys).
+        No return value but raise exception if it fails.
+        """
+        self.cursor.execute("CREATE INDEX IF NOT EXISTS sensorsNodeIdClientSensorId "
+                            + "ON sensors (nodeId, clientSensorId)")
+        self.cursor.execute("CREATE INDEX IF NOT EXISTS alertsNodeIdClientAlertId "
+                            + "ON alerts (nodeId, clientAlertId)")
+        self.cursor.execute("CREATE INDEX IF NOT EXISTS managersNodeId "
+                            + "ON managers (nodeId)")
 
     def _deleteStorage(self):
         """
@@ -566,7 +999,7 @@ class Sqlite(_Storage):
         self.cursor.execute("DROP TABLE IF EXISTS sensorAlerts")
 
         # commit all changes
-        self.conn.commit()
+        self._commit()
 
     def _deleteAlertsForNodeId(self,
                                nodeId: int,
@@ -583,21 +1016,15 @@ class Sqlite(_Storage):
             logger = self.logger
 
         try:
-            # Get all alert ids that are connected to
-            # the node.
-            self.cursor.execute("SELECT id FROM alerts WHERE nodeId = ?", (nodeId, ))
-            result = self.cursor.fetchall()
-
             # Delete all alert alert levels and alerts of
             # this node
-            for alertIdResult in result:
-
-                self.cursor.execute("DELETE FROM alertsAlertLevels WHERE alertId = ?", (alertIdResult[0], ))
-
-                self.cursor.execute("DELETE FROM alerts WHERE id = ?", (alertIdResult[0], ))
+            self.cursor.execute("DELETE FROM alertsAlertLevels "
+                                + "WHERE alertId IN (SELECT id FROM alerts WHERE nodeId = ?)",
+                                (nodeId, ))
+            self.cursor.execute("DELETE FROM alerts WHERE nodeId = ?", (nodeId, ))
 
             # Commit all changes.
-            self.conn.commit()
+            self._commit()
 
         except Exception as e:
             logger.exception("[%s]: Unable to delete alerts for node with id %d." % (self.log_tag, nodeId))
@@ -624,7 +1051,7 @@ class Sqlite(_Storage):
             self.cursor.execute("DELETE FROM managers WHERE nodeId = ?", (nodeId, ))
 
             # Commit all changes.
-            self.conn.commit()
+            self._commit()
 
         except Exception as e:
             logger.exception("[%s]: Unable to delete manager for node with id %d." % (self.log_tag, nodeId))
@@ -647,21 +1074,15 @@ class Sqlite(_Storage):
             logger = self.logger
 
         try:
-            # Get all sensor ids that are connected to
-            # the old sensor.
-            self.cursor.execute("SELECT id FROM sensors WHERE nodeId = ? ", (nodeId, ))
-            result = self.cursor.fetchall()
-
             # Delete all data and sensors of this node.
-            for sensorIdResult in result:
-                self.cursor.execute("DELETE FROM sensorsDataInt WHERE sensorId = ?", (sensorIdResult[0], ))
-                self.cursor.execute("DELETE FROM sensorsDataFloat WHERE sensorId = ?", (sensorIdResult[0], ))
-                self.cursor.execute("DELETE FROM sensorsDataGPS WHERE sensorId = ?", (sensorIdResult[0], ))
-                self.cursor.execute("DELETE FROM sensorsAlertLevels WHERE sensorId = ?", (sensorIdResult[0],))
-                self.cursor.execute("DELETE FROM sensors WHERE id = ?", (sensorIdResult[0], ))
+            for table in ["sensorsDataInt", "sensorsDataFloat", "sensorsDataGPS", "sensorsAlertLevels"]:
+                self.cursor.execute("DELETE FROM " + table + " "
+                                    + "WHERE sensorId IN (SELECT id FROM sensors WHERE nodeId = ?)",
+                                    (nodeId, ))
+            self.cursor.execute("DELETE FROM sensors WHERE nodeId = ?", (nodeId, ))
 
             # Commit all changes.
-            self.conn.commit()
+            self._commit()
 
         except Exception as e:
             logger.exception("[%s]: Unable to delete sensors for node with id %d." % (self.log_tag, nodeId))
@@ -742,9 +1163,33 @@ class Sqlite(_Storage):
         else:
             currDbVersion = -1
 
+        # Version 7 only lacks the indexes and the registration hashes of the nodes, version 8 only lacks the
+        # registration hashes
+        # => add them without clearing the database (a read-only database can be used without them).
+        if currDbVersion in [7, 8]:
+
+            if self._read_only:
+                self._releaseLock(logger)
+                return
+
+            if currDbVersion == 7:
+                logger.info("[%s]: Adding indexes to database layout version '%d'." % (self.log_tag, currDbVersion))
+                self._createIndexes()
+
+            logger.info("[%s]: Adding registration hashes to database layout version '%d'."
+                        % (self.log_tag, currDbVersion))
+            self.cursor.execute("PRAGMA table_info(nodes)")
+            if "registrationHash" not in [x[1] for x in self.cursor.fetchall()]:
+                self.cursor.execute("ALTER TABLE nodes ADD COLUMN registrationHash TEXT")
+
+            self.cursor.execute("UPDATE internals SET value = ? WHERE type = ?", (self.dbVersion, "dbversion"))
+
+            # commit all changes
+            self._commit()
+
         # If the versions are not compatible
         # => update database schema.
-        if currDbVersion < self.dbVersion:
+        elif currDbVersion < self.dbVersion:
 
             logger.info("[%s]: Needed database version '%d' not compatible with current database layout version '%d'. "
                         % (self.log_tag, self.dbVersion, currDbVersion)
@@ -761,7 +1206,7 @@ class Sqlite(_Storage):
             self._createStorage(uniqueID)
 
             # commit all changes
-            self.conn.commit()
+            self._commit()
 
         # Raise an exception if database layout version
         # is newer than the one we need.
@@ -979,7 +1424,7 @@ class Sqlite(_Storage):
                     return False
 
         # commit all changes
-        self.conn.commit()
+        self._commit()
 
         self._releaseLock(logger)
         return True
@@ -1202,7 +1647,7 @@ class Sqlite(_Storage):
                 return False
 
         # commit all changes
-        self.conn.commit()
+        self._commit()
         self._releaseLock(logger)
         return True
 
@@ -1288,7 +1733,7 @@ class Sqlite(_Storage):
                     return False
 
         # commit all changes
-        self.conn.commit()
+        self._commit()
         self._releaseLock(logger)
         return True
 
@@ -1300,7 +1745,7 @@ class Sqlite(_Storage):
         if not logger:
             logger = self.logger
 
-        self._acquireLock(logger)
+        self._acquireReadLock(logger)
 
         nodeId = None
         try:
@@ -1309,7 +1754,7 @@ class Sqlite(_Storage):
         except Exception as e:
             logger.exception("[%s]: Unable to get node id." % self.log_tag)
 
-        self._releaseLock(logger)
+        self._releaseReadLock(logger)
         return nodeId
 
     def getNodeIds(self,
@@ -1319,7 +1764,7 @@ class Sqlite(_Storage):
         if not logger:
             logger = self.logger
 
-        self._acquireLock(logger)
+        self._acquireReadLock(logger)
 
         nodeIds = list()
         try:
@@ -1332,7 +1777,7 @@ class Sqlite(_Storage):
         except Exception as e:
             logger.exception("[%s]: Unable to get node ids." % self.log_tag)
 
-        self._releaseLock(logger)
+        self._releaseReadLock(logger)
         return nodeIds
 
     def getSensorCount(self,
@@ -1343,7 +1788,7 @@ class Sqlite(_Storage):
         if not logger:
             logger = self.logger
 
-        self._acquireLock(logger)
+        self._acquireReadLock(logger)
 
         # get all sensors on this nodes
         sensorCount = None
@@ -1357,7 +1802,7 @@ class Sqlite(_Storage):
         except Exception as e:
             logger.exception("[%s]: Unable to get sensor count." % self.log_tag)
 
-        self._releaseLock(logger)
+        self._releaseReadLock(logger)
         return sensorCount
 
     def getSurveyData(self,
@@ -1367,7 +1812,7 @@ class Sqlite(_Storage):
         if not logger:
             logger = self.logger
 
-        self._acquireLock(logger)
+        self._acquireReadLock(logger)
 
         surveyData = None
         try:
@@ -1381,7 +1826,7 @@ class Sqlite(_Storage):
         except Exception as e:
             logger.exception("[%s]: Unable to get survey data." % self.log_tag)
 
-        self._releaseLock(logger)
+        self._releaseReadLock(logger)
         return surveyData
 
     def getUniqueID(self,
@@ -1391,9 +1836,9 @@ class Sqlite(_Storage):
         if not logger:
             logger = self.logger
 
-        self._acquireLock(logger)
+        self._acquireReadLock(logger)
         uniqueID = self._getUniqueID()
-        self._releaseLock(logger)
+        self._releaseReadLock(logger)
 
         return uniqueID
 
@@ -1406,38 +1851,7 @@ class Sqlite(_Storage):
         if not logger:
             logger = self.logger
 
-        self._acquireLock(logger)
-
-        # stateList is a list of tuples of (clientSensorId, state)
-        for stateTuple in stateList:
-
-            try:
-
-                # check if the sensor does exist in the database
-                self.cursor.execute("SELECT id FROM sensors "
-                                    + "WHERE nodeId = ? "
-                                    + "AND clientSensorId = ?", (nodeId, stateTuple[0]))
-                result = self.cursor.fetchall()
-                if len(result) != 1:
-                    logger.error("[%s]: Sensor does not exist in database." % self.log_tag)
-                    self._releaseLock(logger)
-                    return False
-
-                self.cursor.execute("UPDATE sensors SET "
-                                    + "state = ? "
-                                    + "WHERE nodeId = ? "
-                                    + "AND clientSensorId = ?",
-                                    (stateTuple[1], nodeId, stateTuple[0]))
-
-            except Exception as e:
-                logger.exception("[%s]: Unable to update sensor state." % self.log_tag)
-                self._releaseLock(logger)
-                return False
-
-        # commit all changes
-        self.conn.commit()
-        self._releaseLock(logger)
-        return True
+        return self.updateSensorStateAndData(nodeId, stateList, [], logger)
 
     def updateSensorData(self,
                          nodeId: int,
@@ -1448,70 +1862,59 @@ class Sqlite(_Storage):
         if not logger:
             logger = self.logger
 
-        self._acquireLock(logger)
+        return self.updateSensorStateAndData(nodeId, [], dataList, logger)
 
-        # dataList is a list of tuples of (clientSensorId, data)
-        for dataTuple in dataList:
+    def updateSensorStateAndData(self,
+                                 nodeId: int,
+                                 stateList: List[Tuple[int, int]],
+                                 dataList: List[Tuple[int, _SensorData]],
+                                 logger: logging.Logger = None,
+                                 historyList: List[Tuple[int, Optional[int], Optional[_SensorData]]] = None) -> bool:
 
-            try:
-                # Check if the sensor does exist in the database and get its
-                # data type.
-                self.cursor.execute("SELECT id, dataType FROM sensors "
-                                    + "WHERE nodeId = ? "
-                                    + "AND clientSensorId = ?", (nodeId, dataTuple[0]))
-                result = self.cursor.fetchall()
+        # Set logger instance to use.
+        if not logger:
+            logger = self.logger
 
-                if len(result) != 1:
-                    logger.error("[%s]: Sensor does not exist in database." % self.log_tag)
-                    self._releaseLock(logger)
-                    return False
+        self._acquireLock(logger)
 
-                sensorId = result[0][0]
-                dataType = result[0][1]
+        try:
+            clientSensorIds = self._getClientSensorIds(nodeId)
 
-                if dataType == SensorDataType.NONE:
-                    pass
+        except Exception as e:
+            logger.exception("[%s]: Unable to get sensors of node with id %d." % (self.log_tag, nodeId))
+            self._releaseLock(logger)
+            return False
 
-                elif dataType == SensorDataType.INT:
-                    # noinspection PyUnresolvedReferences
-                    self.cursor.execute("UPDATE sensorsDataInt SET "
-                                        + "value = ?, "
-                                        + "unit = ? "
-                                        + "WHERE sensorId = ?",
-                                        (dataTuple[1].value,
-                                         dataTuple[1].unit,
-                                         sensorId))
+        try:
+            self._beginAtomic()
 
-                elif dataType == SensorDataType.FLOAT:
-                    # noinspection PyUnresolvedReferences
-                    self.cursor.execute("UPDATE sensorsDataFloat SET "
-                                        + "value = ?, "
-                                        + "unit = ? "
-                                        + "WHERE sensorId = ?",
-                                        (dataTuple[1].value,
-                                         dataTuple[1].unit,
-                                         sensorId))
+        except Exception as e:
+            logger.exception("[%s]: Unable to start sensor updates." % self.log_tag)
+            self._releaseLock(logger)
+            return False
 
-                elif dataType == SensorDataType.GPS:
-                    # noinspection PyUnresolvedReferences
-                    self.cursor.execute("UPDATE sensorsDataGPS SET "
-                                        + "lat = ?, "
-                                        + "lon = ?, "
-                                        + "utctime = ? "
-                                        + "WHERE sensorId = ?",
-                                        (dataTuple[1].lat,
-                                         dataTuple[1].lon,
-                                         dataTuple[1].utctime,
-                                         sensorId))
+        if (not self._updateSensorState(nodeId, stateList, logger, clientSensorIds)
+                or not self._updateSensorData(nodeId, dataList, logger, clientSensorIds)):
+
+            # Discard the changes already made so the transaction is applied either completely or not at all.
+            try:
+                self._rollbackAtomic()
 
             except Exception as e:
-                logger.exception("[%s]: Unable to update sensor data." % self.log_tag)
-                self._releaseLock(logger)
-                return False
+                logger.exception("[%s]: Unable to roll back sensor updates." % self.log_tag)
 
-        # commit all changes
-        self.conn.commit()
+            self._releaseLock(logger)
+            return False
+
+        # commit all changes in one transaction
+        self._releaseAtomic()
+        self._commit()
         self._releaseLock(logger)
+
+        # Record the changes in the history after the lock is released.
+        if self.globalData.sensor_history is not None:
+            self._addSensorHistory(clientSensorIds, stateList, dataList, historyList)
+
         return True
 
     def getSensorId(self,
@@ -1523,17 +1926,17 @@ class Sqlite(_Storage):
         if not logger:
             logger = self.logger
 
-        self._acquireLock(logger)
+        self._acquireReadLock(logger)
 
         try:
             sensorId = self._getSensorId(nodeId, clientSensorId)
 
         except Exception as e:
             logger.exception("[%s]: Unable to get sensorId from database." % self.log_tag)
-            self._releaseLock(logger)
+            self._releaseReadLock(logger)
             return None
 
-        self._releaseLock(logger)
+        self._releaseReadLock(logger)
         return sensorId
 
     def getAlertId(self,
@@ -1545,17 +1948,17 @@ class Sqlite(_Storage):
         if not logger:
             logger = self.logger
 
-        self._acquireLock(logger)
+        self._acquireReadLock(logger)
 
         try:
             alertId = self._getAlertId(nodeId, clientAlertId)
 
         except Exception as e:
             logger.exception("[%s]: Unable to get alertId from database." % self.log_tag)
-            self._releaseLock(logger)
+            self._releaseReadLock(logger)
             return None
 
-        self._releaseLock(logger)
+        self._releaseReadLock(logger)
         return alertId
 
     def getSensorAlertLevels(self,
@@ -1566,11 +1969,11 @@ class Sqlite(_Storage):
         if not logger:
             logger = self.logger
 
-        self._acquireLock(logger)
+        self._acquireReadLock(logger)
 
         result = self._getSensorAlertLevels(sensorId, logger)
 
-        self._releaseLock(logger)
+        self._releaseReadLock(logger)
 
         # return list of alertLevel
         return result
@@ -1583,11 +1986,11 @@ class Sqlite(_Storage):
         if not logger:
             logger = self.logger
 
-        self._acquireLock(logger)
+        self._acquireReadLock(logger)
 
         result = self._getAlertAlertLevels(alertId, logger)
 
-        self._releaseLock(logger)
+        self._releaseReadLock(logger)
 
         # return list of alertLevels
         return result
@@ -1650,7 +2053,7 @@ class Sqlite(_Storage):
             return False
 
         # commit all changes
-        self.conn.commit()
+        self._commit()
         self._releaseLock(logger)
         return True
 
@@ -1662,7 +2065,7 @@ class Sqlite(_Storage):
         if not logger:
             logger = self.logger
 
-        self._acquireLock(logger)
+        self._acquireReadLock(logger)
 
         try:
             self.cursor.execute("SELECT alertLevel "
@@ -1671,11 +2074,11 @@ class Sqlite(_Storage):
 
         except Exception as e:
             logger.exception("[%s]: Unable to get all alert levels for alert clients." % self.log_tag)
-            self._releaseLock(logger)
+            self._releaseReadLock(logger)
             # return None if action failed
             return None
 
-        self._releaseLock(logger)
+        self._releaseReadLock(logger)
 
         # return list alertLevels as integer
         return [x[0] for x in result]
@@ -1687,7 +2090,7 @@ class Sqlite(_Storage):
         if not logger:
             logger = self.logger
 
-        self._acquireLock(logger)
+        self._acquireReadLock(logger)
 
         try:
             self.cursor.execute("SELECT alertLevel "
@@ -1696,11 +2099,11 @@ class Sqlite(_Storage):
 
         except Exception as e:
             logger.exception("[%s]: Unable to get all alert levels for sensors." % self.log_tag)
-            self._releaseLock(logger)
+            self._releaseReadLock(logger)
             # return None if action failed
             return None
 
-        self._releaseLock(logger)
+        self._releaseReadLock(logger)
 
         # return list alertLevels as integer
         return [x[0] for x in result]
@@ -1712,7 +2115,7 @@ class Sqlite(_Storage):
         if not logger:
             logger = self.logger
 
-        self._acquireLock(logger)
+        self._acquireReadLock(logger)
 
         # get all connected node ids from database
         try:
@@ -1723,11 +2126,11 @@ class Sqlite(_Storage):
 
         except Exception as e:
             logger.exception("[%s]: Unable to get all connected node ids." % self.log_tag)
-            self._releaseLock(logger)
+            self._releaseReadLock(logger)
             # return None if action failed
             return None
 
-        self._releaseLock(logger)
+        self._releaseReadLock(logger)
 
         # return list of nodeIds
         return [x[0] for x in result]
@@ -1739,7 +2142,7 @@ class Sqlite(_Storage):
         if not logger:
             logger = self.logger
 
-        self._acquireLock(logger)
+        self._acquireReadLock(logger)
 
         # get all persistent node ids from database
         try:
@@ -1750,11 +2153,11 @@ class Sqlite(_Storage):
 
         except Exception as e:
             logger.exception("[%s]: Unable to get all persistent node ids." % self.log_tag)
-            self._releaseLock(logger)
+            self._releaseReadLock(logger)
             # return None if action failed
             return None
 
-        self._releaseLock(logger)
+        self._releaseReadLock(logger)
 
         # return list of nodeIds
         return [x[0] for x in result]
@@ -1780,7 +2183,7 @@ class Sqlite(_Storage):
             return False
 
         # commit all changes
-        self.conn.commit()
+        self._commit()
         self._releaseLock(logger)
         return True
 
@@ -1805,7 +2208,7 @@ class Sqlite(_Storage):
             return False
 
         # commit all changes
-        self.conn.commit()
+        self._commit()
         self._releaseLock(logger)
         return True
 
@@ -1817,11 +2220,11 @@ class Sqlite(_Storage):
         if not logger:
             logger = self.logger
 
-        self._acquireLock(logger)
+        self._acquireReadLock(logger)
 
         result = self._getAlertById(alertId, logger)
 
-        self._releaseLock(logger)
+        self._releaseReadLock(logger)
 
         # return an alert object or None
         return result
@@ -1834,11 +2237,11 @@ class Sqlite(_Storage):
         if not logger:
             logger = self.logger
 
-        self._acquireLock(logger)
+        self._acquireReadLock(logger)
 
         result = self._getManagerById(managerId, logger)
 
-        self._releaseLock(logger)
+        self._releaseReadLock(logger)
 
         # return a manager object or None
         return result
@@ -1851,11 +2254,11 @@ class Sqlite(_Storage):
         if not logger:
             logger = self.logger
 
-        self._acquireLock(logger)
+        self._acquireReadLock(logger)
 
         result = self._getNodeById(nodeId, logger)
 
-        self._releaseLock(logger)
+        self._releaseReadLock(logger)
 
         # return a node object or None
         return result
@@ -1868,11 +2271,11 @@ class Sqlite(_Storage):
         if not logger:
             logger = self.logger
 
-        self._acquireLock(logger)
+        self._acquireReadLock(logger)
 
         result = self._getSensorById(sensorId, logger)
 
-        self._releaseLock(logger)
+        self._releaseReadLock(logger)
 
         # return a sensor object or None
         return result
@@ -1884,7 +2287,7 @@ class Sqlite(_Storage):
         if not logger:
             logger = self.logger
 
-        self._acquireLock(logger)
+        self._acquireReadLock(logger)
 
         nodes = list()
         try:
@@ -1898,10 +2301,10 @@ class Sqlite(_Storage):
 
         except Exception as e:
             logger.exception("[%s]: Unable to get nodes from database." % self.log_tag)
-            self._releaseLock(logger)
+            self._releaseReadLock(logger)
             return None
 
-        self._releaseLock(logger)
+        self._releaseReadLock(logger)
 
         # list(node objects)
         return nodes
@@ -1917,7 +2320,7 @@ class Sqlite(_Storage):
         if not logger:
             logger = self.logger
 
-        self._acquireLock(logger)
+        self._acquireReadLock(logger)
 
         try:
 
@@ -1984,10 +2387,10 @@ class Sqlite(_Storage):
 
         except Exception as e:
             logger.exception("[%s]: Unable to get complete system information from database." % self.log_tag)
-            self._releaseLock(logger)
+            self._releaseReadLock(logger)
             return None
 
-        self._releaseLock(logger)
+        self._releaseReadLock(logger)
 
         # return a list of
         # list[0] = list(option objects)
@@ -2005,7 +2408,7 @@ class Sqlite(_Storage):
         if not logger:
             logger = self.logger
 
-        self._acquireLock(logger)
+        self._acquireReadLock(logger)
 
         try:
             # get sensor state from database
@@ -2016,17 +2419,17 @@ class Sqlite(_Storage):
             result = self.cursor.fetchall()
             if len(result) != 1:
                 logger.error("[%s]: Sensor was not found." % self.log_tag)
-                self._releaseLock(logger)
+                self._releaseReadLock(logger)
                 return None
 
             state = result[0][0]
 
         except Exception as e:
             logger.exception("[%s]: Unable to get sensor state from database." % self.log_tag)
-            self._releaseLock(logger)
+            self._releaseReadLock(logger)
             return None
 
-        self._releaseLock(logger)
+        self._releaseReadLock(logger)
         return state
 
     def getSensorData(self,
@@ -2037,7 +2440,7 @@ class Sqlite(_Storage):
         if not logger:
             logger = self.logger
 
-        self._acquireLock(logger)
+        self._acquireReadLock(logger)
 
         try:
             # Get data type from database.
@@ -2048,14 +2451,14 @@ class Sqlite(_Storage):
             result = self.cursor.fetchall()
             if len(result) != 1:
                 logger.error("[%s]: Sensor was not found." % self.log_tag)
-                self._releaseLock(logger)
+                self._releaseReadLock(logger)
                 return None
 
             dataType = result[0][0]
 
         except Exception as e:
             logger.exception("[%s]: Unable to get sensor data type from database." % self.log_tag)
-            self._releaseLock(logger)
+            self._releaseReadLock(logger)
             return None
 
         data = SensorData()
@@ -2066,7 +2469,7 @@ class Sqlite(_Storage):
         if data.data is None:
             data = None
 
-        self._releaseLock(logger)
+        self._releaseReadLock(logger)
 
         # return a sensor data object or None
         return data
@@ -2078,13 +2481,199 @@ class Sqlite(_Storage):
         if not logger:
             logger = self.logger
 
+        # Stop the group commit thread and commit all pending changes.
+        if self._group_commit_thread is not None:
+            self._group_commit_exit = True
+            self._group_commit_event.set()
+            self._group_commit_thread.join()
+
         self._acquireLock(logger)
 
-        self.cursor.close()
-        self.conn.close()
+        # The storage can be closed multiple times (e.g., during the shutdown of the server).
+        if self._closed:
+            self._releaseLock(logger)
+            return
+        self._closed = True
+
+        if self._group_commit_thread is not None:
+            self._commitPending(logger)
+            logger.info("[%s]: Saved %d commits by committing changes in groups."
+                        % (self.log_tag, self._saved_commits))
+            self._group_commit_thread = None
+
+        self._cursor.close()
+        self._conn.close()
+
+        if self._reader_pool is not None:
+            for _ in range(self._reader_count):
+                reader_conn, reader_cursor = self._reader_pool.get()
+                reader_cursor.close()
+                reader_conn.close()
+            self._reader_pool = None
 
         self._releaseLock(logger)
 
+    def get_commit_future(self,
+                          logger: logging.Logger = None) -> concurrent.futures.Future:
+
+        future = concurrent.futures.Future()
+        with self.dbLock:
+            if self._group_commit_thread is None or self._pending_changes == 0:
+                future.set_result(True)
+
+            else:
+                self._commit_futures.append(future)
+
+        return future
+
+    def get_registration_hash(self,
+                              node_id: int,
+                              logger: logging.Logger = None) -> Optional[str]:
+
+        # Set logger instance to use.
+        if not logger:
+            logger = self.logger
+
+        with self.dbReadLock:
+            try:
+                self.cursor.execute("SELECT registrationHash FROM nodes WHERE id = ?", (node_id, ))
+                result = self.cursor.fetchall()
+
+            except Exception as e:
+                logger.exception("[%s]: Unable to get registration hash of node with id %d."
+                                 % (self.log_tag, node_id))
+                return None
+
+        if not result:
+            return None
+        return result[0][0]
+
+    def set_registration_hash(self,
+                              node_id: int,
+                              registration_hash: Optional[str],
+                              logger: logging.Logger = None) -> bool:
+
+        # Set logger instance to use.
+        if not logger:
+            logger = self.logger
+
+        with self.dbLock:
+            try:
+                self.cursor.execute("UPDATE nodes SET registrationHash = ? WHERE id = ?", (registration_hash, node_id))
+
+            except Exception as e:
+                logger.exception("[%s]: Unable to set registration hash of node with id %d."
+                                 % (self.log_tag, node_id))
+                return False
+
+            self._commit()
+
+        return True
+
+    def get_snapshot_token(self,
+                           logger: logging.Logger = None) -> Optional[str]:
+
+        # Set logger instance to use.
+        if not logger:
+            logger = self.logger
+
+        with self.dbReadLock:
+            try:
+                self.cursor.execute("SELECT value FROM internals WHERE type = ?", ("snapshotToken", ))
+                result = self.cursor.fetchall()
+
+            except Exception as e:
+                logger.exception("[%s]: Unable to get snapshot token." % self.log_tag)
+                return None
+
+        if not result:
+            return None
+        return result[0][0]
+
+    def set_snapshot_token(self,
+                           token: Optional[str],
+                           logger: logging.Logger = None) -> bool:
+
+        # Set logger instance to use.
+        if not logger:
+            logger = self.logger
+
+        with self.dbLock:
+            try:
+                self.cursor.execute("DELETE FROM internals WHERE type = ?", ("snapshotToken", ))
+                if token is not None:
+                    self.cursor.execute("INSERT INTO internals ("
+                                        + "type, "
+                                        + "value) VALUES (?, ?)", ("snapshotToken", token))
+
+            except Exception as e:
+                logger.exception("[%s]: Unable to set snapshot token." % self.log_tag)
+                return False
+
+            self._commit()
+
+        return True
+
+    # region Alert API
+
+    def get_alerts(self,
+                   node_id: int,
+                   logger: logging.Logger = None) -> Optional[List[Alert]]:
+
+        # Set logger instance to use.
+        if not logger:
+            logger = self.logger
+
+        alerts = list()
+        with self.dbReadLock:
+            try:
+                self.cursor.execute("SELECT id FROM alerts WHERE nodeId = ? ORDER BY id ASC", (node_id, ))
+                result = self.cursor.fetchall()
+
+                for alert_tuple in result:
+                    alert = self._getAlertById(alert_tuple[0], logger)
+                    if alert is None:
+                        raise ValueError("Can not retrieve alert with id %d." % alert_tuple[0])
+                    alerts.append(alert)
+
+            except Exception as e:
+                logger.exception("[%s]: Unable to get alerts for node id %d." % (self.log_tag, node_id))
+                return None
+
+        return alerts
+
+    # endregion
+
+    # region Manager API
+
+    def get_managers(self,
+                     node_id: int,
+                     logger: logging.Logger = None) -> Optional[List[Manager]]:
+
+        # Set logger instance to use.
+        if not logger:
+            logger = self.logger
+
+        managers = list()
+        with self.dbReadLock:
+            try:
+                self.cursor.execute("SELECT id FROM managers WHERE nodeId = ? ORDER BY id ASC", (node_id, ))
+                result = self.cursor.fetchall()
+
+                for manager_tuple in result:
+                    manager = self._getManagerById(manager_tuple[0], logger)
+                    if manager is None:
+                        raise ValueError("Can not retrieve manager with id %d." % manager_tuple[0])
+                    managers.append(manager)
+
+            except Exception as e:
+                logger.exception("[%s]: Unable to get managers for node id %d." % (self.log_tag, node_id))
+                return None
+
+        return managers
+
+    # endregion
+
     # region Option API
 
     def _delete_option_by_type(self,
@@ -2227,7 +2816,7 @@ class Sqlite(_Storage):
 
         with self.dbLock:
             if self._delete_option_by_type(option_type, logger):
-                self.conn.commit()
+                self._commit()
                 return True
 
         return False
@@ -2240,7 +2829,7 @@ class Sqlite(_Storage):
         if not logger:
             logger = self.logger
 
-        with self.dbLock:
+        with self.dbReadLock:
             return self._get_option_by_type(option_type,
                                             logger)
 
@@ -2250,7 +2839,7 @@ class Sqlite(_Storage):
         if not logger:
             logger = self.logger
 
-        with self.dbLock:
+        with self.dbReadLock:
             return self._get_options_list(logger)
 
     def update_option(self,
@@ -2268,7 +2857,7 @@ class Sqlite(_Storage):
 
         with self.dbLock:
             if self._update_option(option, logger):
-                self.conn.commit()
+                self._commit()
                 return True
 
         return False
@@ -2283,7 +2872,7 @@ class Sqlite(_Storage):
 
         with self.dbLock:
             if self._update_option(option, logger):
-                self.conn.commit()
+                self._commit()
                 return True
 
         return False
@@ -2807,6 +3396,135 @@ class Sqlite(_Storage):
 
         return self._insert_sensor_data(sensor_id, data_type, data, logger)
 
+    def _upsert_sensors(self,
+                        node_id: int,
+                        sensors: List[Sensor],
+                        logger: logging.Logger = None) -> bool:
+        """
+        Internal function that inserts/updates all sensors of a node and deletes all remaining sensors of the node
+        that are not part of the given sensors. Each table is changed with a constant number of statements
+        regardless of the number of sensors.
+
+        :param node_id:
+        :param sensors:
+        :param logger:
+        :return: success or failure
+        """
+
+        # Set logger instance to use.
+        if not logger:
+            logger = self.logger
+
+        # If a sensor is given multiple times, the last one is stored (as if each sensor was upserted on its own).
+        sensors_by_client_id = collections.OrderedDict()  # type: Dict[int, Sensor]
+        for sensor in sensors:
+            sensors_by_client_id[sensor.clientSensorId] = sensor
+
+        for sensor in sensors_by_client_id.values():
+            if sensor.dataType not in [SensorDataType.NONE,
+                                       SensorDataType.INT,
+                                       SensorDataType.FLOAT,
+                                       SensorDataType.GPS]:
+                logger.error("[%s]: Data type unknown. Unable to add data for sensor with client id %d."
+                             % (self.log_tag, sensor.clientSensorId))
+                return False
+
+        try:
+            client_sensor_ids = self._getClientSensorIds(node_id)
+
+            # Update existing sensors.
+            existing_sensors = [x for x in sensors_by_client_id.values() if x.clientSensorId in client_sensor_ids]
+            self.cursor.executemany("UPDATE sensors SET "
+                                    + "description = ?, "
+                                    + "state = ?, "
+                                    + "alertDelay = ?, "
+                                    + "dataType = ?, "
+                                    + "error_state = ?, "
+                                    + "error_msg = ? "
+                                    + "WHERE id = ?",
+                                    [(x.description,
+                                      x.state,
+                                      x.alertDelay,
+                                      x.dataType,
+                                      x.error_state.state,
+                                      x.error_state.msg,
+                                      client_sensor_ids[x.clientSensorId][0]) for x in existing_sensors])
+
+            # Add new sensors.
+            new_sensors = [x for x in sensors_by_client_id.values() if x.clientSensorId not in client_sensor_ids]
+            if new_sensors:
+                for sensor in new_sensors:
+                    logger.info("[%s]: Sensor on node id %d with client id %d does not exist in database. Adding it."
+                                % (self.log_tag, node_id, sensor.clientSensorId))
+
+                self.cursor.executemany("INSERT INTO sensors ("
+                                        + "nodeId, "
+                                        + "clientSensorId, "
+                                        + "description, "
+                                        + "state, "
+                                        + "alertDelay, "
+                                        + "dataType,"
+                                        + "error_state,"
+                                        + "error_msg) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                                        [(node_id,
+                                          x.clientSensorId,
+                                          x.description,
+                                          x.state,
+                                          x.alertDelay,
+                                          x.dataType,
+                                          x.error_state.state,
+                                          x.error_state.msg) for x in new_sensors])
+
+                # Get sensor ids of the added sensors.
+                client_sensor_ids = self._getClientSensorIds(node_id)
+
+            # Remove alert levels and data of existing sensors and all sensors that were not part of
+            # the given sensors.
+            removed_sensor_ids = [(sensor_id, ) for client_sensor_id, (sensor_id, _) in client_sensor_ids.items()
+                                  if client_sensor_id not in sensors_by_client_id]
+            existing_sensor_ids = [(client_sensor_ids[x.clientSensorId][0], ) for x in existing_sensors]
+            for table in ["sensorsDataInt", "sensorsDataFloat", "sensorsDataGPS", "sensorsAlertLevels"]:
+                self.cursor.executemany("DELETE FROM " + table + " WHERE sensorId = ?",
+                                        existing_sensor_ids + removed_sensor_ids)
+            self.cursor.executemany("DELETE FROM sensors WHERE id = ?", removed_sensor_ids)
+
+            # Add alert levels and data of all given sensors.
+            self.cursor.executemany("INSERT INTO sensorsAlertLevels ("
+                                    + "sensorId, "
+                                    + "alertLevel) VALUES (?, ?)",
+                                    [(client_sensor_ids[x.clientSensorId][0], alert_level)
+                                     for x in sensors_by_client_id.values() for alert_level in x.alertLevels])
+
+            int_data = list()
+            float_data = list()
+            gps_data = list()
+            for sensor in sensors_by_client_id.values():
+                sensor_id = client_sensor_ids[sensor.clientSensorId][0]
+                if sensor.dataType == SensorDataType.INT:
+                    data = cast(SensorDataInt, sensor.data)
+                    int_data.append((sensor_id, data.value, data.unit))
+
+                elif sensor.dataType == SensorDataType.FLOAT:
+                    data = cast(SensorDataFloat, sensor.data)
+                    float_data.append((sensor_id, data.value, data.unit))
+
+                elif sensor.dataType == SensorDataType.GPS:
+                    data = cast(SensorDataGPS, sensor.data)
+                    gps_data.append((sensor_id, data.lat, data.lon, data.utctime))
+
+            self.cursor.executemany("INSERT INTO sensorsDataInt (sensorId, value, unit) VALUES (?, ?, ?)",
+                                    int_data)
+            self.cursor.executemany("INSERT INTO sensorsDataFloat (sensorId, value, unit) VALUES (?, ?, ?)",
+                                    float_data)
+            self.cursor.executemany("INSERT INTO sensorsDataGPS (sensorId, lat, lon, utctime) VALUES (?, ?, ?, ?)",
+                                    gps_data)
+
+        except Exception as e:
+            logger.exception("[%s]: Unable to upsert sensors for node id %d." % (self.log_tag, node_id))
+            return False
+
+        return True
+
     def delete_sensor(self,
                       sensor_id: int,
                       logger: logging.Logger = None) -> bool:
@@ -2816,7 +3534,7 @@ class Sqlite(_Storage):
 
         with self.dbLock:
             if self._delete_sensor(sensor_id, logger):
-                self.conn.commit()
+                self._commit()
                 return True
 
         return False
@@ -2829,7 +3547,7 @@ class Sqlite(_Storage):
         if not logger:
             logger = self.logger
 
-        with self.dbLock:
+        with self.dbReadLock:
             try:
                 self.cursor.execute("SELECT error_state, "
                                     + "error_msg "
@@ -2855,7 +3573,7 @@ class Sqlite(_Storage):
             logger = self.logger
 
         result = []
-        with self.dbLock:
+        with self.dbReadLock:
             try:
                 self.cursor.execute("SELECT id "
                                     + "FROM sensors "
@@ -2872,14 +3590,14 @@ class Sqlite(_Storage):
 
     def get_sensors(self,
                     node_id: int,
-                    logger: logging.Logger = None) -> List[Sensor]:
+                    logger: logging.Logger = None) -> Optional[List[Sensor]]:
 
         # Set logger instance to use.
         if not logger:
             logger = self.logger
 
-        sensors = []
-        with self.dbLock:
+        sensors = None
+        with self.dbReadLock:
             try:
                 sensors = self._get_sensors(node_id, logger)
             except Exception as e:
@@ -2925,7 +3643,7 @@ class Sqlite(_Storage):
                                  % (self.log_tag, node_id, client_sensor_id))
                 return False
 
-            self.conn.commit()
+            self._commit()
             return True
 
     def upsert_sensor(self,
@@ -2938,7 +3656,7 @@ class Sqlite(_Storage):
 
         with self.dbLock:
             if self._upsert_sensor(sensor, logger):
-                self.conn.commit()
+                self._commit()
                 return True
 
         return False
@@ -2961,29 +3679,26 @@ class Sqlite(_Storage):
             return False
 
         with self.dbLock:
-
-            # Upsert given sensors.
-            for sensor in sensors:
-                if not self._upsert_sensor(sensor, logger):
-                    return False
-
-            # Remove all remaining sensors from database that were not part of the given sensors list argument.
             try:
-                db_sensors = self._get_sensors(node_id, logger)
+                self._beginAtomic()
 
             except Exception as e:
-                logger.exception("[%s]: Unable to get sensors for node id %d."
-                                 % (self.log_tag, node_id))
+                logger.exception("[%s]: Unable to start sensor upserts." % self.log_tag)
                 return False
 
-            client_sensor_ids = [obj.clientSensorId for obj in sensors]
-            to_remove = filter(lambda x: x.clientSensorId not in client_sensor_ids, db_sensors)
+            if not self._upsert_sensors(node_id, sensors, logger):
 
-            for db_sensor in to_remove:
-                if not self._delete_sensor(db_sensor.sensorId, logger):
-                    return False
+                # Discard the changes already made so the sensors are upserted either completely or not at all.
+                try:
+                    self._rollbackAtomic()
 
-            self.conn.commit()
+                except Exception as e:
+                    logger.exception("[%s]: Unable to roll back sensor upserts." % self.log_tag)
+
+                return False
+
+            self._releaseAtomic()
+            self._commit()
             return True
 
     # endregion
@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+
+# written by sqall
+# twitter: https://twitter.com/sqall01
+# blog: https://h4des.org
+# github: https://github.com/sqall01
+#
+# Licensed under the GNU Affero General Public License, version 3.
+
+import collections
+import os
+import socket
+import ssl
+import threading
+import time
+from typing import Optional, Dict, Any, List
+from ..globalData.globalData import GlobalData
+
+
+class TlsContext:
+    """
+    Holds the TLS/SSL context that is shared by all client connections. The context is created once and is only
+    recreated if the server certificate, key or client CA file changes on disk. Since all connections use the same
+    context, the TLS session cache and session tickets of the context allow clients to resume their sessions.
+    Additionally, the duration of the TLS handshakes is measured.
+    """
+
+    def __init__(self,
+                 globalData: GlobalData,
+                 check_interval: Optional[float] = None,
+                 max_samples: int = 1000):
+        """
+        :param globalData:
+        :param check_interval: interval in seconds in which the files are checked for changes
+        (None uses the configured interval)
+        :param max_samples: number of most recent handshake durations that are kept for statistics
+        """
+        self._log_tag = os.path.basename(__file__)
+        self._global_data = globalData
+        self._logger = self._global_data.logger
+
+        if check_interval is None:
+            check_interval = self._global_data.tlsReloadCheckInterval
+        self._check_interval = check_interval
+
+        self._lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+
+        self._last_check = time.time()
+        self._file_states = self._get_file_states()
+        self._ssl_context = self._create_ssl_context()
+
+        self._reload_count = 0
+        self._handshake_count = 0
+        self._handshake_failed_count = 0
+        self._handshake_resumed_count = 0
+        self._handshake_durations = collections.deque(maxlen=max_samples)
+
+    def _get_server_protocol(self) -> int:
+        """
+        Internal function that gets the protocol for the server side context. The generic (deprecated) protocol
+        negotiating the highest version is mapped to its server side variant.
+
+        :return:
+        """
+        protocol = self._global_data.sslProtocol
+        if protocol == ssl.PROTOCOL_SSLv23 and hasattr(ssl, "PROTOCOL_TLS_SERVER"):
+            return ssl.PROTOCOL_TLS_SERVER
+        return protocol
+
+    def _create_ssl_context(self) -> ssl.SSLContext:
+        """
+        Internal function that creates the TLS/SSL context from the current configuration.
+
+        :return:
+        """
+        ssl_context = ssl.SSLContext(self._get_server_protocol())
+        ssl_context.load_cert_chain(certfile=self._global_data.serverCertFile,
+                                    keyfile=self._global_data.serverKeyFile)
+        ssl_context.set_ciphers(self._global_data.sslCiphers)
+        ssl_context.options = self._global_data.sslOptions
+
+        # Session tickets are needed for the session resumption of the clients.
+        ssl_context.options &= ~ssl.OP_NO_TICKET
+
+        # If activated, require a client certificate.
+        if self._global_data.useClientCertificates:
+            ssl_context.verify_mode = ssl.CERT_REQUIRED
+            ssl_context.load_verify_locations(cafile=self._global_data.clientCAFile)
+
+        return ssl_context
+
+    def _get_file_states(self) -> List[Optional[tuple]]:
+        """
+        Internal function that gets the modification state of all files the context is created from.
+
+        :return:
+        """
+        file_locations = [self._global_data.serverCertFile, self._global_data.serverKeyFile]
+        if self._global_data.useClientCertificates:
+            file_locations.append(self._global_data.clientCAFile)
+
+        file_states = list()
+        for file_location in file_locations:
+            try:
+                stat = os.stat(file_location)
+                file_states.append((stat.st_mtime_ns, stat.st_size, stat.st_ino))
+
+            except Exception as e:
+                file_states.append(None)
+
+        return file_states
+
+    def _check_for_changes(self):
+        """
+        Internal function that recreates the context if the files it is created from have changed.
+        """
+        with self._lock:
+            now = time.time()
+            if (now - self._last_check) < self._check_interval:
+                return
+            self._last_check = now
+
+            file_states = self._get_file_states()
+            if file_states == self._file_states:
+                return
+
+            self._logger.info("[%s]: TLS/SSL certificate files changed. Reloading context." % self._log_tag)
+            self._reload(file_states)
+
+    def _reload(self, file_states: List[Optional[tuple]]) -> bool:
+        """
+        Internal function that recreates the context. The lock has to be held by the caller.
+
+        :param file_states: modification state of the files the context is created from
+        :return: success or failure
+        """
+        try:
+            ssl_context = self._create_ssl_context()
+
+        except Exception as e:
+            # Keep the old context to not lock out all clients because of an incomplete update of the files
+            # (for example, a new certificate was written but its key not yet). Since the file states are
+            # not updated, the reload is tried again after the next check interval.
+            self._logger.exception("[%s]: Reloading TLS/SSL context failed. Keeping old context." % self._log_tag)
+            return False
+
+        self._ssl_context = ssl_context
+        self._file_states = file_states
+        self._reload_count += 1
+        return True
+
+    @property
+    def ssl_context(self) -> ssl.SSLContext:
+        self._check_for_changes()
+        return self._ssl_context
+
+    def reload(self) -> bool:
+        """
+        Recreates the context from the current configuration regardless of file changes.
+
+        :return: success or failure
+        """
+        with self._lock:
+            self._last_check = time.time()
+            return self._reload(self._get_file_states())
+
+    def wrap_socket(self, sock: socket.socket) -> ssl.SSLSocket:
+        """
+        Establishes the TLS/SSL connection with a client and measures the duration of the handshake.
+
+        :param sock: connected socket of the client
+        :return: TLS/SSL socket
+        """
+        ssl_context = self.ssl_context
+        start = time.perf_counter()
+        try:
+            ssl_sock = ssl_context.wrap_socket(sock, server_side=True)
+
+        except Exception:
+            self.record_handshake(None, 0.0)
+            raise
+
+        self.record_handshake(ssl_sock, time.perf_counter() - start)
+        return ssl_sock
+
+    def start_handshake(self, sock: socket.socket) -> ssl.SSLSocket:
+        """
+        Wraps the non-blocking socket of a client without establishing the TLS/SSL connection. The caller drives
+        the handshake with do_handshake() and reports its result with record_handshake().
+
+        :param sock: connected non-blocking socket of the client
+        :return: TLS/SSL socket
+        """
+        return self.ssl_context.wrap_socket(sock, server_side=True, do_handshake_on_connect=False)
+
+    def record_handshake(self,
+                         ssl_sock: Optional[ssl.SSLSocket],
+                         duration: float):
+        """
+        Adds the result of a handshake to the statistics.
+
+        :param ssl_sock: TLS/SSL socket of the established connection or None if the handshake failed
+        :param duration: duration of the handshake in seconds
+        """
+        with self._stats_lock:
+            if ssl_sock is None:
+                self._handshake_failed_count += 1
+                return
+
+            self._handshake_count += 1
+            if ssl_sock.session_reused:
+                self._handshake_resumed_count += 1
+            self._handshake_durations.append(duration)
+
+    def reset_stats(self):
+        """
+        Resets the statistics of the TLS/SSL handshakes (for example, to measure a reconnect storm).
+        """
+        with self._stats_lock:
+            self._handshake_count = 0
+            self._handshake_failed_count = 0
+            self._handshake_resumed_count = 0
+            self._handshake_durations.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Gets the statistics of the TLS/SSL handshakes.
+
+        :return: dictionary with the number of handshakes and the handshake durations in seconds
+        """
+        with self._stats_lock:
+            durations = sorted(self._handshake_durations)
+            stats = {"handshakes": self._handshake_count,
+                     "resumed": self._handshake_resumed_count,
+                     "failed": self._handshake_failed_count,
+                     "reloads": self._reload_count}
+
+        if durations:
+            stats["duration_mean"] = sum(durations) / len(durations)
+            stats["duration_p50"] = durations[int(0.50 * (len(durations) - 1))]
+            stats["duration_p99"] = durations[int(0.99 * (len(durations) - 1))]
+            stats["duration_max"] = durations[-1]
+
+        else:
+            stats["duration_mean"] = 0.0
+            stats["duration_p50"] = 0.0
+            stats["duration_p99"] = 0.0
+            stats["duration_max"] = 0.0
+
+        return stats
@@ -0,0 +1,37 @@
+"""
+Test instrumentation functions for the "python" instrumentation mode.
+"""
+
+import time
+from lib.localObjects import SensorAlert
+
+
+def mirror(sensor_alert: SensorAlert) -> SensorAlert:
+    return sensor_alert
+
+
+def toggle_state(sensor_alert: SensorAlert) -> SensorAlert:
+    sensor_alert.state = 1 - sensor_alert.state
+    return sensor_alert
+
+
+def suppress(sensor_alert: SensorAlert) -> None:
+    return None
+
+
+def timeout(sensor_alert: SensorAlert) -> SensorAlert:
+    time.sleep(5)
+    return sensor_alert
+
+
+def exception(sensor_alert: SensorAlert) -> SensorAlert:
+    raise ValueError("instrumentation failed")
+
+
+def invalid_sensor_id(sensor_alert: SensorAlert) -> SensorAlert:
+    sensor_alert.sensorId += 1
+    return sensor_alert
+
+
+def invalid_return_value(sensor_alert: SensorAlert) -> str:
+    return "invalid"
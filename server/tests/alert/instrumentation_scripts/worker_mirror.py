@@ -0,0 +1,23 @@
+#!/usr/bin/env python3
+
+"""
+Test instrumentation script which runs as persistent worker and outputs each received sensor alert. The worker
+waits before it answers if the optional data contains "sleep" and exits with the given exit code if it contains "exit".
+"""
+
+import json
+import sys
+import time
+
+if sys.argv[1:] != ["--worker"]:
+    print(sys.argv[1])
+    sys.exit(0)
+
+for line in sys.stdin:
+    optional_data = json.loads(line).get("optionalData") or {}
+    if "sleep" in optional_data:
+        time.sleep(optional_data["sleep"])
+    if "exit" in optional_data:
+        sys.exit(optional_data["exit"])
+    sys.stdout.write(line)
+    sys.stdout.flush()
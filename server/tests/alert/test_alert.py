@@ -140,6 +140,32 @@ class MockManagerUpdateExecuter:
         self._manager_update_event.set()
 
 
+class MockClientCommunication:
+
+    def __init__(self, node_type: str, alert_levels: List[int]):
+        self.nodeType = node_type
+        self.clientInitialized = True
+        self.clientAlertLevels = set(alert_levels)
+        self.clientAddress = "127.0.0.1"
+        self.clientPort = 1337
+
+
+class MockServerSession:
+
+    def __init__(self, node_type: str, alert_levels: List[int]):
+        self.clientComm = MockClientCommunication(node_type, alert_levels)
+
+
+class MockSenderDispatcher:
+
+    def __init__(self):
+        self.messages = list()
+
+    def queue_message(self, client_comm, message) -> bool:
+        self.messages.append((client_comm, message))
+        return True
+
+
 class MockInternalSensor(AlertLevelInstrumentationErrorSensor):
 
     def __init__(self, global_data: GlobalData):
@@ -313,6 +339,10 @@ class TestAlert(TestCase):
         for alert_level in alert_levels:
             alert_level.triggerAlertTriggered = True
 
+        # Compile the trigger conditions of the changed alert levels.
+        global_data.alertLevels = alert_levels
+        sensor_alert_executer.update_alert_levels()
+
         sensor_alert_executer._update_suitable_alert_levels(sensor_alert_states)
 
         for sensor_alert_state in sensor_alert_states:
@@ -343,6 +373,10 @@ class TestAlert(TestCase):
         for alert_level in alert_levels:
             alert_level.triggerAlertTriggered = True
 
+        # Compile the trigger conditions of the changed alert levels.
+        global_data.alertLevels = alert_levels
+        sensor_alert_executer.update_alert_levels()
+
         sensor_alert_executer._update_suitable_alert_levels(sensor_alert_states)
 
         for sensor_alert_state in sensor_alert_states:
@@ -394,6 +428,10 @@ class TestAlert(TestCase):
                 alert_level.profiles = [0, 1, 2, 4]
             ctr += 1
 
+        # Compile the trigger conditions of the changed alert levels.
+        global_data.alertLevels = alert_levels
+        sensor_alert_executer.update_alert_levels()
+
         sensor_alert_executer._update_suitable_alert_levels(sensor_alert_states)
 
         for sensor_alert_state in sensor_alert_states:
@@ -450,6 +488,10 @@ class TestAlert(TestCase):
         sensor_alert_state._init_sensor_alert.state = 1
         sensor_alert_states.append(sensor_alert_state)
 
+        # Compile the trigger conditions of the changed alert levels.
+        global_data.alertLevels = alert_levels
+        sensor_alert_executer.update_alert_levels()
+
         sensor_alert_executer._update_suitable_alert_levels(sensor_alert_states)
 
         for sensor_alert_state in sensor_alert_states:
@@ -496,6 +538,10 @@ class TestAlert(TestCase):
             alert_level.triggerAlertTriggered = True
             alert_level.instrumentation_active = True
 
+        # Compile the trigger conditions of the changed alert levels.
+        global_data.alertLevels = alert_levels
+        sensor_alert_executer.update_alert_levels()
+
         sensor_alert_executer._update_suitable_alert_levels(sensor_alert_states)
 
         for sensor_alert_state in sensor_alert_states:
@@ -541,6 +587,10 @@ class TestAlert(TestCase):
             alert_level.triggerAlertTriggered = True
             alert_level.instrumentation_active = True
 
+        # Compile the trigger conditions of the changed alert levels.
+        global_data.alertLevels = alert_levels
+        sensor_alert_executer.update_alert_levels()
+
         sensor_alert_executer._update_suitable_alert_levels(sensor_alert_states)
 
         for sensor_alert_state in sensor_alert_states:
@@ -587,6 +637,10 @@ class TestAlert(TestCase):
             alert_level.triggerAlertTriggered = True
             alert_level.instrumentation_active = True
 
+        # Compile the trigger conditions of the changed alert levels.
+        global_data.alertLevels = alert_levels
+        sensor_alert_executer.update_alert_levels()
+
         sensor_alert_executer._update_suitable_alert_levels(sensor_alert_states)
 
         for sensor_alert_state in sensor_alert_states:
@@ -631,6 +685,10 @@ class TestAlert(TestCase):
             alert_level.triggerAlertNormal = False
             alert_level.instrumentation_active = True
 
+        # Compile the trigger conditions of the changed alert levels.
+        global_data.alertLevels = alert_levels
+        sensor_alert_executer.update_alert_levels()
+
         sensor_alert_executer._update_suitable_alert_levels(sensor_alert_states)
 
         for sensor_alert_state in sensor_alert_states:
@@ -675,6 +733,10 @@ class TestAlert(TestCase):
             alert_level.triggerAlertNormal = True
             alert_level.instrumentation_active = True
 
+        # Compile the trigger conditions of the changed alert levels.
+        global_data.alertLevels = alert_levels
+        sensor_alert_executer.update_alert_levels()
+
         sensor_alert_executer._update_suitable_alert_levels(sensor_alert_states)
 
         for sensor_alert_state in sensor_alert_states:
@@ -2084,8 +2146,9 @@ class TestAlert(TestCase):
             self.assertFalse(manager_update_executer._manager_update_event.is_set())
             self.assertEqual(0, len(manager_update_executer._queue_state_change))
 
-        # Change system profile to change trigger condition.
+        # Change system profile to change trigger condition (the option executer notifies the sensor alert executer).
         global_data.storage.profile = 99
+        sensor_alert_executer.force_reevaluation()
 
         for i in range(int(delay/2) + 1):
             self.assertEqual(0, len(TestAlert._callback_trigger_sensor_alert_arg))
@@ -2100,3 +2163,186 @@ class TestAlert(TestCase):
         # All sensor alerts should have been dropped.
         self.assertTrue(manager_update_executer._manager_update_event.is_set())
         self.assertEqual(num, len(manager_update_executer._queue_state_change))
+
+    def _create_run_executer(self,
+                             num: int,
+                             delay: int) -> Tuple[GlobalData, SensorAlertExecuter, List[SensorAlert]]:
+        """
+        Creates a sensor alert executer with triggering alert levels and the sensors for the sensor alerts.
+        """
+        TestAlert._callback_trigger_sensor_alert_arg.clear()
+
+        global_data = GlobalData()
+        global_data.logger = logging.getLogger("Alert Test Case")
+        global_data.storage = MockStorage()
+        global_data.storage.profile = 0
+        global_data.managerUpdateExecuter = MockManagerUpdateExecuter()
+
+        alert_levels, sensor_alerts = self._create_sensor_alerts(num)
+        for alert_level in alert_levels:
+            alert_level.triggerAlertTriggered = True
+
+        global_data.alertLevels = alert_levels
+        sensor_alert_executer = SensorAlertExecuter(global_data)
+        for sensor_alert in sensor_alerts:
+            sensor_alert.alertDelay = delay
+            sensor_alert.changeState = True
+
+            sensor = Sensor()
+            sensor.sensorId = sensor_alert.sensorId
+            sensor.nodeId = sensor_alert.nodeId
+            sensor.clientSensorId = 0
+            sensor.description = sensor_alert.description
+            sensor.alertDelay = sensor_alert.alertDelay
+            sensor.alertLevels = list(sensor_alert.alertLevels)
+            sensor.state = sensor_alert.state
+            sensor.dataType = sensor_alert.dataType
+            sensor.data = sensor_alert.data
+            global_data.storage.add_sensor(sensor)
+
+        # Overwrite _trigger_sensor_alert() function of SensorAlertExecuter object since it will be called
+        # if a sensor alert is triggered.
+        func_type = type(sensor_alert_executer._trigger_sensor_alert)
+        sensor_alert_executer._trigger_sensor_alert = func_type(_callback_trigger_sensor_alert,
+                                                                sensor_alert_executer)
+
+        sensor_alert_executer.daemon = True
+        sensor_alert_executer.start()
+        self.addCleanup(sensor_alert_executer.exit)
+
+        return global_data, sensor_alert_executer, sensor_alerts
+
+    def test_run_trigger_without_polling(self):
+        """
+        Integration test that checks if sensor alerts without alert delay are triggered right after they are
+        received (and not in the next processing round).
+        """
+        _, sensor_alert_executer, sensor_alerts = self._create_run_executer(5, 0)
+
+        for i in range(len(sensor_alerts)):
+            sensor_alert = sensor_alerts[i]
+            sensor_alert_executer.add_sensor_alert(sensor_alert.nodeId,
+                                                   sensor_alert.sensorId,
+                                                   sensor_alert.state,
+                                                   sensor_alert.optionalData,
+                                                   sensor_alert.changeState,
+                                                   sensor_alert.hasLatestData,
+                                                   sensor_alert.dataType,
+                                                   sensor_alert.data)
+
+            # Wait considerably shorter than the former processing interval of 0.5 seconds.
+            timeout = time.time() + 0.25
+            while len(TestAlert._callback_trigger_sensor_alert_arg) < i + 1 and time.time() < timeout:
+                time.sleep(0.01)
+            self.assertEqual(i + 1, len(TestAlert._callback_trigger_sensor_alert_arg))
+
+    def test_run_alert_delay_force_reevaluation(self):
+        """
+        Integration test that checks if sensor alerts waiting for their alert delay are dropped as soon as the
+        executer is told that the system profile has changed.
+        """
+        num = 5
+        global_data, sensor_alert_executer, sensor_alerts = self._create_run_executer(num, 60)
+        manager_update_executer = global_data.managerUpdateExecuter
+
+        for sensor_alert in sensor_alerts:
+            sensor_alert_executer.add_sensor_alert(sensor_alert.nodeId,
+                                                   sensor_alert.sensorId,
+                                                   sensor_alert.state,
+                                                   sensor_alert.optionalData,
+                                                   sensor_alert.changeState,
+                                                   sensor_alert.hasLatestData,
+                                                   sensor_alert.dataType,
+                                                   sensor_alert.data)
+
+        time.sleep(0.5)
+        self.assertEqual(num, len(sensor_alert_executer._deadline_heap))
+        self.assertFalse(manager_update_executer._manager_update_event.is_set())
+
+        # Change system profile to change trigger condition.
+        global_data.storage.profile = 99
+        sensor_alert_executer.force_reevaluation()
+
+        self.assertTrue(manager_update_executer._manager_update_event.wait(5))
+        time.sleep(0.5)
+        self.assertEqual(num, len(manager_update_executer._queue_state_change))
+        self.assertEqual(0, len(sensor_alert_executer._deadline_heap))
+        self.assertEqual(0, len(TestAlert._callback_trigger_sensor_alert_arg))
+
+    def test_trigger_sensor_alert_routing(self):
+        """
+        Tests that a triggered sensor alert is only sent to the initialized alert and manager clients that handle
+        one of the triggered alert levels.
+        """
+        global_data = GlobalData()
+        global_data.logger = logging.getLogger("Alert Test Case")
+        global_data.sender_dispatcher = MockSenderDispatcher()
+
+        server_sessions = {"alert_1": MockServerSession("alert", [1]),
+                           "alert_2": MockServerSession("alert", [2]),
+                           "alert_1_3": MockServerSession("alert", [1, 3]),
+                           "manager": MockServerSession("manager", [1, 2, 3]),
+                           "sensor": MockServerSession("sensor", [1]),
+                           "not_initialized": MockServerSession("alert", [1])}
+        for name, server_session in server_sessions.items():
+            global_data.serverSessions.append(server_session)
+            if name != "not_initialized":
+                global_data.serverSessions.add_initialized_client(server_session.clientComm)
+
+        alert_levels, sensor_alerts = self._create_sensor_alerts(4)
+        sensor_alert = sensor_alerts[1]
+        sensor_alert.alertLevels = [1, 3]
+        sensor_alert.triggeredAlertLevels = [1, 3]
+
+        global_data.alertLevels = alert_levels
+        sensor_alert_executer = SensorAlertExecuter(global_data)
+        sensor_alert_executer._trigger_sensor_alert(SensorAlertState(sensor_alert, alert_levels))
+
+        recipients = [x[0] for x in global_data.sender_dispatcher.messages]
+        self.assertEqual(3, len(recipients))
+        self.assertEqual({server_sessions[x].clientComm for x in ["alert_1", "alert_1_3", "manager"]},
+                         set(recipients))
+
+        # Disconnected clients no longer receive sensor alerts.
+        global_data.serverSessions.remove(server_sessions["alert_1"])
+        global_data.serverSessions.remove_initialized_client(server_sessions["manager"].clientComm)
+        global_data.sender_dispatcher.messages.clear()
+        sensor_alert_executer._trigger_sensor_alert(SensorAlertState(sensor_alert, alert_levels))
+
+        recipients = [x[0] for x in global_data.sender_dispatcher.messages]
+        self.assertEqual([server_sessions["alert_1_3"].clientComm], recipients)
+
+    def test_update_suitable_alert_levels_profile_change(self):
+        """
+        Tests that the system profile is only read again after the sensor alert executer was told about a change.
+        """
+        num = 2
+
+        global_data = GlobalData()
+        global_data.logger = logging.getLogger("Alert Test Case")
+        global_data.storage = MockStorage()
+        global_data.storage.profile = 0
+
+        alert_levels, sensor_alerts = self._create_sensor_alerts(num)
+        for alert_level in alert_levels:
+            alert_level.triggerAlertTriggered = True
+        alert_levels[1].profiles = [1]
+
+        global_data.alertLevels = alert_levels
+        sensor_alert_executer = SensorAlertExecuter(global_data)
+
+        sensor_alert_states = [SensorAlertState(x, alert_levels) for x in sensor_alerts]
+        sensor_alert_executer._update_suitable_alert_levels(sensor_alert_states)
+        self.assertEqual([[0], []], [x.sensor_alert.triggeredAlertLevels for x in sensor_alert_states])
+
+        # The changed profile is not read without notification.
+        global_data.storage.profile = 1
+        sensor_alert_states = [SensorAlertState(x, alert_levels) for x in sensor_alerts]
+        sensor_alert_executer._update_suitable_alert_levels(sensor_alert_states)
+        self.assertEqual([[0], []], [x.sensor_alert.triggeredAlertLevels for x in sensor_alert_states])
+
+        sensor_alert_executer.force_reevaluation()
+        sensor_alert_executer._get_sensor_alert_states()
+        sensor_alert_states = [SensorAlertState(x, alert_levels) for x in sensor_alerts]
+        sensor_alert_executer._update_suitable_alert_levels(sensor_alert_states)
+        self.assertEqual([[], [1]], [x.sensor_alert.triggeredAlertLevels for x in sensor_alert_states])
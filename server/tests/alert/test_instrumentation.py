@@ -7,6 +7,8 @@ from unittest import TestCase
 from lib.internalSensors import AlertLevelInstrumentationErrorSensor
 from lib.localObjects import AlertLevel, SensorAlert
 from lib.alert.instrumentation import Instrumentation
+from lib.alert.instrumentationFunction import InstrumentationFunctionPool, load_instrumentation_function
+from lib.alert.instrumentationWorker import InstrumentationWorkerPool
 from lib.globalData.globalData import GlobalData
 from lib.globalData.sensorObjects import SensorDataGPS, SensorDataNone, SensorDataInt, SensorDataFloat, SensorDataType
 
@@ -59,6 +61,40 @@ class TestInstrumentation(TestCase):
 
         return Instrumentation(alert_level, sensor_alert, logger)
 
+    def _create_worker_pool(self,
+                            instrumentation: Instrumentation,
+                            worker_count: int = 2,
+                            max_requests: int = 1000) -> InstrumentationWorkerPool:
+        target_cmd = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                  "instrumentation_scripts",
+                                  "worker_mirror.py")
+
+        instrumentation._alert_level.instrumentation_cmd = target_cmd
+        instrumentation._alert_level.instrumentation_mode = "worker"
+        worker_pool = InstrumentationWorkerPool(target_cmd,
+                                                worker_count,
+                                                max_requests,
+                                                logging.getLogger("Instrumentation Test Case"))
+        self.addCleanup(worker_pool.close)
+        instrumentation._worker_pool = worker_pool
+        return worker_pool
+
+    def _create_function_pool(self,
+                              instrumentation: Instrumentation,
+                              function_name: str,
+                              worker_count: int = 2) -> InstrumentationFunctionPool:
+        cmd = "tests.alert.instrumentation_functions:" + function_name
+
+        instrumentation._alert_level.instrumentation_cmd = cmd
+        instrumentation._alert_level.instrumentation_mode = "python"
+        instrumentation._alert_level.instrumentation_function = load_instrumentation_function(cmd)
+        function_pool = InstrumentationFunctionPool(instrumentation._alert_level.instrumentation_function,
+                                                    worker_count,
+                                                    logging.getLogger("Instrumentation Test Case"))
+        self.addCleanup(function_pool.close)
+        instrumentation._worker_pool = function_pool
+        return function_pool
+
     def test_process_output_valid(self):
         """
         Tests a valid output processing of an instrumentation script.
@@ -718,3 +754,249 @@ class TestInstrumentation(TestCase):
         # to verify that the instrumentation script was only executed once.
         timestamp_second = promise_second.new_sensor_alert.optionalData["timestamp"]
         self.assertEqual(timestamp_first, timestamp_second)
+
+    def test_finished_callback(self):
+        """
+        Tests that the finished callbacks of the instrumentation promise are executed when the instrumentation
+        finishes and immediately if it has already finished.
+        """
+        target_cmd = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                  "instrumentation_scripts",
+                                  "mirror.py")
+
+        # Prepare instrumentation object.
+        instrumentation = self._create_instrumentation_dummy()
+        instrumentation._alert_level.instrumentation_cmd = target_cmd
+
+        calls = list()
+        promise = instrumentation._promise
+        promise.add_finished_callback(lambda: calls.append(promise.is_finished()))
+        self.assertEqual([], calls)
+
+        instrumentation.execute()
+        self.assertTrue(promise.is_finished(blocking=True))
+        self.assertTrue(promise.was_success())
+        self.assertEqual([True], calls)
+
+        promise.add_finished_callback(lambda: calls.append(promise.is_finished()))
+        self.assertEqual([True, True], calls)
+
+    def test_execute_worker_valid(self):
+        """
+        Tests a valid execution of an instrumentation by a persistent worker.
+        """
+        instrumentation = self._create_instrumentation_dummy()
+        worker_pool = self._create_worker_pool(instrumentation)
+
+        promise = instrumentation.execute()
+
+        # Executing again does not send the sensor alert to the worker again.
+        self.assertIs(promise, instrumentation.execute())
+
+        self.assertTrue(promise.is_finished(timeout=10))
+        self.assertTrue(promise.was_success())
+
+        sensor_alert = promise.orig_sensor_alert
+        new_sensor_alert = promise.new_sensor_alert
+        self.assertEqual(sensor_alert.sensorId, new_sensor_alert.sensorId)
+        self.assertEqual(sensor_alert.optionalData, new_sensor_alert.optionalData)
+        self.assertEqual(1, worker_pool.started_count)
+
+    def test_execute_worker_timeout_internal_sensor(self):
+        """
+        Tests an execution by a persistent worker that times out with internal sensor and that the worker
+        is replaced afterwards.
+        """
+        instrumentation = self._create_instrumentation_dummy()
+        instrumentation._sensor_alert.optionalData = {"sleep": 60}
+        instrumentation._alert_level.instrumentation_timeout = 2
+        worker_pool = self._create_worker_pool(instrumentation, worker_count=1)
+
+        internal_sensor = MockInternalSensor()
+        instrumentation._internal_sensor = internal_sensor
+
+        promise = instrumentation.execute()
+
+        self.assertTrue(promise.is_finished(timeout=10))
+        self.assertFalse(promise.was_success())
+        self.assertEqual(1, len(internal_sensor.optional_data))
+        self.assertIn("timed out", internal_sensor.optional_data[0]["message"])
+
+        # The next sensor alert is handled by a new worker.
+        next_instrumentation = self._create_instrumentation_dummy()
+        next_instrumentation._alert_level = instrumentation._alert_level
+        next_instrumentation._worker_pool = worker_pool
+        next_promise = next_instrumentation.execute()
+
+        self.assertTrue(next_promise.is_finished(timeout=10))
+        self.assertTrue(next_promise.was_success())
+        self.assertEqual(2, worker_pool.started_count)
+
+    def test_execute_worker_exit_code_internal_sensor(self):
+        """
+        Tests an execution by a persistent worker that exits with internal sensor.
+        """
+        instrumentation = self._create_instrumentation_dummy()
+        instrumentation._sensor_alert.optionalData = {"exit": 3}
+        self._create_worker_pool(instrumentation)
+
+        internal_sensor = MockInternalSensor()
+        instrumentation._internal_sensor = internal_sensor
+
+        promise = instrumentation.execute()
+
+        self.assertTrue(promise.is_finished(timeout=10))
+        self.assertFalse(promise.was_success())
+        self.assertEqual(1, len(internal_sensor.optional_data))
+        self.assertEqual(3, internal_sensor.optional_data[0]["exit_code"])
+
+    def test_execute_worker_recycling(self):
+        """
+        Tests that a persistent worker is replaced after it handled the maximal number of requests.
+        """
+        instrumentation = self._create_instrumentation_dummy()
+        worker_pool = self._create_worker_pool(instrumentation, worker_count=1, max_requests=2)
+
+        for _ in range(5):
+            next_instrumentation = self._create_instrumentation_dummy()
+            next_instrumentation._alert_level = instrumentation._alert_level
+            next_instrumentation._worker_pool = worker_pool
+            promise = next_instrumentation.execute()
+            self.assertTrue(promise.is_finished(timeout=10))
+            self.assertTrue(promise.was_success())
+
+        self.assertEqual(3, worker_pool.started_count)
+
+    def test_execute_worker_concurrency(self):
+        """
+        Tests that the number of persistent workers caps the number of concurrently executed instrumentations.
+        """
+        instrumentation = self._create_instrumentation_dummy()
+        worker_pool = self._create_worker_pool(instrumentation, worker_count=2)
+
+        start = time.monotonic()
+        promises = list()
+        for _ in range(6):
+            next_instrumentation = self._create_instrumentation_dummy()
+            next_instrumentation._sensor_alert.optionalData = {"sleep": 0.5}
+            next_instrumentation._alert_level = instrumentation._alert_level
+            next_instrumentation._worker_pool = worker_pool
+            promises.append(next_instrumentation.execute())
+
+        for promise in promises:
+            self.assertTrue(promise.is_finished(timeout=10))
+            self.assertTrue(promise.was_success())
+
+        # Two workers handle three sensor alerts each one after another.
+        self.assertGreaterEqual(time.monotonic() - start, 1.5)
+        self.assertEqual(2, worker_pool.started_count)
+
+    def test_load_instrumentation_function(self):
+        """
+        Tests loading the Python callable of the instrumentation.
+        """
+        from tests.alert import instrumentation_functions
+        self.assertIs(instrumentation_functions.mirror,
+                      load_instrumentation_function("tests.alert.instrumentation_functions:mirror"))
+
+        for name in ["tests.alert.instrumentation_functions",
+                     "tests.alert.instrumentation_functions:",
+                     ":mirror",
+                     "tests.alert.instrumentation_functions:does_not_exist",
+                     "tests.alert.does_not_exist:mirror",
+                     "tests.alert.instrumentation_functions:time"]:
+            with self.assertRaises(Exception):
+                load_instrumentation_function(name)
+
+    def test_execute_function_valid(self):
+        """
+        Tests a valid execution of a Python callable as instrumentation.
+        """
+        instrumentation = self._create_instrumentation_dummy()
+        self._create_function_pool(instrumentation, "toggle_state")
+
+        promise = instrumentation.execute()
+
+        # Executing again does not call the instrumentation again.
+        self.assertIs(promise, instrumentation.execute())
+
+        self.assertTrue(promise.is_finished(timeout=10))
+        self.assertTrue(promise.was_success())
+
+        # The callable gets a copy of the sensor alert.
+        sensor_alert = promise.orig_sensor_alert
+        new_sensor_alert = promise.new_sensor_alert
+        self.assertIsNot(sensor_alert, new_sensor_alert)
+        self.assertEqual(1, sensor_alert.state)
+        self.assertEqual(0, new_sensor_alert.state)
+        self.assertEqual(sensor_alert.sensorId, new_sensor_alert.sensorId)
+        self.assertEqual(sensor_alert.optionalData, new_sensor_alert.optionalData)
+        self.assertEqual([], new_sensor_alert.triggeredAlertLevels)
+
+    def test_execute_function_suppress(self):
+        """
+        Tests a valid execution of a Python callable as instrumentation which suppresses the sensor alert.
+        """
+        instrumentation = self._create_instrumentation_dummy()
+        self._create_function_pool(instrumentation, "suppress")
+
+        promise = instrumentation.execute()
+
+        self.assertTrue(promise.is_finished(timeout=10))
+        self.assertTrue(promise.was_success())
+        self.assertIsNone(promise.new_sensor_alert)
+
+    def test_execute_function_timeout_internal_sensor(self):
+        """
+        Tests an execution of a Python callable as instrumentation that times out with internal sensor.
+        """
+        instrumentation = self._create_instrumentation_dummy()
+        instrumentation._alert_level.instrumentation_timeout = 1
+        self._create_function_pool(instrumentation, "timeout")
+
+        internal_sensor = MockInternalSensor()
+        instrumentation._internal_sensor = internal_sensor
+
+        start = time.monotonic()
+        promise = instrumentation.execute()
+
+        self.assertTrue(promise.is_finished(timeout=10))
+        self.assertLess(time.monotonic() - start, 4)
+        self.assertFalse(promise.was_success())
+        self.assertEqual(1, len(internal_sensor.optional_data))
+        self.assertIn("timed out", internal_sensor.optional_data[0]["message"])
+
+    def test_execute_function_exception_internal_sensor(self):
+        """
+        Tests an execution of a Python callable as instrumentation that raises an exception with internal sensor.
+        """
+        instrumentation = self._create_instrumentation_dummy()
+        self._create_function_pool(instrumentation, "exception")
+
+        internal_sensor = MockInternalSensor()
+        instrumentation._internal_sensor = internal_sensor
+
+        promise = instrumentation.execute()
+
+        self.assertTrue(promise.is_finished(timeout=10))
+        self.assertFalse(promise.was_success())
+        self.assertEqual(1, len(internal_sensor.optional_data))
+        self.assertIn("failed", internal_sensor.optional_data[0]["message"])
+
+    def test_execute_function_invalid_internal_sensor(self):
+        """
+        Tests executions of Python callables as instrumentation that return invalid sensor alerts with internal sensor.
+        """
+        for function_name in ["invalid_sensor_id", "invalid_return_value"]:
+            instrumentation = self._create_instrumentation_dummy()
+            self._create_function_pool(instrumentation, function_name)
+
+            internal_sensor = MockInternalSensor()
+            instrumentation._internal_sensor = internal_sensor
+
+            promise = instrumentation.execute()
+
+            self.assertTrue(promise.is_finished(timeout=10))
+            self.assertFalse(promise.was_success())
+            self.assertEqual(1, len(internal_sensor.optional_data))
+            self.assertIn("Unable to process output", internal_sensor.optional_data[0]["message"])
@@ -0,0 +1,65 @@
+from unittest import TestCase
+from typing import List
+from lib.alert.rules import AlertLevelRules
+from lib.localObjects import AlertLevel
+
+
+class TestAlertLevelRules(TestCase):
+
+    @staticmethod
+    def _create_alert_level(level: int,
+                            profiles: List[int],
+                            trigger_triggered: bool,
+                            trigger_normal: bool) -> AlertLevel:
+        alert_level = AlertLevel()
+        alert_level.level = level
+        alert_level.name = "AlertLevel_" + str(level)
+        alert_level.profiles = profiles
+        alert_level.triggerAlertTriggered = trigger_triggered
+        alert_level.triggerAlertNormal = trigger_normal
+        return alert_level
+
+    def test_get_alert_levels(self):
+        """
+        Tests that the rules contain the alert levels for each combination of profile and state.
+        """
+        alert_levels = [self._create_alert_level(1, [0, 1], True, False),
+                        self._create_alert_level(2, [1], True, True),
+                        self._create_alert_level(3, [0, 2], False, True),
+                        self._create_alert_level(4, [0, 1, 2], False, False)]
+        rules = AlertLevelRules(alert_levels)
+
+        self.assertEqual({1}, rules.get_alert_levels(0, 1))
+        self.assertEqual({3}, rules.get_alert_levels(0, 0))
+        self.assertEqual({1, 2}, rules.get_alert_levels(1, 1))
+        self.assertEqual({2}, rules.get_alert_levels(1, 0))
+        self.assertEqual(set(), rules.get_alert_levels(2, 1))
+        self.assertEqual({3}, rules.get_alert_levels(2, 0))
+
+        # Unknown profile.
+        self.assertEqual(set(), rules.get_alert_levels(99, 1))
+
+        self.assertEqual({0: {2}, 1: {1, 2}}, rules.get_profile_rules(1))
+
+    def test_same_as_alert_level_check(self):
+        """
+        Tests that the rules give the same alert levels as checking the profiles and trigger flags of each alert level.
+        """
+        alert_levels = list()
+        for level in range(32):
+            alert_levels.append(self._create_alert_level(level,
+                                                         [x for x in range(5) if (level >> x) & 1],
+                                                         level % 3 != 0,
+                                                         level % 4 != 0))
+        rules = AlertLevelRules(alert_levels)
+
+        for profile_id in range(6):
+            for state in [0, 1]:
+                gt_alert_levels = set()
+                for alert_level in alert_levels:
+                    if profile_id not in alert_level.profiles:
+                        continue
+                    if (state == 1 and alert_level.triggerAlertTriggered) \
+                            or (state == 0 and alert_level.triggerAlertNormal):
+                        gt_alert_levels.add(alert_level.level)
+                self.assertEqual(gt_alert_levels, rules.get_alert_levels(profile_id, state))
@@ -0,0 +1,156 @@
+"""
+Microbenchmark that compares the update of the suitable alert levels of sensor alerts using the precompiled alert
+level rules with the former implementation that checks the profiles and trigger flags of each alert level.
+
+Every run creates the given number of alert levels (each one active in a part of the system profiles) and sensor
+alerts (each one with the given number of alert levels) and measures the time to update the suitable alert levels
+of all sensor alert states. The former implementation (reference) reads the profile option in each processing
+round, the current one only when the profile changes.
+
+Usage (from the server directory):
+
+    python3 -m tests.benchmark.bench_alert_level_rules [--alert-levels 10 100] [--profiles 10]
+        [--levels-per-alert 5] [--sensor-alerts 1000] [--rounds 20]
+"""
+
+import argparse
+import logging
+import random
+import time
+from typing import Dict, Any, List, Optional, Tuple
+from lib.alert.alert import SensorAlertExecuter, SensorAlertState
+from lib.globalData.globalData import GlobalData
+from lib.globalData.sensorObjects import SensorDataNone, SensorDataType
+from lib.localObjects import AlertLevel, Option, SensorAlert
+# noinspection PyProtectedMember
+from lib.storage.core import _Storage
+
+
+# noinspection PyAbstractClass
+class _BenchmarkStorage(_Storage):
+
+    def get_option_by_type(self,
+                           option_type: str,
+                           logger: logging.Logger = None) -> Optional[Option]:
+        option = Option()
+        option.type = option_type
+        option.value = 0
+        return option
+
+
+def _update_suitable_alert_levels_reference(storage: _Storage, sensor_alert_states: List[SensorAlertState]):
+    """
+    Former implementation of SensorAlertExecuter._update_suitable_alert_levels() for sensor alerts without
+    instrumentation.
+    """
+    option = storage.get_option_by_type("profile")
+    curr_profile_id = option.value
+
+    for sensor_alert_state in sensor_alert_states:
+
+        suitable_alert_levels = list()
+        for alert_level in sensor_alert_state.suitable_alert_levels:
+            if curr_profile_id in alert_level.profiles:
+
+                if alert_level.triggerAlertTriggered and sensor_alert_state.sensor_alert.state == 1:
+                    suitable_alert_levels.append(alert_level)
+                    continue
+
+                if alert_level.triggerAlertNormal and sensor_alert_state.sensor_alert.state == 0:
+                    suitable_alert_levels.append(alert_level)
+                    continue
+
+        sensor_alert_state.suitable_alert_levels = suitable_alert_levels
+        sensor_alert_state.sensor_alert.triggeredAlertLevels = \
+            [al.level for al in sensor_alert_state.suitable_alert_levels]
+
+
+def _create_alert_system(alert_level_count: int,
+                         profile_count: int,
+                         levels_per_alert: int,
+                         sensor_alert_count: int) -> Tuple[List[AlertLevel], List[SensorAlert]]:
+    rand = random.Random(alert_level_count)
+
+    alert_levels = list()
+    for level in range(alert_level_count):
+        alert_level = AlertLevel()
+        alert_level.level = level
+        alert_level.profiles = [x for x in range(profile_count) if rand.random() < 0.5]
+        alert_level.triggerAlertTriggered = rand.random() < 0.8
+        alert_level.triggerAlertNormal = rand.random() < 0.3
+        alert_levels.append(alert_level)
+
+    sensor_alerts = list()
+    for i in range(sensor_alert_count):
+        sensor_alert = SensorAlert()
+        sensor_alert.sensorId = i
+        sensor_alert.timeReceived = 0
+        sensor_alert.alertDelay = 0
+        sensor_alert.state = rand.randint(0, 1)
+        sensor_alert.alertLevels = rand.sample(range(alert_level_count), min(levels_per_alert, alert_level_count))
+        sensor_alert.dataType = SensorDataType.NONE
+        sensor_alert.data = SensorDataNone()
+        sensor_alerts.append(sensor_alert)
+
+    return alert_levels, sensor_alerts
+
+
+def run(alert_level_count: int,
+        profile_count: int,
+        levels_per_alert: int,
+        sensor_alert_count: int,
+        round_count: int) -> Dict[str, Any]:
+    alert_levels, sensor_alerts = _create_alert_system(alert_level_count,
+                                                       profile_count,
+                                                       levels_per_alert,
+                                                       sensor_alert_count)
+
+    global_data = GlobalData()
+    global_data.logger = logging.getLogger("Alert Level Rules Benchmark")
+    global_data.storage = _BenchmarkStorage()
+    global_data.alertLevels = alert_levels
+    sensor_alert_executer = SensorAlertExecuter(global_data)
+
+    durations = dict()
+    results = dict()
+    for name, func in [("reference", lambda x: _update_suitable_alert_levels_reference(global_data.storage, x)),
+                       ("rules", sensor_alert_executer._update_suitable_alert_levels)]:
+        duration = 0.0
+        for _ in range(round_count):
+            sensor_alert_states = [SensorAlertState(x, alert_levels) for x in sensor_alerts]
+            start = time.perf_counter()
+            func(sensor_alert_states)
+            duration += time.perf_counter() - start
+        durations[name] = duration
+        results[name] = [x.sensor_alert.triggeredAlertLevels for x in sensor_alert_states]
+
+    if results["reference"] != results["rules"]:
+        raise ValueError("Suitable alert levels differ from reference.")
+
+    return {"alert_levels": alert_level_count,
+            "reference_us": durations["reference"] / (round_count * sensor_alert_count) * 1000000,
+            "rules_us": durations["rules"] / (round_count * sensor_alert_count) * 1000000}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compares the update of the suitable alert levels using the "
+                                                 + "precompiled alert level rules with the former implementation.")
+    parser.add_argument("--alert-levels", type=int, nargs="+", default=[10, 100], help="number of alert levels")
+    parser.add_argument("--profiles", type=int, default=10, help="number of system profiles")
+    parser.add_argument("--levels-per-alert", type=int, default=5, help="number of alert levels of a sensor alert")
+    parser.add_argument("--sensor-alerts", type=int, default=1000, help="number of sensor alerts in each round")
+    parser.add_argument("--rounds", type=int, default=20, help="number of processing rounds")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.CRITICAL)
+
+    print("%12s %14s %14s %8s" % ("alert levels", "reference", "rules", "speedup"))
+    for alert_level_count in args.alert_levels:
+        result = run(alert_level_count, args.profiles, args.levels_per_alert, args.sensor_alerts, args.rounds)
+        print("%12d %10.2fus/op %10.2fus/op %7.1fx"
+              % (result["alert_levels"], result["reference_us"], result["rules_us"],
+                 result["reference_us"] / result["rules_us"]))
+
+
+if __name__ == '__main__':
+    main()
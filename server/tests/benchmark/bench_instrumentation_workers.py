@@ -0,0 +1,130 @@
+"""
+Benchmark that compares the instrumentation of sensor alerts by starting the instrumentation script for each
+sensor alert (one-shot mode) with sending them to a pool of persistent worker processes (worker mode) and with
+calling a Python callable in a thread pool of the server (python mode).
+
+Every run instruments the given number of sensor alerts with the test script (or function) that mirrors the sensor
+alert and measures the latency from starting the instrumentation until its promise is finished as well as the throughput.
+All sensor alerts are started at once, hence the latency includes the time waiting for a free worker.
+
+Usage (from the server directory):
+
+    python3 -m tests.benchmark.bench_instrumentation_workers [--sensor-alerts 200] [--workers 2 4]
+"""
+
+import argparse
+import logging
+import os
+import time
+from typing import Dict, Any, List, Optional, Union
+from lib.alert.instrumentation import Instrumentation
+from lib.alert.instrumentationFunction import InstrumentationFunctionPool, load_instrumentation_function
+from lib.alert.instrumentationWorker import InstrumentationWorkerPool
+from lib.globalData.sensorObjects import SensorDataNone, SensorDataType
+from lib.localObjects import AlertLevel, SensorAlert
+
+
+def _percentile(values: List[float], percentile: float) -> float:
+    values = sorted(values)
+    index = min(len(values) - 1, int(round(percentile / 100.0 * (len(values) - 1))))
+    return values[index]
+
+
+def _create_sensor_alert(idx: int) -> SensorAlert:
+    sensor_alert = SensorAlert()
+    sensor_alert.nodeId = 1
+    sensor_alert.sensorId = idx
+    sensor_alert.description = "sensor_%d" % idx
+    sensor_alert.timeReceived = 0
+    sensor_alert.alertDelay = 0
+    sensor_alert.state = 1
+    sensor_alert.hasOptionalData = False
+    sensor_alert.optionalData = None
+    sensor_alert.changeState = False
+    sensor_alert.alertLevels = [1]
+    sensor_alert.triggeredAlertLevels = [1]
+    sensor_alert.hasLatestData = False
+    sensor_alert.dataType = SensorDataType.NONE
+    sensor_alert.data = SensorDataNone()
+    return sensor_alert
+
+
+def run(mode: str,
+        sensor_alert_count: int,
+        worker_count: int) -> Dict[str, Any]:
+    logger = logging.getLogger("Instrumentation Workers Benchmark")
+
+    alert_level = AlertLevel()
+    alert_level.level = 1
+    alert_level.instrumentation_active = True
+    alert_level.instrumentation_cmd = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                                   "..",
+                                                   "alert",
+                                                   "instrumentation_scripts",
+                                                   "worker_mirror.py")
+    alert_level.instrumentation_timeout = 60
+    alert_level.instrumentation_mode = mode
+    alert_level.instrumentation_workers = worker_count
+
+    worker_pool = None  # type: Optional[Union[InstrumentationWorkerPool, InstrumentationFunctionPool]]
+    if mode == "worker":
+        worker_pool = InstrumentationWorkerPool(alert_level.instrumentation_cmd,
+                                                worker_count,
+                                                alert_level.instrumentation_max_requests,
+                                                logger)
+
+    elif mode == "python":
+        alert_level.instrumentation_cmd = "tests.alert.instrumentation_functions:mirror"
+        alert_level.instrumentation_function = load_instrumentation_function(alert_level.instrumentation_cmd)
+        worker_pool = InstrumentationFunctionPool(alert_level.instrumentation_function, worker_count, logger)
+
+    start = time.perf_counter()
+    finish_times = dict()  # type: Dict[int, float]
+    promises = list()
+    for idx in range(sensor_alert_count):
+        instrumentation = Instrumentation(alert_level, _create_sensor_alert(idx), logger, None, worker_pool)
+        promise = instrumentation.execute()
+        promise.add_finished_callback(lambda x=idx: finish_times.__setitem__(x, time.perf_counter()))
+        promises.append(promise)
+
+    success_count = 0
+    for promise in promises:
+        promise.is_finished(blocking=True)
+        if promise.was_success():
+            success_count += 1
+    duration = time.perf_counter() - start
+
+    if worker_pool is not None:
+        worker_pool.close()
+
+    latencies = [x - start for x in finish_times.values()]
+    return {"mode": mode,
+            "workers": worker_count if mode != "oneshot" else 0,
+            "success": success_count,
+            "expected": sensor_alert_count,
+            "per_second": sensor_alert_count / duration,
+            "p50_ms": _percentile(latencies, 50) * 1000,
+            "p99_ms": _percentile(latencies, 99) * 1000}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compares the instrumentation of sensor alerts in the one-shot mode "
+                                                 + "with the worker and python mode.")
+    parser.add_argument("--sensor-alerts", type=int, default=200, help="number of instrumented sensor alerts")
+    parser.add_argument("--workers", type=int, nargs="+", default=[2, 4],
+                        help="number of worker processes (or threads)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.CRITICAL)
+
+    print("%8s %8s %14s %12s %10s %10s" % ("mode", "workers", "success", "throughput", "p50", "p99"))
+    runs = [("oneshot", 0)] + [(mode, x) for mode in ["worker", "python"] for x in args.workers]
+    for mode, worker_count in runs:
+        result = run(mode, args.sensor_alerts, worker_count)
+        print("%8s %8d %7d/%-6d %10.1f/s %8.1fms %8.1fms"
+              % (result["mode"], result["workers"], result["success"], result["expected"], result["per_second"],
+                 result["p50_ms"], result["p99_ms"]))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,194 @@
+"""
+Benchmark that simulates a reconnect storm (for example, after a restart of the server all nodes reconnect at the
+same time).
+
+Every run starts a server instance (TLS/SSL disabled, a storage that only keeps node information in memory and a user
+backend that verifies a bcrypt hash like the CSV user backend) and lets the given number of simulated alert nodes
+connect concurrently. Nodes that fail to connect retry with an exponential backoff with jitter. The run measures the
+time until all nodes are connected and the peak CPU usage of the process. Each run is executed in its own process.
+
+Usage (from the server directory):
+
+    python3 -m tests.benchmark.bench_reconnect_storm [--nodes 500] [--modes threaded async] [--max-setups 16 1000]
+"""
+
+import argparse
+import json
+import logging
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import bcrypt
+from typing import Dict, Any, List
+from tests.server.util import SimulatedNode, create_server_global_data
+from tests.benchmark.bench_server_modes import _raise_fd_limit
+from lib.asyncServer import AsyncServer
+from lib.server import ThreadedTCPServer, ServerSession
+
+
+class BcryptUserBackend:
+
+    def __init__(self, rounds: int):
+        self._pwhash = bcrypt.hashpw(b"password", bcrypt.gensalt(rounds))
+
+    def areUserCredentialsValid(self, username: str, password: str) -> bool:
+        return bcrypt.checkpw(password.encode("ascii"), self._pwhash)
+
+    def checkNodeTypeAndInstance(self, username: str, nodeType: str, instance: str) -> bool:
+        return True
+
+
+class CpuSampler(threading.Thread):
+    """
+    Samples the CPU usage of the process (in percent of one core) in the given interval.
+    """
+
+    def __init__(self, interval: float):
+        threading.Thread.__init__(self, daemon=True)
+        self._interval = interval
+        self._exit_flag = False
+        self.samples = list()  # type: List[float]
+
+    def run(self):
+        last_cpu = sum(os.times()[:2])
+        last_time = time.time()
+        while not self._exit_flag:
+            time.sleep(self._interval)
+            cpu = sum(os.times()[:2])
+            now = time.time()
+            self.samples.append((cpu - last_cpu) / (now - last_time) * 100.0)
+            last_cpu = cpu
+            last_time = now
+
+    def exit(self):
+        self._exit_flag = True
+
+
+def _connect_node(node: SimulatedNode, base_delay: float, max_delay: float, results: Dict[str, Any]):
+    retries = 0
+    while True:
+        try:
+            node.connect()
+            if node.register():
+                break
+
+        except Exception:
+            pass
+
+        node.close()
+        retries += 1
+        delay = min(max_delay, base_delay * (2 ** (retries - 1)))
+        time.sleep(random.uniform(delay / 2.0, delay))
+
+    with results["lock"]:
+        results["retries"] += retries
+
+
+def run_single(mode: str,
+               node_count: int,
+               max_setups: int,
+               workers: int,
+               bcrypt_rounds: int) -> Dict[str, Any]:
+    logging.basicConfig(level=logging.CRITICAL)
+    _raise_fd_limit(node_count)
+
+    log_dir = tempfile.mkdtemp()
+    global_data = create_server_global_data(log_dir)
+    global_data.logger.setLevel(logging.CRITICAL)
+    global_data.userBackend = BcryptUserBackend(bcrypt_rounds)
+    global_data.server_async_workers = workers
+    global_data.serverMaxConcurrentSetups = max_setups
+
+    if mode == "async":
+        server = AsyncServer(global_data, ("127.0.0.1", 0))
+    else:
+        ThreadedTCPServer.request_queue_size = 1024
+        server = ThreadedTCPServer(global_data, ("127.0.0.1", 0), ServerSession)
+    host, port = server.server_address[0], server.server_address[1]
+
+    server_thread = threading.Thread(target=server.serve_forever, daemon=True)
+    server_thread.start()
+
+    nodes = [SimulatedNode("node_%d" % i, host, port) for i in range(node_count)]
+    results = {"lock": threading.Lock(), "retries": 0}
+
+    sampler = CpuSampler(0.1)
+    sampler.start()
+
+    start = time.time()
+    threads = list()
+    for node in nodes:
+        thread = threading.Thread(target=_connect_node, args=(node, 0.5, 10.0, results), daemon=True)
+        thread.start()
+        threads.append(thread)
+
+    for thread in threads:
+        thread.join()
+
+    while len(global_data.storage.connected_nodes) != node_count:
+        time.sleep(0.01)
+    duration = time.time() - start
+
+    sampler.exit()
+    sampler.join()
+
+    admission_stats = global_data.admission_controller.get_stats()
+
+    for node in nodes:
+        node.close()
+
+    return {"mode": mode,
+            "nodes": node_count,
+            "max_setups": max_setups,
+            "connected_s": duration,
+            "retries": results["retries"],
+            "cpu_peak": max(sampler.samples) if sampler.samples else 0.0,
+            "cpu_mean": (sum(sampler.samples) / len(sampler.samples)) if sampler.samples else 0.0,
+            "peak_queued": admission_stats["peak_queued"],
+            "wait_max_s": admission_stats["wait_max"]}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulates a reconnect storm of all nodes.")
+    parser.add_argument("--nodes", type=int, nargs="+", default=[500])
+    parser.add_argument("--modes", nargs="+", default=["threaded", "async"], choices=["threaded", "async"])
+    parser.add_argument("--max-setups", type=int, nargs="+", default=[16, 1000],
+                        help="maximal number of concurrent session setups")
+    parser.add_argument("--workers", type=int, default=32, help="number of worker threads in the async mode")
+    parser.add_argument("--bcrypt-rounds", type=int, default=8, help="cost factor of the password hashes")
+    parser.add_argument("--single", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.single:
+        result = run_single(args.modes[0], args.nodes[0], args.max_setups[0], args.workers, args.bcrypt_rounds)
+        print(json.dumps(result))
+        sys.stdout.flush()
+        # Do not wait for the remaining client threads of the threaded server.
+        os._exit(0)
+
+    print("%-9s %6s %10s %12s %8s %9s %9s %11s %10s"
+          % ("mode", "nodes", "max setups", "connected", "retries", "CPU peak", "CPU mean", "peak queued",
+             "wait max"))
+    for node_count in args.nodes:
+        for mode in args.modes:
+            for max_setups in args.max_setups:
+                output = subprocess.check_output([sys.executable, "-m", "tests.benchmark.bench_reconnect_storm",
+                                                  "--single",
+                                                  "--modes", mode,
+                                                  "--nodes", str(node_count),
+                                                  "--max-setups", str(max_setups),
+                                                  "--workers", str(args.workers),
+                                                  "--bcrypt-rounds", str(args.bcrypt_rounds)])
+                result = json.loads(output.decode("utf-8").strip().split("\n")[-1])
+                print("%-9s %6d %10d %11.2fs %8d %8.0f%% %8.0f%% %11d %9.2fs"
+                      % (result["mode"], result["nodes"], result["max_setups"], result["connected_s"],
+                         result["retries"], result["cpu_peak"], result["cpu_mean"], result["peak_queued"],
+                         result["wait_max_s"]))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,198 @@
+"""
+Benchmark that measures the latency of the sensor alert executer from receiving a sensor alert until the sensor
+alert message is queued for sending.
+
+Every run starts a sensor alert executer with the given number of alert nodes handling the alert level of the
+sensor alerts (and optionally further alert nodes handling another alert level that are not recipients) and adds sensor alerts without alert delay at a constant rate. For each sensor alert, the time between add_sensor_alert()
+and the first SensorAlertMessage queued at the sender dispatcher is recorded. Optionally, a part of the sensor
+alerts is sent by sensors with an alert delay to show that pending sensor alerts do not slow down new ones.
+
+Usage (from the server directory):
+
+    python3 -m tests.benchmark.bench_sensor_alert_executer [--rate 1000] [--duration 5] [--alert-nodes 5]
+        [--other-nodes 0 500] [--delayed 0.5]
+"""
+
+import argparse
+import logging
+import threading
+import time
+from typing import Dict, Any, List, Optional
+from lib.alert import SensorAlertExecuter
+from lib.globalData.globalData import GlobalData
+from lib.globalData.sensorObjects import SensorDataNone, SensorDataType
+from lib.localObjects import AlertLevel, Option, Sensor
+# noinspection PyProtectedMember
+from lib.storage.core import _Storage
+
+
+def _percentile(values: List[float], percentile: float) -> float:
+    values = sorted(values)
+    index = min(len(values) - 1, int(round(percentile / 100.0 * (len(values) - 1))))
+    return values[index]
+
+
+# noinspection PyAbstractClass
+class _BenchmarkStorage(_Storage):
+
+    def __init__(self, sensors: Dict[int, Sensor]):
+        self._sensors = sensors
+
+    def getSensorById(self,
+                      sensorId: int,
+                      logger: logging.Logger = None) -> Optional[Sensor]:
+        return self._sensors.get(sensorId)
+
+    def get_option_by_type(self,
+                           option_type: str,
+                           logger: logging.Logger = None) -> Optional[Option]:
+        option = Option()
+        option.type = option_type
+        option.value = 0
+        return option
+
+
+class _BenchmarkClientComm:
+
+    def __init__(self, alert_levels: List[int]):
+        self.nodeType = "alert"
+        self.clientInitialized = True
+        self.clientAlertLevels = alert_levels
+        self.clientAddress = "127.0.0.1"
+        self.clientPort = 0
+
+
+class _BenchmarkServerSession:
+
+    def __init__(self, client_comm: _BenchmarkClientComm):
+        self.clientComm = client_comm
+
+
+class _BenchmarkSenderDispatcher:
+    """
+    Records the time the first message of each sensor alert is queued.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.send_times = dict()  # type: Dict[int, float]
+
+    def queue_message(self, client_comm: _BenchmarkClientComm, message: Any):
+        now = time.perf_counter()
+        # The optional data carries the number of the sensor alert.
+        alert_idx = message.sensor_alert.optionalData["idx"]
+        with self._lock:
+            if alert_idx not in self.send_times.keys():
+                self.send_times[alert_idx] = now
+
+
+def run(rate: int,
+        duration: float,
+        alert_node_count: int,
+        other_node_count: int,
+        delayed_ratio: float) -> Dict[str, Any]:
+    alert_level = AlertLevel()
+    alert_level.level = 1
+    alert_level.profiles = [0]
+    alert_level.triggerAlertTriggered = True
+    alert_level.triggerAlertNormal = True
+
+    # Sensor 1 triggers immediately, sensor 2 has a long alert delay and keeps its sensor alerts pending.
+    sensors = dict()
+    for sensor_id, alert_delay in [(1, 0), (2, 3600)]:
+        sensor = Sensor()
+        sensor.sensorId = sensor_id
+        sensor.nodeId = 1
+        sensor.description = "sensor_%d" % sensor_id
+        sensor.alertDelay = alert_delay
+        sensor.alertLevels = [1]
+        sensors[sensor_id] = sensor
+
+    global_data = GlobalData()
+    global_data.logger = logging.getLogger("Sensor Alert Executer Benchmark")
+    global_data.storage = _BenchmarkStorage(sensors)
+    global_data.alertLevels = [alert_level]
+    global_data.sender_dispatcher = _BenchmarkSenderDispatcher()
+    for alert_levels in [[1]] * alert_node_count + [[2]] * other_node_count:
+        server_session = _BenchmarkServerSession(_BenchmarkClientComm(alert_levels))
+        global_data.serverSessions.append(server_session)
+        global_data.serverSessions.add_initialized_client(server_session.clientComm)
+
+    sensor_alert_executer = SensorAlertExecuter(global_data)
+    sensor_alert_executer.daemon = True
+    sensor_alert_executer.start()
+
+    alert_count = int(rate * duration)
+    add_times = dict()  # type: Dict[int, float]
+    delayed_count = 0
+    start = time.perf_counter()
+    for alert_idx in range(alert_count):
+
+        # Send sensor alerts at a constant rate.
+        next_time = start + alert_idx / rate
+        sleep_time = next_time - time.perf_counter()
+        if sleep_time > 0:
+            time.sleep(sleep_time)
+
+        # Spread the delayed sensor alerts evenly.
+        is_delayed = int((alert_idx + 1) * delayed_ratio) > delayed_count
+        if is_delayed:
+            delayed_count += 1
+            sensor_id = 2
+        else:
+            sensor_id = 1
+            add_times[alert_idx] = time.perf_counter()
+
+        sensor_alert_executer.add_sensor_alert(1,
+                                               sensor_id,
+                                               1,
+                                               {"idx": alert_idx},
+                                               False,
+                                               False,
+                                               SensorDataType.NONE,
+                                               SensorDataNone())
+
+    send_times = global_data.sender_dispatcher.send_times
+    timeout = time.perf_counter() + 10.0
+    while len(send_times) < len(add_times) and time.perf_counter() < timeout:
+        time.sleep(0.01)
+    sensor_alert_executer.exit()
+
+    latencies = [send_times[alert_idx] - add_time
+                 for alert_idx, add_time in add_times.items()
+                 if alert_idx in send_times.keys()]
+
+    return {"rate": rate,
+            "other_nodes": other_node_count,
+            "delayed": delayed_count,
+            "sent": len(latencies),
+            "expected": len(add_times),
+            "p50_ms": _percentile(latencies, 50) * 1000,
+            "p99_ms": _percentile(latencies, 99) * 1000}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measures the latency of the sensor alert executer from receiving "
+                                                 + "a sensor alert until it is queued for sending.")
+    parser.add_argument("--rate", type=int, nargs="+", default=[1000], help="sensor alerts per second")
+    parser.add_argument("--duration", type=float, default=5.0, help="duration of each run in seconds")
+    parser.add_argument("--alert-nodes", type=int, default=5, help="number of connected alert nodes")
+    parser.add_argument("--other-nodes", type=int, nargs="+", default=[0, 500],
+                        help="number of connected alert nodes handling another alert level")
+    parser.add_argument("--delayed", type=float, default=0.5,
+                        help="ratio of sensor alerts that are kept pending by an alert delay")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.CRITICAL)
+
+    print("%8s %12s %9s %14s %10s %10s" % ("rate", "other nodes", "delayed", "sent", "p50", "p99"))
+    for rate in args.rate:
+        for other_node_count in args.other_nodes:
+            result = run(rate, args.duration, args.alert_nodes, other_node_count, args.delayed)
+            print("%6d/s %12d %9d %7d/%-6d %8.2fms %8.2fms"
+                  % (result["rate"], result["other_nodes"], result["delayed"], result["sent"], result["expected"],
+                     result["p50_ms"], result["p99_ms"]))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,110 @@
+"""
+Microbenchmark that measures the overhead of the sensor history on the sensor updates of the Sqlite storage.
+
+Every run creates a database with one sensor node with the given number of sensors (half of them with integer data,
+half of them without data) and measures the duration of a status update of all sensors (updateSensorStateAndData)
+with and without the sensor history, the duration of writing the collected history entries of all updates and
+the duration of downsampling them.
+
+Usage (from the server directory):
+
+    python3 -m tests.benchmark.bench_sensor_history [--sensors 10 100 1000] [--iterations 100]
+"""
+
+import argparse
+import logging
+import os
+import random
+import shutil
+import tempfile
+import time
+from typing import Dict, Any
+from lib.globalData.globalData import GlobalData
+from lib.globalData.sensorObjects import SensorDataInt, SensorDataType, SensorDataNone, SensorErrorState
+from lib.history import SensorHistory
+from lib.localObjects import Sensor
+from lib.storage.sqlite import Sqlite
+
+
+def run(sensor_count: int, iterations: int, history_enabled: bool) -> Dict[str, Any]:
+    temp_dir = tempfile.mkdtemp()
+    try:
+        global_data = GlobalData()
+        global_data.logger = logging.getLogger("History Benchmark")
+        global_data.storageBackendSqliteFile = os.path.join(temp_dir, "database.db")
+        global_data.sensorHistoryMaxPending = sensor_count * iterations
+        storage = Sqlite(global_data.storageBackendSqliteFile, global_data)
+        if history_enabled:
+            global_data.sensor_history = SensorHistory(global_data, os.path.join(temp_dir, "history.db"))
+
+        storage.addNode("user", "host", "sensor", "instance", 1.0, 0, 1)
+        node_id = storage.getNodeId("user")
+        sensors = list()
+        for client_sensor_id in range(sensor_count):
+            sensor = Sensor()
+            sensor.nodeId = node_id
+            sensor.clientSensorId = client_sensor_id
+            sensor.description = "sensor_%d" % client_sensor_id
+            sensor.state = 0
+            sensor.error_state = SensorErrorState()
+            sensor.alertLevels.append(1)
+            sensor.alertDelay = 0
+            if client_sensor_id % 2 == 0:
+                sensor.dataType = SensorDataType.INT
+                sensor.data = SensorDataInt(0, "unit")
+            else:
+                sensor.dataType = SensorDataType.NONE
+                sensor.data = SensorDataNone()
+            sensors.append(sensor)
+        storage.upsert_sensors(sensors)
+
+        result = {"sensors": sensor_count, "history": history_enabled, "flush_ms": 0.0, "downsample_ms": 0.0}
+
+        start = time.perf_counter()
+        for _ in range(iterations):
+            state_list = [(i, random.randint(0, 1)) for i in range(sensor_count)]
+            data_list = [(i, SensorDataInt(random.randint(0, 100), "unit")) for i in range(0, sensor_count, 2)]
+            storage.updateSensorStateAndData(node_id, state_list, data_list)
+        result["update_ms"] = (time.perf_counter() - start) / iterations * 1000
+
+        if history_enabled:
+            start = time.perf_counter()
+            global_data.sensor_history.flush()
+            result["flush_ms"] = (time.perf_counter() - start) * 1000
+
+            start = time.perf_counter()
+            global_data.sensor_history.downsample(time.time() + 3600)
+            result["downsample_ms"] = (time.perf_counter() - start) * 1000
+
+            global_data.sensor_history.close()
+
+        storage.close()
+        return result
+
+    finally:
+        shutil.rmtree(temp_dir)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measures the overhead of the sensor history.")
+    parser.add_argument("--sensors", type=int, nargs="+", default=[10, 100, 1000], help="number of sensors of the node")
+    parser.add_argument("--iterations", type=int, default=100, help="number of updates that are measured")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.CRITICAL)
+
+    print("%8s %8s %12s %12s %12s %12s"
+          % ("sensors", "history", "update", "entries/s", "flush", "downsample"))
+    for sensor_count in args.sensors:
+        for history_enabled in [False, True]:
+            result = run(sensor_count, args.iterations, history_enabled)
+            entries_per_s = 0.0
+            if result["flush_ms"] > 0:
+                entries_per_s = sensor_count * args.iterations / (result["flush_ms"] / 1000)
+            print("%8d %8s %10.2fms %12.0f %10.2fms %10.2fms"
+                  % (result["sensors"], "yes" if result["history"] else "no", result["update_ms"], entries_per_s,
+                     result["flush_ms"], result["downsample_ms"]))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,154 @@
+"""
+Load benchmark that compares the "threaded" and the "async" server mode.
+
+Every run connects the given number of simulated alert nodes to a server instance (TLS/SSL disabled and
+a storage that only keeps node information in memory) and measures the number of threads and the resident memory
+of the process as well as the registration and ping latencies. Each run is executed in its own process.
+
+Usage (from the server directory):
+
+    python3 -m tests.benchmark.bench_server_modes [--nodes 100 1000 5000] [--modes threaded async]
+"""
+
+import argparse
+import json
+import logging
+import os
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from typing import Dict, Any, List
+from tests.server.util import SimulatedNode, create_server_global_data
+from lib.asyncServer import AsyncServer
+from lib.server import ThreadedTCPServer, ServerSession
+
+
+def _get_rss_kb() -> int:
+    with open("/proc/self/status", "r") as fp:
+        for line in fp:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1])
+    return 0
+
+
+def _percentile(values: List[float], percentile: float) -> float:
+    values = sorted(values)
+    index = min(len(values) - 1, int(round(percentile / 100.0 * (len(values) - 1))))
+    return values[index]
+
+
+def _raise_fd_limit(node_count: int):
+    # Each node needs a client socket, a server socket and a client log file.
+    needed = node_count * 3 + 100
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft < needed:
+        if hard != resource.RLIM_INFINITY and hard < needed:
+            raise RuntimeError("File descriptor limit too low (need %d, hard limit %d)." % (needed, hard))
+        resource.setrlimit(resource.RLIMIT_NOFILE, (needed, hard))
+
+
+def run_single(mode: str, node_count: int, ping_count: int, workers: int) -> Dict[str, Any]:
+    logging.basicConfig(level=logging.CRITICAL)
+    _raise_fd_limit(node_count)
+
+    log_dir = tempfile.mkdtemp()
+    global_data = create_server_global_data(log_dir)
+    global_data.logger.setLevel(logging.CRITICAL)
+    global_data.server_async_workers = workers
+
+    if mode == "async":
+        server = AsyncServer(global_data, ("127.0.0.1", 0))
+    else:
+        ThreadedTCPServer.request_queue_size = 1024
+        server = ThreadedTCPServer(global_data, ("127.0.0.1", 0), ServerSession)
+    host, port = server.server_address[0], server.server_address[1]
+
+    server_thread = threading.Thread(target=server.serve_forever, daemon=True)
+    server_thread.start()
+
+    base_threads = threading.active_count()
+    base_rss = _get_rss_kb()
+
+    nodes = list()
+    register_latencies = list()
+    start = time.time()
+    for i in range(node_count):
+        node = SimulatedNode("node_%d" % i, host, port)
+        reg_start = time.time()
+        node.connect()
+        if not node.register():
+            raise RuntimeError("Registration of node %d failed." % i)
+        register_latencies.append(time.time() - reg_start)
+        nodes.append(node)
+
+    while len(global_data.storage.connected_nodes) != node_count:
+        time.sleep(0.01)
+    register_duration = time.time() - start
+
+    # Give the per client threads time to settle.
+    time.sleep(1.0)
+    threads = threading.active_count()
+    rss = _get_rss_kb()
+
+    ping_latencies = list()
+    for i in range(ping_count):
+        node = nodes[i % node_count]
+        ping_start = time.time()
+        if not node.ping():
+            raise RuntimeError("Ping of node failed.")
+        ping_latencies.append(time.time() - ping_start)
+
+    for node in nodes:
+        node.close()
+
+    return {"mode": mode,
+            "nodes": node_count,
+            "register_total_s": register_duration,
+            "register_p50_ms": _percentile(register_latencies, 50) * 1000,
+            "register_p99_ms": _percentile(register_latencies, 99) * 1000,
+            "threads": threads - base_threads,
+            "rss_mb": (rss - base_rss) / 1024.0,
+            "ping_mean_ms": statistics.mean(ping_latencies) * 1000,
+            "ping_p50_ms": _percentile(ping_latencies, 50) * 1000,
+            "ping_p99_ms": _percentile(ping_latencies, 99) * 1000}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compares the threaded and the async server mode.")
+    parser.add_argument("--nodes", type=int, nargs="+", default=[100, 1000, 5000])
+    parser.add_argument("--modes", nargs="+", default=["threaded", "async"], choices=["threaded", "async"])
+    parser.add_argument("--pings", type=int, default=1000, help="number of ping requests per run")
+    parser.add_argument("--workers", type=int, default=32, help="number of worker threads in the async mode")
+    parser.add_argument("--single", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.single:
+        result = run_single(args.modes[0], args.nodes[0], args.pings, args.workers)
+        print(json.dumps(result))
+        sys.stdout.flush()
+        # Do not wait for the remaining client threads of the threaded server.
+        os._exit(0)
+
+    print("%-9s %6s %10s %8s %8s %8s %9s %9s %9s"
+          % ("mode", "nodes", "reg total", "reg p50", "reg p99", "threads", "RSS MB", "ping p50", "ping p99"))
+    for node_count in args.nodes:
+        for mode in args.modes:
+            output = subprocess.check_output([sys.executable, "-m", "tests.benchmark.bench_server_modes",
+                                              "--single",
+                                              "--modes", mode,
+                                              "--nodes", str(node_count),
+                                              "--pings", str(args.pings),
+                                              "--workers", str(args.workers)])
+            result = json.loads(output.decode("utf-8").strip().split("\n")[-1])
+            print("%-9s %6d %9.2fs %6.2fms %6.2fms %8d %9.1f %7.2fms %7.2fms"
+                  % (result["mode"], result["nodes"], result["register_total_s"], result["register_p50_ms"],
+                     result["register_p99_ms"], result["threads"], result["rss_mb"], result["ping_p50_ms"],
+                     result["ping_p99_ms"]))
+
+
+if __name__ == '__main__':
+    main()
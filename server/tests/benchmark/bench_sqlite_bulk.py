@@ -0,0 +1,123 @@
+"""
+Microbenchmark that measures the duration of the Sqlite storage functions that change all sensors of a node at once.
+
+Every run creates a database with one sensor node with the given number of sensors (half of them with integer data,
+half of them without data) and measures the duration of a status update of all sensors (updateSensorState,
+updateSensorData and updateSensorStateAndData), a re-registration of all sensors (upsert_sensors) and the deletion
+of the node (deleteNode).
+
+Usage (from the server directory):
+
+    python3 -m tests.benchmark.bench_sqlite_bulk [--sensors 10 100 1000] [--iterations 20]
+"""
+
+import argparse
+import logging
+import os
+import random
+import shutil
+import tempfile
+import time
+from typing import Dict, Any, List, Callable
+from lib.globalData.globalData import GlobalData
+from lib.globalData.sensorObjects import SensorDataInt, SensorDataType, SensorDataNone, SensorErrorState
+from lib.localObjects import Sensor
+from lib.storage.sqlite import Sqlite
+
+
+def _create_sensors(node_id: int, sensor_count: int) -> List[Sensor]:
+    sensors = list()
+    for client_sensor_id in range(sensor_count):
+        sensor = Sensor()
+        sensor.nodeId = node_id
+        sensor.clientSensorId = client_sensor_id
+        sensor.description = "sensor_%d" % client_sensor_id
+        sensor.state = 0
+        sensor.error_state = SensorErrorState()
+        sensor.alertLevels.append(1)
+        sensor.alertDelay = 0
+        if client_sensor_id % 2 == 0:
+            sensor.dataType = SensorDataType.INT
+            sensor.data = SensorDataInt(0, "unit")
+        else:
+            sensor.dataType = SensorDataType.NONE
+            sensor.data = SensorDataNone()
+        sensors.append(sensor)
+    return sensors
+
+
+def _measure(func: Callable[[], Any], iterations: int) -> float:
+    """
+    Measures the mean duration of the given function in milliseconds.
+    """
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return (time.perf_counter() - start) / iterations * 1000
+
+
+def run(sensor_count: int, iterations: int) -> Dict[str, Any]:
+    temp_dir = tempfile.mkdtemp()
+    try:
+        global_data = GlobalData()
+        global_data.logger = logging.getLogger("Sqlite Benchmark")
+        global_data.storageBackendSqliteFile = os.path.join(temp_dir, "database.db")
+        storage = Sqlite(global_data.storageBackendSqliteFile, global_data)
+
+        storage.addNode("user", "host", "sensor", "instance", 1.0, 0, 1)
+        node_id = storage.getNodeId("user")
+        sensors = _create_sensors(node_id, sensor_count)
+        storage.upsert_sensors(sensors)
+
+        def _state_list():
+            return [(i, random.randint(0, 1)) for i in range(sensor_count)]
+
+        def _data_list():
+            return [(i, SensorDataInt(random.randint(0, 100), "unit")) for i in range(0, sensor_count, 2)]
+
+        result = {"sensors": sensor_count}
+        result["state_ms"] = _measure(lambda: storage.updateSensorState(node_id, _state_list()), iterations)
+        result["data_ms"] = _measure(lambda: storage.updateSensorData(node_id, _data_list()), iterations)
+        result["state_data_ms"] = _measure(lambda: storage.updateSensorStateAndData(node_id,
+                                                                                    _state_list(),
+                                                                                    _data_list()),
+                                           iterations)
+
+        # Every other re-registration replaces a tenth of the sensors by new ones.
+        replaced_sensors = sensors[:-(sensor_count // 10)] \
+            + _create_sensors(node_id, sensor_count + sensor_count // 10)[sensor_count:]
+        upsert_lists = [sensors, replaced_sensors]
+        upsert_iterations = list(range(iterations))
+        result["upsert_ms"] = _measure(lambda: storage.upsert_sensors(upsert_lists[upsert_iterations.pop() % 2]),
+                                       iterations)
+
+        start = time.perf_counter()
+        storage.deleteNode(node_id)
+        result["delete_ms"] = (time.perf_counter() - start) * 1000
+
+        storage.close()
+        return result
+
+    finally:
+        shutil.rmtree(temp_dir)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measures the sensor updates of the Sqlite storage.")
+    parser.add_argument("--sensors", type=int, nargs="+", default=[10, 100, 1000], help="number of sensors of the node")
+    parser.add_argument("--iterations", type=int, default=20, help="number of calls that are measured")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.CRITICAL)
+
+    print("%8s %12s %12s %12s %12s %12s"
+          % ("sensors", "state", "data", "state+data", "upsert", "delete"))
+    for sensor_count in args.sensors:
+        result = run(sensor_count, args.iterations)
+        print("%8d %10.2fms %10.2fms %10.2fms %10.2fms %10.2fms"
+              % (result["sensors"], result["state_ms"], result["data_ms"], result["state_data_ms"],
+                 result["upsert_ms"], result["delete_ms"]))
+
+
+if __name__ == '__main__':
+    main()
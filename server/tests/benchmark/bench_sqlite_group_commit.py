@@ -0,0 +1,122 @@
+"""
+Benchmark that measures the sensor state changes per second the Sqlite storage backend handles with and without
+group commits.
+
+Every run creates an empty database with the given number of nodes and sensors. Each thread then changes the
+states of the sensors of its nodes one by one (updateSensorState), as done by the server for nodes that
+send state changes at a high rate. The number of commits saved by group commits is reported as well.
+
+Usage (from the server directory):
+
+    python3 -m tests.benchmark.bench_sqlite_group_commit [--threads 1 8] [--nodes 16] [--sensors 10]
+        [--changes 2000] [--interval 0.01] [--size 100]
+"""
+
+import argparse
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import time
+from typing import Dict, Any, List
+from lib.globalData.globalData import GlobalData
+from lib.globalData.sensorObjects import SensorDataNone, SensorDataType, SensorErrorState
+from lib.localObjects import Sensor
+from lib.storage.sqlite import Sqlite
+
+
+def _create_sensors(node_id: int, sensor_count: int) -> List[Sensor]:
+    sensors = list()
+    for client_sensor_id in range(sensor_count):
+        sensor = Sensor()
+        sensor.nodeId = node_id
+        sensor.clientSensorId = client_sensor_id
+        sensor.description = "sensor_%d" % client_sensor_id
+        sensor.state = 0
+        sensor.error_state = SensorErrorState()
+        sensor.alertLevels.append(1)
+        sensor.alertDelay = 0
+        sensor.dataType = SensorDataType.NONE
+        sensor.data = SensorDataNone()
+        sensors.append(sensor)
+    return sensors
+
+
+def run(thread_count: int,
+        node_count: int,
+        sensor_count: int,
+        change_count: int,
+        group_commit_interval: float,
+        group_commit_size: int) -> Dict[str, Any]:
+    temp_dir = tempfile.mkdtemp()
+    try:
+        global_data = GlobalData()
+        global_data.logger = logging.getLogger("Group Commit Benchmark")
+        global_data.storageBackendSqliteFile = os.path.join(temp_dir, "database.db")
+        storage = Sqlite(global_data.storageBackendSqliteFile,
+                         global_data,
+                         group_commit_interval=group_commit_interval,
+                         group_commit_size=group_commit_size)
+
+        node_ids = list()
+        for node_idx in range(node_count):
+            username = "user_%d" % node_idx
+            storage.addNode(username, "host", "sensor", "instance", 1.0, 0, 1)
+            node_id = storage.getNodeId(username)
+            storage.upsert_sensors(_create_sensors(node_id, sensor_count))
+            node_ids.append(node_id)
+        storage.get_commit_future().result()
+        saved_commits = storage.saved_commits
+
+        def _change_states(thread_idx: int):
+            thread_node_ids = node_ids[thread_idx::thread_count]
+            for i in range(thread_idx, change_count, thread_count):
+                storage.updateSensorState(thread_node_ids[i % len(thread_node_ids)],
+                                          [(i % sensor_count, i % 2)])
+
+        threads = [threading.Thread(target=_change_states, args=(i, ), daemon=True) for i in range(thread_count)]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        # The changes count only when they are durable.
+        storage.get_commit_future().result()
+        duration = time.perf_counter() - start
+
+        result = {"threads": thread_count,
+                  "interval": group_commit_interval,
+                  "changes_per_s": change_count / duration,
+                  "saved_commits": storage.saved_commits - saved_commits}
+        storage.close()
+        return result
+
+    finally:
+        shutil.rmtree(temp_dir)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measures the sensor state changes per second of the Sqlite "
+                                                 + "storage backend with and without group commits.")
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 8], help="number of writing threads")
+    parser.add_argument("--nodes", type=int, default=16, help="number of sensor nodes")
+    parser.add_argument("--sensors", type=int, default=10, help="number of sensors of each node")
+    parser.add_argument("--changes", type=int, default=2000, help="number of state changes")
+    parser.add_argument("--interval", type=float, default=0.01, help="group commit interval in seconds")
+    parser.add_argument("--size", type=int, default=100, help="group commit size")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.CRITICAL)
+
+    print("%8s %10s %18s %14s" % ("threads", "interval", "state changes", "saved commits"))
+    for thread_count in args.threads:
+        for interval in [0.0, args.interval]:
+            result = run(thread_count, args.nodes, args.sensors, args.changes, interval, args.size)
+            print("%8d %10.3f %16.1f/s %14d"
+                  % (result["threads"], result["interval"], result["changes_per_s"], result["saved_commits"]))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,168 @@
+"""
+Benchmark that measures the throughput of the Sqlite storage with concurrent readers and a writer.
+
+Every run creates a database with the given number of sensor nodes (with the same sensors that are used by the
+storage tests), starts reader threads that request sensors, sensor data and the complete alert system information
+(like the sensor alert executer and the manager updates do) and a writer thread that updates the sensor states and
+data of the nodes (like the status updates of the nodes do). The number of reads and writes per second is measured
+with and without reading connections and with the objects cached in memory in front of the Sqlite storage.
+
+Usage (from the server directory):
+
+    python3 -m tests.benchmark.bench_sqlite_readers [--readers 0 4] [--cache] [--threads 4] [--nodes 20] [--duration 5]
+"""
+
+import argparse
+import logging
+import os
+import random
+import shutil
+import tempfile
+import threading
+import time
+from typing import Dict, Any, List, Union
+from lib.globalData.globalData import GlobalData
+from lib.globalData.sensorObjects import SensorDataInt, SensorDataType, SensorDataNone, SensorErrorState
+from lib.localObjects import Sensor
+from lib.storage.sqlite import Sqlite
+from lib.storage.cache import CachedStorage
+
+
+def _create_storage(temp_dir: str,
+                    reader_count: int,
+                    cache: bool,
+                    node_count: int,
+                    sensors_per_node: int) -> Union[Sqlite, CachedStorage]:
+    global_data = GlobalData()
+    global_data.logger = logging.getLogger("Sqlite Benchmark")
+    global_data.storageBackendSqliteFile = os.path.join(temp_dir, "database.db")
+    storage = Sqlite(global_data.storageBackendSqliteFile, global_data, reader_count=reader_count)
+    if cache:
+        storage = CachedStorage(storage, global_data)
+
+    for node_idx in range(node_count):
+        username = "user_%d" % node_idx
+        storage.addNode(username, "host_%d" % node_idx, "sensor", "instance", 1.0, 0, 1)
+        node_id = storage.getNodeId(username)
+
+        sensors = list()
+        for client_sensor_id in range(sensors_per_node):
+            sensor = Sensor()
+            sensor.nodeId = node_id
+            sensor.clientSensorId = client_sensor_id
+            sensor.description = "sensor_%d" % client_sensor_id
+            sensor.state = 0
+            sensor.error_state = SensorErrorState()
+            sensor.alertLevels.append(1)
+            sensor.alertDelay = 0
+            if client_sensor_id % 2 == 0:
+                sensor.dataType = SensorDataType.INT
+                sensor.data = SensorDataInt(0, "unit")
+            else:
+                sensor.dataType = SensorDataType.NONE
+                sensor.data = SensorDataNone()
+            sensors.append(sensor)
+        storage.upsert_sensors(sensors)
+
+    return storage
+
+
+def run(reader_count: int,
+        cache: bool,
+        thread_count: int,
+        node_count: int,
+        sensors_per_node: int,
+        duration: float) -> Dict[str, Any]:
+    temp_dir = tempfile.mkdtemp()
+    try:
+        storage = _create_storage(temp_dir, reader_count, cache, node_count, sensors_per_node)
+        node_ids = [storage.getNodeId("user_%d" % i) for i in range(node_count)]
+        sensor_ids = [sensor.sensorId for node_id in node_ids for sensor in storage.get_sensors(node_id)]
+
+        exit_flag = threading.Event()
+        counters = {"reads": 0, "writes": 0, "snapshots": 0}
+        counters_lock = threading.Lock()
+        latencies = list()  # type: List[float]
+
+        def _reader():
+            reads = 0
+            snapshots = 0
+            while not exit_flag.is_set():
+                start = time.perf_counter()
+                if reads % 50 == 49:
+                    storage.getAlertSystemInformation()
+                    snapshots += 1
+                else:
+                    sensor_id = random.choice(sensor_ids)
+                    storage.getSensorById(sensor_id)
+                    storage.getSensorData(sensor_id)
+                latencies.append(time.perf_counter() - start)
+                reads += 1
+            with counters_lock:
+                counters["reads"] += reads
+                counters["snapshots"] += snapshots
+
+        def _writer():
+            writes = 0
+            while not exit_flag.is_set():
+                node_id = random.choice(node_ids)
+                state_list = [(i, random.randint(0, 1)) for i in range(sensors_per_node)]
+                data_list = [(i, SensorDataInt(random.randint(0, 100), "unit"))
+                             for i in range(0, sensors_per_node, 2)]
+                storage.updateSensorStateAndData(node_id, state_list, data_list)
+                writes += 1
+            with counters_lock:
+                counters["writes"] += writes
+
+        threads = [threading.Thread(target=_reader) for _ in range(thread_count)]
+        threads.append(threading.Thread(target=_writer))
+        for thread in threads:
+            thread.start()
+        time.sleep(duration)
+        exit_flag.set()
+        for thread in threads:
+            thread.join()
+
+        storage.close()
+
+        latencies.sort()
+        return {"readers": reader_count,
+                "cache": cache,
+                "reads_per_s": counters["reads"] / duration,
+                "snapshots_per_s": counters["snapshots"] / duration,
+                "writes_per_s": counters["writes"] / duration,
+                "read_p50_ms": latencies[len(latencies) // 2] * 1000,
+                "read_p99_ms": latencies[int(len(latencies) * 0.99)] * 1000}
+
+    finally:
+        shutil.rmtree(temp_dir)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measures the throughput of the Sqlite storage.")
+    parser.add_argument("--readers", type=int, nargs="+", default=[0, 4],
+                        help="number of reading connections (0 reads with the writing connection)")
+    parser.add_argument("--cache", action="store_true", help="additionally run with the objects cached in memory")
+    parser.add_argument("--threads", type=int, default=4, help="number of reading threads")
+    parser.add_argument("--nodes", type=int, default=20)
+    parser.add_argument("--sensors", type=int, default=10, help="number of sensors per node")
+    parser.add_argument("--duration", type=float, default=5.0, help="duration of each run in seconds")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.CRITICAL)
+
+    print("%8s %6s %10s %12s %10s %10s %10s"
+          % ("readers", "cache", "reads/s", "snapshots/s", "writes/s", "read p50", "read p99"))
+    runs = [(reader_count, False) for reader_count in args.readers]
+    if args.cache:
+        runs.append((max(args.readers), True))
+
+    for reader_count, cache in runs:
+        result = run(reader_count, cache, args.threads, args.nodes, args.sensors, args.duration)
+        print("%8d %6s %10.0f %12.1f %10.0f %8.2fms %8.2fms"
+              % (result["readers"], "yes" if result["cache"] else "no", result["reads_per_s"], result["snapshots_per_s"], result["writes_per_s"],
+                 result["read_p50_ms"], result["read_p99_ms"]))
+
+
+if __name__ == '__main__':
+    main()
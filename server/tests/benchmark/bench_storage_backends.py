@@ -0,0 +1,160 @@
+"""
+Benchmark that compares the Sqlite and the PostgreSQL storage backend under concurrent writes.
+
+Every run creates an empty database and measures two workloads with the given number of threads:
+
+* registrations: each thread registers its share of the nodes (addNode, upsert_sensors and markNodeAsConnected),
+  as done by the server when all nodes reconnect at once.
+* status flood: each thread sends status updates (updateSensorStateAndData of all sensors) for its own nodes.
+
+The PostgreSQL backend is only measured if a connection string is given. All tables of the given
+database are deleted.
+
+Usage (from the server directory):
+
+    python3 -m tests.benchmark.bench_storage_backends [--threads 1 4 16] [--nodes 64] [--sensors 50]
+        [--updates 20] [--postgresql "host=127.0.0.1 port=5432 dbname=alertr_bench user=alertr password=secret"]
+"""
+
+import argparse
+import logging
+import os
+import random
+import shutil
+import tempfile
+import threading
+import time
+from typing import Dict, Any, List, Callable, Optional
+from lib.globalData.globalData import GlobalData
+from lib.globalData.sensorObjects import SensorDataInt, SensorDataType, SensorErrorState
+from lib.localObjects import Sensor
+from lib.storage.sqlite import Sqlite
+from lib.storage.postgresql import Postgresql
+
+
+def _create_sensors(node_id: int, sensor_count: int) -> List[Sensor]:
+    sensors = list()
+    for client_sensor_id in range(sensor_count):
+        sensor = Sensor()
+        sensor.nodeId = node_id
+        sensor.clientSensorId = client_sensor_id
+        sensor.description = "sensor_%d" % client_sensor_id
+        sensor.state = 0
+        sensor.error_state = SensorErrorState()
+        sensor.alertLevels.append(1)
+        sensor.alertDelay = 0
+        sensor.dataType = SensorDataType.INT
+        sensor.data = SensorDataInt(0, "unit")
+        sensors.append(sensor)
+    return sensors
+
+
+def _run_threads(thread_count: int, func: Callable[[int], None]) -> float:
+    """
+    Runs the given function with the index of the thread in each thread and measures the duration in seconds.
+    """
+    threads = [threading.Thread(target=func, args=(i, ), daemon=True) for i in range(thread_count)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - start
+
+
+def _clear_postgresql(dsn: str):
+    import psycopg2
+    conn = psycopg2.connect(dsn)
+    with conn:
+        with conn.cursor() as cursor:
+            cursor.execute("DROP TABLE IF EXISTS internals, options, sensorsAlertLevels, sensorsDataInt, "
+                           + "sensorsDataFloat, sensorsDataGPS, sensors, alertsAlertLevels, alerts, managers, "
+                           + "nodes CASCADE")
+    conn.close()
+
+
+def run(backend: str,
+        thread_count: int,
+        node_count: int,
+        sensor_count: int,
+        update_count: int,
+        dsn: Optional[str] = None) -> Dict[str, Any]:
+    temp_dir = tempfile.mkdtemp()
+    try:
+        global_data = GlobalData()
+        global_data.logger = logging.getLogger("Storage Benchmark")
+
+        if backend == "sqlite":
+            global_data.storageBackendSqliteFile = os.path.join(temp_dir, "database.db")
+            storage = Sqlite(global_data.storageBackendSqliteFile, global_data)
+
+        else:
+            import psycopg2.extensions
+            _clear_postgresql(dsn)
+            params = psycopg2.extensions.parse_dsn(dsn)
+            storage = Postgresql(global_data,
+                                 host=params.get("host", "localhost"),
+                                 port=int(params.get("port", 5432)),
+                                 database=params.get("dbname", "alertr"),
+                                 user=params.get("user", "alertr"),
+                                 password=params.get("password", ""),
+                                 pool_size=thread_count)
+
+        node_ids = [None] * node_count
+
+        def _register(thread_idx: int):
+            for node_idx in range(thread_idx, node_count, thread_count):
+                username = "user_%d" % node_idx
+                storage.addNode(username, "host", "sensor", "instance", 1.0, 0, 1)
+                node_id = storage.getNodeId(username)
+                storage.upsert_sensors(_create_sensors(node_id, sensor_count))
+                storage.markNodeAsConnected(node_id)
+                node_ids[node_idx] = node_id
+
+        def _flood(thread_idx: int):
+            for _ in range(update_count):
+                for node_idx in range(thread_idx, node_count, thread_count):
+                    storage.updateSensorStateAndData(node_ids[node_idx],
+                                                     [(i, random.randint(0, 1)) for i in range(sensor_count)],
+                                                     [(i, SensorDataInt(random.randint(0, 100), "unit"))
+                                                      for i in range(sensor_count)])
+
+        result = {"backend": backend, "threads": thread_count}
+        duration = _run_threads(thread_count, _register)
+        result["registrations_per_s"] = node_count / duration
+
+        duration = _run_threads(thread_count, _flood)
+        result["updates_per_s"] = node_count * update_count / duration
+
+        storage.close()
+        return result
+
+    finally:
+        shutil.rmtree(temp_dir)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compares the storage backends under concurrent writes.")
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 4, 16], help="number of writing threads")
+    parser.add_argument("--nodes", type=int, default=64, help="number of sensor nodes")
+    parser.add_argument("--sensors", type=int, default=50, help="number of sensors of each node")
+    parser.add_argument("--updates", type=int, default=20, help="number of status updates of each node")
+    parser.add_argument("--postgresql", type=str, default=None, help="connection string of the PostgreSQL database")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.CRITICAL)
+
+    backends = ["sqlite"]
+    if args.postgresql:
+        backends.append("postgresql")
+
+    print("%12s %8s %16s %16s" % ("backend", "threads", "registrations", "status updates"))
+    for thread_count in args.threads:
+        for backend in backends:
+            result = run(backend, thread_count, args.nodes, args.sensors, args.updates, args.postgresql)
+            print("%12s %8d %14.1f/s %14.1f/s"
+                  % (result["backend"], result["threads"], result["registrations_per_s"], result["updates_per_s"]))
+
+
+if __name__ == '__main__':
+    main()
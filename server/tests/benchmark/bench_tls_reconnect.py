@@ -0,0 +1,138 @@
+"""
+Benchmark that measures the TLS/SSL handshakes of a reconnect storm.
+
+Every run starts a server instance with TLS/SSL enabled (self-signed certificate created with openssl), connects
+the given number of clients concurrently with a full handshake and afterwards lets all clients reconnect
+concurrently. In the "resumed" mode the clients offer their last TLS session on reconnect, in the "full" mode
+they do not. The handshake durations are measured by the server.
+
+Usage (from the server directory):
+
+    python3 -m tests.benchmark.bench_tls_reconnect [--clients 500] [--server-mode threaded async]
+"""
+
+import argparse
+import concurrent.futures
+import logging
+import os
+import shutil
+import socket
+import ssl
+import tempfile
+import threading
+import time
+from typing import Dict, Any, Optional
+from tests.server.util import create_server_global_data
+from tests.tls.util import create_certificate
+from lib.asyncServer import AsyncServer
+from lib.server import ThreadedTCPServer, ServerSession
+from lib.tls import TlsContext
+
+
+def _connect(client_context: ssl.SSLContext,
+             host: str,
+             port: int,
+             session: Optional[ssl.SSLSession]) -> Optional[ssl.SSLSession]:
+    sock = client_context.wrap_socket(socket.socket(socket.AF_INET, socket.SOCK_STREAM), session=session)
+    sock.settimeout(30.0)
+    sock.connect((host, port))
+
+    # With TLS 1.3 the session ticket is sent after the handshake and is processed on the next receive.
+    sock.settimeout(0.05)
+    try:
+        sock.recv(1)
+
+    except Exception:
+        pass
+
+    new_session = sock.session
+    sock.close()
+    return new_session
+
+
+def _storm(client_context: ssl.SSLContext,
+           host: str,
+           port: int,
+           sessions: Dict[int, Optional[ssl.SSLSession]],
+           workers: int) -> float:
+    start = time.time()
+    with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {i: executor.submit(_connect, client_context, host, port, session)
+                   for i, session in sessions.items()}
+        for i, future in futures.items():
+            sessions[i] = future.result()
+    return time.time() - start
+
+
+def run(server_mode: str, client_count: int, resume: bool, workers: int) -> Dict[str, Any]:
+    temp_dir = tempfile.mkdtemp()
+    try:
+        cert_file = os.path.join(temp_dir, "server.crt")
+        key_file = os.path.join(temp_dir, "server.key")
+        if not create_certificate(cert_file, key_file):
+            raise RuntimeError("openssl not available.")
+
+        global_data = create_server_global_data(temp_dir)
+        global_data.logger.setLevel(logging.CRITICAL)
+        global_data.sslEnabled = True
+        global_data.serverCertFile = cert_file
+        global_data.serverKeyFile = key_file
+        global_data.useClientCertificates = False
+        global_data.tls_context = TlsContext(global_data)
+
+        if server_mode == "async":
+            server = AsyncServer(global_data, ("127.0.0.1", 0))
+        else:
+            ThreadedTCPServer.request_queue_size = 1024
+            server = ThreadedTCPServer(global_data, ("127.0.0.1", 0), ServerSession)
+        host, port = server.server_address[0], server.server_address[1]
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+
+        client_context = ssl.SSLContext(ssl.PROTOCOL_TLS_CLIENT)
+        client_context.check_hostname = False
+        client_context.load_verify_locations(cafile=cert_file)
+
+        sessions = {i: None for i in range(client_count)}
+        _storm(client_context, host, port, sessions, workers)
+
+        if not resume:
+            sessions = {i: None for i in range(client_count)}
+        global_data.tls_context.reset_stats()
+        duration = _storm(client_context, host, port, sessions, workers)
+        stats = global_data.tls_context.get_stats()
+
+        server.shutdown()
+        server.server_close()
+
+        stats["server_mode"] = server_mode
+        stats["clients"] = client_count
+        stats["resume"] = resume
+        stats["storm_total_s"] = duration
+        return stats
+
+    finally:
+        shutil.rmtree(temp_dir)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measures the TLS/SSL handshakes of a reconnect storm.")
+    parser.add_argument("--clients", type=int, default=500)
+    parser.add_argument("--server-mode", nargs="+", default=["threaded", "async"], choices=["threaded", "async"])
+    parser.add_argument("--workers", type=int, default=50, help="number of concurrently connecting clients")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.CRITICAL)
+
+    print("%-9s %-8s %7s %10s %9s %9s %10s %10s"
+          % ("mode", "session", "clients", "total", "resumed", "failed", "hs p50", "hs p99"))
+    for server_mode in args.server_mode:
+        for resume in [False, True]:
+            result = run(server_mode, args.clients, resume, args.workers)
+            print("%-9s %-8s %7d %9.2fs %9d %9d %8.2fms %8.2fms"
+                  % (result["server_mode"], "resumed" if result["resume"] else "full", result["clients"],
+                     result["storm_total_s"], result["resumed"], result["failed"],
+                     result["duration_p50"] * 1000, result["duration_p99"] * 1000))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,234 @@
+import logging
+import os
+import time
+from tests.util import config_logging
+from tests.storage.sqlite_core import TestStorageCore
+from lib.history import SensorHistory
+from lib.globalData.sensorObjects import SensorDataInt, SensorDataFloat, SensorDataGPS, SensorDataType
+
+
+class TestSensorHistory(TestStorageCore):
+
+    def _init_history(self) -> SensorHistory:
+        history = SensorHistory(self.global_data, os.path.join(self.temp_dir, "history.db"))
+        self.addCleanup(history.close)
+        return history
+
+    def setUp(self):
+        config_logging(logging.ERROR)
+        self.storage = self._init_storage()
+
+        # Start of an hour in the past that is still within all retention times.
+        self.start = (int(time.time()) // 3600 - 5) * 3600
+
+    def test_add_raw(self):
+        """
+        Tests that added entries are returned in the order of their timestamps.
+        """
+        history = self._init_history()
+
+        history.add([(1, 0, SensorDataInt(5, "unit")), (2, 1, None)], self.start + 1)
+        history.add([(1, None, SensorDataFloat(7.5, "unit"))], self.start + 2)
+        history.add([(1, 1, SensorDataGPS(1.5, 2.5, 1337))], self.start + 3)
+
+        # Entries without state and data are ignored.
+        history.add([(1, None, None)], self.start + 4)
+
+        entries = history.get_history(1, self.start, self.start + 60, "raw")
+        self.assertEqual(3, len(entries))
+        self.assertEqual([self.start + 1, self.start + 2, self.start + 3], [x.timestamp for x in entries])
+        self.assertEqual([0, None, 1], [x.state for x in entries])
+        self.assertEqual([5, 7.5, None], [x.value for x in entries])
+        self.assertEqual((1.5, 2.5, 1337), (entries[2].lat, entries[2].lon, entries[2].utctime))
+
+        entries = history.get_history(2, self.start, self.start + 60, "raw")
+        self.assertEqual(1, len(entries))
+        self.assertEqual(1, entries[0].state)
+        self.assertEqual(4, history.written_count)
+
+        # The end of the range is exclusive.
+        self.assertEqual(2, len(history.get_history(1, self.start + 2, self.start + 60, "raw")))
+        self.assertEqual(1, len(history.get_history(1, self.start, self.start + 2, "raw")))
+
+    def test_downsample(self):
+        """
+        Tests the aggregation of the raw entries per minute and per hour.
+        """
+        history = self._init_history()
+
+        # Two minutes of the first hour and one minute of the second hour.
+        history.add([(1, 0, SensorDataInt(10, "unit"))], self.start)
+        history.add([(1, 1, SensorDataInt(20, "unit"))], self.start + 30)
+        history.add([(1, 1, SensorDataInt(60, "unit"))], self.start + 90)
+        history.add([(1, 0, SensorDataInt(4, "unit"))], self.start + 3600)
+        history.flush()
+
+        history.downsample(self.start + 2 * 3600 + 120)
+
+        minutes = history.get_history(1, self.start, self.start + 7200, "minute")
+        self.assertEqual([self.start, self.start + 60, self.start + 3600], [x.timestamp for x in minutes])
+        self.assertEqual([2, 1, 1], [x.count for x in minutes])
+        self.assertEqual(1, minutes[0].state)
+        self.assertEqual(0.5, minutes[0].state_avg)
+        self.assertEqual((20, 10, 20, 15), (minutes[0].value,
+                                            minutes[0].value_min,
+                                            minutes[0].value_max,
+                                            minutes[0].value_avg))
+
+        hours = history.get_history(1, self.start, self.start + 7200, "hour")
+        self.assertEqual([self.start, self.start + 3600], [x.timestamp for x in hours])
+        self.assertEqual(3, hours[0].count)
+        self.assertEqual(1, hours[0].state)
+        self.assertAlmostEqual(2 / 3, hours[0].state_avg)
+        self.assertEqual((60, 10, 60, 30), (hours[0].value,
+                                            hours[0].value_min,
+                                            hours[0].value_max,
+                                            hours[0].value_avg))
+        self.assertEqual(4, hours[1].value)
+
+        # Downsampling again does not change the aggregates.
+        history.downsample(self.start + 2 * 3600 + 120)
+        self.assertEqual(3, history.get_history(1, self.start, self.start + 7200, "hour")[0].count)
+
+    def test_downsample_incomplete_interval(self):
+        """
+        Tests that the current minute is not aggregated before it is completed.
+        """
+        history = self._init_history()
+
+        history.add([(1, 0, None)], self.start + 10)
+        history.flush()
+        history.downsample(self.start + 30)
+        self.assertEqual([], history.get_history(1, self.start, self.start + 60, "minute"))
+
+        history.add([(1, 1, None)], self.start + 40)
+        history.flush()
+        history.downsample(self.start + 70)
+        minutes = history.get_history(1, self.start, self.start + 60, "minute")
+        self.assertEqual(1, len(minutes))
+        self.assertEqual(2, minutes[0].count)
+        self.assertIsNone(minutes[0].value_avg)
+
+    def test_retention(self):
+        """
+        Tests that entries are deleted after their retention time but only after they were aggregated.
+        """
+        self.global_data.sensorHistoryRawRetention = 60.0
+        history = self._init_history()
+
+        history.add([(1, 1, None)], self.start)
+        history.add([(1, 1, None)], self.start + 7200)
+        history.flush()
+
+        history.downsample(self.start + 7200 + 30)
+        raw = history.get_history(1, self.start, self.start + 7300, "raw")
+        self.assertEqual([self.start + 7200], [x.timestamp for x in raw])
+        self.assertEqual(1, len(history.get_history(1, self.start, self.start + 7300, "minute")))
+
+        # The range is answered from the finest resolution that is retained.
+        entries = history.get_history(1, self.start, self.start + 7300)
+        self.assertEqual([self.start], [x.timestamp for x in entries])
+        self.assertEqual(1, entries[0].count)
+
+    def test_dropped_entries(self):
+        """
+        Tests that the oldest entries are dropped if too many entries are collected.
+        """
+        self.global_data.sensorHistoryMaxPending = 2
+        history = self._init_history()
+
+        history.add([(1, 0, None), (1, 1, None), (1, 0, None)], self.start)
+        self.assertEqual(1, history.dropped_count)
+        self.assertEqual([1, 0], [x.state for x in history.get_history(1, self.start, self.start + 1, "raw")])
+
+    def test_invalid_resolution(self):
+        """
+        Tests that an unknown resolution is rejected.
+        """
+        config_logging(logging.CRITICAL)
+        history = self._init_history()
+        self.assertIsNone(history.get_history(1, self.start, self.start + 60, "day"))
+
+    def test_storage_updates(self):
+        """
+        Tests that the sensor updates of the storage are recorded in the history.
+        """
+        storage = self._create_sensors(self.storage)
+        history = self._init_history()
+        self.global_data.sensor_history = history
+        node_id = self.sensors[0].nodeId
+        sensor_none = [x for x in self.sensors if x.dataType == SensorDataType.NONE][0]
+        sensor_int = [x for x in self.sensors if x.dataType == SensorDataType.INT][0]
+
+        start = time.time() - 1
+        self.assertTrue(storage.updateSensorState(node_id, [(sensor_none.clientSensorId, 1)]))
+        self.assertTrue(storage.updateSensorData(node_id, [(sensor_int.clientSensorId,
+                                                            SensorDataInt(1337, "unit"))]))
+        self.assertTrue(storage.updateSensorStateAndData(node_id,
+                                                         [(sensor_int.clientSensorId, 1)],
+                                                         [(sensor_int.clientSensorId, SensorDataInt(42, "unit"))]))
+
+        # Failed updates are not recorded.
+        config_logging(logging.CRITICAL)
+        self.assertFalse(storage.updateSensorState(node_id, [(sensor_none.clientSensorId, 0), (4567, 0)]))
+
+        entries = history.get_history(sensor_none.sensorId, start, time.time() + 1, "raw")
+        self.assertEqual([(1, None)], [(x.state, x.value) for x in entries])
+
+        entries = history.get_history(sensor_int.sensorId, start, time.time() + 1, "raw")
+        self.assertEqual([(None, 1337), (1, 42)], [(x.state, x.value) for x in entries])
+
+    def test_storage_updates_history_list(self):
+        """
+        Tests that the given history entries of a sensor update are recorded each on its own
+        while only the latest state and data is stored.
+        """
+        storage = self._create_sensors(self.storage)
+        history = self._init_history()
+        self.global_data.sensor_history = history
+        node_id = self.sensors[0].nodeId
+        sensor_none = [x for x in self.sensors if x.dataType == SensorDataType.NONE][0]
+        sensor_int = [x for x in self.sensors if x.dataType == SensorDataType.INT][0]
+
+        start = time.time() - 1
+        self.assertTrue(storage.updateSensorStateAndData(node_id,
+                                                         [(sensor_none.clientSensorId, 0),
+                                                          (sensor_int.clientSensorId, 0)],
+                                                         [(sensor_int.clientSensorId, SensorDataInt(2, "unit"))],
+                                                         historyList=[(sensor_none.clientSensorId, 1, None),
+                                                                      (sensor_int.clientSensorId,
+                                                                       1,
+                                                                       SensorDataInt(1, "unit")),
+                                                                      (sensor_none.clientSensorId, 0, None),
+                                                                      (sensor_int.clientSensorId,
+                                                                       0,
+                                                                       SensorDataInt(2, "unit"))]))
+
+        entries = history.get_history(sensor_none.sensorId, start, time.time() + 1, "raw")
+        self.assertEqual([(1, None), (0, None)], [(x.state, x.value) for x in entries])
+
+        entries = history.get_history(sensor_int.sensorId, start, time.time() + 1, "raw")
+        self.assertEqual([(1, 1), (0, 2)], [(x.state, x.value) for x in entries])
+
+        sensor = storage.getSensorById(sensor_int.sensorId)
+        self.assertEqual(0, sensor.state)
+        self.assertEqual(SensorDataInt(2, "unit"), sensor.data)
+
+    def test_thread(self):
+        """
+        Tests that the thread writes the collected entries.
+        """
+        self.global_data.sensorHistoryFlushInterval = 0.05
+        history = self._init_history()
+        history.start()
+
+        history.add([(1, 1, None)], self.start)
+        for _ in range(100):
+            if history.written_count == 1:
+                break
+            time.sleep(0.05)
+
+        history.exit()
+        history.join(5)
+        self.assertFalse(history.is_alive())
+        self.assertEqual(1, history.written_count)
@@ -0,0 +1,226 @@
+import logging
+import os
+import shutil
+import tempfile
+import time
+from unittest import TestCase
+from typing import List
+from tests.util import config_logging
+from lib.alert.alert import SensorAlertExecuter, SensorAlertState
+from lib.alert.instrumentation import InstrumentationPromise, PromiseState
+from lib.globalData.globalData import GlobalData
+from lib.globalData.sensorObjects import SensorDataInt, SensorDataType
+from lib.journal import JournalOutcome, SensorAlertJournal
+from lib.localObjects import AlertLevel, SensorAlert
+
+
+class TestSensorAlertJournal(TestCase):
+
+    def setUp(self):
+        config_logging(logging.ERROR)
+        self.temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.temp_dir)
+
+        self.global_data = GlobalData()
+        self.global_data.logger = logging.getLogger("Journal Test Case")
+        self.global_data.storageBackendSqliteJournalFile = os.path.join(self.temp_dir, "journal.db")
+
+        self.now = int(time.time())
+
+    def _init_journal(self) -> SensorAlertJournal:
+        journal = SensorAlertJournal(self.global_data)
+        self.addCleanup(journal.close)
+        return journal
+
+    @staticmethod
+    def _create_sensor_alert(sensor_id: int,
+                             time_received: int,
+                             alert_levels: List[int],
+                             triggered_alert_levels: List[int]) -> SensorAlert:
+        sensor_alert = SensorAlert()
+        sensor_alert.nodeId = 1
+        sensor_alert.sensorId = sensor_id
+        sensor_alert.description = "sensor_%d" % sensor_id
+        sensor_alert.timeReceived = time_received
+        sensor_alert.alertDelay = 0
+        sensor_alert.state = 1
+        sensor_alert.hasOptionalData = True
+        sensor_alert.optionalData = {"message": "alert of sensor %d" % sensor_id}
+        sensor_alert.changeState = True
+        sensor_alert.alertLevels = alert_levels
+        sensor_alert.triggeredAlertLevels = triggered_alert_levels
+        sensor_alert.hasLatestData = True
+        sensor_alert.dataType = SensorDataType.INT
+        sensor_alert.data = SensorDataInt(sensor_id, "unit")
+        return sensor_alert
+
+    def test_add(self):
+        """
+        Tests that added sensor alerts are returned with all their information.
+        """
+        journal = self._init_journal()
+
+        sensor_alert = self._create_sensor_alert(1, self.now, [1, 2], [2])
+        journal.add(sensor_alert, JournalOutcome.TRIGGERED, PromiseState.SUCCESS)
+
+        # The journal contains the sensor alert as it was when it was added.
+        sensor_alert.optionalData["message"] = "changed"
+
+        entries = journal.get_sensor_alerts()
+        self.assertEqual(1, len(entries))
+        self.assertEqual(JournalOutcome.TRIGGERED, entries[0].outcome)
+        self.assertEqual(PromiseState.SUCCESS, entries[0].instrumentation)
+        self.assertEqual(1, journal.written_count)
+
+        stored_sensor_alert = entries[0].sensorAlert
+        self.assertEqual(1, stored_sensor_alert.sensorId)
+        self.assertEqual(self.now, stored_sensor_alert.timeReceived)
+        self.assertEqual([1, 2], stored_sensor_alert.alertLevels)
+        self.assertEqual([2], stored_sensor_alert.triggeredAlertLevels)
+        self.assertEqual({"message": "alert of sensor 1"}, stored_sensor_alert.optionalData)
+        self.assertEqual(SensorDataInt(1, "unit"), stored_sensor_alert.data)
+
+    def test_query(self):
+        """
+        Tests the filters of the query.
+        """
+        journal = self._init_journal()
+
+        journal.add(self._create_sensor_alert(1, self.now - 30, [1, 2], [1, 2]), JournalOutcome.TRIGGERED)
+        journal.add(self._create_sensor_alert(2, self.now - 20, [1], [1]), JournalOutcome.TRIGGERED)
+        journal.add(self._create_sensor_alert(1, self.now - 10, [2], []), JournalOutcome.NOT_TRIGGERED)
+
+        # Newest sensor alert first.
+        entries = journal.get_sensor_alerts()
+        self.assertEqual([self.now - 10, self.now - 20, self.now - 30],
+                         [x.sensorAlert.timeReceived for x in entries])
+
+        entries = journal.get_sensor_alerts(sensor_id=1)
+        self.assertEqual([self.now - 10, self.now - 30], [x.sensorAlert.timeReceived for x in entries])
+
+        # Only triggered alert levels are considered.
+        entries = journal.get_sensor_alerts(alert_level=2)
+        self.assertEqual([self.now - 30], [x.sensorAlert.timeReceived for x in entries])
+
+        entries = journal.get_sensor_alerts(alert_level=1, sensor_id=2)
+        self.assertEqual([self.now - 20], [x.sensorAlert.timeReceived for x in entries])
+
+        entries = journal.get_sensor_alerts(start=self.now - 20, end=self.now - 10)
+        self.assertEqual([self.now - 20], [x.sensorAlert.timeReceived for x in entries])
+
+        entries = journal.get_sensor_alerts(alert_level=1, start=self.now - 25)
+        self.assertEqual([self.now - 20], [x.sensorAlert.timeReceived for x in entries])
+
+        entries = journal.get_sensor_alerts(limit=2)
+        self.assertEqual([self.now - 10, self.now - 20], [x.sensorAlert.timeReceived for x in entries])
+
+    def test_compact(self):
+        """
+        Tests that sensor alerts are deleted after the retention time.
+        """
+        self.global_data.sensorAlertJournalRetention = 60.0
+        journal = self._init_journal()
+
+        journal.add(self._create_sensor_alert(1, self.now - 120, [1], [1]), JournalOutcome.TRIGGERED)
+        journal.add(self._create_sensor_alert(1, self.now - 30, [1], [1]), JournalOutcome.TRIGGERED)
+        journal.flush()
+
+        journal.compact(self.now)
+
+        entries = journal.get_sensor_alerts()
+        self.assertEqual([self.now - 30], [x.sensorAlert.timeReceived for x in entries])
+        entries = journal.get_sensor_alerts(alert_level=1)
+        self.assertEqual([self.now - 30], [x.sensorAlert.timeReceived for x in entries])
+
+    def test_load_existing(self):
+        """
+        Tests that the sensor alerts are kept after a restart.
+        """
+        journal = SensorAlertJournal(self.global_data)
+        journal.add(self._create_sensor_alert(1, self.now, [1], [1]), JournalOutcome.TRIGGERED)
+        journal.close()
+
+        journal = self._init_journal()
+        self.assertEqual(1, len(journal.get_sensor_alerts(alert_level=1)))
+
+    def test_dropped_sensor_alerts(self):
+        """
+        Tests that the oldest sensor alerts are dropped if too many sensor alerts are collected.
+        """
+        self.global_data.sensorAlertJournalMaxPending = 2
+        journal = self._init_journal()
+
+        for i in range(3):
+            journal.add(self._create_sensor_alert(i, self.now, [1], [1]), JournalOutcome.TRIGGERED)
+        self.assertEqual(1, journal.dropped_count)
+        self.assertEqual([2, 1], [x.sensorAlert.sensorId for x in journal.get_sensor_alerts()])
+
+    def test_thread(self):
+        """
+        Tests that the thread writes the collected sensor alerts.
+        """
+        self.global_data.sensorAlertJournalFlushInterval = 0.05
+        journal = self._init_journal()
+        journal.start()
+
+        journal.add(self._create_sensor_alert(1, self.now, [1], [1]), JournalOutcome.TRIGGERED)
+        for _ in range(100):
+            if journal.written_count == 1:
+                break
+            time.sleep(0.05)
+
+        journal.exit()
+        journal.join(5)
+        self.assertFalse(journal.is_alive())
+        self.assertEqual(1, journal.written_count)
+
+    def test_sensor_alert_executer(self):
+        """
+        Tests that the sensor alert executer adds the processed sensor alerts to the journal.
+        """
+        journal = self._init_journal()
+        self.global_data.sensor_alert_journal = journal
+        sensor_alert_executer = SensorAlertExecuter(self.global_data)
+
+        alert_level = AlertLevel()
+        alert_level.level = 1
+        alert_level.profiles = [0]
+        alert_level.triggerAlertTriggered = True
+        alert_level.triggerAlertNormal = True
+
+        # Sensor alert without suitable alert level.
+        not_triggered_state = SensorAlertState(self._create_sensor_alert(1, self.now, [2], []), [alert_level])
+
+        # Sensor alert suppressed by the instrumentation.
+        suppressed_state = SensorAlertState(self._create_sensor_alert(2, self.now, [1], []), [alert_level])
+        suppressed_state.uses_instrumentation = True
+        suppressed_state.instrumentation_promise = InstrumentationPromise(alert_level,
+                                                                          suppressed_state.init_sensor_alert)
+        suppressed_state.instrumentation_promise.set_success()
+
+        # Sensor alert with failed instrumentation.
+        config_logging(logging.CRITICAL)
+        failed_state = SensorAlertState(self._create_sensor_alert(3, self.now, [1], []), [alert_level])
+        failed_state.uses_instrumentation = True
+        failed_state.instrumentation_promise = InstrumentationPromise(alert_level,
+                                                                      failed_state.init_sensor_alert)
+        failed_state.instrumentation_promise.set_failed()
+
+        triggered_state = SensorAlertState(self._create_sensor_alert(4, self.now, [1], [1]), [alert_level])
+
+        new_states, _ = sensor_alert_executer._filter_sensor_alerts([not_triggered_state,
+                                                                     suppressed_state,
+                                                                     failed_state,
+                                                                     triggered_state])
+        self.assertEqual([triggered_state], new_states)
+        sensor_alert_executer._trigger_sensor_alert(triggered_state)
+
+        entries = {x.sensorAlert.sensorId: x for x in journal.get_sensor_alerts()}
+        self.assertEqual(4, len(entries))
+        self.assertEqual((JournalOutcome.NOT_TRIGGERED, None), (entries[1].outcome, entries[1].instrumentation))
+        self.assertEqual((JournalOutcome.SUPPRESSED, PromiseState.SUCCESS),
+                         (entries[2].outcome, entries[2].instrumentation))
+        self.assertEqual((JournalOutcome.INSTRUMENTATION_FAILED, PromiseState.FAILED),
+                         (entries[3].outcome, entries[3].instrumentation))
+        self.assertEqual((JournalOutcome.TRIGGERED, None), (entries[4].outcome, entries[4].instrumentation))
+        self.assertEqual([4], [x.sensorAlert.sensorId for x in journal.get_sensor_alerts(alert_level=1)])
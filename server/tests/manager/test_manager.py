@@ -0,0 +1,150 @@
+import logging
+import time
+from unittest import TestCase
+from typing import Tuple
+from tests.util import config_logging
+from lib.globalData.globalData import GlobalData
+from lib.globalData.sensorObjects import SensorDataType
+from lib.localObjects import SensorData
+from lib.manager import ManagerUpdateExecuter
+from lib.sender import StateChangeMessage, StatusUpdateMessage
+
+
+class MockClientCommunication:
+
+    def __init__(self, node_type: str):
+        self.nodeType = node_type
+        self.clientInitialized = True
+        self.clientAlertLevels = set()
+
+
+class MockServerSession:
+
+    def __init__(self, node_type: str):
+        self.clientComm = MockClientCommunication(node_type)
+
+
+class MockSenderDispatcher:
+
+    def __init__(self):
+        self.messages = list()
+
+    def queue_message(self, client_comm, message) -> bool:
+        self.messages.append((client_comm, message))
+        return True
+
+
+class TestManager(TestCase):
+
+    def _create_manager_update_executer(self, flush_window: float) -> Tuple[ManagerUpdateExecuter, GlobalData]:
+        config_logging(logging.ERROR)
+
+        global_data = GlobalData()
+        global_data.logger = logging.getLogger("Manager Test Case")
+        global_data.managerStateChangeFlushWindow = flush_window
+        global_data.sender_dispatcher = MockSenderDispatcher()
+        for node_type in ["manager", "manager", "alert"]:
+            server_session = MockServerSession(node_type)
+            global_data.serverSessions.append(server_session)
+            global_data.serverSessions.add_initialized_client(server_session.clientComm)
+
+        manager_update_executer = ManagerUpdateExecuter(global_data)
+
+        # Do not send the initial status update.
+        manager_update_executer.lastStatusUpdateSend = int(time.time())
+
+        manager_update_executer.daemon = True
+        manager_update_executer.start()
+        self.addCleanup(manager_update_executer.exit)
+
+        return manager_update_executer, global_data
+
+    @staticmethod
+    def _create_sensor_data(sensor_id: int, data: int) -> SensorData:
+        sensor_data = SensorData()
+        sensor_data.sensorId = sensor_id
+        sensor_data.dataType = SensorDataType.INT
+        sensor_data.data = data
+        return sensor_data
+
+    def test_coalesce_state_changes(self):
+        """
+        Tests that only the latest state change of each sensor in the flush window is sent to each manager.
+        """
+        manager_update_executer, global_data = self._create_manager_update_executer(0.5)
+
+        for i in range(10):
+            manager_update_executer.queue_state_change(1, i % 2, self._create_sensor_data(1, i))
+            manager_update_executer.queue_state_change(2, 1, self._create_sensor_data(2, i))
+
+        time.sleep(1.0)
+
+        messages = global_data.sender_dispatcher.messages
+        self.assertEqual(4, len(messages))
+        self.assertTrue(all(isinstance(message, StateChangeMessage) for _, message in messages))
+        self.assertTrue(all(client_comm.nodeType == "manager" for client_comm, _ in messages))
+
+        gt_data = {1: (1, 9), 2: (1, 9)}
+        for _, message in messages:
+            self.assertEqual(gt_data[message.sensor_id], (message.state, message.data))
+
+        self.assertEqual(20, manager_update_executer.stateChangeQueuedCount)
+        self.assertEqual(18, manager_update_executer.stateChangeCoalescedCount)
+
+    def test_state_changes_in_separate_windows(self):
+        """
+        Tests that state changes of separate flush windows are all sent.
+        """
+        manager_update_executer, global_data = self._create_manager_update_executer(0.1)
+
+        manager_update_executer.queue_state_change(1, 1, self._create_sensor_data(1, 1))
+        time.sleep(0.5)
+        manager_update_executer.queue_state_change(1, 0, self._create_sensor_data(1, 2))
+        time.sleep(0.5)
+
+        messages = global_data.sender_dispatcher.messages
+        self.assertEqual(4, len(messages))
+        self.assertEqual([1, 1, 0, 0], [message.state for _, message in messages])
+        self.assertEqual(0, manager_update_executer.stateChangeCoalescedCount)
+
+    def test_status_update_discards_state_changes(self):
+        """
+        Tests that a forced status update discards all queued state changes.
+        """
+        manager_update_executer, global_data = self._create_manager_update_executer(0.5)
+
+        manager_update_executer.queue_state_change(1, 1, self._create_sensor_data(1, 1))
+        manager_update_executer.force_status_update()
+        time.sleep(1.0)
+
+        messages = global_data.sender_dispatcher.messages
+        self.assertEqual(2, len(messages))
+        self.assertTrue(all(isinstance(message, StatusUpdateMessage) for _, message in messages))
+
+    def test_no_flush_window(self):
+        """
+        Tests that state changes are sent immediately without a flush window (default).
+        """
+        self.assertEqual(0, GlobalData().managerStateChangeFlushWindow)
+        manager_update_executer, global_data = self._create_manager_update_executer(0.0)
+
+        manager_update_executer.queue_state_change(1, 1, self._create_sensor_data(1, 1))
+        time.sleep(0.2)
+
+        messages = global_data.sender_dispatcher.messages
+        self.assertEqual(2, len(messages))
+        self.assertTrue(all(isinstance(message, StateChangeMessage) for _, message in messages))
+
+    def test_exit_during_flush_window(self):
+        """
+        Tests that the thread terminates without waiting for the flush window to pass.
+        """
+        manager_update_executer, global_data = self._create_manager_update_executer(30.0)
+
+        manager_update_executer.queue_state_change(1, 1, self._create_sensor_data(1, 1))
+        time.sleep(0.2)
+        manager_update_executer.exit()
+        manager_update_executer.join(2.0)
+
+        self.assertFalse(manager_update_executer.is_alive())
+        self.assertEqual([], global_data.sender_dispatcher.messages)
@@ -0,0 +1,274 @@
+import logging
+import threading
+import time
+from unittest import TestCase
+from tests.util import config_logging
+from lib.globalData.globalData import GlobalData
+from lib.localObjects import Profile, SensorAlert
+from lib.globalData.sensorObjects import SensorErrorState, SensorDataType
+from lib.sender import SenderDispatcher, StatusUpdateMessage, StateChangeMessage, SensorAlertMessage, \
+    ProfileChangeMessage, SensorErrorStateChangeMessage
+
+
+class MockClientCommunication:
+
+    def __init__(self, node_type: str):
+        self.nodeType = node_type
+        self.clientInitialized = True
+        self.clientAddress = "127.0.0.1"
+        self.clientPort = 1337
+        self.is_closed = False
+
+        # Event that blocks all sends until it is set.
+        self.send_event = threading.Event()
+        self.send_event.set()
+
+        self.sent = list()
+        self._in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+
+    def _send(self, msg) -> bool:
+        with self._lock:
+            self._in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self._in_flight)
+        self.send_event.wait()
+        with self._lock:
+            self._in_flight -= 1
+            self.sent.append(msg)
+        return True
+
+    def sendManagerUpdate(self) -> bool:
+        return self._send(("status",))
+
+    def sendManagerStateChange(self, sensorId, state, dataType, data) -> bool:
+        return self._send(("state", sensorId, state))
+
+    def sendSensorAlert(self, sensorAlert) -> bool:
+        return self._send(("alert", sensorAlert))
+
+    def send_profile_change(self, profile) -> bool:
+        return self._send(("profile", profile.profileId))
+
+    def send_sensor_error_state_change(self, sensor_id, error_state) -> bool:
+        return self._send(("error_state", sensor_id))
+
+    def close_connection(self):
+        # Same as the cleanup of the server session of the closed connection.
+        self.is_closed = True
+        self.clientInitialized = False
+
+
+class TestSender(TestCase):
+
+    def _create_dispatcher(self, worker_count: int = 2, queue_size: int = 100) -> SenderDispatcher:
+        config_logging(logging.CRITICAL)
+
+        global_data = GlobalData()
+        global_data.logger = logging.getLogger("Sender Test Case")
+        global_data.sender_worker_count = worker_count
+        global_data.sender_queue_size = queue_size
+
+        dispatcher = SenderDispatcher(global_data)
+        dispatcher.start()
+        self.addCleanup(dispatcher.exit)
+        return dispatcher
+
+    def _wait_until_empty(self, dispatcher: SenderDispatcher, timeout: float = 5.0):
+        start = time.time()
+        while dispatcher.queue_depth != 0 or (dispatcher.sent_count + dispatcher.failed_count) == 0:
+            if (time.time() - start) > timeout:
+                self.fail("Dispatcher did not process messages in time.")
+            time.sleep(0.01)
+
+    def test_state_change_coalescing(self):
+        """
+        Tests that a queued state change is replaced by a newer one of the same sensor.
+        """
+        dispatcher = self._create_dispatcher()
+        client_comm = MockClientCommunication("manager")
+
+        # Block the first message so all others are queued.
+        client_comm.send_event.clear()
+        dispatcher.queue_message(client_comm, StateChangeMessage(1, 0, SensorDataType.NONE, None))
+        time.sleep(0.1)
+
+        for state in range(5):
+            dispatcher.queue_message(client_comm, StateChangeMessage(2, state, SensorDataType.NONE, None))
+        dispatcher.queue_message(client_comm, StateChangeMessage(3, 1, SensorDataType.NONE, None))
+
+        self.assertEqual(2, dispatcher.get_queue_depth(client_comm))
+        self.assertEqual(4, dispatcher.coalesced_count)
+
+        client_comm.send_event.set()
+        self._wait_until_empty(dispatcher)
+
+        self.assertEqual([("state", 1, 0), ("state", 2, 4), ("state", 3, 1)], client_comm.sent)
+        self.assertEqual(0, dispatcher.dropped_count)
+
+    def test_status_update_covers_state(self):
+        """
+        Tests that a queued status update discards all state information queued before it but keeps sensor alerts.
+        """
+        dispatcher = self._create_dispatcher()
+        client_comm = MockClientCommunication("manager")
+        sensor_alert = SensorAlert()
+
+        client_comm.send_event.clear()
+        dispatcher.queue_message(client_comm, StatusUpdateMessage())
+        time.sleep(0.1)
+
+        dispatcher.queue_message(client_comm, StateChangeMessage(1, 1, SensorDataType.NONE, None))
+        dispatcher.queue_message(client_comm, SensorAlertMessage(sensor_alert))
+        dispatcher.queue_message(client_comm, SensorErrorStateChangeMessage(1, SensorErrorState()))
+        dispatcher.queue_message(client_comm, StatusUpdateMessage())
+        dispatcher.queue_message(client_comm, StateChangeMessage(2, 1, SensorDataType.NONE, None))
+
+        self.assertEqual(3, dispatcher.get_queue_depth(client_comm))
+
+        client_comm.send_event.set()
+        self._wait_until_empty(dispatcher)
+
+        self.assertEqual([("status",), ("alert", sensor_alert), ("status",), ("state", 2, 1)], client_comm.sent)
+
+    def test_full_queue(self):
+        """
+        Tests that the connection to a slow client is closed without blocking the producer and without dropping
+        a message if its queue is full.
+        """
+        dispatcher = self._create_dispatcher(queue_size=3)
+        client_comm = MockClientCommunication("alert")
+
+        client_comm.send_event.clear()
+        dispatcher.queue_message(client_comm, SensorAlertMessage(SensorAlert()))
+        time.sleep(0.1)
+
+        for _ in range(3):
+            dispatcher.queue_message(client_comm, SensorAlertMessage(SensorAlert()))
+        self.assertEqual(0, dispatcher.disconnected_count)
+        self.assertFalse(client_comm.is_closed)
+
+        start = time.time()
+        dispatcher.queue_message(client_comm, SensorAlertMessage(SensorAlert()))
+        self.assertLess(time.time() - start, 0.5)
+
+        self.assertTrue(client_comm.is_closed)
+        self.assertEqual(1, dispatcher.disconnected_count)
+        self.assertEqual(0, dispatcher.dropped_count)
+        self.assertEqual(4, dispatcher.get_queue_depth(client_comm))
+
+        # The connection is only closed once.
+        dispatcher.queue_message(client_comm, SensorAlertMessage(SensorAlert()))
+        self.assertEqual(1, dispatcher.disconnected_count)
+
+        # The pending messages are discarded once the session is gone.
+        client_comm.send_event.set()
+        self._wait_until_empty(dispatcher)
+        self.assertEqual(1, len(client_comm.sent))
+        self.assertEqual(5, dispatcher.dropped_count)
+
+    def test_full_queue_other_clients(self):
+        """
+        Tests that the messages to other clients are not delayed by a slow client.
+        """
+        dispatcher = self._create_dispatcher(queue_size=3)
+        slow_client_comm = MockClientCommunication("alert")
+        client_comm = MockClientCommunication("alert")
+
+        slow_client_comm.send_event.clear()
+        dispatcher.queue_message(slow_client_comm, SensorAlertMessage(SensorAlert()))
+        time.sleep(0.1)
+
+        start = time.time()
+        for _ in range(5):
+            dispatcher.queue_message(slow_client_comm, SensorAlertMessage(SensorAlert()))
+        for _ in range(3):
+            dispatcher.queue_message(client_comm, SensorAlertMessage(SensorAlert()))
+        self.assertLess(time.time() - start, 0.5)
+
+        start = time.time()
+        while len(client_comm.sent) != 3:
+            if (time.time() - start) > 5.0:
+                self.fail("Dispatcher did not send messages in time.")
+            time.sleep(0.01)
+
+        self.assertTrue(slow_client_comm.is_closed)
+        self.assertFalse(client_comm.is_closed)
+        slow_client_comm.send_event.set()
+
+    def test_full_queue_manager(self):
+        """
+        Tests that the state information of a slow manager is replaced by a status update if its queue is full.
+        """
+        dispatcher = self._create_dispatcher(queue_size=3)
+        client_comm = MockClientCommunication("manager")
+
+        client_comm.send_event.clear()
+        dispatcher.queue_message(client_comm, StateChangeMessage(0, 1, SensorDataType.NONE, None))
+        time.sleep(0.1)
+
+        for sensor_id in range(1, 5):
+            dispatcher.queue_message(client_comm, StateChangeMessage(sensor_id, 1, SensorDataType.NONE, None))
+
+        self.assertEqual(2, dispatcher.get_queue_depth(client_comm))
+        self.assertEqual(0, dispatcher.dropped_count)
+
+        client_comm.send_event.set()
+        self._wait_until_empty(dispatcher)
+
+        self.assertEqual([("state", 0, 1), ("status",), ("state", 4, 1)], client_comm.sent)
+
+    def test_bounded_workers(self):
+        """
+        Tests that many clients are served by the bounded number of workers and each client by one worker at a time.
+        """
+        dispatcher = self._create_dispatcher(worker_count=3)
+        client_comms = [MockClientCommunication("alert") for _ in range(20)]
+
+        profile = Profile()
+        profile.profileId = 1
+        thread_count = threading.active_count()
+        for _ in range(10):
+            for client_comm in client_comms:
+                dispatcher.queue_message(client_comm, SensorAlertMessage(SensorAlert()))
+                dispatcher.queue_message(client_comm, ProfileChangeMessage(profile))
+
+        self.assertEqual(thread_count, threading.active_count())
+
+        start = time.time()
+        while dispatcher.queue_depth != 0 or dispatcher.sent_count != 20 * 11:
+            if (time.time() - start) > 5.0:
+                self.fail("Dispatcher did not process messages in time.")
+            time.sleep(0.01)
+
+        for client_comm in client_comms:
+            self.assertEqual(1, client_comm.max_in_flight)
+            self.assertEqual(11, len(client_comm.sent))
+
+    def test_disconnected_client(self):
+        """
+        Tests that pending messages of a disconnected client are dropped.
+        """
+        dispatcher = self._create_dispatcher()
+        client_comm = MockClientCommunication("alert")
+
+        client_comm.send_event.clear()
+        for _ in range(3):
+            dispatcher.queue_message(client_comm, SensorAlertMessage(SensorAlert()))
+        time.sleep(0.1)
+
+        client_comm.clientInitialized = False
+        client_comm.send_event.set()
+        self._wait_until_empty(dispatcher)
+
+        self.assertEqual(1, len(client_comm.sent))
+        self.assertEqual(2, dispatcher.dropped_count)
+
+    def test_wrong_node_type(self):
+        """
+        Tests that messages are only queued for suitable node types.
+        """
+        dispatcher = self._create_dispatcher()
+        self.assertFalse(dispatcher.queue_message(MockClientCommunication("sensor"), StatusUpdateMessage()))
+        self.assertFalse(dispatcher.queue_message(MockClientCommunication("manager"), ProfileChangeMessage(Profile())))
+        self.assertEqual(0, dispatcher.queue_depth)
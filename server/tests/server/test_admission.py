@@ -0,0 +1,159 @@
+import logging
+import tempfile
+import threading
+import time
+from unittest import TestCase
+from tests.util import config_logging
+from tests.server.util import SimulatedNode, MockUserBackend, create_server_global_data
+from lib.admission import AdmissionController
+from lib.asyncServer import AsyncServer
+from lib.server import ThreadedTCPServer, ServerSession
+
+
+class SlowUserBackend(MockUserBackend):
+    """
+    User backend that takes some time to verify the credentials (like the bcrypt verification) and keeps track
+    of the number of concurrent verifications.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._active = 0
+        self.peak_active = 0
+
+    def areUserCredentialsValid(self, username: str, password: str) -> bool:
+        with self._lock:
+            self._active += 1
+            self.peak_active = max(self.peak_active, self._active)
+        time.sleep(0.05)
+        with self._lock:
+            self._active -= 1
+        return True
+
+
+class TestAdmissionController(TestCase):
+
+    def test_limit(self):
+        """
+        Tests that only the configured number of slots is granted and queued requests are granted in order.
+        """
+        controller = AdmissionController(2)
+        granted = list()
+
+        for i in range(4):
+            controller.request(lambda i=i: granted.append(i))
+
+        self.assertEqual([0, 1], granted)
+        self.assertEqual(2, controller.active)
+        self.assertEqual(2, controller.queued)
+
+        controller.release()
+        self.assertEqual([0, 1, 2], granted)
+        self.assertEqual(2, controller.active)
+
+        for _ in range(3):
+            controller.release()
+        self.assertEqual([0, 1, 2, 3], granted)
+        self.assertEqual(0, controller.active)
+        self.assertEqual(0, controller.queued)
+
+        stats = controller.get_stats()
+        self.assertEqual(4, stats["admitted"])
+        self.assertEqual(2, stats["queued_total"])
+        self.assertEqual(2, stats["peak_active"])
+        self.assertEqual(2, stats["peak_queued"])
+
+    def test_acquire_blocks(self):
+        """
+        Tests that acquiring a slot blocks until a slot is released.
+        """
+        controller = AdmissionController(1)
+        controller.acquire()
+
+        acquired = threading.Event()
+
+        def _acquire():
+            controller.acquire()
+            acquired.set()
+
+        thread = threading.Thread(target=_acquire, daemon=True)
+        thread.start()
+
+        self.assertFalse(acquired.wait(0.2))
+        controller.release()
+        self.assertTrue(acquired.wait(5.0))
+        controller.release()
+
+        self.assertEqual(0, controller.active)
+        self.assertGreater(controller.get_stats()["wait_max"], 0.0)
+
+
+class TestServerAdmission(TestCase):
+
+    def setUp(self):
+        config_logging(logging.ERROR)
+        self._temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self._temp_dir.cleanup)
+
+    def _check_concurrent_setups(self, use_async: bool):
+        global_data = create_server_global_data(self._temp_dir.name)
+        global_data.userBackend = SlowUserBackend()
+        global_data.serverMaxConcurrentSetups = 2
+
+        if use_async:
+            server = AsyncServer(global_data, ("127.0.0.1", 0))
+        else:
+            server = ThreadedTCPServer(global_data, ("127.0.0.1", 0), ServerSession)
+            server.daemon_threads = True
+        server_thread = threading.Thread(target=server.serve_forever, daemon=True)
+        server_thread.start()
+
+        def _stop():
+            server.shutdown()
+            server_thread.join(5)
+            server.server_close()
+        self.addCleanup(_stop)
+
+        node_count = 10
+        results = list()
+
+        def _connect(node: SimulatedNode):
+            node.connect()
+            results.append(node.register())
+
+        nodes = list()
+        threads = list()
+        for i in range(node_count):
+            node = SimulatedNode("node_%d" % i, server.server_address[0], server.server_address[1])
+            self.addCleanup(node.close)
+            nodes.append(node)
+            thread = threading.Thread(target=_connect, args=(node,), daemon=True)
+            thread.start()
+            threads.append(thread)
+
+        for thread in threads:
+            thread.join(10.0)
+
+        self.assertEqual([True] * node_count, results)
+        self.assertEqual(2, global_data.userBackend.peak_active)
+
+        stats = global_data.admission_controller.get_stats()
+        self.assertEqual(node_count, stats["admitted"])
+        self.assertEqual(2, stats["peak_active"])
+        self.assertGreater(stats["queued_total"], 0)
+
+        # The nodes are still usable after their sessions were set up.
+        for node in nodes:
+            self.assertTrue(node.ping())
+
+    def test_concurrent_setups_threaded(self):
+        """
+        Tests that the threaded server limits the number of concurrent session setups.
+        """
+        self._check_concurrent_setups(False)
+
+    def test_concurrent_setups_async(self):
+        """
+        Tests that the async server limits the number of concurrent session setups.
+        """
+        self._check_concurrent_setups(True)
@@ -0,0 +1,225 @@
+import json
+import logging
+import os
+import socket
+import ssl
+import tempfile
+import threading
+import time
+from unittest import TestCase
+from typing import Tuple
+from tests.util import config_logging
+from tests.server.util import SimulatedNode, create_server_global_data
+from tests.tls.util import create_certificate
+from lib.asyncServer import AsyncServer
+from lib.globalData.globalData import GlobalData
+
+
+class TestAsyncServer(TestCase):
+
+    def setUp(self):
+        config_logging(logging.ERROR)
+        self._temp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self._temp_dir.cleanup()
+
+    def _start_server(self, workers: int = 4, tls: bool = False) -> Tuple[AsyncServer, GlobalData]:
+        global_data = create_server_global_data(self._temp_dir.name)
+        global_data.server_async_workers = workers
+
+        if tls:
+            global_data.serverCertFile = os.path.join(self._temp_dir.name, "server.crt")
+            global_data.serverKeyFile = os.path.join(self._temp_dir.name, "server.key")
+            if not create_certificate(global_data.serverCertFile, global_data.serverKeyFile):
+                self.skipTest("openssl not available")
+            global_data.sslEnabled = True
+            global_data.useClientCertificates = False
+
+        server = AsyncServer(global_data, ("127.0.0.1", 0))
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+
+        def _stop():
+            server.shutdown()
+            thread.join(5)
+            server.server_close()
+        self.addCleanup(_stop)
+
+        return server, global_data
+
+    def _wait_for(self, condition, timeout: float = 5.0):
+        start = time.time()
+        while not condition():
+            if (time.time() - start) > timeout:
+                self.fail("Condition not reached in time.")
+            time.sleep(0.05)
+
+    def test_register_and_ping(self):
+        """
+        Tests that more clients than worker threads can register and send requests.
+        """
+        server, global_data = self._start_server(workers=2)
+        host, port = server.server_address
+
+        nodes = list()
+        for i in range(10):
+            node = SimulatedNode("node_%d" % i, host, port)
+            node.connect()
+            self.assertTrue(node.register())
+            nodes.append(node)
+
+        self._wait_for(lambda: len(global_data.storage.connected_nodes) == 10)
+        self.assertEqual(10, len(list(global_data.serverSessions)))
+
+        for _ in range(3):
+            for node in nodes:
+                self.assertTrue(node.ping())
+
+        for node in nodes:
+            node.close()
+
+        self._wait_for(lambda: len(list(global_data.serverSessions)) == 0)
+        self.assertEqual(0, len(global_data.storage.connected_nodes))
+
+    def test_version_mismatch(self):
+        """
+        Tests that a client with an incompatible version is rejected.
+        """
+        server, global_data = self._start_server()
+        host, port = server.server_address
+
+        node = SimulatedNode("node_version", host, port, version=0.1)
+        node.connect()
+        self.assertFalse(node.register())
+        node.close()
+
+        self._wait_for(lambda: len(list(global_data.serverSessions)) == 0)
+        self.assertEqual(0, len(global_data.storage.connected_nodes))
+
+    def test_close_connection(self):
+        """
+        Tests that closing a session (as done by the watchdogs) cleans up the session.
+        """
+        server, global_data = self._start_server()
+        host, port = server.server_address
+
+        node = SimulatedNode("node_persistent", host, port, persistent=1)
+        node.connect()
+        self.assertTrue(node.register())
+        self._wait_for(lambda: len(global_data.storage.connected_nodes) == 1)
+
+        for server_session in global_data.serverSessions:
+            server_session.closeConnection()
+
+        self._wait_for(lambda: len(global_data.storage.connected_nodes) == 0)
+        self.assertEqual(0, len(list(global_data.serverSessions)))
+        self._wait_for(lambda: len(global_data.connectionWatchdog.added_node_pre_timeouts) == 1)
+
+        with self.assertRaises(Exception):
+            node.ping()
+        node.close()
+
+    def test_routing_index(self):
+        """
+        Tests that initialized clients are added to the routing index of the server sessions and removed on
+        disconnect.
+        """
+        server, global_data = self._start_server()
+        host, port = server.server_address
+
+        nodes = list()
+        for i in range(3):
+            node = SimulatedNode("node_%d" % i, host, port)
+            node.connect()
+            self.assertTrue(node.register())
+            nodes.append(node)
+
+        self._wait_for(lambda: len(global_data.serverSessions.get_clients_by_alert_levels([1])) == 3)
+        self.assertEqual(3, len(global_data.serverSessions.get_clients_by_node_type("alert")))
+        self.assertEqual([], global_data.serverSessions.get_clients_by_alert_levels([2]))
+        self.assertEqual([], global_data.serverSessions.get_clients_by_node_type("manager"))
+
+        nodes[0].close()
+        self._wait_for(lambda: len(global_data.serverSessions.get_clients_by_alert_levels([1])) == 2)
+
+        for server_session in global_data.serverSessions:
+            server_session.closeConnection()
+        self._wait_for(lambda: len(list(global_data.serverSessions)) == 0)
+        self.assertEqual([], global_data.serverSessions.get_clients_by_alert_levels([1]))
+        self.assertEqual([], global_data.serverSessions.get_clients_by_node_type("alert"))
+
+        for node in nodes[1:]:
+            node.close()
+
+    def test_tls_handshake_stalled_client(self):
+        """
+        Tests that a client that does not finish the TLS/SSL handshake does not block a worker thread.
+        """
+        server, global_data = self._start_server(workers=1, tls=True)
+        global_data.serverReceiveTimeout = 2.0
+        host, port = server.server_address
+
+        stalled_sock = socket.create_connection((host, port), timeout=5.0)
+        self.addCleanup(stalled_sock.close)
+
+        client_context = ssl.SSLContext(ssl.PROTOCOL_TLS_CLIENT)
+        client_context.load_verify_locations(global_data.serverCertFile)
+        client_context.check_hostname = False
+
+        start = time.time()
+        node = SimulatedNode("node_tls", host, port, ssl_context=client_context)
+        node.connect()
+        self.assertTrue(node.register())
+        self.assertTrue(node.ping())
+        self.assertLess(time.time() - start, global_data.serverReceiveTimeout)
+
+        # The handshake of the stalled client is aborted after the timeout.
+        self._wait_for(lambda: global_data.tls_context.get_stats()["failed"] == 1)
+        self.assertEqual(1, global_data.tls_context.get_stats()["handshakes"])
+        self.assertEqual(b"", stalled_sock.recv(1024))
+        self.assertEqual(1, len(list(global_data.serverSessions)))
+
+        node.close()
+        self._wait_for(lambda: len(list(global_data.serverSessions)) == 0)
+
+    def test_partial_request(self):
+        """
+        Tests that a client that sends only a part of a request does not block a worker thread.
+        """
+        server, global_data = self._start_server(workers=1)
+        host, port = server.server_address
+
+        slow_node = SimulatedNode("node_slow", host, port)
+        slow_node.connect()
+        self.assertTrue(slow_node.register())
+
+        node = SimulatedNode("node_fast", host, port)
+        node.connect()
+        self.assertTrue(node.register())
+
+        # Send the first half of a request and stall.
+        ping_message = json.dumps({"msgTime": int(time.time()),
+                                   "message": "ping",
+                                   "payload": {"type": "request"}})
+        rts_message = json.dumps({"size": len(ping_message),
+                                  "message": "ping",
+                                  "payload": {"type": "rts",
+                                              "id": 1337}})
+        slow_node._send(rts_message[:10], None)
+
+        start = time.time()
+        for _ in range(3):
+            self.assertTrue(node.ping())
+        self.assertLess(time.time() - start, global_data.serverReceiveTimeout)
+
+        # The request is handled as soon as it is complete.
+        slow_node._send(rts_message[10:], None)
+        message = slow_node._recv_msg()
+        self.assertEqual(("cts", 1337), (message["payload"]["type"], message["payload"]["id"]))
+        slow_node._send(ping_message, None)
+        self.assertEqual("ok", slow_node._recv_msg()["payload"]["result"])
+
+        slow_node.close()
+        node.close()
+        self._wait_for(lambda: len(list(global_data.serverSessions)) == 0)
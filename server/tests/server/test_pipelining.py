@@ -0,0 +1,139 @@
+import json
+import logging
+import tempfile
+import threading
+import time
+from unittest import TestCase
+from typing import Tuple
+from tests.util import config_logging
+from tests.server.util import SimulatedNode, create_server_global_data
+from lib.asyncServer import AsyncServer
+from lib.globalData.globalData import GlobalData
+from lib.localObjects import Profile
+from lib.server import ThreadedTCPServer, ServerSession, ClientCommunication, FrameType
+
+
+class TestPipelining(TestCase):
+
+    def setUp(self):
+        config_logging(logging.ERROR)
+        self._temp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self._temp_dir.cleanup()
+
+    def _start_server(self, use_async: bool) -> Tuple[Tuple[str, int], GlobalData]:
+        global_data = create_server_global_data(self._temp_dir.name)
+
+        if use_async:
+            server = AsyncServer(global_data, ("127.0.0.1", 0))
+        else:
+            server = ThreadedTCPServer(global_data, ("127.0.0.1", 0), ServerSession)
+            server.daemon_threads = True
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+
+        def _stop():
+            server.shutdown()
+            thread.join(5)
+            server.server_close()
+        self.addCleanup(_stop)
+
+        return server.server_address, global_data
+
+    def _wait_for(self, condition, timeout: float = 5.0):
+        start = time.time()
+        while not condition():
+            if (time.time() - start) > timeout:
+                self.fail("Condition not reached in time.")
+            time.sleep(0.05)
+
+    def _connect_node(self, address: Tuple[str, int], global_data: GlobalData, pipelining: bool) -> SimulatedNode:
+        node = SimulatedNode("node_pipelining", address[0], address[1], pipelining=pipelining)
+        node.connect()
+        self.addCleanup(node.close)
+        self.assertTrue(node.register())
+        self._wait_for(lambda: len(global_data.storage.connected_nodes) == 1)
+        return node
+
+    def _check_pipelined_pings(self, use_async: bool):
+        address, global_data = self._start_server(use_async)
+        node = self._connect_node(address, global_data, True)
+
+        self.assertTrue(node.pipelining)
+        for _ in range(3):
+            self.assertTrue(node.ping_pipelined(20))
+
+    def _check_server_request(self, use_async: bool):
+        address, global_data = self._start_server(use_async)
+        node = self._connect_node(address, global_data, True)
+        client_comm = list(global_data.serverSessions)[0].clientComm  # type: ClientCommunication
+
+        profile = Profile()
+        profile.profileId = 1
+        profile.name = "profile"
+        results = list()
+        sender = threading.Thread(target=lambda: results.append(client_comm.send_profile_change(profile)),
+                                  daemon=True)
+        sender.start()
+
+        frame_type, transaction_id, message = node.recv_frame()
+        self.assertEqual(FrameType.REQUEST, frame_type)
+        self.assertEqual("profilechange", message["message"])
+        self.assertEqual(1, message["payload"]["profileId"])
+
+        # Send a request of the node together with the response to the request of the server.
+        ping_message = json.dumps({"msgTime": int(time.time()),
+                                   "message": "ping",
+                                   "payload": {"type": "request"}})
+        response_message = json.dumps({"message": "profilechange",
+                                       "payload": {"type": "response",
+                                                   "result": "ok"}})
+        node.send_frames([(FrameType.REQUEST, 1337, ping_message),
+                          (FrameType.RESPONSE, transaction_id, response_message)])
+
+        sender.join(5)
+        self.assertEqual([True], results)
+
+        frame_type, transaction_id, message = node.recv_frame()
+        self.assertEqual(FrameType.RESPONSE, frame_type)
+        self.assertEqual(1337, transaction_id)
+        self.assertEqual("ping", message["message"])
+        self.assertEqual("ok", message["payload"]["result"])
+
+    def test_pipelined_pings(self):
+        """
+        Tests that multiple requests in flight are answered with the transaction id of each request.
+        """
+        self._check_pipelined_pings(False)
+
+    def test_pipelined_pings_async(self):
+        """
+        Tests that multiple requests in flight are answered by the event driven server.
+        """
+        self._check_pipelined_pings(True)
+
+    def test_server_request(self):
+        """
+        Tests that a request of the server is sent without RTS/CTS and that a request of the client
+        received while waiting for the response is processed afterwards.
+        """
+        self._check_server_request(False)
+
+    def test_server_request_async(self):
+        """
+        Tests the request of the server with the event driven server.
+        """
+        self._check_server_request(True)
+
+    def test_classic_client(self):
+        """
+        Tests that a client that does not request pipelining keeps using the RTS/CTS protocol.
+        """
+        address, global_data = self._start_server(False)
+        node = self._connect_node(address, global_data, False)
+
+        self.assertFalse(node.pipelining)
+        self.assertFalse(list(global_data.serverSessions)[0].clientComm.pipelining)
+        for _ in range(3):
+            self.assertTrue(node.ping())
@@ -0,0 +1,149 @@
+import json
+import logging
+import tempfile
+import threading
+from unittest import TestCase
+from tests.util import config_logging
+from tests.server.util import SimulatedNode, create_server_global_data
+from lib.asyncServer import AsyncServer
+from lib.server import ThreadedTCPServer, ServerSession, ReceiveBuffer, FrameType, build_frame
+
+
+class TestReceiveBuffer(TestCase):
+
+    def test_fragmented_and_concatenated_messages(self):
+        """
+        Tests that messages are split correctly if they are received in pieces or together.
+        """
+        messages = [json.dumps({"message": "ping", "payload": {"type": "request"}}),
+                    json.dumps({"message": "option",
+                                "payload": {"value": "braces {in} string \"quoted\" {",
+                                            "path": "C:\\\\",
+                                            "nested": [{"a": {}}, {"b": "}"}]}}),
+                    json.dumps({"message": "ping", "payload": {"type": "response", "result": "ok"}})]
+        data = "\n".join(messages).encode("ascii")
+
+        for chunk_size in range(1, 20):
+            receive_buffer = ReceiveBuffer()
+            received = list()
+            for i in range(0, len(data), chunk_size):
+                receive_buffer.feed(data[i:i + chunk_size])
+                while receive_buffer.has_message():
+                    received.append(receive_buffer.pop_message())
+
+            self.assertEqual(messages, received)
+            self.assertEqual(0, len(receive_buffer))
+            self.assertIsNone(receive_buffer.pop_message())
+
+    def test_fragmented_and_concatenated_frames(self):
+        """
+        Tests that frames are split correctly if they are received in pieces or together.
+        """
+        frames = [(FrameType.REQUEST, 1, "first"),
+                  (FrameType.RESPONSE, 0xffffffff, ""),
+                  (FrameType.REQUEST, 3, json.dumps({"message": "ping"}))]
+        data = "".join(build_frame(*frame) for frame in frames).encode("ascii")
+
+        receive_buffer = ReceiveBuffer()
+        received = list()
+        for i in range(0, len(data), 5):
+            receive_buffer.feed(data[i:i + 5])
+            while receive_buffer.has_frame():
+                received.append(receive_buffer.pop_frame())
+
+        self.assertEqual(frames, received)
+        self.assertEqual(0, len(receive_buffer))
+        self.assertIsNone(receive_buffer.pop_frame())
+
+    def test_mixed_protocol(self):
+        """
+        Tests that a RTS message, the announced data and following frames received together are split correctly.
+        """
+        request = json.dumps({"message": "initialization", "payload": {"type": "request"}})
+        rts = json.dumps({"size": len(request), "message": "initialization", "payload": {"type": "rts", "id": 1}})
+        frame = (FrameType.REQUEST, 2, json.dumps({"message": "ping"}))
+
+        receive_buffer = ReceiveBuffer()
+        receive_buffer.feed((rts + request + build_frame(*frame)).encode("ascii"))
+
+        self.assertEqual(rts, receive_buffer.pop_message())
+        self.assertIsNone(receive_buffer.pop_data(len(request) + 1000))
+        self.assertEqual(request, receive_buffer.pop_data(len(request)))
+        self.assertEqual(frame, receive_buffer.pop_frame())
+        self.assertEqual(0, len(receive_buffer))
+
+    def test_large_data(self):
+        """
+        Tests that a large message received in many pieces is reassembled and the consumed data is released.
+        """
+        large_message = json.dumps({"message": "status", "payload": {"data": "x" * (1024 * 1024)}})
+        data = (large_message + large_message).encode("ascii")
+
+        receive_buffer = ReceiveBuffer()
+        received = list()
+        for i in range(0, len(data), 4096):
+            receive_buffer.feed(data[i:i + 4096])
+            message = receive_buffer.pop_message()
+            if message is not None:
+                received.append(message)
+                # The data of the first message is removed from the buffer.
+                self.assertLess(len(receive_buffer._buffer), 4096 * 2)
+
+        self.assertEqual([large_message, large_message], received)
+        self.assertEqual(0, len(receive_buffer))
+
+    def test_invalid_data(self):
+        """
+        Tests that data that is not a JSON message is rejected.
+        """
+        receive_buffer = ReceiveBuffer()
+        receive_buffer.feed(b" \r\nnot a message")
+        with self.assertRaises(ValueError):
+            receive_buffer.pop_message()
+
+
+class TestFragmentedTransport(TestCase):
+
+    def setUp(self):
+        config_logging(logging.ERROR)
+        self._temp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self._temp_dir.cleanup()
+
+    def _check_fragmented_ping(self, use_async: bool):
+        global_data = create_server_global_data(self._temp_dir.name)
+
+        if use_async:
+            server = AsyncServer(global_data, ("127.0.0.1", 0))
+        else:
+            server = ThreadedTCPServer(global_data, ("127.0.0.1", 0), ServerSession)
+            server.daemon_threads = True
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+
+        def _stop():
+            server.shutdown()
+            thread.join(5)
+            server.server_close()
+        self.addCleanup(_stop)
+
+        node = SimulatedNode("node_fragmented", server.server_address[0], server.server_address[1])
+        node.connect()
+        self.addCleanup(node.close)
+        self.assertTrue(node.register())
+
+        for chunk_size in [1, 7, 50]:
+            self.assertTrue(node.ping(chunk_size))
+
+    def test_fragmented_ping(self):
+        """
+        Tests that messages received in pieces are processed by the server.
+        """
+        self._check_fragmented_ping(False)
+
+    def test_fragmented_ping_async(self):
+        """
+        Tests that messages received in pieces are processed by the event driven server.
+        """
+        self._check_fragmented_ping(True)
@@ -0,0 +1,216 @@
+import copy
+import json
+import logging
+import os
+import shutil
+import socket
+import tempfile
+from unittest import TestCase
+from typing import Dict, Any, List
+from tests.util import config_logging
+from lib.globalData.globalData import GlobalData
+from lib.globalData.sensorObjects import SensorDataType, SensorDataInt, SensorErrorState
+from lib.localObjects import AlertLevel
+from lib.registration import RegistrationTracker
+from lib.server import ClientCommunication
+from lib.storage.cache import CachedStorage
+from lib.storage.sqlite import Sqlite
+
+
+class MockUserBackend:
+
+    def checkNodeTypeAndInstance(self, username, nodeType, instance) -> bool:
+        return True
+
+
+class MockErrorStateExecuter:
+
+    def start_processing_round(self):
+        pass
+
+
+class TestRegistration(TestCase):
+
+    def setUp(self):
+        config_logging(logging.CRITICAL)
+
+        self._temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self._temp_dir)
+
+        self._global_data = GlobalData()
+        self._global_data.logger = logging.getLogger("Registration Test Case")
+        self._global_data.storageBackendSqliteFile = os.path.join(self._temp_dir, "database.db")
+        self._backend = Sqlite(self._global_data.storageBackendSqliteFile, self._global_data)
+        self.addCleanup(self._backend.close)
+        self._global_data.storage = CachedStorage(self._backend, self._global_data)
+        self._global_data.userBackend = MockUserBackend()
+        self._global_data.error_state_executer = MockErrorStateExecuter()
+        self._global_data.registration_tracker = RegistrationTracker()
+
+        for level in [1, 2]:
+            alert_level = AlertLevel()
+            alert_level.level = level
+            self._global_data.alertLevels.append(alert_level)
+
+        # Record the changes of the registrations.
+        self._calls = list()  # type: List[str]
+        storage = self._global_data.storage
+        for name in ["addNode", "upsert_sensors", "addAlerts", "addManager", "updateSensorStateAndData",
+                     "update_sensor_error_state"]:
+            setattr(storage, name, self._record(name, getattr(storage, name)))
+
+    def _record(self, name, func):
+        def _func(*args, **kwargs):
+            self._calls.append(name)
+            return func(*args, **kwargs)
+        return _func
+
+    @staticmethod
+    def _create_sensor_payload() -> Dict[str, Any]:
+        sensors = list()
+        for client_sensor_id in range(3):
+            sensors.append({"clientSensorId": client_sensor_id,
+                            "alertDelay": 0,
+                            "alertLevels": [1],
+                            "description": "sensor_%d" % client_sensor_id,
+                            "state": 0,
+                            "dataType": SensorDataType.INT,
+                            "data": SensorDataInt(0, "unit").copy_to_dict(),
+                            "error_state": SensorErrorState().copy_to_dict()})
+        return {"type": "request",
+                "hostname": "host",
+                "nodeType": "sensor",
+                "instance": "instance",
+                "persistent": 0,
+                "sensors": sensors}
+
+    def _register(self, payload: Dict[str, Any], username: str = "user") -> bool:
+        server_sock, client_sock = socket.socketpair()
+        self.addCleanup(server_sock.close)
+        self.addCleanup(client_sock.close)
+
+        client_comm = ClientCommunication(server_sock, "127.0.0.1", 1337, self._global_data)
+        client_comm.logger = self._global_data.logger
+        client_comm.username = username
+        client_comm.clientVersion = 1.0
+        client_comm.clientRev = 0
+
+        data = json.dumps({"message": "initialization", "payload": payload})
+        client_sock.sendall(data.encode("ascii"))
+        return client_comm._registerClient(len(data))
+
+    def test_unchanged_registration(self):
+        """
+        Tests that an unchanged registration does not write the registration again and only updates changed states.
+        """
+        payload = self._create_sensor_payload()
+        self.assertTrue(self._register(payload))
+        self.assertEqual(["addNode", "upsert_sensors"], self._calls)
+        self.assertEqual({"skipped": 0, "applied": 1}, self._global_data.registration_tracker.get_stats())
+
+        storage = self._global_data.storage
+        node_id = storage.getNodeId("user")
+        self.assertIsNotNone(self._backend.get_registration_hash(node_id))
+
+        # Identical registration.
+        self._calls.clear()
+        self.assertTrue(self._register(payload))
+        self.assertEqual([], self._calls)
+        self.assertEqual({"skipped": 1, "applied": 1}, self._global_data.registration_tracker.get_stats())
+
+        # Only the states of the sensors have changed.
+        payload["sensors"][1]["state"] = 1
+        payload["sensors"][2]["data"] = SensorDataInt(5, "unit").copy_to_dict()
+        payload["sensors"][2]["error_state"] = SensorErrorState(SensorErrorState.GenericError, "error").copy_to_dict()
+        self.assertTrue(self._register(payload))
+        self.assertEqual(["updateSensorStateAndData", "update_sensor_error_state"], self._calls)
+        self.assertEqual({"skipped": 2, "applied": 1}, self._global_data.registration_tracker.get_stats())
+
+        sensors = {x.clientSensorId: x for x in storage.get_sensors(node_id)}
+        self.assertEqual([0, 1, 0], [sensors[i].state for i in range(3)])
+        self.assertEqual(SensorDataInt(5, "unit"), sensors[2].data)
+        self.assertEqual(SensorErrorState.GenericError, sensors[2].error_state.state)
+
+    def test_changed_registration(self):
+        """
+        Tests that a changed registration is written to the database.
+        """
+        payload = self._create_sensor_payload()
+        self.assertTrue(self._register(payload))
+
+        storage = self._global_data.storage
+        node_id = storage.getNodeId("user")
+        registration_hash = self._backend.get_registration_hash(node_id)
+
+        changed_payload = copy.deepcopy(payload)
+        changed_payload["sensors"][0]["description"] = "changed"
+        del changed_payload["sensors"][2]
+        self._calls.clear()
+        self.assertTrue(self._register(changed_payload))
+        self.assertEqual(["addNode", "upsert_sensors"], self._calls)
+        self.assertEqual({"skipped": 0, "applied": 2}, self._global_data.registration_tracker.get_stats())
+
+        self.assertNotEqual(registration_hash, self._backend.get_registration_hash(node_id))
+        self.assertEqual(["changed", "sensor_1"], [x.description for x in storage.get_sensors(node_id)])
+
+    def test_changed_registration_reset_hash_failed(self):
+        """
+        Tests that a changed registration is rejected if the stored registration can not be marked as changed.
+        """
+        payload = self._create_sensor_payload()
+        self.assertTrue(self._register(payload))
+
+        storage = self._global_data.storage
+        node_id = storage.getNodeId("user")
+        registration_hash = self._backend.get_registration_hash(node_id)
+
+        storage.set_registration_hash = lambda node_id, registration_hash, logger=None: False
+
+        changed_payload = copy.deepcopy(payload)
+        changed_payload["sensors"][0]["description"] = "changed"
+        self._calls.clear()
+        self.assertFalse(self._register(changed_payload))
+        self.assertEqual([], self._calls)
+        self.assertEqual({"skipped": 0, "applied": 1}, self._global_data.registration_tracker.get_stats())
+
+        self.assertEqual(registration_hash, self._backend.get_registration_hash(node_id))
+        self.assertEqual(["sensor_0", "sensor_1", "sensor_2"], [x.description for x in storage.get_sensors(node_id)])
+
+    def test_registration_not_matching_database(self):
+        """
+        Tests that an unchanged registration is written again if the sensors in the database do not match it.
+        """
+        payload = self._create_sensor_payload()
+        self.assertTrue(self._register(payload))
+
+        storage = self._global_data.storage
+        node_id = storage.getNodeId("user")
+        self.assertTrue(storage.delete_sensor(storage.getSensorId(node_id, 2)))
+
+        self._calls.clear()
+        self.assertTrue(self._register(payload))
+        self.assertEqual(["upsert_sensors"], self._calls)
+        self.assertEqual(3, storage.getSensorCount(node_id))
+
+    def test_unchanged_alert_registration(self):
+        """
+        Tests that an unchanged registration of an alert node does not write the alerts again.
+        """
+        payload = {"type": "request",
+                   "hostname": "host",
+                   "nodeType": "alert",
+                   "instance": "instance",
+                   "persistent": 0,
+                   "alerts": [{"clientAlertId": 0, "description": "alert_0", "alertLevels": [1, 2]}]}
+        self.assertTrue(self._register(payload, "alert_user"))
+        self.assertEqual(["addNode", "addAlerts"], self._calls)
+
+        self._calls.clear()
+        self.assertTrue(self._register(payload, "alert_user"))
+        self.assertEqual([], self._calls)
+
+        # The registration hash is persisted with the node and used by a newly started server.
+        new_storage = CachedStorage(self._backend, self._global_data)
+        node_id = new_storage.getNodeId("alert_user")
+        self.assertIsNotNone(new_storage.get_registration_hash(node_id))
+        self.assertEqual(self._backend.get_registration_hash(node_id), new_storage.get_registration_hash(node_id))
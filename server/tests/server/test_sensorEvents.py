@@ -0,0 +1,189 @@
+import json
+import logging
+import socket
+from unittest import TestCase
+from typing import List, Tuple, Any, Optional
+from tests.util import config_logging
+from lib.globalData.globalData import GlobalData
+from lib.globalData.sensorObjects import SensorDataType, SensorDataNone, SensorDataInt, SensorErrorState
+from lib.localObjects import Sensor
+from lib.server import ClientCommunication
+# noinspection PyProtectedMember
+from lib.storage.core import _Storage
+
+
+# noinspection PyAbstractClass
+class MockStorage(_Storage):
+
+    def __init__(self):
+        self.updates = list()  # type: List[Tuple[int, List[Tuple[int, int]], List[Tuple[int, Any]]]]
+        self.history = list()  # type: List[List[Tuple[int, Optional[int], Any]]]
+
+    def updateSensorStateAndData(self,
+                                 nodeId: int,
+                                 stateList: List[Tuple[int, int]],
+                                 dataList: List[Tuple[int, Any]],
+                                 logger: logging.Logger = None,
+                                 historyList: List[Tuple[int, Optional[int], Any]] = None) -> bool:
+        self.updates.append((nodeId, stateList, dataList))
+        self.history.append(historyList)
+        return True
+
+
+class MockSensorAlertExecuter:
+
+    def __init__(self):
+        self.sensor_alerts = list()
+
+    def add_sensor_alert(self, nodeId, sensorId, state, optionalData, changeState, hasLatestData, dataType,
+                         sensorData, logger=None) -> bool:
+        self.sensor_alerts.append((sensorId, state, optionalData))
+        return True
+
+
+class MockManagerUpdateExecuter:
+
+    def __init__(self):
+        self.state_changes = list()
+
+    def queue_state_change(self, sensor_id, state, sensor_data):
+        self.state_changes.append((sensor_id, state, sensor_data.data))
+
+
+class MockErrorStateExecuter:
+
+    def __init__(self):
+        self.error_states = list()
+
+    def add_error_state(self, node_id, client_sensor_id, error_state):
+        self.error_states.append((client_sensor_id, error_state))
+
+
+class TestSensorEvents(TestCase):
+
+    def setUp(self):
+        config_logging(logging.CRITICAL)
+
+        self._global_data = GlobalData()
+        self._global_data.logger = logging.getLogger("Sensor Events Test Case")
+        self._global_data.storage = MockStorage()
+        self._global_data.sensorAlertExecuter = MockSensorAlertExecuter()
+        self._global_data.managerUpdateExecuter = MockManagerUpdateExecuter()
+        self._global_data.error_state_executer = MockErrorStateExecuter()
+
+        self._server_sock, self._client_sock = socket.socketpair()
+        self.addCleanup(self._server_sock.close)
+        self._client_sock.settimeout(5.0)
+        self.addCleanup(self._client_sock.close)
+
+        self._client_comm = ClientCommunication(self._server_sock, "127.0.0.1", 1337, self._global_data)
+        self._client_comm.logger = self._global_data.logger
+        self._client_comm.nodeId = 1
+        self._client_comm.nodeType = "sensor"
+
+        self._client_comm.sensors = list()
+        for client_sensor_id, data_type, data in [(1, SensorDataType.NONE, SensorDataNone()),
+                                                  (2, SensorDataType.INT, SensorDataInt(0, "unit"))]:
+            sensor = Sensor()
+            sensor.sensorId = client_sensor_id + 10
+            sensor.nodeId = 1
+            sensor.clientSensorId = client_sensor_id
+            sensor.state = 0
+            sensor.dataType = data_type
+            sensor.data = data
+            sensor.error_state = SensorErrorState()
+            self._client_comm.sensors.append(sensor)
+
+    @staticmethod
+    def _create_message(events: List[Tuple[str, dict]]) -> dict:
+        return {"msgTime": 0,
+                "message": "sensorevents",
+                "payload": {"type": "request",
+                            "events": [{"message": event_type, "payload": payload}
+                                       for event_type, payload in events]}}
+
+    @staticmethod
+    def _state_change(client_sensor_id: int, state: int, data: dict, data_type: int) -> Tuple[str, dict]:
+        return "statechange", {"clientSensorId": client_sensor_id,
+                               "state": state,
+                               "dataType": data_type,
+                               "data": data}
+
+    @staticmethod
+    def _sensor_alert(client_sensor_id: int, state: int, change_state: bool) -> Tuple[str, dict]:
+        return "sensoralert", {"clientSensorId": client_sensor_id,
+                               "state": state,
+                               "hasOptionalData": True,
+                               "optionalData": {"message": "alert %d" % state},
+                               "changeState": change_state,
+                               "hasLatestData": False,
+                               "dataType": SensorDataType.NONE,
+                               "data": {}}
+
+    def _recv_response(self) -> dict:
+        return json.loads(self._client_sock.recv(4096).decode("ascii"))
+
+    def test_events_processed_in_order(self):
+        """
+        Tests that all events are stored in one transaction and handed to the executers in the order they were sent.
+        """
+        int_data = [SensorDataInt(i, "unit").copy_to_dict() for i in range(3)]
+        events = [self._sensor_alert(1, 1, True),
+                  self._state_change(2, 1, int_data[0], SensorDataType.INT),
+                  self._state_change(2, 0, int_data[1], SensorDataType.INT),
+                  ("sensorerrorstatechange", {"clientSensorId": 2,
+                                              "error_state": SensorErrorState(SensorErrorState.GenericError,
+                                                                              "error").copy_to_dict()}),
+                  self._sensor_alert(1, 0, False),
+                  self._state_change(2, 1, int_data[2], SensorDataType.INT)]
+
+        self.assertTrue(self._client_comm._sensorEventsHandler(self._create_message(events)))
+
+        response = self._recv_response()
+        self.assertEqual("sensorevents", response["message"])
+        self.assertEqual("ok", response["payload"]["result"])
+
+        # Only the latest state and data of each sensor is stored.
+        storage = self._global_data.storage
+        self.assertEqual(1, len(storage.updates))
+        node_id, state_list, data_list = storage.updates[0]
+        self.assertEqual(1, node_id)
+        self.assertEqual([(1, 1), (2, 1)], state_list)
+        self.assertEqual([(2, SensorDataInt(2, "unit"))], data_list)
+
+        # The history nevertheless gets an entry for each event that changes the state or data of a sensor.
+        self.assertEqual([[(1, 1, None),
+                           (2, 1, SensorDataInt(0, "unit")),
+                           (2, 0, SensorDataInt(1, "unit")),
+                           (2, 1, SensorDataInt(2, "unit"))]],
+                         storage.history)
+
+        self.assertEqual([(11, 1, {"message": "alert 1"}), (11, 0, {"message": "alert 0"})],
+                         self._global_data.sensorAlertExecuter.sensor_alerts)
+        self.assertEqual([(12, 1, SensorDataInt(0, "unit")),
+                          (12, 0, SensorDataInt(1, "unit")),
+                          (12, 1, SensorDataInt(2, "unit"))],
+                         self._global_data.managerUpdateExecuter.state_changes)
+        self.assertEqual([(2, SensorErrorState(SensorErrorState.GenericError, "error"))],
+                         self._global_data.error_state_executer.error_states)
+
+        self.assertEqual(1, self._client_comm.sensors[0].state)
+        self.assertEqual(1, self._client_comm.sensors[1].state)
+        self.assertEqual(SensorDataInt(2, "unit"), self._client_comm.sensors[1].data)
+
+    def test_invalid_event(self):
+        """
+        Tests that the whole batch is discarded if one event is invalid.
+        """
+        events = [self._sensor_alert(1, 1, True),
+                  self._state_change(3, 1, {}, SensorDataType.NONE)]
+
+        self.assertFalse(self._client_comm._sensorEventsHandler(self._create_message(events)))
+
+        response = self._recv_response()
+        self.assertEqual("unknown client sensor id", response["error"])
+
+        self.assertEqual([], self._global_data.storage.updates)
+        self.assertEqual([], self._global_data.sensorAlertExecuter.sensor_alerts)
+        self.assertEqual([], self._global_data.managerUpdateExecuter.state_changes)
+        self.assertEqual(0, self._client_comm.sensors[0].state)
@@ -0,0 +1,291 @@
+import json
+import logging
+import socket
+import ssl
+import threading
+import time
+from typing import Dict, List, Any, Optional, Tuple
+from lib.globalData.globalData import GlobalData
+from lib.localObjects import AlertLevel
+from lib.server import ReceiveBuffer, FrameType, build_frame
+from lib.status import StatusTracker
+# noinspection PyProtectedMember
+from lib.storage.core import _Storage
+
+
+class MockUserBackend:
+
+    def areUserCredentialsValid(self, username: str, password: str) -> bool:
+        return True
+
+    def checkNodeTypeAndInstance(self, username: str, nodeType: str, instance: str) -> bool:
+        return True
+
+
+class MockManagerUpdateExecuter:
+
+    def __init__(self):
+        self.force_status_update_calls = 0
+
+    def force_status_update(self):
+        self.force_status_update_calls += 1
+
+
+class MockConnectionWatchdog:
+
+    def __init__(self):
+        self.removed_node_timeouts = list()
+        self.added_node_pre_timeouts = list()
+
+    def removeNodeTimeout(self, nodeId: int):
+        self.removed_node_timeouts.append(nodeId)
+
+    def addNodePreTimeout(self, nodeId: int):
+        self.added_node_pre_timeouts.append(nodeId)
+
+
+# noinspection PyAbstractClass
+class MockStorage(_Storage):
+    """
+    Storage that only holds the node information needed to register alert nodes.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._node_ids = dict()  # type: Dict[str, int]
+        self._registration_hashes = dict()  # type: Dict[int, str]
+        self.connected_nodes = set()
+
+    def addNode(self,
+                username: str,
+                hostname: str,
+                nodeType: str,
+                instance: str,
+                version: float,
+                rev: int,
+                persistent: int,
+                logger: logging.Logger = None) -> bool:
+        with self._lock:
+            if username not in self._node_ids.keys():
+                self._node_ids[username] = len(self._node_ids) + 1
+        return True
+
+    def addAlerts(self,
+                  username: str,
+                  alerts: List[Dict[str, Any]],
+                  logger: logging.Logger = None) -> bool:
+        return True
+
+    def getNodeId(self,
+                  username: str,
+                  logger: logging.Logger = None) -> Optional[int]:
+        with self._lock:
+            return self._node_ids.get(username)
+
+    def get_registration_hash(self,
+                              node_id: int,
+                              logger: logging.Logger = None) -> Optional[str]:
+        with self._lock:
+            return self._registration_hashes.get(node_id)
+
+    def set_registration_hash(self,
+                              node_id: int,
+                              registration_hash: Optional[str],
+                              logger: logging.Logger = None) -> bool:
+        with self._lock:
+            self._registration_hashes[node_id] = registration_hash
+        return True
+
+    def markNodeAsConnected(self,
+                            nodeId: int,
+                            logger: logging.Logger = None) -> bool:
+        with self._lock:
+            self.connected_nodes.add(nodeId)
+        return True
+
+    def markNodeAsNotConnected(self,
+                               nodeId: int,
+                               logger: logging.Logger = None) -> bool:
+        with self._lock:
+            self.connected_nodes.discard(nodeId)
+        return True
+
+
+class SimulatedNode:
+    """
+    Minimal alert node that speaks the server protocol over a plain TCP connection.
+    """
+
+    def __init__(self,
+                 username: str,
+                 host: str,
+                 port: int,
+                 version: float = 1.0,
+                 persistent: int = 0,
+                 pipelining: bool = False,
+                 ssl_context: Optional[ssl.SSLContext] = None):
+        self._username = username
+        self._host = host
+        self._port = port
+        self._version = version
+        self._persistent = persistent
+        self._socket = None  # type: Optional[socket.socket]
+        self._transaction_id = 0
+        self._request_pipelining = pipelining
+        self._recv_buffer = ReceiveBuffer()
+        self._ssl_context = ssl_context
+
+        # Flag that states if the server accepted the pipelining mode.
+        self.pipelining = False
+
+    def _recv_chunk(self):
+        chunk = self._socket.recv(4096)
+        if not chunk:
+            raise ConnectionError("Connection closed by server.")
+        self._recv_buffer.feed(chunk)
+
+    def _recv_msg(self) -> Dict[str, Any]:
+        while True:
+            data = self._recv_buffer.pop_message()
+            if data is not None:
+                return json.loads(data)
+            self._recv_chunk()
+
+    def connect(self, timeout: float = 20.0):
+        self._socket = socket.create_connection((self._host, self._port), timeout=timeout)
+        if self._ssl_context is not None:
+            self._socket = self._ssl_context.wrap_socket(self._socket)
+
+    def register(self) -> bool:
+        payload = {"type": "request",
+                   "hostname": "simulated",
+                   "nodeType": "alert",
+                   "instance": "simulatedAlert",
+                   "persistent": self._persistent,
+                   "alerts": [{"clientAlertId": 0,
+                               "description": "simulated alert",
+                               "alertLevels": [1]}]}
+        if self._request_pipelining:
+            payload["pipelining"] = True
+        reg_message = json.dumps({"msgTime": int(time.time()),
+                                  "message": "initialization",
+                                  "payload": payload})
+
+        auth_payload = {"type": "request",
+                        "version": self._version,
+                        "rev": 0,
+                        "username": self._username,
+                        "password": "password"}
+        auth_message = {"msgTime": int(time.time()),
+                        "size": len(reg_message),
+                        "message": "initialization",
+                        "payload": auth_payload}
+        self._socket.send(json.dumps(auth_message).encode("ascii"))
+        message = self._recv_msg()
+        if "error" in message.keys():
+            return False
+
+        self._socket.send(reg_message.encode("ascii"))
+        message = self._recv_msg()
+        if "error" in message.keys():
+            return False
+
+        self.pipelining = message["payload"].get("pipelining", False) is True
+        return True
+
+    def send_frames(self, frames: List[Tuple[int, int, str]]):
+        """
+        Sends all given frames (frame type, transaction id, payload) at once.
+        """
+        data = "".join(build_frame(frame_type, transaction_id, msg) for frame_type, transaction_id, msg in frames)
+        self._socket.send(data.encode("ascii"))
+
+    def recv_frame(self) -> Tuple[int, int, Dict[str, Any]]:
+        while True:
+            frame = self._recv_buffer.pop_frame()
+            if frame is not None:
+                return frame[0], frame[1], json.loads(frame[2])
+            self._recv_chunk()
+
+    def ping_pipelined(self, count: int) -> bool:
+        """
+        Sends the given number of ping requests without waiting for the responses in between.
+        """
+        frames = list()
+        for _ in range(count):
+            self._transaction_id += 1
+            ping_message = json.dumps({"msgTime": int(time.time()),
+                                       "message": "ping",
+                                       "payload": {"type": "request"}})
+            frames.append((FrameType.REQUEST, self._transaction_id, ping_message))
+        self.send_frames(frames)
+
+        transaction_ids = set(frame[1] for frame in frames)
+        while transaction_ids:
+            frame_type, transaction_id, message = self.recv_frame()
+            if frame_type != FrameType.RESPONSE or transaction_id not in transaction_ids:
+                return False
+            if message["payload"]["result"] != "ok":
+                return False
+            transaction_ids.remove(transaction_id)
+        return True
+
+    def _send(self, data: str, chunk_size: Optional[int]):
+        data = data.encode("ascii")
+        if chunk_size is None:
+            self._socket.send(data)
+            return
+
+        # Send the data in pieces to simulate a fragmented transmission.
+        for i in range(0, len(data), chunk_size):
+            self._socket.send(data[i:i + chunk_size])
+            time.sleep(0.01)
+
+    def ping(self, chunk_size: Optional[int] = None) -> bool:
+        ping_message = json.dumps({"msgTime": int(time.time()),
+                                   "message": "ping",
+                                   "payload": {"type": "request"}})
+
+        self._transaction_id += 1
+        rts_message = {"size": len(ping_message),
+                       "message": "ping",
+                       "payload": {"type": "rts",
+                                   "id": self._transaction_id}}
+        self._send(json.dumps(rts_message), chunk_size)
+        message = self._recv_msg()
+        if message["payload"]["type"] != "cts" or message["payload"]["id"] != self._transaction_id:
+            return False
+
+        self._send(ping_message, chunk_size)
+        message = self._recv_msg()
+        return message["payload"]["result"] == "ok"
+
+    def close(self):
+        try:
+            self._socket.close()
+        except Exception:
+            pass
+
+
+def create_server_global_data(logdir: str) -> GlobalData:
+    """
+    Creates a global data object that is able to run the server with simulated alert nodes.
+    :param logdir: directory the server writes the client log files to
+    """
+    global_data = GlobalData()
+    global_data.logger = logging.getLogger("Server Test Case")
+    global_data.logdir = logdir
+    global_data.loglevel = logging.ERROR
+    global_data.sslEnabled = False
+    global_data.storage = MockStorage()
+    global_data.userBackend = MockUserBackend()
+    global_data.managerUpdateExecuter = MockManagerUpdateExecuter()
+    global_data.connectionWatchdog = MockConnectionWatchdog()
+    global_data.status_tracker = StatusTracker(global_data.statusDeltaMaxLag)
+
+    alert_level = AlertLevel()
+    alert_level.level = 1
+    alert_level.name = "simulated alert level"
+    global_data.alertLevels.append(alert_level)
+
+    return global_data
@@ -0,0 +1,317 @@
+import json
+import logging
+from unittest import TestCase
+from typing import Dict, List, Any, Optional
+from tests.util import config_logging
+from lib.globalData.globalData import GlobalData
+from lib.localObjects import Node, Option
+from lib.server import ClientCommunication
+from lib.status import StatusTracker
+from tests.storage.sqlite_core import TestStorageCore
+
+
+class MockStorage:
+
+    def __init__(self):
+        self.options = list()  # type: List[Option]
+        self.nodes = list()  # type: List[Node]
+
+    def getAlertSystemInformation(self, logger: logging.Logger = None) -> Optional[List[List[Any]]]:
+        return [list(self.options), list(self.nodes), [], [], []]
+
+
+class TestStatusTracker(TestCase):
+
+    @staticmethod
+    def _create_status(node_count: int) -> Dict[str, List[Dict[str, Any]]]:
+        status = dict()
+        for category in StatusTracker.id_keys.keys():
+            status[category] = list()
+
+        status["options"].append({"type": "alertSystemActive", "value": 1})
+        for i in range(node_count):
+            status["nodes"].append({"nodeId": i, "hostname": "host_%d" % i, "connected": 1})
+        return status
+
+    def test_first_update_is_full(self):
+        """
+        Tests that a full snapshot is returned if no base version is given.
+        """
+        tracker = StatusTracker(10)
+        status = self._create_status(5)
+
+        status_update = tracker.get_status_update(lambda: status, None)
+        self.assertFalse(status_update.is_delta)
+        self.assertEqual(1, status_update.version)
+        self.assertEqual(status, status_update.objects)
+
+        # Version does not change if the status does not change.
+        tracker.invalidate()
+        status_update = tracker.get_status_update(lambda: self._create_status(5), None)
+        self.assertEqual(1, status_update.version)
+
+    def test_delta(self):
+        """
+        Tests that a delta only contains the changed and deleted objects.
+        """
+        tracker = StatusTracker(10)
+        base_version = tracker.get_status_update(lambda: self._create_status(10), None).version
+
+        status = self._create_status(10)
+        status["nodes"][3]["connected"] = 0
+        del status["nodes"][7]
+        tracker.invalidate()
+        status_update = tracker.get_status_update(lambda: status, base_version)
+
+        self.assertTrue(status_update.is_delta)
+        self.assertEqual(base_version, status_update.base_version)
+        self.assertEqual(base_version + 1, status_update.version)
+        self.assertEqual([status["nodes"][3]], status_update.objects["nodes"])
+        self.assertEqual([], status_update.objects["options"])
+        self.assertEqual([7], status_update.deleted["nodes"])
+        self.assertEqual([], status_update.deleted["options"])
+
+        # Delta from the newest version is empty.
+        status_update = tracker.get_status_update(lambda: status, status_update.version)
+        self.assertTrue(status_update.is_delta)
+        self.assertEqual(0, sum(len(objects) for objects in status_update.objects.values()))
+        self.assertEqual(0, sum(len(ids) for ids in status_update.deleted.values()))
+
+    def test_delta_over_multiple_versions(self):
+        """
+        Tests that a delta contains all changes since the base version and objects that were deleted and
+        added again are not reported as deleted.
+        """
+        tracker = StatusTracker(10)
+        base_version = tracker.get_status_update(lambda: self._create_status(10), None).version
+
+        status = self._create_status(10)
+        status["nodes"][1]["hostname"] = "changed"
+        del status["nodes"][2]
+        tracker.invalidate()
+        tracker.get_status_update(lambda: status, None)
+
+        status = self._create_status(10)
+        status["nodes"][1]["hostname"] = "changed"
+        status["nodes"][5]["hostname"] = "changed"
+        tracker.invalidate()
+        status_update = tracker.get_status_update(lambda: status, base_version)
+
+        self.assertEqual(base_version + 2, status_update.version)
+        self.assertEqual([1, 2, 5], [obj["nodeId"] for obj in status_update.objects["nodes"]])
+        self.assertEqual([], status_update.deleted["nodes"])
+
+    def test_full_if_too_far_behind(self):
+        """
+        Tests that a full snapshot is returned if the base version is too old.
+        """
+        tracker = StatusTracker(3)
+        base_version = tracker.get_status_update(lambda: self._create_status(10), None).version
+
+        for i in range(5):
+            status = self._create_status(10)
+            status["nodes"][0]["hostname"] = "changed_%d" % i
+            tracker.invalidate()
+            tracker.get_status_update(lambda: status, None)
+
+        status_update = tracker.get_status_update(lambda: status, base_version)
+        self.assertFalse(status_update.is_delta)
+        self.assertEqual(status, status_update.objects)
+
+        # Unknown versions also result in a full snapshot.
+        status_update = tracker.get_status_update(lambda: status, status_update.version + 1)
+        self.assertFalse(status_update.is_delta)
+
+    def test_full_if_delta_too_large(self):
+        """
+        Tests that a full snapshot is returned if most of the objects changed.
+        """
+        tracker = StatusTracker(10)
+        base_version = tracker.get_status_update(lambda: self._create_status(10), None).version
+
+        status = self._create_status(10)
+        for obj in status["nodes"]:
+            obj["connected"] = 0
+        tracker.invalidate()
+        status_update = tracker.get_status_update(lambda: status, base_version)
+        self.assertFalse(status_update.is_delta)
+
+    def test_failing_builder(self):
+        """
+        Tests that no status update is returned if the status could not be built.
+        """
+        tracker = StatusTracker(10)
+        self.assertIsNone(tracker.get_status_update(lambda: None, None))
+        self.assertEqual(0, tracker.version)
+
+    def test_cached_status(self):
+        """
+        Tests that the status is only read again after it was invalidated and each payload is only encoded once.
+        """
+        tracker = StatusTracker(10)
+        builds = list()
+
+        def _builder():
+            builds.append(1)
+            return self._create_status(10)
+
+        version, full_payload = tracker.get_encoded_payload(_builder, True, None)
+        for _ in range(5):
+            self.assertIs(full_payload, tracker.get_encoded_payload(_builder, True, None)[1])
+        legacy_payload = tracker.get_encoded_payload(_builder, False, None)[1]
+        self.assertIs(legacy_payload, tracker.get_encoded_payload(_builder, False, 1)[1])
+
+        self.assertEqual(1, len(builds))
+        self.assertEqual(1, tracker.build_count)
+        self.assertEqual(2, tracker.miss_count)
+        self.assertEqual(6, tracker.hit_count)
+        self.assertEqual(version, json.loads(full_payload)["statusVersion"])
+        self.assertNotIn("statusVersion", json.loads(legacy_payload).keys())
+
+        # Reading the unchanged status again keeps the encoded payloads.
+        tracker.invalidate()
+        self.assertIs(full_payload, tracker.get_encoded_payload(_builder, True, None)[1])
+        self.assertEqual(2, tracker.build_count)
+
+        # Each manager that is behind gets the shared delta for its base version.
+        tracker.invalidate()
+        new_version, delta_payload = tracker.get_encoded_payload(lambda: self._create_status(11), True, version)
+        self.assertEqual(version + 1, new_version)
+        self.assertIs(delta_payload, tracker.get_encoded_payload(_builder, True, version)[1])
+        self.assertEqual([10], [node["nodeId"] for node in json.loads(delta_payload)["nodes"]])
+        self.assertEqual(3, tracker.build_count)
+
+        # Unknown base versions share the full snapshot.
+        full_payload = tracker.get_encoded_payload(_builder, True, None)[1]
+        self.assertIs(full_payload, tracker.get_encoded_payload(_builder, True, 1337)[1])
+
+
+class TestStatusMessage(TestCase):
+
+    def _create_client_communication(self, status_delta: bool) -> ClientCommunication:
+        config_logging(logging.ERROR)
+
+        global_data = GlobalData()
+        global_data.logger = logging.getLogger("Status Test Case")
+        global_data.storage = MockStorage()
+        global_data.status_tracker = StatusTracker(global_data.statusDeltaMaxLag)
+
+        option = Option()
+        option.type = "alertSystemActive"
+        option.value = 1
+        global_data.storage.options.append(option)
+
+        for i in range(10):
+            node = Node()
+            node.id = i
+            node.hostname = "host_%d" % i
+            node.username = "user_%d" % i
+            node.nodeType = "alert"
+            node.instance = "instance"
+            node.connected = 1
+            node.version = 1.0
+            node.rev = 0
+            node.persistent = 0
+            global_data.storage.nodes.append(node)
+
+        client_comm = ClientCommunication(None, "127.0.0.1", 1337, global_data)
+        client_comm.nodeType = "manager"
+        client_comm.statusDeltaSupported = status_delta
+        return client_comm
+
+    @staticmethod
+    def _acknowledge(client_comm: ClientCommunication):
+        # Same as a received "ok" response in _sendManagerAllInformation().
+        client_comm.statusVersion = client_comm._sent_status_version
+
+    def test_legacy_manager(self):
+        """
+        Tests that managers without delta support get full status messages without version information.
+        """
+        client_comm = self._create_client_communication(False)
+
+        payload = json.loads(client_comm._buildAlertSystemStateMessage())["payload"]
+        self.assertNotIn("statusVersion", payload.keys())
+        self.assertNotIn("baseVersion", payload.keys())
+        self.assertEqual(10, len(payload["nodes"]))
+
+    def test_without_status_tracker(self):
+        """
+        Tests that a full status message is built if no status tracker is set up.
+        """
+        client_comm = self._create_client_communication(True)
+        client_comm._status_tracker = None
+
+        payload = json.loads(client_comm._buildAlertSystemStateMessage())["payload"]
+        self.assertNotIn("statusVersion", payload.keys())
+        self.assertNotIn("baseVersion", payload.keys())
+        self.assertEqual(10, len(payload["nodes"]))
+        self.assertIsNone(client_comm._sent_status_version)
+
+    def test_delta_message(self):
+        """
+        Tests that a manager gets a full status message first and only the changes after acknowledging it.
+        """
+        client_comm = self._create_client_communication(True)
+        storage = client_comm.storage
+
+        payload = json.loads(client_comm._buildAlertSystemStateMessage())["payload"]
+        self.assertNotIn("baseVersion", payload.keys())
+        self.assertEqual(10, len(payload["nodes"]))
+        self._acknowledge(client_comm)
+        base_version = payload["statusVersion"]
+
+        storage.nodes[4].connected = 0
+        del storage.nodes[8]
+        client_comm._status_tracker.invalidate()
+
+        payload = json.loads(client_comm._buildAlertSystemStateMessage())["payload"]
+        self.assertEqual(base_version, payload["baseVersion"])
+        self.assertEqual(base_version + 1, payload["statusVersion"])
+        self.assertEqual([4], [node["nodeId"] for node in payload["nodes"]])
+        self.assertEqual([], payload["options"])
+        self.assertEqual([8], payload["deleted"]["nodes"])
+
+        # Without acknowledgement the next status message has to be based on the same version.
+        payload = json.loads(client_comm._buildAlertSystemStateMessage())["payload"]
+        self.assertEqual(base_version, payload["baseVersion"])
+
+        # An expired status message is answered with a full one.
+        client_comm.statusVersion = None
+        payload = json.loads(client_comm._buildAlertSystemStateMessage())["payload"]
+        self.assertNotIn("baseVersion", payload.keys())
+        self.assertEqual(9, len(payload["nodes"]))
+
+
+class TestStatusInvalidation(TestStorageCore):
+
+    def test_storage_write_invalidates(self):
+        """
+        Tests that writes to the storage invalidate the cached status.
+        """
+        config_logging(logging.ERROR)
+        storage = self._create_options()
+        tracker = StatusTracker(10)
+        self.global_data.status_tracker = tracker
+
+        builds = list()
+
+        def _builder():
+            builds.append(1)
+            status = dict()
+            for category in StatusTracker.id_keys.keys():
+                status[category] = list()
+            for option in storage.get_options_list():
+                status["options"].append({"type": option.type, "value": option.value})
+            return status
+
+        version, _ = tracker.get_encoded_payload(_builder, True, None)
+        tracker.get_encoded_payload(_builder, True, None)
+        self.assertEqual(1, len(builds))
+
+        storage.update_option(self.options[0].type, self.options[0].value + 1)
+
+        new_version, payload = tracker.get_encoded_payload(_builder, True, version)
+        self.assertEqual(2, len(builds))
+        self.assertEqual(version + 1, new_version)
+        self.assertEqual([self.options[0].type], [option["type"] for option in json.loads(payload)["options"]])
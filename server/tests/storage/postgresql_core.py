@@ -0,0 +1,177 @@
+import atexit
+import glob
+import logging
+import os
+import pwd
+import shutil
+import socket
+import subprocess
+import tempfile
+from typing import Optional
+from tests.storage.sqlite_core import TestStorageCore
+from lib.globalData.globalData import GlobalData
+
+try:
+    import psycopg2
+    import psycopg2.extensions
+except ImportError:
+    psycopg2 = None
+
+# Connection string of the PostgreSQL database used by the tests, for example
+# "host=127.0.0.1 port=5432 dbname=alertr_test user=alertr password=secret"
+# (all tables of the database are deleted by the tests). If it is not set, the tests start a temporary
+# PostgreSQL server with the binaries found in the PATH (or of the installed PostgreSQL version).
+POSTGRESQL_DSN_ENV = "ALERTR_TEST_POSTGRESQL"
+
+
+class _TemporaryPostgresql:
+    """
+    Throwaway PostgreSQL server in a temporary directory that is started once for all tests.
+    """
+
+    def __init__(self, bin_dir: str):
+        self._bin_dir = bin_dir
+        self._temp_dir = None  # type: Optional[str]
+        self._data_dir = None  # type: Optional[str]
+        self._user = None  # type: Optional[pwd.struct_passwd]
+        self.dsn = None  # type: Optional[str]
+
+    @staticmethod
+    def find_bin_dir() -> Optional[str]:
+        """
+        Returns the directory of the PostgreSQL server binaries or None if PostgreSQL is not installed.
+        """
+        pg_ctl = shutil.which("pg_ctl")
+        if pg_ctl is not None:
+            return os.path.dirname(pg_ctl)
+
+        # Debian based distributions do not add the server binaries to the PATH.
+        for bin_dir in sorted(glob.glob("/usr/lib/postgresql/*/bin"), reverse=True):
+            if os.path.isfile(os.path.join(bin_dir, "pg_ctl")):
+                return bin_dir
+
+        return None
+
+    @staticmethod
+    def _get_free_port() -> int:
+        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+            sock.bind(("127.0.0.1", 0))
+            return sock.getsockname()[1]
+
+    def _demote(self):
+        os.setgid(self._user.pw_gid)
+        os.setuid(self._user.pw_uid)
+
+    def _run(self, *args: str):
+        subprocess.run([os.path.join(self._bin_dir, args[0])] + list(args[1:]),
+                       stdout=subprocess.DEVNULL,
+                       stderr=subprocess.PIPE,
+                       preexec_fn=self._demote if self._user is not None else None,
+                       check=True)
+
+    def start(self):
+        self._temp_dir = tempfile.mkdtemp(prefix="alertr_postgresql_")
+        self._data_dir = os.path.join(self._temp_dir, "data")
+
+        # PostgreSQL refuses to run as root.
+        if os.geteuid() == 0:
+            self._user = pwd.getpwnam("nobody")
+            os.chown(self._temp_dir, self._user.pw_uid, self._user.pw_gid)
+
+        port = self._get_free_port()
+        self._run("initdb", "-D", self._data_dir, "-U", "alertr", "-A", "trust", "-E", "UTF8", "--no-sync")
+        self._run("pg_ctl", "-D", self._data_dir, "-w", "-l", os.path.join(self._temp_dir, "postgresql.log"),
+                  "-o", "-F -h 127.0.0.1 -p %d -k %s" % (port, self._temp_dir), "start")
+
+        conn = psycopg2.connect(host="127.0.0.1", port=port, dbname="postgres", user="alertr")
+        conn.autocommit = True
+        with conn.cursor() as cursor:
+            cursor.execute("CREATE DATABASE alertr")
+        conn.close()
+
+        self.dsn = "host=127.0.0.1 port=%d dbname=alertr user=alertr" % port
+
+    def stop(self):
+        try:
+            self._run("pg_ctl", "-D", self._data_dir, "-m", "immediate", "stop")
+
+        except Exception as e:
+            pass
+
+        shutil.rmtree(self._temp_dir, ignore_errors=True)
+
+
+# Temporary PostgreSQL server shared by all tests (None if it was not started yet).
+_temporary_postgresql = None  # type: Optional[_TemporaryPostgresql]
+
+
+def _get_test_dsn() -> Optional[str]:
+    """
+    Returns the connection string of the test database or None if no PostgreSQL database is available.
+    """
+    global _temporary_postgresql
+
+    dsn = os.environ.get(POSTGRESQL_DSN_ENV)
+    if dsn:
+        return dsn
+
+    if _temporary_postgresql is None:
+        bin_dir = _TemporaryPostgresql.find_bin_dir()
+        if bin_dir is None:
+            return None
+
+        _temporary_postgresql = _TemporaryPostgresql(bin_dir)
+        atexit.register(_temporary_postgresql.stop)
+        _temporary_postgresql.start()
+
+    if _temporary_postgresql.dsn is None:
+        raise RuntimeError("Starting temporary PostgreSQL server failed.")
+
+    return _temporary_postgresql.dsn
+
+
+class TestPostgresqlCore(TestStorageCore):
+    """
+    Runs the storage tests against the PostgreSQL storage backend (skipped if PostgreSQL is not available).
+    """
+
+    def _init_storage(self, reader_count: Optional[int] = None, pool_size: Optional[int] = None):
+        # Import here to be able to collect the tests without psycopg2.
+        from lib.storage.postgresql import Postgresql
+
+        if psycopg2 is None:
+            self.skipTest("psycopg2 is not installed.")
+
+        dsn = _get_test_dsn()
+        if dsn is None:
+            self.skipTest("PostgreSQL is not installed and no test database is configured (set %s)."
+                          % POSTGRESQL_DSN_ENV)
+
+        params = psycopg2.extensions.parse_dsn(dsn)
+
+        # Start each test with an empty database.
+        conn = psycopg2.connect(dsn)
+        with conn:
+            with conn.cursor() as cursor:
+                cursor.execute("DROP TABLE IF EXISTS internals, options, sensorsAlertLevels, sensorsDataInt, "
+                               + "sensorsDataFloat, sensorsDataGPS, sensors, alertsAlertLevels, alerts, managers, "
+                               + "nodes CASCADE")
+        conn.close()
+
+        self.temp_dir = None
+        self.global_data = GlobalData()
+        self.global_data.logger = logging.getLogger("server")
+
+        self.connection_args = {"host": params.get("host", "localhost"),
+                                "port": int(params.get("port", 5432)),
+                                "database": params.get("dbname", "alertr"),
+                                "user": params.get("user", "alertr"),
+                                "password": params.get("password", "")}
+
+        storage = Postgresql(self.global_data, pool_size=pool_size, **self.connection_args)
+        self.addCleanup(storage.close)
+        self.nodes = []
+        self.options = []
+        self.sensors = []
+
+        return storage
@@ -20,7 +20,10 @@ class TestStorageCore(TestCase):
             except:
                 pass
 
-    def _init_storage(self) -> Sqlite:
+    def _init_storage(self,
+                      reader_count: Optional[int] = None,
+                      group_commit_interval: Optional[float] = None,
+                      group_commit_size: Optional[int] = None) -> Sqlite:
         self.addCleanup(self._clean_up_storage)
 
         self.temp_dir = tempfile.mkdtemp()
@@ -29,7 +32,11 @@ class TestStorageCore(TestCase):
         self.global_data.logger = logging.getLogger("server")
 
         storage = Sqlite(self.global_data.storageBackendSqliteFile,
-                         self.global_data)
+                         self.global_data,
+                         reader_count=reader_count,
+                         group_commit_interval=group_commit_interval,
+                         group_commit_size=group_commit_size)
+        self.addCleanup(storage.close)
         self.nodes = []  # type: List[Node]
         self.options = []  # type: List[Option]
         self.sensors = []  # type: List[Sensor]
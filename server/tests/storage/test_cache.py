@@ -0,0 +1,230 @@
+import logging
+import threading
+from typing import Optional
+from tests.util import config_logging
+from tests.storage import test_sqlite_option, test_sqlite_sensor
+from tests.storage.sqlite_core import TestStorageCore
+from tests.storage.util import compare_sensors_content
+from lib.storage.cache import CachedStorage
+from lib.storage.core import _Storage
+from lib.globalData.sensorObjects import SensorDataInt, SensorDataType
+
+
+class _CachedStorageMixin:
+    """
+    Runs the storage tests against the cached storage in front of the Sqlite storage.
+    """
+
+    def _init_storage(self, reader_count: Optional[int] = None) -> CachedStorage:
+        # noinspection PyUnresolvedReferences
+        backend = super()._init_storage(reader_count)
+        return CachedStorage(backend, self.global_data)
+
+
+class TestCachedStorageOption(_CachedStorageMixin, test_sqlite_option.TestStorageOption):
+    pass
+
+
+class TestCachedStorageSensor(_CachedStorageMixin, test_sqlite_sensor.TestStorageSensor):
+    pass
+
+
+class TestCachedStorage(_CachedStorageMixin, TestStorageCore):
+
+    def _check_backend_consistency(self, storage: CachedStorage):
+        """
+        Checks that the objects in memory are the same as the objects in the backend.
+        """
+        cached_information = storage.getAlertSystemInformation()
+        backend_information = storage.backend.getAlertSystemInformation()
+
+        self.assertEqual([(x.type, x.value) for x in backend_information[0]],
+                         [(x.type, x.value) for x in cached_information[0]])
+        self.assertEqual([vars(x) for x in backend_information[1]],
+                         [vars(x) for x in cached_information[1]])
+        compare_sensors_content(self, backend_information[2], cached_information[2])
+        self.assertEqual([vars(x) for x in backend_information[3]],
+                         [vars(x) for x in cached_information[3]])
+        self.assertEqual([vars(x) for x in backend_information[4]],
+                         [vars(x) for x in cached_information[4]])
+
+    def test_read_without_backend(self):
+        """
+        Tests that all objects are read from memory without accessing the backend.
+        """
+        config_logging(logging.ERROR)
+        storage = self._create_sensors()
+        self._create_options(storage)
+
+        # Every access of the abstract storage raises an exception.
+        backend = storage.backend
+        storage._backend = _Storage()
+
+        node_id = self.sensors[0].nodeId
+        compare_sensors_content(self, self.sensors, storage.get_sensors(node_id))
+        self.assertEqual(node_id, storage.getNodeId(self.nodes[0].username))
+        self.assertEqual(len(self.sensors), storage.getSensorCount(node_id))
+        self.assertEqual([node_id], storage.getNodeIds())
+        self.assertEqual([node_id], storage.getAllPersistentNodeIds())
+        self.assertEqual(len(self.options), len(storage.get_options_list()))
+
+        for sensor in self.sensors:
+            self.assertEqual(sensor.sensorId, storage.getSensorId(node_id, sensor.clientSensorId))
+            self.assertEqual(sensor.state, storage.getSensorState(sensor.sensorId))
+            self.assertEqual(sensor.data, storage.getSensorData(sensor.sensorId).data)
+            self.assertEqual(sensor.description, storage.getSensorById(sensor.sensorId).description)
+
+        for option in self.options:
+            self.assertEqual(option.value, storage.get_option_by_type(option.type).value)
+
+        storage._backend = backend
+
+    def test_write_through(self):
+        """
+        Tests that all changes are written to the backend.
+        """
+        config_logging(logging.ERROR)
+        storage = self._create_sensors()
+        self._create_options(storage)
+        node_id = self.sensors[0].nodeId
+
+        storage.updateSensorState(node_id, [(self.sensors[0].clientSensorId, 1)])
+        storage.updateSensorData(node_id, [(self.sensors[1].clientSensorId, SensorDataInt(1337, "new unit"))])
+        storage.update_option("type_1", 5)
+        storage.delete_option_by_type("type_2")
+        storage.delete_sensor(self.sensors[2].sensorId)
+        storage.markNodeAsNotConnected(node_id)
+
+        storage.addNode("alert_user", "alert_host", "alert", "instance", 1.0, 0, 1)
+        storage.addAlerts("alert_user", [{"clientAlertId": 1, "description": "alert_1", "alertLevels": [1, 2]}])
+        storage.addNode("manager_user", "manager_host", "manager", "instance", 1.0, 0, 0)
+        storage.addManager("manager_user", {"description": "manager_1"})
+
+        alert_node_id = storage.getNodeId("alert_user")
+        self.assertIsNotNone(alert_node_id)
+        alert_id = storage.getAlertId(alert_node_id, 1)
+        self.assertEqual([1, 2], storage.getAlertById(alert_id).alertLevels)
+        self.assertEqual(1, len(storage.get_managers(storage.getNodeId("manager_user"))))
+
+        self._check_backend_consistency(storage)
+
+        self.assertTrue(storage.deleteNode(alert_node_id))
+        self.assertIsNone(storage.getNodeId("alert_user"))
+        self.assertIsNone(storage.getAlertId(alert_node_id, 1))
+
+        self._check_backend_consistency(storage)
+
+    def test_failed_update(self):
+        """
+        Tests that a failed change does not change the objects in memory.
+        """
+        config_logging(logging.CRITICAL)
+        storage = self._create_sensors()
+        node_id = self.sensors[0].nodeId
+
+        state_list = [(sensor.clientSensorId, 1) for sensor in self.sensors]
+        data_list = [(self.sensors[1].clientSensorId, SensorDataInt(1337, "new unit")),
+                     (4567, SensorDataInt(1337, "new unit"))]
+
+        self.assertFalse(storage.updateSensorStateAndData(node_id, state_list, data_list))
+
+        compare_sensors_content(self, self.sensors, storage.get_sensors(node_id))
+        self._check_backend_consistency(storage)
+
+    def test_refresh_failed_read(self):
+        """
+        Tests that a failed read of a node while refreshing it does not remove its objects from memory.
+        """
+        config_logging(logging.CRITICAL)
+        storage = self._create_sensors()
+        node_id = self.sensors[0].nodeId
+        backend = storage.backend
+
+        for name in ["get_sensors", "getNodeById"]:
+            orig_func = getattr(backend, name)
+            setattr(backend, name, lambda *args, **kwargs: None)
+            try:
+                with storage._lock_nodes([node_id]):
+                    self.assertFalse(storage._refresh(node_id))
+            finally:
+                setattr(backend, name, orig_func)
+            storage._reload(logging.getLogger())
+
+            self.assertIsNotNone(storage.getNodeById(node_id))
+            compare_sensors_content(self, self.sensors, storage.get_sensors(node_id))
+            self._check_backend_consistency(storage)
+
+    def test_parallel_writes_of_different_nodes(self):
+        """
+        Tests that a change of a node is written to the backend while a change of another node is still written.
+        """
+        config_logging(logging.ERROR)
+        storage = self._create_sensors()
+        node_id = self.sensors[0].nodeId
+        storage.addNode("other_user", "other_host", "alert", "instance", 1.0, 0, 1)
+        other_node_id = storage.getNodeId("other_user")
+
+        # Block the backend while it writes the change of the first node.
+        backend = storage.backend
+        orig_update = backend.updateSensorState
+        write_started = threading.Event()
+        write_blocked = threading.Event()
+
+        def _blocking_update(node_id_arg, *args, **kwargs):
+            if node_id_arg == node_id:
+                write_started.set()
+                write_blocked.wait(5.0)
+            return orig_update(node_id_arg, *args, **kwargs)
+
+        backend.updateSensorState = _blocking_update
+        try:
+            thread = threading.Thread(target=storage.updateSensorState,
+                                      args=(node_id, [(self.sensors[0].clientSensorId, 1)]),
+                                      daemon=True)
+            thread.start()
+            self.assertTrue(write_started.wait(5.0))
+
+            self.assertTrue(storage.markNodeAsNotConnected(other_node_id))
+            self.assertEqual(0, storage.getNodeById(other_node_id).connected)
+            self.assertTrue(thread.is_alive())
+
+        finally:
+            write_blocked.set()
+            backend.updateSensorState = orig_update
+        thread.join(5.0)
+
+        self.assertEqual(1, storage.getSensorState(self.sensors[0].sensorId))
+        self._check_backend_consistency(storage)
+
+    def test_returned_objects_are_copies(self):
+        """
+        Tests that changing a returned object does not change the objects in memory.
+        """
+        config_logging(logging.ERROR)
+        storage = self._create_sensors()
+
+        sensor_int = [x for x in self.sensors if x.dataType == SensorDataType.INT][0]
+        storage.markNodeAsConnected(sensor_int.nodeId)
+
+        sensor = storage.getSensorById(sensor_int.sensorId)
+        sensor.state = 1
+        sensor.alertLevels.append(1337)
+        sensor.data = SensorDataInt(1337, "new unit")
+
+        node = storage.getNodeById(sensor_int.nodeId)
+        node.connected = 0
+
+        compare_sensors_content(self, self.sensors, storage.get_sensors(sensor_int.nodeId))
+        self.assertEqual(1, storage.getNodeById(sensor_int.nodeId).connected)
+
+    def test_load_existing(self):
+        """
+        Tests that the objects stored by the backend are loaded on start.
+        """
+        config_logging(logging.ERROR)
+        storage = self._create_sensors()
+        self._create_options(storage)
+
+        new_storage = CachedStorage(storage.backend, self.global_data)
+        self._check_backend_consistency(new_storage)
+        compare_sensors_content(self, self.sensors, new_storage.get_sensors(self.sensors[0].nodeId))
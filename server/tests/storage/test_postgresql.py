@@ -0,0 +1,154 @@
+import logging
+import threading
+from tests.util import config_logging
+from tests.storage import test_sqlite_option, test_sqlite_sensor
+from tests.storage.postgresql_core import TestPostgresqlCore
+from lib.localObjects import Sensor
+from lib.globalData.sensorObjects import SensorErrorState, SensorDataInt, SensorDataType
+
+
+class TestPostgresqlOption(TestPostgresqlCore, test_sqlite_option.TestStorageOption):
+    pass
+
+
+class TestPostgresqlSensor(TestPostgresqlCore, test_sqlite_sensor.TestStorageSensor):
+    pass
+
+
+class TestPostgresql(TestPostgresqlCore):
+
+    def _create_sensor_node(self, storage, username: str, sensor_count: int) -> int:
+        self.assertTrue(storage.addNode(username, "host", "sensor", "instance", 1.0, 0, 1))
+        node_id = storage.getNodeId(username)
+
+        sensors = list()
+        for client_sensor_id in range(sensor_count):
+            sensor = Sensor()
+            sensor.nodeId = node_id
+            sensor.clientSensorId = client_sensor_id
+            sensor.description = "sensor_%d" % client_sensor_id
+            sensor.state = 0
+            sensor.error_state = SensorErrorState()
+            sensor.alertLevels.append(client_sensor_id % 3)
+            sensor.alertDelay = 0
+            sensor.dataType = SensorDataType.INT
+            sensor.data = SensorDataInt(0, "unit")
+            sensors.append(sensor)
+        self.assertTrue(storage.upsert_sensors(sensors))
+
+        return node_id
+
+    def test_add_node_type_change(self):
+        """
+        Tests that the objects of a node are deleted if its type changes.
+        """
+        config_logging(logging.INFO)
+        storage = self._init_storage()
+
+        node_id = self._create_sensor_node(storage, "user", 5)
+        self.assertEqual(5, storage.getSensorCount(node_id))
+
+        self.assertTrue(storage.addNode("user", "new_host", "alert", "new_instance", 2.0, 1, 0))
+        self.assertEqual(0, storage.getSensorCount(node_id))
+
+        node = storage.getNodeById(node_id)
+        self.assertEqual(("new_host", "alert", "new_instance", 2.0, 1, 0),
+                         (node.hostname, node.nodeType, node.instance, node.version, node.rev, node.persistent))
+
+        self.assertTrue(storage.addAlerts("user", [{"clientAlertId": 1, "description": "alert_1", "alertLevels": [1, 2]},
+                                                   {"clientAlertId": 2, "description": "alert_2", "alertLevels": [2]}]))
+        alerts = storage.get_alerts(node_id)
+        self.assertEqual([(1, "alert_1", [1, 2]), (2, "alert_2", [2])],
+                         [(x.clientAlertId, x.description, x.alertLevels) for x in alerts])
+
+        # Changed alerts are updated and alerts that are not part of the registration anymore are deleted.
+        self.assertTrue(storage.addAlerts("user", [{"clientAlertId": 1, "description": "changed", "alertLevels": [3]}]))
+        alerts = storage.get_alerts(node_id)
+        self.assertEqual([(1, "changed", [3])], [(x.clientAlertId, x.description, x.alertLevels) for x in alerts])
+        self.assertEqual([3], storage.getAllAlertsAlertLevels())
+
+        self.assertTrue(storage.deleteNode(node_id))
+        self.assertIsNone(storage.getNodeById(node_id))
+        self.assertEqual([], storage.getAllAlertsAlertLevels())
+
+    def test_alert_system_information(self):
+        """
+        Tests that the complete alert system is read.
+        """
+        config_logging(logging.INFO)
+        storage = self._create_sensors()
+
+        self.assertTrue(storage.addNode("manager", "host", "manager", "instance", 1.0, 0, 0))
+        self.assertTrue(storage.addManager("manager", {"description": "manager"}))
+        self.assertTrue(storage.markNodeAsConnected(storage.getNodeId("manager")))
+
+        options, nodes, sensors, managers, alerts = storage.getAlertSystemInformation()
+        self.assertEqual([("profile", 0)], [(x.type, x.value) for x in options])
+        self.assertEqual(["user_1", "manager"], [x.username for x in nodes])
+        self.assertEqual([x.sensorId for x in self.sensors], [x.sensorId for x in sensors])
+        self.assertEqual([x.data for x in self.sensors], [x.data for x in sensors])
+        self.assertEqual(["manager"], [x.description for x in managers])
+        self.assertEqual([], alerts)
+        self.assertEqual([storage.getNodeId("manager")], storage.getAllConnectedNodeIds())
+
+    def test_keep_database(self):
+        """
+        Tests that an existing database is used by a new storage object.
+        """
+        config_logging(logging.INFO)
+        storage = self._create_sensors()
+        unique_id = storage.getUniqueID()
+
+        from lib.storage.postgresql import Postgresql
+        self.global_data.uniqueID = None
+        new_storage = Postgresql(self.global_data, **self.connection_args)
+        self.addCleanup(new_storage.close)
+
+        self.assertEqual(unique_id, new_storage.getUniqueID())
+        self.assertEqual(len(self.sensors), len(new_storage.get_sensors(self.nodes[0].id)))
+
+    def test_parallel_nodes(self):
+        """
+        Tests that nodes register and update their sensors in parallel with more threads than connections.
+        """
+        config_logging(logging.ERROR)
+        storage = self._init_storage(pool_size=2)
+
+        errors = list()
+
+        def _run_node(username: str):
+            node_id = self._create_sensor_node(storage, username, 20)
+            for i in range(10):
+                if not storage.updateSensorStateAndData(node_id,
+                                                        [(x, i % 2) for x in range(20)],
+                                                        [(x, SensorDataInt(i, "unit")) for x in range(20)]):
+                    errors.append(username)
+
+        threads = [threading.Thread(target=_run_node, args=("user_%d" % i, ), daemon=True) for i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(30.0)
+
+        self.assertEqual([], errors)
+        self.assertEqual(8, len(storage.getNodeIds()))
+        for node_id in storage.getNodeIds():
+            sensors = storage.get_sensors(node_id)
+            self.assertEqual(20, len(sensors))
+            self.assertTrue(all(x.state == 1 and x.data == SensorDataInt(9, "unit") for x in sensors))
+
+    def test_update_sensor_state_rolled_back(self):
+        """
+        Tests that a status update with an unknown sensor does not change any sensor.
+        """
+        config_logging(logging.CRITICAL)
+        storage = self._init_storage()
+        node_id = self._create_sensor_node(storage, "user", 3)
+
+        self.assertFalse(storage.updateSensorStateAndData(node_id,
+                                                          [(0, 1), (1, 1), (1337, 1)],
+                                                          [(0, SensorDataInt(5, "unit"))]))
+
+        for sensor in storage.get_sensors(node_id):
+            self.assertEqual(0, sensor.state)
+            self.assertEqual(SensorDataInt(0, "unit"), sensor.data)
@@ -0,0 +1,382 @@
+import logging
+import threading
+import time
+from unittest import TestCase
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+from tests.util import config_logging
+from lib.localObjects import Sensor
+from lib.globalData.globalData import GlobalData
+from lib.globalData.sensorObjects import SensorErrorState, SensorDataInt, SensorDataType
+
+try:
+    import psycopg2
+    import psycopg2.pool
+
+except ImportError:
+    psycopg2 = None
+
+
+class MockDatabase:
+    """
+    Database that records all executed statements and answers queries with the configured results.
+    """
+
+    def __init__(self):
+        self.statements = list()  # type: List[Tuple[str, Any]]
+
+        # Start of a query -> rows (or function that gets the query arguments and returns the rows).
+        self.results = dict()  # type: Dict[str, Union[List[tuple], Callable[[Any], List[tuple]]]]
+
+        self.fail_commit = False
+
+    def fetch(self, statement: str, args: Any) -> List[tuple]:
+        for start, result in self.results.items():
+            if statement.startswith(start):
+                return result(args) if callable(result) else list(result)
+        return []
+
+    def get_statements(self, start: str) -> List[Tuple[str, Any]]:
+        return [x for x in self.statements if x[0].startswith(start)]
+
+
+class MockCursor:
+
+    def __init__(self, connection: "MockConnection"):
+        self.connection = connection
+        self._result = []  # type: List[tuple]
+
+    def close(self):
+        pass
+
+    def execute(self, statement: Union[str, bytes], args: Any = None):
+        if isinstance(statement, bytes):
+            statement = statement.decode("utf-8")
+        self.connection.database.statements.append((statement, args))
+        self._result = self.connection.database.fetch(statement, args)
+
+    def fetchall(self) -> List[tuple]:
+        return self._result
+
+    def mogrify(self, template: Union[str, bytes], args: tuple) -> bytes:
+        if isinstance(template, bytes):
+            template = template.decode("utf-8")
+        return (template % tuple(repr(x) for x in args)).encode("utf-8")
+
+
+class MockConnection:
+
+    def __init__(self, database: MockDatabase):
+        self.database = database
+        self.encoding = "UTF8"
+        self.closed = 0
+        self.commit_count = 0
+        self.rollback_count = 0
+
+    def commit(self):
+        if self.database.fail_commit:
+            raise psycopg2.OperationalError("server closed the connection unexpectedly")
+        self.commit_count += 1
+
+    def cursor(self) -> MockCursor:
+        return MockCursor(self)
+
+    def rollback(self):
+        self.rollback_count += 1
+
+
+class MockPool:
+    """
+    Connection pool that hands out mock connections (replaces psycopg2.pool.ThreadedConnectionPool).
+    """
+
+    def __init__(self, database: MockDatabase, minconn: int, maxconn: int, **kwargs):
+        self.database = database
+        self.maxconn = maxconn
+        self.connection_args = kwargs
+        self.idle = list()  # type: List[MockConnection]
+        self.used = list()  # type: List[MockConnection]
+        self.closed = list()  # type: List[MockConnection]
+        self._lock = threading.Lock()
+
+    def closeall(self):
+        with self._lock:
+            self.closed.extend(self.idle)
+            self.idle = list()
+
+    def getconn(self) -> MockConnection:
+        with self._lock:
+            if len(self.used) >= self.maxconn:
+                raise psycopg2.pool.PoolError("connection pool exhausted")
+            conn = self.idle.pop() if self.idle else MockConnection(self.database)
+            self.used.append(conn)
+            return conn
+
+    def putconn(self, conn: MockConnection, close: bool = False):
+        with self._lock:
+            self.used.remove(conn)
+            if close:
+                conn.closed = 1
+                self.closed.append(conn)
+            else:
+                self.idle.append(conn)
+
+
+class TestPostgresqlMock(TestCase):
+    """
+    Tests the PostgreSQL storage backend against a mocked database connection (runs without a PostgreSQL server).
+    """
+
+    def setUp(self):
+        config_logging(logging.ERROR)
+
+        if psycopg2 is None:
+            self.skipTest("psycopg2 is not installed.")
+
+    def _init_storage(self, db_version: Optional[str] = "9", pool_size: int = 2):
+        # Import here to be able to collect the tests without psycopg2.
+        from lib.storage.postgresql import Postgresql
+
+        self.database = MockDatabase()
+        self.database.results["SELECT to_regclass"] = [("internals", )]
+        self.database.results["SELECT value FROM internals"] = \
+            lambda args: ([(db_version, )] if db_version is not None else []) if args == ("dbversion", ) \
+            else [("unique_id", )]
+
+        pools = list()
+
+        def _create_pool(minconn, maxconn, **kwargs):
+            pools.append(MockPool(self.database, minconn, maxconn, **kwargs))
+            return pools[-1]
+
+        self.global_data = GlobalData()
+        self.global_data.logger = logging.getLogger("server")
+
+        original_pool = psycopg2.pool.ThreadedConnectionPool
+        psycopg2.pool.ThreadedConnectionPool = _create_pool
+        try:
+            storage = Postgresql(self.global_data,
+                                 host="localhost",
+                                 port=5432,
+                                 database="alertr",
+                                 user="alertr",
+                                 password="password",
+                                 pool_size=pool_size)
+
+        finally:
+            psycopg2.pool.ThreadedConnectionPool = original_pool
+
+        self.addCleanup(storage.close)
+        self.pool = pools[0]  # type: MockPool
+        return storage
+
+    def test_pool_checkout_return(self):
+        """
+        Tests that connections are taken from the pool for a transaction and returned afterwards.
+        """
+        storage = self._init_storage(pool_size=2)
+        self.assertEqual(2, self.pool.maxconn)
+        self.assertEqual("alertr", self.pool.connection_args["dbname"])
+
+        # The version check at the start used and returned one connection.
+        self.assertEqual([], self.pool.used)
+        self.assertEqual(1, len(self.pool.idle))
+        conn = self.pool.idle[0]
+        self.assertEqual(1, conn.commit_count)
+
+        # Read transactions are rolled back, write transactions are committed.
+        with storage._transaction() as cursor:
+            self.assertEqual([conn], self.pool.used)
+            cursor.execute("SELECT 1")
+        self.assertEqual((1, 1), (conn.commit_count, conn.rollback_count))
+
+        with storage._transaction(write=True) as cursor:
+            cursor.execute("SELECT 1")
+        self.assertEqual((2, 1), (conn.commit_count, conn.rollback_count))
+
+        # Failing blocks roll back and return the connection for reuse.
+        with self.assertRaises(ValueError):
+            with storage._transaction(write=True) as cursor:
+                raise ValueError("test")
+        self.assertEqual((2, 2), (conn.commit_count, conn.rollback_count))
+        self.assertEqual([conn], self.pool.idle)
+
+        # Connections that can not commit are closed instead of being reused.
+        self.database.fail_commit = True
+        with self.assertRaises(psycopg2.OperationalError):
+            with storage._transaction(write=True) as cursor:
+                cursor.execute("SELECT 1")
+        self.assertEqual([conn], self.pool.closed)
+        self.assertEqual([], self.pool.idle)
+        self.assertEqual([], self.pool.used)
+
+    def test_pool_wait_for_free_connection(self):
+        """
+        Tests that a transaction waits for a free connection if all connections of the pool are in use.
+        """
+        storage = self._init_storage(pool_size=2)
+
+        conns = [storage._getConnection(), storage._getConnection()]
+        self.assertEqual(2, len(self.pool.used))
+
+        result = list()
+
+        def _read():
+            with storage._transaction() as cursor:
+                cursor.execute("SELECT 1")
+                result.append(len(self.pool.used))
+
+        thread = threading.Thread(target=_read, daemon=True)
+        thread.start()
+
+        time.sleep(0.2)
+        self.assertEqual([], result)
+
+        storage._putConnection(conns.pop())
+        thread.join(5)
+        self.assertFalse(thread.is_alive())
+        self.assertEqual([2], result)
+
+        storage._putConnection(conns.pop())
+        self.assertEqual([], self.pool.used)
+
+    def test_migration_version_8(self):
+        """
+        Tests that a database of layout version 8 gets the registration hashes without being cleared.
+        """
+        self._init_storage(db_version="8")
+
+        self.assertEqual([("ALTER TABLE nodes ADD COLUMN IF NOT EXISTS registrationHash TEXT", None)],
+                         self.database.get_statements("ALTER TABLE"))
+        self.assertEqual([("9", "dbversion")],
+                         [x[1] for x in self.database.get_statements("UPDATE internals")])
+        self.assertEqual([], self.database.get_statements("DROP TABLE"))
+        self.assertEqual([], self.database.get_statements("CREATE TABLE"))
+
+        # The migration is committed.
+        self.assertEqual(1, self.pool.idle[0].commit_count)
+
+    def test_migration_older_version(self):
+        """
+        Tests that a database with a layout version older than 8 is recreated and keeps its unique id.
+        """
+        self._init_storage(db_version="7")
+
+        self.assertEqual(1, len(self.database.get_statements("DROP TABLE IF EXISTS")))
+        self.assertEqual([], self.database.get_statements("ALTER TABLE"))
+
+        create_nodes = self.database.get_statements("CREATE TABLE nodes")
+        self.assertEqual(1, len(create_nodes))
+        self.assertIn("registrationHash TEXT", create_nodes[0][0])
+
+        internals = self.database.get_statements("INSERT INTO internals")
+        self.assertEqual(1, len(internals))
+        self.assertIn("unique_id", internals[0][1])
+        self.assertIn("9", internals[0][1])
+
+    def test_no_migration_current_version(self):
+        """
+        Tests that a database with the current layout version is not changed.
+        """
+        self._init_storage(db_version="9")
+
+        for start in ["ALTER TABLE", "UPDATE internals", "DROP TABLE", "CREATE TABLE"]:
+            self.assertEqual([], self.database.get_statements(start))
+
+    def test_newer_version(self):
+        """
+        Tests that a database with a newer layout version is not used.
+        """
+        with self.assertRaises(ValueError):
+            self._init_storage(db_version="10")
+
+        # The failed check rolled back its transaction.
+        self.assertEqual([], self.database.get_statements("DROP TABLE"))
+
+    def test_upsert_sensors_statements(self):
+        """
+        Tests that the sensors are inserted/updated with one statement per table regardless of their number.
+        """
+        storage = self._init_storage()
+
+        # Node 1 has the sensor with client id 0 already, all others are new.
+        self.database.results["SELECT nodeType FROM nodes"] = [("sensor", )]
+        self.database.results["SELECT clientSensorId, id, dataType FROM sensors"] = [(0, 10, SensorDataType.INT)]
+        self.database.results["INSERT INTO sensors"] = [(x, 10 + x, SensorDataType.INT) for x in range(1, 5)]
+
+        sensors = list()
+        for client_sensor_id in range(5):
+            sensor = Sensor()
+            sensor.nodeId = 1
+            sensor.clientSensorId = client_sensor_id
+            sensor.description = "sensor_%d" % client_sensor_id
+            sensor.state = 0
+            sensor.error_state = SensorErrorState()
+            sensor.alertLevels = [client_sensor_id % 2]
+            sensor.alertDelay = 0
+            sensor.dataType = SensorDataType.INT
+            sensor.data = SensorDataInt(client_sensor_id, "unit")
+            sensors.append(sensor)
+
+        self.assertTrue(storage.upsert_sensors(sensors))
+
+        self.assertEqual([(1, )], [x[1] for x in self.database.get_statements("SELECT nodeType FROM nodes")])
+
+        updates = self.database.get_statements("UPDATE sensors")
+        self.assertEqual(1, len(updates))
+        self.assertIn("FROM (VALUES (10::integer, 'sensor_0'::text, ", updates[0][0])
+        self.assertIn("WHERE sensors.id = data.id", updates[0][0])
+
+        inserts = self.database.get_statements("INSERT INTO sensors ")
+        self.assertEqual(1, len(inserts))
+        self.assertIn("RETURNING clientSensorId, id, dataType", inserts[0][0])
+        for client_sensor_id in range(1, 5):
+            self.assertIn("'sensor_%d'" % client_sensor_id, inserts[0][0])
+
+        # Only the alert levels and data of the existing sensor are deleted before all are added again.
+        self.assertEqual([([10], )] * 4, [x[1] for x in self.database.get_statements("DELETE FROM sensorsData")
+                                          + self.database.get_statements("DELETE FROM sensorsAlertLevels")])
+        self.assertEqual([], self.database.get_statements("DELETE FROM sensors "))
+
+        alert_levels = self.database.get_statements("INSERT INTO sensorsAlertLevels")
+        self.assertEqual(1, len(alert_levels))
+        self.assertIn("VALUES (10,0),(11,1),(12,0),(13,1),(14,0)", alert_levels[0][0])
+
+        int_data = self.database.get_statements("INSERT INTO sensorsDataInt")
+        self.assertEqual(1, len(int_data))
+        self.assertIn("(10,0,'unit'),(11,1,'unit')", int_data[0][0])
+
+        self.assertEqual([], self.database.get_statements("INSERT INTO sensorsDataFloat"))
+        self.assertEqual([], self.database.get_statements("INSERT INTO sensorsDataGPS"))
+
+    def test_update_sensor_state_and_data_statements(self):
+        """
+        Tests that the states and data of the sensors are updated with one statement per table.
+        """
+        storage = self._init_storage()
+
+        self.database.results["SELECT nodeType FROM nodes"] = [("sensor", )]
+        self.database.results["SELECT clientSensorId, id, dataType FROM sensors"] = [(1, 11, SensorDataType.INT),
+                                                                                     (2, 12, SensorDataType.INT)]
+
+        self.assertTrue(storage.updateSensorStateAndData(1,
+                                                         [(2, 1), (1, 0), (2, 0)],
+                                                         [(1, SensorDataInt(5, "unit")),
+                                                          (2, SensorDataInt(7, "unit"))]))
+
+        states = self.database.get_statements("UPDATE sensors SET state")
+        self.assertEqual(1, len(states))
+        self.assertIn("FROM unnest(", states[0][0])
+
+        # The last state of a sensor given multiple times is stored.
+        self.assertEqual(([11, 12], [0, 0]), states[0][1])
+
+        data = self.database.get_statements("UPDATE sensorsDataInt")
+        self.assertEqual(1, len(data))
+        self.assertEqual([[11, 12], [5, 7], ["unit", "unit"]], data[0][1])
+        self.assertEqual(1, len(self.pool.idle))
+        self.assertEqual(2, self.pool.idle[0].commit_count)
+
+        # Unknown sensors roll back the whole update.
+        self.assertFalse(storage.updateSensorStateAndData(1, [(1, 1), (3, 1)], []))
+        self.assertEqual(1, len(self.database.get_statements("UPDATE sensors SET state")))
+        self.assertEqual(2, self.pool.idle[0].commit_count)
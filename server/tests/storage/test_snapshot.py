@@ -0,0 +1,102 @@
+import logging
+import os
+from tests.util import config_logging
+from tests.storage.sqlite_core import TestStorageCore
+from tests.storage.test_cache import _CachedStorageMixin
+from tests.storage.util import compare_sensors_content
+from lib.storage.cache import CachedStorage
+from lib.storage.snapshot import StorageSnapshot
+from lib.globalData.sensorObjects import SensorDataInt
+
+
+class TestStorageSnapshot(_CachedStorageMixin, TestStorageCore):
+
+    def _create_alert_system(self) -> CachedStorage:
+        """
+        Creates sensors, alerts, managers and options and a snapshot writer for them.
+        """
+        storage = self._create_sensors()
+        self._create_options(storage)
+
+        storage.addNode("alert_user", "alert_host", "alert", "instance", 1.0, 0, 1)
+        storage.addAlerts("alert_user", [{"clientAlertId": 1, "description": "alert_1", "alertLevels": [1, 2]}])
+        storage.addNode("manager_user", "manager_host", "manager", "instance", 1.0, 0, 0)
+        storage.addManager("manager_user", {"description": "manager_1"})
+
+        self.global_data.storage = storage
+        self.snapshot_path = os.path.join(self.temp_dir, "snapshot.bin")
+        self.storage_snapshot = StorageSnapshot(self.global_data, self.snapshot_path)
+
+        return storage
+
+    def test_warm_restart(self):
+        """
+        Tests that a new cached storage loads all objects from the snapshot instead of the backend.
+        """
+        config_logging(logging.ERROR)
+        storage = self._create_alert_system()
+        self.assertTrue(self.storage_snapshot.write())
+
+        snapshot = StorageSnapshot.read(self.snapshot_path, self.global_data.logger)
+        self.assertIsNotNone(snapshot)
+
+        # Loading all objects from the backend fails.
+        backend = storage.backend
+        get_alert_system_information = backend.getAlertSystemInformation
+        backend.getAlertSystemInformation = lambda logger=None: None
+        new_storage = CachedStorage(backend, self.global_data, snapshot)
+        backend.getAlertSystemInformation = get_alert_system_information
+
+        backend_information = backend.getAlertSystemInformation()
+        new_information = new_storage.getAlertSystemInformation()
+        self.assertEqual([(x.type, x.value) for x in backend_information[0]],
+                         [(x.type, x.value) for x in new_information[0]])
+        self.assertEqual([vars(x) for x in backend_information[1]], [vars(x) for x in new_information[1]])
+        compare_sensors_content(self, backend_information[2], new_information[2])
+        self.assertEqual([vars(x) for x in backend_information[3]], [vars(x) for x in new_information[3]])
+        self.assertEqual([vars(x) for x in backend_information[4]], [vars(x) for x in new_information[4]])
+
+        # The first change invalidates the snapshot.
+        node_id = self.sensors[0].nodeId
+        self.assertTrue(new_storage.updateSensorState(node_id, [(self.sensors[0].clientSensorId, 1)]))
+        self.assertIsNone(backend.get_snapshot_token())
+        self.assertEqual(1, new_storage.getSensorState(self.sensors[0].sensorId))
+
+    def test_snapshot_ignored_after_change(self):
+        """
+        Tests that the snapshot is not used if the backend was changed after the snapshot was written.
+        """
+        config_logging(logging.ERROR)
+        storage = self._create_alert_system()
+        self.assertTrue(self.storage_snapshot.write())
+        self.assertIsNotNone(storage.backend.get_snapshot_token())
+
+        node_id = self.sensors[0].nodeId
+        self.assertTrue(storage.updateSensorData(node_id,
+                                                 [(self.sensors[1].clientSensorId, SensorDataInt(1337, "unit"))]))
+        self.assertIsNone(storage.backend.get_snapshot_token())
+
+        snapshot = StorageSnapshot.read(self.snapshot_path, self.global_data.logger)
+        new_storage = CachedStorage(storage.backend, self.global_data, snapshot)
+        self.assertEqual(SensorDataInt(1337, "unit"), new_storage.getSensorData(self.sensors[1].sensorId).data)
+
+    def test_invalid_snapshot(self):
+        """
+        Tests that a broken snapshot file is not used.
+        """
+        config_logging(logging.CRITICAL)
+        self._create_alert_system()
+        self.assertTrue(self.storage_snapshot.write())
+
+        with open(self.snapshot_path, "rb") as fp:
+            data = fp.read()
+        self.assertEqual(dict, type(StorageSnapshot.decode(data)))
+
+        for broken_data in [data[:-1], b"XXXX" + data[4:], data[:20] + bytes([data[20] ^ 0xff]) + data[21:]]:
+            with self.assertRaises(ValueError):
+                StorageSnapshot.decode(broken_data)
+
+        with open(self.snapshot_path, "wb") as fp:
+            fp.write(data[:-1])
+        self.assertIsNone(StorageSnapshot.read(self.snapshot_path, self.global_data.logger))
+        self.assertIsNone(StorageSnapshot.read(self.snapshot_path + ".missing", self.global_data.logger))
@@ -0,0 +1,158 @@
+import logging
+import sqlite3
+import threading
+from typing import Optional
+from tests.util import config_logging
+from tests.storage import test_sqlite_sensor
+from tests.storage.sqlite_core import TestStorageCore
+from lib.globalData.sensorObjects import SensorDataInt
+from lib.storage.sqlite import Sqlite
+
+
+class TestSqliteGroupCommitSensor(test_sqlite_sensor.TestStorageSensor):
+    """
+    Runs the sensor tests with changes that are only committed when the storage is closed.
+    """
+
+    def _init_storage(self,
+                      reader_count: Optional[int] = None,
+                      group_commit_interval: Optional[float] = None,
+                      group_commit_size: Optional[int] = None) -> Sqlite:
+        return super()._init_storage(reader_count=0,
+                                     group_commit_interval=3600.0,
+                                     group_commit_size=1000000)
+
+
+class TestSqliteGroupCommit(TestStorageCore):
+
+    def _get_committed_states(self, node_id: int):
+        """
+        Reads the sensor states with a separate connection that only sees committed changes.
+        """
+        conn = sqlite3.connect(self.global_data.storageBackendSqliteFile)
+        try:
+            cursor = conn.cursor()
+            cursor.execute("SELECT clientSensorId, state FROM sensors WHERE nodeId = ? ORDER BY clientSensorId",
+                           (node_id, ))
+            return cursor.fetchall()
+
+        finally:
+            conn.close()
+
+    def _create_group_commit_storage(self,
+                                     group_commit_interval: float = 3600.0,
+                                     group_commit_size: int = 1000000) -> Sqlite:
+        """
+        Creates the sensors and opens the database again with group commits.
+        """
+        storage = self._init_storage(reader_count=0, group_commit_interval=0.0)
+        self._create_sensors(storage)
+        storage.close()
+
+        storage = Sqlite(self.global_data.storageBackendSqliteFile,
+                         self.global_data,
+                         reader_count=0,
+                         group_commit_interval=group_commit_interval,
+                         group_commit_size=group_commit_size)
+        self.addCleanup(storage.close)
+        return storage
+
+    def test_commit_on_close(self):
+        """
+        Tests that changes are collected until the storage is closed and the saved commits are counted.
+        """
+        config_logging(logging.ERROR)
+        storage = self._create_group_commit_storage()
+        node_id = self.nodes[0].id
+        committed_states = self._get_committed_states(node_id)
+
+        for i in range(10):
+            self.assertTrue(storage.updateSensorState(node_id, [(self.sensors[0].clientSensorId, i % 2)]))
+
+        # Changes are visible to the storage but not committed yet.
+        self.assertEqual(1, storage.getSensorState(self.sensors[0].sensorId))
+        self.assertEqual(committed_states, self._get_committed_states(node_id))
+
+        saved_commits = storage.saved_commits
+        storage.close()
+
+        self.assertEqual(saved_commits + 9, storage.saved_commits)
+        self.assertIn((self.sensors[0].clientSensorId, 1), self._get_committed_states(node_id))
+
+    def test_commit_on_size(self):
+        """
+        Tests that the collected changes are committed as soon as the group commit size is reached.
+        """
+        config_logging(logging.ERROR)
+        storage = self._create_group_commit_storage(group_commit_size=5)
+        node_id = self.nodes[0].id
+        client_sensor_id = self.sensors[0].clientSensorId
+
+        for i in range(4):
+            self.assertTrue(storage.updateSensorState(node_id, [(client_sensor_id, 1)]))
+        self.assertNotIn((client_sensor_id, 1), self._get_committed_states(node_id))
+
+        self.assertTrue(storage.updateSensorState(node_id, [(client_sensor_id, 1)]))
+        self.assertIn((client_sensor_id, 1), self._get_committed_states(node_id))
+
+    def test_commit_future(self):
+        """
+        Tests that the commit future is resolved as soon as the collected changes are committed.
+        """
+        config_logging(logging.ERROR)
+        storage = self._create_group_commit_storage(group_commit_interval=0.05)
+        node_id = self.nodes[0].id
+        client_sensor_id = self.sensors[0].clientSensorId
+
+        def _update(state: int):
+            storage.updateSensorState(node_id, [(client_sensor_id, state)])
+
+        threads = [threading.Thread(target=_update, args=(1, ), daemon=True) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        future = storage.get_commit_future()
+        self.assertTrue(future.result(5.0))
+        self.assertIn((client_sensor_id, 1), self._get_committed_states(node_id))
+        self.assertGreater(storage.saved_commits, 0)
+
+        # Nothing is pending anymore.
+        self.assertTrue(storage.get_commit_future().done())
+
+    def test_commit_without_group_commit(self):
+        """
+        Tests that each change is committed on its own if group commits are disabled.
+        """
+        config_logging(logging.ERROR)
+        storage = self._init_storage(reader_count=0, group_commit_interval=0.0)
+        self._create_sensors(storage)
+        node_id = self.nodes[0].id
+        client_sensor_id = self.sensors[0].clientSensorId
+
+        self.assertTrue(storage.updateSensorState(node_id, [(client_sensor_id, 1)]))
+        self.assertTrue(storage.get_commit_future().done())
+        self.assertIn((client_sensor_id, 1), self._get_committed_states(node_id))
+        self.assertEqual(0, storage.saved_commits)
+
+    def test_failed_update_keeps_pending_changes(self):
+        """
+        Tests that a failed status update only discards its own changes and keeps the other collected changes.
+        """
+        config_logging(logging.CRITICAL)
+        storage = self._create_group_commit_storage()
+        node_id = self.nodes[0].id
+        first_sensor = self.sensors[0]
+        second_sensor = self.sensors[1]
+
+        self.assertTrue(storage.updateSensorState(node_id, [(first_sensor.clientSensorId, 1)]))
+        self.assertFalse(storage.updateSensorStateAndData(node_id,
+                                                          [(second_sensor.clientSensorId, 1), (1337, 1)],
+                                                          [(second_sensor.clientSensorId, SensorDataInt(5, "unit"))]))
+
+        storage.close()
+
+        committed_states = dict(self._get_committed_states(node_id))
+        self.assertEqual(1, committed_states[first_sensor.clientSensorId])
+        self.assertEqual(second_sensor.state, committed_states[second_sensor.clientSensorId])
@@ -0,0 +1,108 @@
+import logging
+from typing import List
+from tests.util import config_logging
+from tests.storage.sqlite_core import TestStorageCore
+from lib.storage.sqlite import Sqlite
+from lib.globalData.sensorObjects import SensorDataInt
+
+# Queries that read the whole table on purpose (only a few nodes exist and the error states are checked rarely).
+_FULL_SCAN_ALLOWED = ["FROM nodes WHERE connected = ",
+                      "FROM nodes WHERE persistent = ",
+                      "FROM sensors WHERE error_state != "]
+
+
+class TestStorageIndexes(TestStorageCore):
+
+    def _run_workload(self, storage: Sqlite):
+        """
+        Executes the storage functions used while the nodes are connected.
+        """
+        self._create_sensors(storage)
+        node_id = self.sensors[0].nodeId
+
+        storage.addNode("alert_user", "alert_host", "alert", "instance", 1.0, 0, 1)
+        alert_node_id = storage.getNodeId("alert_user")
+        storage.addAlerts("alert_user", [{"clientAlertId": 1, "description": "alert_1", "alertLevels": [1, 2]}])
+        storage.addNode("manager_user", "manager_host", "manager", "instance", 1.0, 0, 0)
+        manager_node_id = storage.getNodeId("manager_user")
+        storage.addManager("manager_user", {"description": "manager_1"})
+
+        storage.markNodeAsConnected(node_id)
+        storage.updateSensorStateAndData(node_id,
+                                         [(sensor.clientSensorId, 1) for sensor in self.sensors],
+                                         [(self.sensors[1].clientSensorId, SensorDataInt(1337, "unit"))])
+        for sensor in self.sensors:
+            storage.getSensorId(node_id, sensor.clientSensorId)
+            storage.getSensorById(sensor.sensorId)
+            storage.getSensorState(sensor.sensorId)
+            storage.getSensorData(sensor.sensorId)
+            storage.getSensorAlertLevels(sensor.sensorId)
+        storage.get_sensors(node_id)
+        storage.getSensorCount(node_id)
+        storage.getNodeById(node_id)
+        storage.getAlertId(alert_node_id, 1)
+        storage.get_alerts(alert_node_id)
+        storage.get_managers(manager_node_id)
+        storage.getAlertSystemInformation()
+
+        storage.upsert_sensors(self.sensors[1:])
+        storage.markNodeAsNotConnected(node_id)
+        storage.deleteNode(alert_node_id)
+        storage.deleteNode(manager_node_id)
+        storage.deleteNode(node_id)
+
+    def _get_full_scans(self, storage: Sqlite, statements: List[str]) -> List[str]:
+        """
+        Gets the plans of the given statements that read a whole table.
+        """
+        full_scans = list()
+        for statement in sorted(set(statements)):
+            if not statement.startswith(("SELECT", "UPDATE", "DELETE")) or " WHERE " not in statement:
+                continue
+            if any(allowed in statement for allowed in _FULL_SCAN_ALLOWED):
+                continue
+
+            storage.cursor.execute("EXPLAIN QUERY PLAN " + statement)
+            for row in storage.cursor.fetchall():
+                if row[3].startswith("SCAN "):
+                    full_scans.append("%s: %s" % (statement, row[3]))
+        return full_scans
+
+    def test_queries_use_indexes(self):
+        """
+        Tests that no query with a condition reads a whole table.
+        """
+        config_logging(logging.ERROR)
+        storage = self._init_storage(reader_count=0)
+
+        statements = list()
+        storage.conn.set_trace_callback(statements.append)
+        self._run_workload(storage)
+        storage.conn.set_trace_callback(None)
+
+        self.assertTrue(any("FROM sensors WHERE nodeId = " in x for x in statements))
+        self.assertEqual([], self._get_full_scans(storage, statements))
+
+    def test_migrate_version_7(self):
+        """
+        Tests that the indexes are added to a database of version 7 without losing its content.
+        """
+        config_logging(logging.ERROR)
+        storage = self._create_sensors(self._init_storage(reader_count=0))
+        node_id = self.sensors[0].nodeId
+
+        for index in ["sensorsNodeIdClientSensorId", "alertsNodeIdClientAlertId", "managersNodeId"]:
+            storage.cursor.execute("DROP INDEX " + index)
+        storage.cursor.execute("UPDATE internals SET value = ? WHERE type = ?", (7, "dbversion"))
+        storage.conn.commit()
+
+        storage.checkVersionAndClearConflict()
+
+        storage.cursor.execute("SELECT name FROM sqlite_master WHERE type = ? AND name NOT LIKE ?",
+                               ("index", "sqlite_autoindex_%"))
+        self.assertEqual({"sensorsNodeIdClientSensorId", "alertsNodeIdClientAlertId", "managersNodeId"},
+                         {x[0] for x in storage.cursor.fetchall()})
+
+        storage.cursor.execute("SELECT value FROM internals WHERE type = ?", ("dbversion", ))
+        self.assertEqual(storage.dbVersion, int(storage.cursor.fetchall()[0][0]))
+        self.assertEqual(len(self.sensors), len(storage.get_sensors(node_id)))
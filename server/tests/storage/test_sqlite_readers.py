@@ -0,0 +1,86 @@
+import logging
+import threading
+from tests.util import config_logging
+from tests.storage.sqlite_core import TestStorageCore
+from lib.globalData.sensorObjects import SensorDataInt
+
+
+class TestStorageReaders(TestStorageCore):
+
+    def _get_sensor_in_thread(self, storage, sensor_id: int) -> threading.Event:
+        finished = threading.Event()
+
+        def _get_sensor():
+            if storage.getSensorById(sensor_id) is not None:
+                finished.set()
+
+        thread = threading.Thread(target=_get_sensor, daemon=True)
+        thread.start()
+        return finished
+
+    def test_wal_mode(self):
+        """
+        Tests that the database uses write-ahead logging if reading connections are used.
+        """
+        config_logging(logging.INFO)
+        storage = self._init_storage(reader_count=2)
+
+        storage.cursor.execute("PRAGMA journal_mode")
+        self.assertEqual("wal", storage.cursor.fetchall()[0][0].lower())
+
+    def test_no_wal_mode_without_readers(self):
+        """
+        Tests that the journal mode of the database is not changed if no reading connections are used.
+        """
+        config_logging(logging.INFO)
+        storage = self._init_storage(reader_count=0)
+
+        storage.cursor.execute("PRAGMA journal_mode")
+        self.assertEqual("delete", storage.cursor.fetchall()[0][0].lower())
+
+    def test_read_parallel_to_write(self):
+        """
+        Tests that reads do not wait for the writing connection if reading connections are used.
+        """
+        config_logging(logging.INFO)
+        storage = self._create_sensors(self._init_storage(reader_count=2))
+
+        with storage.dbLock:
+            finished = self._get_sensor_in_thread(storage, self.sensors[0].sensorId)
+            self.assertTrue(finished.wait(5.0))
+
+    def test_read_without_readers(self):
+        """
+        Tests that reads wait for the writing connection if no reading connections are used.
+        """
+        config_logging(logging.INFO)
+        storage = self._create_sensors(self._init_storage(reader_count=0))
+
+        with storage.dbLock:
+            finished = self._get_sensor_in_thread(storage, self.sensors[0].sensorId)
+            self.assertFalse(finished.wait(0.5))
+
+        self.assertTrue(finished.wait(5.0))
+
+    def test_read_committed_changes(self):
+        """
+        Tests that the reading connections see the changes committed by the writing connection.
+        """
+        config_logging(logging.INFO)
+        storage = self._create_sensors(self._init_storage(reader_count=2))
+
+        sensor = self.sensors[1]
+        self.assertEqual(0, storage.getSensorState(sensor.sensorId))
+
+        self.assertTrue(storage.updateSensorStateAndData(sensor.nodeId,
+                                                         [(sensor.clientSensorId, 1)],
+                                                         [(sensor.clientSensorId, SensorDataInt(1337, "new unit"))]))
+
+        # Use all reading connections to make sure each one sees the change.
+        for _ in range(2):
+            self.assertEqual(1, storage.getSensorState(sensor.sensorId))
+            self.assertEqual(SensorDataInt(1337, "new unit"), storage.getSensorData(sensor.sensorId).data)
+
+        alert_system_information = storage.getAlertSystemInformation()
+        self.assertIsNotNone(alert_system_information)
+        self.assertEqual(len(self.sensors), len(alert_system_information[2]))
@@ -378,3 +378,174 @@ class TestStorageSensor(TestStorageCore):
         compare_sensors_content(self, self.sensors, init_db_sensors)
 
         self.assertIsNone(storage.get_sensor_error_state(4567))
+
+    def test_update_sensor_state_and_data(self):
+        """
+        Test update of states and data of multiple sensors in one transaction.
+        """
+        config_logging(logging.INFO)
+        storage = self._create_sensors()
+
+        node_id = self.sensors[0].nodeId
+
+        state_list = list()
+        data_list = list()
+        for sensor in self.sensors:
+            sensor.state = 1
+            state_list.append((sensor.clientSensorId, sensor.state))
+
+            if sensor.dataType == SensorDataType.INT:
+                sensor.data = SensorDataInt(1337, "new unit")
+                data_list.append((sensor.clientSensorId, sensor.data))
+
+            elif sensor.dataType == SensorDataType.GPS:
+                sensor.data = SensorDataGPS(13.0, 37.0, 1337)
+                data_list.append((sensor.clientSensorId, sensor.data))
+
+        self.assertTrue(storage.updateSensorStateAndData(node_id, state_list, data_list))
+
+        curr_db_sensors = storage.get_sensors(node_id)
+
+        compare_sensors_content(self, self.sensors, curr_db_sensors)
+
+    def test_update_sensor_state_and_data_invalid(self):
+        """
+        Test that no change is stored if the update of one sensor fails.
+        """
+        config_logging(logging.CRITICAL)
+        storage = self._create_sensors()
+
+        node_id = self.sensors[0].nodeId
+        init_db_sensors = storage.get_sensors(node_id)
+
+        state_list = [(sensor.clientSensorId, 1) for sensor in self.sensors]
+        data_list = [(self.sensors[1].clientSensorId, SensorDataInt(1337, "new unit")),
+                     (4567, SensorDataInt(1337, "new unit"))]
+
+        self.assertFalse(storage.updateSensorStateAndData(node_id, state_list, data_list))
+
+        # Commit other changes to make sure the failed update was discarded.
+        self.assertTrue(storage.updateSensorState(node_id, []))
+
+        curr_db_sensors = storage.get_sensors(node_id)
+
+        compare_sensors_content(self, init_db_sensors, curr_db_sensors)
+
+    def test_update_sensor_state_invalid(self):
+        """
+        Test that no state is changed if one of the sensors does not exist.
+        """
+        config_logging(logging.CRITICAL)
+        storage = self._create_sensors()
+
+        node_id = self.sensors[0].nodeId
+        init_db_sensors = storage.get_sensors(node_id)
+
+        state_list = [(sensor.clientSensorId, 1) for sensor in self.sensors]
+        state_list.append((4567, 1))
+
+        self.assertFalse(storage.updateSensorState(node_id, state_list))
+
+        # Commit other changes to make sure the failed update was discarded.
+        self.assertTrue(storage.updateSensorState(node_id, []))
+
+        curr_db_sensors = storage.get_sensors(node_id)
+
+        compare_sensors_content(self, init_db_sensors, curr_db_sensors)
+
+    def test_upsert_sensors_many(self):
+        """
+        Test upserting a large number of sensors of all data types at once (inserting, updating and removing).
+        """
+        config_logging(logging.CRITICAL)
+        storage = self._create_nodes()
+        node_id = self.nodes[0].id
+
+        data_types = [SensorDataType.NONE, SensorDataType.INT, SensorDataType.FLOAT, SensorDataType.GPS]
+        sensors = []
+        for i in range(200):
+            sensor = Sensor()
+            sensor.nodeId = node_id
+            sensor.clientSensorId = i
+            sensor.description = "sensor_%d" % i
+            sensor.state = 0
+            sensor.error_state = SensorErrorState()
+            sensor.alertLevels = [1, i % 3 + 2]
+            sensor.alertDelay = i
+            sensor.dataType = data_types[i % 4]
+            if sensor.dataType == SensorDataType.NONE:
+                sensor.data = SensorDataNone()
+            elif sensor.dataType == SensorDataType.INT:
+                sensor.data = SensorDataInt(i, "int unit")
+            elif sensor.dataType == SensorDataType.FLOAT:
+                sensor.data = SensorDataFloat(float(i), "float unit")
+            else:
+                sensor.data = SensorDataGPS(float(i), float(i), i)
+            sensors.append(sensor)
+
+        self.assertTrue(storage.upsert_sensors(sensors))
+
+        for sensor in sensors:
+            sensor.sensorId = storage.getSensorId(node_id, sensor.clientSensorId)
+        compare_sensors_content(self, sensors, storage.get_sensors(node_id))
+
+        # Change the data type and alert levels of the first half and remove the last quarter of the sensors.
+        for sensor in sensors[:100]:
+            sensor.state = 1
+            sensor.alertLevels = [5]
+            sensor.dataType = SensorDataType.INT
+            sensor.data = SensorDataInt(1337, "new unit")
+        sensors = sensors[:150]
+
+        self.assertTrue(storage.upsert_sensors(sensors))
+
+        compare_sensors_content(self, sensors, storage.get_sensors(node_id))
+        self.assertEqual(150, storage.getSensorCount(node_id))
+
+    def test_upsert_sensors_invalid(self):
+        """
+        Test that no sensor is changed if one of the sensors can not be upserted.
+        """
+        config_logging(logging.CRITICAL)
+        storage = self._create_sensors()
+
+        node_id = self.sensors[0].nodeId
+        init_db_sensors = storage.get_sensors(node_id)
+
+        sensor = Sensor()
+        sensor.nodeId = node_id
+        sensor.clientSensorId = 1337
+        sensor.description = "sensor_invalid"
+        sensor.state = 0
+        sensor.error_state = SensorErrorState()
+        sensor.alertDelay = 0
+        sensor.dataType = SensorDataType.INT
+        sensor.data = None
+
+        for db_sensor in init_db_sensors:
+            db_sensor.state = 1
+
+        self.assertFalse(storage.upsert_sensors(init_db_sensors + [sensor]))
+
+        # Commit other changes to make sure the failed upsert was discarded.
+        self.assertTrue(storage.updateSensorState(node_id, []))
+
+        for db_sensor in init_db_sensors:
+            db_sensor.state = 0
+        compare_sensors_content(self, init_db_sensors, storage.get_sensors(node_id))
+
+    def test_delete_node_with_sensors(self):
+        """
+        Test that deleting a node deletes all its sensors.
+        """
+        config_logging(logging.INFO)
+        storage = self._create_sensors()
+
+        node_id = self.sensors[0].nodeId
+
+        self.assertTrue(storage.deleteNode(node_id))
+
+        self.assertEqual(0, storage.getSensorCount(node_id))
+        self.assertEqual([], storage.get_sensors(node_id))
+        for sensor in self.sensors:
+            self.assertIsNone(storage.getSensorById(sensor.sensorId))
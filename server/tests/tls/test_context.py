@@ -0,0 +1,151 @@
+import logging
+import os
+import shutil
+import socket
+import ssl
+import tempfile
+import threading
+from unittest import TestCase
+from typing import Optional
+from tests.util import config_logging
+from tests.tls.util import create_certificate
+from lib.globalData.globalData import GlobalData
+from lib.tls import TlsContext
+
+
+class TestTlsContext(TestCase):
+
+    def setUp(self):
+        config_logging(logging.CRITICAL)
+
+        self._temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self._temp_dir)
+        self._cert_file = os.path.join(self._temp_dir, "server.crt")
+        self._key_file = os.path.join(self._temp_dir, "server.key")
+        if not create_certificate(self._cert_file, self._key_file):
+            self.skipTest("openssl not available")
+
+        self._global_data = GlobalData()
+        self._global_data.logger = logging.getLogger("TLS Context Test Case")
+        self._global_data.serverCertFile = self._cert_file
+        self._global_data.serverKeyFile = self._key_file
+        self._global_data.useClientCertificates = False
+
+    def _serve(self, tls_context: TlsContext, listen_sock: socket.socket, count: int):
+        """
+        Accepts the given number of connections and echoes the first received data.
+        """
+        for _ in range(count):
+            conn, _ = listen_sock.accept()
+            try:
+                ssl_sock = tls_context.wrap_socket(conn)
+                ssl_sock.sendall(ssl_sock.recv(1024))
+                ssl_sock.close()
+
+            except Exception:
+                conn.close()
+
+    def _connect(self,
+                 client_context: ssl.SSLContext,
+                 port: int,
+                 session: Optional[ssl.SSLSession]) -> ssl.SSLSocket:
+        sock = client_context.wrap_socket(socket.socket(socket.AF_INET, socket.SOCK_STREAM), session=session)
+        sock.settimeout(5.0)
+        sock.connect(("127.0.0.1", port))
+        sock.sendall(b"ping")
+        self.assertEqual(b"ping", sock.recv(1024))
+        return sock
+
+    def test_context_reused(self):
+        """
+        Tests that the same context is used as long as the certificate files do not change.
+        """
+        tls_context = TlsContext(self._global_data, check_interval=0.0)
+        ssl_context = tls_context.ssl_context
+
+        for _ in range(3):
+            self.assertIs(ssl_context, tls_context.ssl_context)
+        self.assertEqual(0, tls_context.get_stats()["reloads"])
+
+        # The generic protocol is mapped to the server side one.
+        self.assertEqual(ssl.PROTOCOL_TLS_SERVER, ssl_context.protocol)
+
+    def test_reload_on_change(self):
+        """
+        Tests that the context is recreated if the certificate files change.
+        """
+        tls_context = TlsContext(self._global_data, check_interval=0.0)
+        ssl_context = tls_context.ssl_context
+
+        create_certificate(self._cert_file, self._key_file)
+        os.utime(self._cert_file, ns=(0, 0))
+
+        self.assertIsNot(ssl_context, tls_context.ssl_context)
+        self.assertEqual(1, tls_context.get_stats()["reloads"])
+
+    def test_reload_check_interval(self):
+        """
+        Tests that changes of the certificate files are only checked after the check interval.
+        """
+        tls_context = TlsContext(self._global_data, check_interval=3600.0)
+        ssl_context = tls_context.ssl_context
+
+        create_certificate(self._cert_file, self._key_file)
+        os.utime(self._cert_file, ns=(0, 0))
+
+        self.assertIs(ssl_context, tls_context.ssl_context)
+
+        self.assertTrue(tls_context.reload())
+        self.assertIsNot(ssl_context, tls_context.ssl_context)
+
+    def test_reload_invalid(self):
+        """
+        Tests that the old context is kept if the changed certificate files are invalid.
+        """
+        tls_context = TlsContext(self._global_data, check_interval=0.0)
+        ssl_context = tls_context.ssl_context
+
+        with open(self._cert_file, "w") as fp:
+            fp.write("invalid certificate")
+
+        self.assertIs(ssl_context, tls_context.ssl_context)
+        self.assertFalse(tls_context.reload())
+        self.assertIs(ssl_context, tls_context.ssl_context)
+        self.assertEqual(0, tls_context.get_stats()["reloads"])
+
+    def test_session_resumption(self):
+        """
+        Tests that a client is able to resume its TLS session on reconnect and that the handshakes are measured.
+        """
+        tls_context = TlsContext(self._global_data)
+
+        listen_sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.addCleanup(listen_sock.close)
+        listen_sock.bind(("127.0.0.1", 0))
+        listen_sock.listen(5)
+        port = listen_sock.getsockname()[1]
+
+        server_thread = threading.Thread(target=self._serve, args=(tls_context, listen_sock, 2), daemon=True)
+        server_thread.start()
+
+        client_context = ssl.SSLContext(ssl.PROTOCOL_TLS_CLIENT)
+        client_context.check_hostname = False
+        client_context.load_verify_locations(cafile=self._cert_file)
+
+        sock = self._connect(client_context, port, None)
+        self.assertFalse(sock.session_reused)
+        session = sock.session
+        sock.close()
+
+        sock = self._connect(client_context, port, session)
+        self.assertTrue(sock.session_reused)
+        sock.close()
+
+        server_thread.join(5.0)
+
+        stats = tls_context.get_stats()
+        self.assertEqual(2, stats["handshakes"])
+        self.assertEqual(1, stats["resumed"])
+        self.assertEqual(0, stats["failed"])
+        self.assertGreater(stats["duration_max"], 0.0)
+        self.assertLessEqual(stats["duration_p50"], stats["duration_max"])
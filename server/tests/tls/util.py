@@ -0,0 +1,24 @@
+import shutil
+import subprocess
+
+
+def create_certificate(cert_file: str, key_file: str) -> bool:
+    """
+    Creates a self-signed certificate that is used as server certificate and as CA file.
+    :param cert_file: location the certificate is written to
+    :param key_file: location the key is written to
+    :return: False if openssl is not available
+    """
+    if shutil.which("openssl") is None:
+        return False
+
+    subprocess.check_call(["openssl", "req", "-x509",
+                           "-newkey", "ec", "-pkeyopt", "ec_paramgen_curve:prime256v1",
+                           "-nodes",
+                           "-keyout", key_file,
+                           "-out", cert_file,
+                           "-days", "1",
+                           "-subj", "/CN=alertR test"],
+                          stdout=subprocess.DEVNULL,
+                          stderr=subprocess.DEVNULL)
+    return True
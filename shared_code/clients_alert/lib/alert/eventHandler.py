@@ -10,7 +10,7 @@
 import logging
 import os
 import threading
-from typing import List, Any
+from typing import List, Dict, Any
 from ..client import EventHandler
 from ..alert.core import _Alert
 from ..globalData import ManagerObjManager, ManagerObjNode, ManagerObjOption, ManagerObjSensorAlert, \
@@ -55,6 +55,20 @@ class AlertEventHandler(EventHandler):
         logging.critical("[%s]: status_update() not supported by node of type 'alert'." % self._log_tag)
         raise NotImplementedError("Not supported by node of type 'alert'.")
 
+    # noinspection PyTypeChecker
+    def status_update_delta(self,
+                            msg_time: int,
+                            options: List[ManagerObjOption],
+                            profiles: List[ManagerObjProfile],
+                            nodes: List[ManagerObjNode],
+                            sensors: List[ManagerObjSensor],
+                            managers: List[ManagerObjManager],
+                            alerts: List[ManagerObjAlert],
+                            alert_levels: List[ManagerObjAlertLevel],
+                            deleted: Dict[str, List[Any]]) -> bool:
+        logging.critical("[%s]: status_update_delta() not supported by node of type 'alert'." % self._log_tag)
+        raise NotImplementedError("Not supported by node of type 'alert'.")
+
     def sensor_alert(self,
                      msg_time: int,
                      sensor_alert: ManagerObjSensorAlert) -> bool:
@@ -13,8 +13,8 @@ import logging
 import random
 import json
 import os
-from typing import Optional, Dict, Any
-from .core import BUFSIZE, RecvTimeout, Connection
+from typing import Optional, Dict, Any, Tuple
+from .core import BUFSIZE, RecvTimeout, Connection, ReceiveBuffer, FrameType, build_frame
 from .util import MsgChecker
 
 
@@ -148,9 +148,20 @@ class Communication:
         self._msg_queue = []
         self._msg_queue_lock = threading.Lock()
 
-        self._transaction_ids = dict()
+        # Requests that are sent in pipelining mode and wait for their response (transaction id -> promise).
+        self._transaction_ids = dict()  # type: Dict[int, Promise]
         self._transaction_ids_lock = threading.Lock()
 
+        # Flag that indicates if the negotiated pipelining mode is used. In pipelining mode each message is sent
+        # as frame with a transaction id without the RTS/CTS round trip and multiple requests can be in flight.
+        self._pipelining = False
+
+        # Buffer for the received data that is split into complete messages (or frames in pipelining mode).
+        self._recv_buffer = ReceiveBuffer()
+
+        # Maximum number of requests that are in flight in pipelining mode.
+        self._max_in_flight = 16
+
         # Timestamp when the last communication with the other side occurred.
         self._last_communication = 0
 
@@ -172,6 +183,246 @@ class Communication:
     def last_communication(self):
         return self._last_communication
 
+    @property
+    def pipelining(self) -> bool:
+        return self._pipelining
+
+    def _new_transaction_id(self) -> int:
+        """
+        Internal function that generates a random "unique" transaction id that is not used
+        by a request in flight. The transaction ids lock has to be held by the caller.
+
+        :return:
+        """
+        while True:
+            transaction_id = random.randint(0, 0xffffffff)
+            if transaction_id not in self._transaction_ids.keys():
+                return transaction_id
+
+    def _requeue_in_flight(self):
+        """
+        Internal function that puts all requests that are still in flight back at the front of the message queue
+        (their responses will never arrive since the connection is gone).
+        """
+        with self._transaction_ids_lock:
+            promises = list(self._transaction_ids.values())
+            self._transaction_ids.clear()
+
+            if not promises:
+                return
+
+            for promise in promises:
+                promise.clear_transaction_id()
+
+            with self._msg_queue_lock:
+                self._msg_queue[0:0] = promises
+
+    def _send_reply(self,
+                    message: Dict[str, Any],
+                    transaction_id: Optional[int]):
+        """
+        Internal function that sends a response (or error) message for a received request.
+        The connection lock has to be held by the caller.
+
+        :param message:
+        :param transaction_id: transaction id of the request
+        """
+        data = json.dumps(message)
+        if self._pipelining:
+            data = build_frame(FrameType.RESPONSE, transaction_id, data)
+        self._connection.send(data)
+
+    def _fill_recv_buffer(self, timeout: float) -> bool:
+        """
+        Internal function that receives the next chunk of data from the connection into the receive buffer.
+        The connection lock has to be held by the caller.
+
+        :param timeout:
+        :return: False if the connection was closed
+        """
+        data = self._connection.recv(BUFSIZE, timeout=timeout)
+        if not data:
+            return False
+        self._recv_buffer.feed(data)
+        return True
+
+    def _recv_message(self, timeout: float = 20.0) -> str:
+        """
+        Internal function that receives the next complete message. The connection lock has to be held
+        by the caller.
+
+        :param timeout:
+        :return: message or an empty string if the connection was closed
+        """
+        while True:
+            data = self._recv_buffer.pop_message()
+            if data is not None:
+                return data
+
+            if not self._fill_recv_buffer(timeout):
+                return ""
+
+    def _recv_data(self, size: int, timeout: float = 20.0) -> str:
+        """
+        Internal function that receives a message of the given size (announced by the RTS message).
+        The connection lock has to be held by the caller.
+
+        :param size:
+        :param timeout:
+        :return: message or an empty string if the connection was closed
+        """
+        while True:
+            data = self._recv_buffer.pop_data(size)
+            if data is not None:
+                return data
+
+            if not self._fill_recv_buffer(timeout):
+                return ""
+
+    def _recv_frame(self, timeout: float) -> Optional[Tuple[int, int, str]]:
+        """
+        Internal function that receives the next frame in pipelining mode. The connection lock has to be held
+        by the caller.
+
+        :param timeout:
+        :return: tuple of frame type, transaction id and payload or None if the connection was closed
+        """
+        while True:
+            frame = self._recv_buffer.pop_frame()
+            if frame is not None:
+                return frame
+
+            if not self._fill_recv_buffer(timeout):
+                return None
+
+    # noinspection PyBroadException
+    def _handle_response_frame(self,
+                               transaction_id: int,
+                               data: str):
+        """
+        Internal function that finishes the promise of the request the received response belongs to.
+
+        :param transaction_id:
+        :param data:
+        """
+        with self._transaction_ids_lock:
+            promise = self._transaction_ids.pop(transaction_id, None)
+
+        if promise is None:
+            logging.warning("[%s]: Received response for unknown transaction %d." % (self._log_tag, transaction_id))
+            return
+
+        # Request sender can send the next request.
+        self._new_msg_event.set()
+
+        try:
+            message = json.loads(data)
+
+            # check if an error was received
+            if "error" in message.keys():
+                logging.error("[%s]: Error received for message of type '%s': %s"
+                              % (self._log_tag, promise.msg_type, message["error"]))
+                promise.set_failed()
+                return
+
+            # Check if we received an answer to our sent request.
+            if str(message["message"]).lower() != promise.msg_type:
+                logging.error("[%s]: Wrong message type for message of type '%s' received: %s"
+                              % (self._log_tag, promise.msg_type, message["message"]))
+                promise.set_failed()
+                return
+
+            # Check if the received type (request/response) is the correct one.
+            if str(message["payload"]["type"]).lower() != "response":
+                logging.error("[%s]: Response expected for message of type '%s'."
+                              % (self._log_tag, promise.msg_type))
+                promise.set_failed()
+                return
+
+            msg_result = str(message["payload"]["result"]).lower()
+
+        except Exception:
+            logging.exception("[%s]: Received response for message of type '%s' not valid."
+                              % (self._log_tag, promise.msg_type))
+            promise.set_failed()
+            return
+
+        if msg_result == "ok":
+            logging.debug("[%s]: Received valid response for message of type '%s'."
+                          % (self._log_tag, promise.msg_type))
+            promise.set_success()
+
+        # Check if result of message was expired
+        # (too long in queue that other side does not process it).
+        elif msg_result == "expired":
+            logging.warning("[%s]: Other side said message of type '%s' is expired (too old)."
+                            % (self._log_tag, promise.msg_type))
+            promise.set_failed()
+
+        else:
+            logging.error("[%s]: Wrong result for message of type '%s' received: %s"
+                          % (self._log_tag, promise.msg_type, msg_result))
+            promise.set_failed()
+
+    # noinspection PyBroadException
+    def _send_pipelined_requests(self):
+        """
+        Internal function that sends the queued messages in pipelining mode. The messages are sent
+        as frames without waiting for the responses (they are processed by the receiving side).
+        """
+        while self._msg_queue:
+
+            if self._exit_flag or not self._has_channel or not self._pipelining:
+                return
+
+            with self._transaction_ids_lock:
+                if len(self._transaction_ids) >= self._max_in_flight:
+                    return
+
+            with self._msg_queue_lock:
+                promise = self._msg_queue.pop(0)
+
+            with self._connection_lock:
+
+                # Only send message if we have a working communication channel.
+                if not self._has_channel or not self._pipelining:
+                    with self._msg_queue_lock:
+                        self._msg_queue.insert(0, promise)
+                    return
+
+                # Register request before sending since the response can arrive before the send returns.
+                with self._transaction_ids_lock:
+                    transaction_id = self._new_transaction_id()
+                    promise.set_transaction_id(transaction_id)
+                    self._transaction_ids[transaction_id] = promise
+
+                try:
+                    logging.debug("[%s]: Sending message of type '%s' with transaction id %d."
+                                  % (self._log_tag, promise.msg_type, transaction_id))
+                    self._connection.send(build_frame(FrameType.REQUEST, transaction_id, promise.msg))
+
+                except OSError:
+                    logging.exception("[%s]: Sending message of type '%s' failed (retrying)."
+                                      % (self._log_tag, promise.msg_type))
+                    with self._transaction_ids_lock:
+                        self._transaction_ids.pop(transaction_id, None)
+                    with self._msg_queue_lock:
+                        promise.clear_transaction_id()
+                        self._msg_queue.insert(0, promise)
+                    self._has_channel = False
+                    return
+
+                except Exception:
+                    logging.exception("[%s]: Sending message of type '%s' failed (giving up)."
+                                      % (self._log_tag, promise.msg_type))
+                    with self._transaction_ids_lock:
+                        self._transaction_ids.pop(transaction_id, None)
+                    self._has_channel = False
+                    promise.set_failed()
+                    return
+
+                self._last_communication = int(time.time())
+
     # noinspection PyBroadException
     def _initiate_transaction(self, promise: Promise) -> bool:
         """
@@ -205,7 +456,7 @@ class Communication:
         received_message_type = ""
         received_payload_type = ""
         try:
-            data = self._connection.recv(BUFSIZE).decode("ascii")
+            data = self._recv_message()
             message = json.loads(data)
 
             # Check if an error was received
@@ -254,7 +505,8 @@ class Communication:
         while True:
 
             # If we still have messages in the queue, wait a short time before starting a new sending round.
-            if self._msg_queue:
+            # In pipelining mode the queue is only processed further if a response frees a slot.
+            if self._msg_queue and not self._pipelining:
                 time.sleep(0.5)
 
             # Wait until a new message has to be sent if we do not have anything in the queue.
@@ -265,6 +517,13 @@ class Communication:
                 logging.info("[%s] Exiting Request Sender thread." % self._log_tag)
                 return
 
+            if self._pipelining:
+                # Clear event before processing the queue to not miss messages queued in the meantime.
+                self._new_msg_event.clear()
+                if self._has_channel:
+                    self._send_pipelined_requests()
+                continue
+
             # Only process message queue if we have a working communication channel.
             if not self._has_channel:
                 continue
@@ -326,7 +585,7 @@ class Communication:
 
                     # Receive response.
                     try:
-                        data = self._connection.recv(BUFSIZE).decode("ascii")
+                        data = self._recv_message()
                         message = json.loads(data)
 
                         # check if an error was received
@@ -410,6 +669,11 @@ class Communication:
     # noinspection PyBroadException
     def connect(self) -> bool:
 
+        # A new connection always starts with the classic protocol.
+        self._pipelining = False
+        self._recv_buffer.clear()
+        self._requeue_in_flight()
+
         if not self._is_server:
             # Closes existing connection if we have one.
             try:
@@ -453,16 +717,19 @@ class Communication:
         except Exception:
             pass
 
+        self._pipelining = False
+        self._requeue_in_flight()
+
     # noinspection PyBroadException
     def recv_raw(self) -> Optional[str]:
         """
-        Raw receiving method that just plainly returns the received data.
+        Raw receiving method that just plainly returns the next received message (without RTS/CTS handling).
 
         :return: Data received as string.
         """
         with self._connection_lock:
             try:
-                data = self._connection.recv(BUFSIZE)
+                data = self._recv_message()
             except Exception:
                 logging.exception("[%s]: Receiving failed." % self._log_tag)
                 self._has_channel = False
@@ -472,13 +739,14 @@ class Communication:
                 return None
 
         self._last_communication = int(time.time())
-        return data.decode("ascii")
+        return data
 
     # noinspection PyBroadException
     def recv_request(self) -> Optional[MsgRequest]:
         """
         Returns received request as string. Blocking until request is received or error occurs.
-        Does not block the channel. Handles RTS/CTS messages with other side.
+        Does not block the channel. Handles RTS/CTS messages with other side
+        (or in pipelining mode the frames and the responses to the own requests).
 
         :return: Data of the received request.
         """
@@ -498,75 +766,80 @@ class Communication:
             # (wait 0.5 seconds in between, because lock
             # are released in random order => other threads could be
             # unlucky and not be chosen => this has happened when
-            # loglevel was not debug => hdd I/O has slowed this process down)
+            # loglevel was not debug => hdd I/O has slowed this process down).
+            # In pipelining mode other threads only need the lock to send a frame.
             if is_timeout_exception:
-                time.sleep(0.5)
+                time.sleep(0.05 if self._pipelining else 0.5)
 
             with self._connection_lock:
 
                 received_transaction_id = None
                 try:
-                    data = self._connection.recv(BUFSIZE, timeout=0.5).decode("ascii")
-                    if not data:
-                        self._has_channel = False
-                        return None
+                    if self._pipelining:
+                        frame = self._recv_frame(0.5)
+                        if frame is None:
+                            self._has_channel = False
+                            return None
 
-                    data = data.strip()
-                    message = json.loads(data)
+                        frame_type, received_transaction_id, data = frame
+                        self._last_communication = int(time.time())
 
-                    # Check if an error was received.
-                    if "error" in message.keys():
-                        logging.error("[%s]: Error received: %s" % (self._log_tag, message["error"]))
-                        return None
+                        # Responses to our own requests are processed while waiting for requests.
+                        if frame_type == FrameType.RESPONSE:
+                            self._handle_response_frame(received_transaction_id, data)
+                            is_timeout_exception = False
+                            continue
 
-                    # Check if RTS was received
-                    # => acknowledge
-                    if str(message["payload"]["type"]).lower() == "rts":
-                        received_transaction_id = int(message["payload"]["id"])
-                        message_size = int(message["size"])
+                        logging.debug("[%s]: Received request frame %d." % (self._log_tag, received_transaction_id))
 
-                        # Received RTS (request to send) message.
-                        logging.debug("[%s]: Received RTS %s message."
-                                      % (self._log_tag, received_transaction_id))
+                    else:
+                        data = self._recv_message(0.5)
+                        if not data:
+                            self._has_channel = False
+                            return None
 
-                        logging.debug("[%s]: Sending CTS %s message."
-                                      % (self._log_tag, received_transaction_id))
+                        data = data.strip()
+                        message = json.loads(data)
 
-                        # send CTS (clear to send) message
-                        payload = {"type": "cts",
-                                   "id": received_transaction_id}
-                        message = {"message": str(message["message"]),
-                                   "payload": payload}
-                        self._connection.send(json.dumps(message))
-
-                        # After initiating transaction receive actual command.
-                        num_read = 0
-                        # NOTE: Use bytearray since bytes are immutable and
-                        # for each += operator a new allocation is done.
-                        data_raw = bytearray(message_size)
-                        while num_read < message_size:
-                            temp_data = self._connection.recv(message_size - len(data))
-                            if not temp_data:
-                                break
-
-                            recv_length = len(temp_data)
-                            data_raw[num_read:num_read+recv_length] = temp_data
-                            num_read += recv_length
-
-                        if num_read != message_size:
-                            logging.error("[%s]: Received data incomplete. Closing connection." % self._log_tag)
-                            self._has_channel = False
+                        # Check if an error was received.
+                        if "error" in message.keys():
+                            logging.error("[%s]: Error received: %s" % (self._log_tag, message["error"]))
                             return None
 
-                        data = data_raw.decode("ascii")
+                        # Check if RTS was received
+                        # => acknowledge
+                        if str(message["payload"]["type"]).lower() == "rts":
+                            received_transaction_id = int(message["payload"]["id"])
+                            message_size = int(message["size"])
+
+                            # Received RTS (request to send) message.
+                            logging.debug("[%s]: Received RTS %s message."
+                                          % (self._log_tag, received_transaction_id))
+
+                            logging.debug("[%s]: Sending CTS %s message."
+                                          % (self._log_tag, received_transaction_id))
+
+                            # send CTS (clear to send) message
+                            payload = {"type": "cts",
+                                       "id": received_transaction_id}
+                            message = {"message": str(message["message"]),
+                                       "payload": payload}
+                            self._connection.send(json.dumps(message))
+
+                            # After initiating transaction receive actual command.
+                            data = self._recv_data(message_size)
+                            if len(data) != message_size:
+                                logging.error("[%s]: Received data incomplete. Closing connection." % self._log_tag)
+                                self._has_channel = False
+                                return None
 
-                    # if no RTS was received
-                    # => other side does not stick to protocol
-                    # => terminate session
-                    else:
-                        logging.error("[%s]: Did not receive RTS. Other side sent: %s"
-                                      % (self._log_tag, data))
-                        return None
+                        # if no RTS was received
+                        # => other side does not stick to protocol
+                        # => terminate session
+                        else:
+                            logging.error("[%s]: Did not receive RTS. Other side sent: %s"
+                                          % (self._log_tag, data))
+                            return None
 
                 except RecvTimeout:
                     # Continue receiving.
@@ -604,7 +877,7 @@ class Communication:
                     try:
                         message = {"message": request_type,
                                    "error": error_msg}
-                        self._connection.send(json.dumps(message))
+                        self._send_reply(message, received_transaction_id)
                     except Exception:
                         pass
 
@@ -637,7 +910,7 @@ class Communication:
                                    "result": "expired"}
                         message = {"message": request_type,
                                    "payload": payload}
-                        self._connection.send(json.dumps(message))
+                        self._send_reply(message, received_transaction_id)
 
                     except Exception:
                         logging.exception("[%s]: Sending 'expired' response message of type '%s' failed."
@@ -657,7 +930,7 @@ class Communication:
                                    "result": "ok"}
                         message = {"message": request_type,
                                    "payload": payload}
-                        self._connection.send(json.dumps(message))
+                        self._send_reply(message, received_transaction_id)
 
                     except Exception:
                         logging.exception("[%s]: Sending 'ok' response message of type '%s' failed."
@@ -710,3 +983,15 @@ class Communication:
 
     def set_connected(self):
         self._has_channel = True
+
+        # Wake up request sender to process the messages queued while we were not connected.
+        self._new_msg_event.set()
+
+    def set_pipelining(self, enabled: bool):
+        """
+        Switches the communication to the pipelining mode negotiated with the other side
+        (or back to the classic RTS/CTS mode). Data that was already received stays in the receive buffer.
+
+        :param enabled:
+        """
+        self._pipelining = enabled
@@ -9,15 +9,222 @@
 
 import socket
 import ssl
-from typing import Optional
+import re
+import time
+from typing import Optional, Tuple
 
 BUFSIZE = 4096
 
+# Size of the header of a frame used in pipelining mode
+# (8 hex digits payload length, 8 hex digits transaction id, 1 digit frame type).
+FRAME_HEADER_SIZE = 17
+
 
 class RecvTimeout(Exception):
     pass
 
 
+class FrameType:
+    REQUEST = 1
+    RESPONSE = 2
+
+
+def build_frame(frame_type: int,
+                transaction_id: int,
+                data: str) -> str:
+    """
+    Builds a frame used in pipelining mode. Each frame is prefixed by the length of the payload and carries
+    the transaction id that is used to match responses to their requests.
+
+    :param frame_type: type of the frame (request or response)
+    :param transaction_id:
+    :param data: payload of the frame (a message of the classic protocol)
+    :return: frame as string
+    """
+    return "%08x%08x%d%s" % (len(data), transaction_id, frame_type, data)
+
+
+class ReceiveBuffer:
+    """
+    Buffers the data received on a connection and splits it into complete messages. Received data can contain
+    multiple messages or only a part of a message. The buffer yields the JSON messages of the classic protocol,
+    messages of a known size (announced by a RTS message) and frames of the pipelining mode.
+    """
+
+    # Characters that are relevant to find the end of a JSON object outside and inside of strings.
+    _object_chars = re.compile(rb'[{}"]')
+    _string_chars = re.compile(rb'["\\]')
+
+    # Number of consumed bytes at the start of the buffer that trigger moving the unread data to the front.
+    _compact_size = 65536
+
+    def __init__(self):
+        # NOTE: Use bytearray since bytes are immutable and for each += operator a new allocation is done.
+        # Consumed data is not removed from the front of the buffer for each message but only from time to time.
+        self._buffer = bytearray()
+        self._start = 0
+
+        # State of the scan for the end of the JSON message at the start of the buffer
+        # (kept between received chunks so that each byte is only scanned once).
+        self._scan_pos = 0
+        self._scan_depth = 0
+        self._scan_in_string = False
+
+    def __len__(self) -> int:
+        return len(self._buffer) - self._start
+
+    def _reset_scan(self):
+        self._scan_pos = self._start
+        self._scan_depth = 0
+        self._scan_in_string = False
+
+    def _consume(self, size: int) -> str:
+        """
+        Internal function that removes the given number of bytes from the start of the buffer.
+
+        :param size:
+        :return: removed data as string
+        """
+        end = self._start + size
+        # Decode directly from the buffer without copying the data into an intermediate bytes object.
+        with memoryview(self._buffer) as view:
+            data = str(view[self._start:end], "ascii")
+        self._start = end
+
+        if self._start == len(self._buffer):
+            self._buffer.clear()
+            self._start = 0
+
+        elif self._start >= self._compact_size and self._start * 2 >= len(self._buffer):
+            del self._buffer[0:self._start]
+            self._start = 0
+
+        self._reset_scan()
+        return data
+
+    def _scan_message(self) -> Optional[int]:
+        """
+        Internal function that searches the end of the JSON message at the start of the buffer.
+
+        :return: size of the message or None if the message is not received completely
+        """
+        if self._scan_depth == 0:
+            # Skip whitespaces between messages.
+            while self._start < len(self._buffer) and self._buffer[self._start] in b" \t\r\n":
+                self._start += 1
+            if self._start == len(self._buffer):
+                return None
+            if self._buffer[self._start] != ord("{"):
+                raise ValueError("Received data is not a JSON message.")
+            self._scan_pos = self._start
+
+        pos = self._scan_pos
+        while True:
+            if self._scan_in_string:
+                match = self._string_chars.search(self._buffer, pos)
+            else:
+                match = self._object_chars.search(self._buffer, pos)
+            if match is None:
+                self._scan_pos = len(self._buffer)
+                return None
+
+            char = self._buffer[match.start()]
+            pos = match.end()
+            if self._scan_in_string:
+                if char == ord("\\"):
+                    # Scan the escape sequence again if the escaped character is not received yet.
+                    if pos == len(self._buffer):
+                        self._scan_pos = match.start()
+                        return None
+                    pos += 1
+
+                else:
+                    self._scan_in_string = False
+
+            elif char == ord('"'):
+                self._scan_in_string = True
+
+            elif char == ord("{"):
+                self._scan_depth += 1
+
+            else:
+                self._scan_depth -= 1
+                if self._scan_depth == 0:
+                    self._scan_pos = pos
+                    return pos - self._start
+
+    def clear(self):
+        self._buffer.clear()
+        self._start = 0
+        self._reset_scan()
+
+    def feed(self, data: bytes):
+        """
+        Adds received data to the buffer.
+
+        :param data:
+        """
+        self._buffer.extend(data)
+
+    def has_message(self) -> bool:
+        """
+        Checks if the buffer holds at least one complete JSON message.
+
+        :return:
+        """
+        return self._scan_message() is not None
+
+    def pop_message(self) -> Optional[str]:
+        """
+        Removes the first complete JSON message from the buffer.
+
+        :return: message or None if no complete message is buffered
+        """
+        size = self._scan_message()
+        if size is None:
+            return None
+        return self._consume(size)
+
+    def pop_data(self, size: int) -> Optional[str]:
+        """
+        Removes a message of the given size from the buffer.
+
+        :param size:
+        :return: message or None if the message is not buffered completely
+        """
+        if len(self) < size:
+            return None
+        return self._consume(size)
+
+    def has_frame(self) -> bool:
+        """
+        Checks if the buffer holds at least one complete frame.
+
+        :return:
+        """
+        if len(self) < FRAME_HEADER_SIZE:
+            return False
+        return len(self) >= FRAME_HEADER_SIZE + int(self._buffer[self._start:self._start + 8], 16)
+
+    def pop_frame(self) -> Optional[Tuple[int, int, str]]:
+        """
+        Removes the first complete frame from the buffer.
+
+        :return: tuple of frame type, transaction id and payload or None if no complete frame is buffered
+        """
+        if not self.has_frame():
+            return None
+
+        header = self._consume(FRAME_HEADER_SIZE)
+        length = int(header[0:8], 16)
+        transaction_id = int(header[8:16], 16)
+        frame_type = int(header[16])
+        if frame_type not in (FrameType.REQUEST, FrameType.RESPONSE):
+            raise ValueError("Frame type %d not known." % frame_type)
+
+        return frame_type, transaction_id, self._consume(length)
+
+
 class Connection:
 
     def connect(self):
@@ -66,25 +273,64 @@ class Client(Connection):
         self._client_key_file = client_key_file
         self._socket = None  # type: Optional[socket.socket]
 
+        # TLS context is created once and used for all connections in order to be able to resume TLS sessions.
+        self._ssl_context = None  # type: Optional[ssl.SSLContext]
+        self._ssl_session = None  # type: Optional[ssl.SSLSession]
+
+        # Duration of the last TLS handshake in seconds and if the TLS session was resumed.
+        self._handshake_duration = None  # type: Optional[float]
+        self._session_reused = False
+
+    @property
+    def handshake_duration(self) -> Optional[float]:
+        return self._handshake_duration
+
+    @property
+    def session_reused(self) -> bool:
+        return self._session_reused
+
+    def _create_ssl_context(self) -> ssl.SSLContext:
+        """
+        Internal function that creates the TLS context used for all connections.
+
+        :return:
+        """
+        ssl_context = ssl.SSLContext(ssl.PROTOCOL_TLS_CLIENT)
+
+        # The server certificate is verified against the configured CA file and not against the host name.
+        ssl_context.check_hostname = False
+        ssl_context.verify_mode = ssl.CERT_REQUIRED
+        ssl_context.load_verify_locations(cafile=self._server_ca_file)
+
+        # Check if a client certificate is required.
+        if self._client_cert_file is not None and self._client_key_file is not None:
+            ssl_context.load_cert_chain(certfile=self._client_cert_file,
+                                        keyfile=self._client_key_file)
+
+        return ssl_context
+
     def connect(self):
         self._socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
 
         # Check if TLS is enabled.
-        if self._server_ca_file is not None:
-            # Check if a client certificate is required.
-            if self._client_cert_file is None or self._client_key_file is None:
-                self._socket = ssl.wrap_socket(self._socket,
-                                               ca_certs=self._server_ca_file,
-                                               cert_reqs=ssl.CERT_REQUIRED)
-            else:
-                self._socket = ssl.wrap_socket(self._socket,
-                                               ca_certs=self._server_ca_file,
-                                               cert_reqs=ssl.CERT_REQUIRED,
-                                               certfile=self._client_cert_file,
-                                               keyfile=self._client_key_file)
+        if self._server_ca_file is None:
+            self._socket.connect((self._host, self._port))
+            return
+
+        if self._ssl_context is None:
+            self._ssl_context = self._create_ssl_context()
 
+        # Offer the session of the last connection to the server in order to resume it.
+        self._socket = self._ssl_context.wrap_socket(self._socket,
+                                                     do_handshake_on_connect=False,
+                                                     session=self._ssl_session)
         self._socket.connect((self._host, self._port))
 
+        start = time.perf_counter()
+        self._socket.do_handshake()
+        self._handshake_duration = time.perf_counter() - start
+        self._session_reused = self._socket.session_reused
+
     def send(self,
              data: str):
         self._socket.send(data.encode('ascii'))
@@ -105,4 +351,16 @@ class Client(Connection):
 
     def close(self):
         if self._socket is not None:
+
+            # Keep the TLS session for the next connection (with TLS 1.3 the session ticket
+            # is sent by the server after the handshake and thus is only available now).
+            if isinstance(self._socket, ssl.SSLSocket):
+                try:
+                    session = self._socket.session
+                    if session is not None and session.has_ticket:
+                        self._ssl_session = session
+
+                except Exception:
+                    pass
+
             self._socket.close()
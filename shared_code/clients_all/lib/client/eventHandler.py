@@ -7,7 +7,7 @@
 #
 # Licensed under the GNU Affero General Public License, version 3.
 
-from typing import List, Any
+from typing import List, Dict, Any
 from ..globalData.managerObjects import ManagerObjOption, ManagerObjNode, ManagerObjSensor, ManagerObjManager, \
     ManagerObjAlert, ManagerObjAlertLevel, ManagerObjSensorAlert, ManagerObjProfile
 from ..globalData.sensorObjects import SensorDataType, SensorErrorState
@@ -109,3 +109,29 @@ class EventHandler:
         :return Success or Failure
         """
         raise NotImplementedError("Abstract class.")
+
+    def status_update_delta(self,
+                            msg_time: int,
+                            options: List[ManagerObjOption],
+                            profiles: List[ManagerObjProfile],
+                            nodes: List[ManagerObjNode],
+                            sensors: List[ManagerObjSensor],
+                            managers: List[ManagerObjManager],
+                            alerts: List[ManagerObjAlert],
+                            alert_levels: List[ManagerObjAlertLevel],
+                            deleted: Dict[str, List[Any]]) -> bool:
+        """
+        Is called when a status update message was received that only contains the changes since the last one.
+
+        :param msg_time:
+        :param options: changed or new options
+        :param profiles: changed or new profiles
+        :param nodes: changed or new nodes
+        :param sensors: changed or new sensors
+        :param managers: changed or new managers
+        :param alerts: changed or new alerts
+        :param alert_levels: changed or new alert levels
+        :param deleted: ids of the deleted objects by list name (e.g., "sensors" or "alertLevels")
+        :return Success or Failure
+        """
+        raise NotImplementedError("Abstract class.")
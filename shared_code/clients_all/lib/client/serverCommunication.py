@@ -12,7 +12,7 @@ import logging
 import os
 import json
 import threading
-from typing import Dict, Any
+from typing import Dict, Any, Optional, List, Union
 from .core import Client
 from .util import MsgBuilder
 from .communication import Communication, Promise, MsgState
@@ -82,10 +82,21 @@ class ServerCommunication(Communication):
 
         self._initialization_lock = threading.Lock()
 
+        # Status version of the last status update received from the server
+        # (a status delta is only applied if it is based on this version).
+        self._status_version = None  # type: Optional[int]
+
+        # Flag that indicates if the server accepts batched sensor events (negotiated during the registration).
+        self._sensor_events_supported = False
+
     @property
     def event_handler(self) -> EventHandler:
         return self._event_handler
 
+    @property
+    def sensor_events_supported(self) -> bool:
+        return self._sensor_events_supported
+
     @property
     def is_connected(self) -> bool:
         return self.has_channel
@@ -262,10 +273,23 @@ class ServerCommunication(Communication):
             alerts_raw = incomingMessage["payload"]["alerts"]
             alert_levels_raw = incomingMessage["payload"]["alertLevels"]
 
+            status_version = incomingMessage["payload"].get("statusVersion", None)
+            base_version = incomingMessage["payload"].get("baseVersion", None)
+            deleted = dict()
+            if base_version is not None:
+                for key in ["options", "profiles", "nodes", "sensors", "managers", "alerts", "alertLevels"]:
+                    deleted[key] = incomingMessage["payload"]["deleted"].get(key, [])
+
         except Exception:
             logging.exception("[%s]: Received status invalid." % self._log_tag)
             return False
 
+        # A status delta can only be applied on top of the status it is based on.
+        if base_version is not None and base_version != self._status_version:
+            logging.error("[%s]: Received status delta is based on version %d but local version is %s."
+                          % (self._log_tag, base_version, str(self._status_version)))
+            return False
+
         logging.debug("[%s]: Received option count: %d." % (self._log_tag, len(options_raw)))
 
         # process received options
@@ -467,17 +491,37 @@ class ServerCommunication(Communication):
             alertLevel.instrumentation_timeout = instrumentation_timeout
             alertLevels.append(alertLevel)
 
+        # handle received status delta
+        if base_version is not None:
+            logging.debug("[%s]: Received status delta from version %d to %d."
+                          % (self._log_tag, base_version, status_version))
+
+            if not self._event_handler.status_update_delta(msg_time,
+                                                           options,
+                                                           profiles,
+                                                           nodes,
+                                                           sensors,
+                                                           managers,
+                                                           alerts,
+                                                           alertLevels,
+                                                           deleted):
+                self._status_version = None
+                return False
+
         # handle received status update
-        if not self._event_handler.status_update(msg_time,
-                                                 options,
-                                                 profiles,
-                                                 nodes,
-                                                 sensors,
-                                                 managers,
-                                                 alerts,
-                                                 alertLevels):
+        elif not self._event_handler.status_update(msg_time,
+                                                   options,
+                                                   profiles,
+                                                   nodes,
+                                                   sensors,
+                                                   managers,
+                                                   alerts,
+                                                   alertLevels):
+            self._status_version = None
             return False
 
+        self._status_version = status_version
+
         return True
 
     def _register_node(self,
@@ -539,10 +583,21 @@ class ServerCommunication(Communication):
                 logging.error("[%s]: Result not ok: '%s'." % (self._log_tag, message["payload"]["result"]))
                 return False
 
+            # Servers that do not support the pipelining mode do not answer the request for it.
+            pipelining = message["payload"].get("pipelining", False) is True
+            sensor_events_supported = message["payload"].get("sensorEvents", False) is True
+
         except Exception:
             logging.exception("[%s]: Receiving registration response failed." % self._log_tag)
             return False
 
+        self._sensor_events_supported = sensor_events_supported
+        self.set_pipelining(pipelining)
+        if pipelining:
+            # In pipelining mode the server can send the first frame directly after the registration response
+            # (it is already in the receive buffer).
+            logging.debug("[%s]: Using pipelining mode." % self._log_tag)
+
         return True
 
     def _verify_version_and_auth(self,
@@ -798,6 +853,9 @@ class ServerCommunication(Communication):
                 # Do not close the connection since it was not established yet.
                 return False
 
+            # The server sends a full status update to a new connection.
+            self._status_version = None
+
             # Build registration message.
             reg_message = ""
             if self._nodeType == "manager":
@@ -943,6 +1001,22 @@ class ServerCommunication(Communication):
 
         return self.send_request("sensoralert", sensor_alert_message)
 
+    def send_sensor_events(self,
+                           events: List[Union[SensorObjSensorAlert,
+                                              SensorObjStateChange,
+                                              SensorObjErrorStateChange]]) -> Promise:
+        """
+        This function sends multiple sensor alerts, state changes and error state changes in one message to the server
+        which processes them in the given order (only supported if the server announced it during the registration).
+
+        :param events:
+        :return: Promise that the request will be sent and that contains the state of the send request
+        """
+
+        sensor_events_message = MsgBuilder.build_sensor_events_msg_sensor(events)
+
+        return self.send_request("sensorevents", sensor_events_message)
+
     def send_state_change(self,
                           state_change: SensorObjStateChange) -> Promise:
         """
@@ -13,7 +13,7 @@ import json
 import socket
 import os
 import logging
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Union
 from ..globalData.sensorObjects import SensorDataType, SensorObjSensorAlert, SensorObjStateChange, \
     SensorObjErrorStateChange, SensorErrorState
 
@@ -330,6 +330,33 @@ class MsgChecker:
                 logging.error("[%s]: Received alertLevels invalid." % MsgChecker._log_tag)
                 return error_msg
 
+            # Status version is only sent to managers that support status deltas.
+            if "statusVersion" in message["payload"].keys():
+                error_msg = MsgChecker.check_status_version(message["payload"]["statusVersion"])
+                if error_msg is not None:
+                    logging.error("[%s]: Received statusVersion invalid." % MsgChecker._log_tag)
+                    return error_msg
+
+            # A status delta contains the version it is based on and the deleted objects.
+            if "baseVersion" in message["payload"].keys():
+                if "statusVersion" not in message["payload"].keys():
+                    logging.error("[%s]: statusVersion missing." % MsgChecker._log_tag)
+                    return "statusVersion expected"
+
+                error_msg = MsgChecker.check_status_version(message["payload"]["baseVersion"])
+                if error_msg is not None:
+                    logging.error("[%s]: Received baseVersion invalid." % MsgChecker._log_tag)
+                    return error_msg
+
+                if "deleted" not in message["payload"].keys():
+                    logging.error("[%s]: deleted missing." % MsgChecker._log_tag)
+                    return "deleted expected"
+
+                error_msg = MsgChecker.check_status_deleted_dict(message["payload"]["deleted"])
+                if error_msg is not None:
+                    logging.error("[%s]: Received deleted invalid." % MsgChecker._log_tag)
+                    return error_msg
+
         else:
             logging.error("[%s]: Unknown request/message type." % MsgChecker._log_tag)
             return "unknown request/message type"
@@ -1117,6 +1144,38 @@ class MsgChecker:
 
         return None
 
+    @staticmethod
+    def check_status_deleted_dict(deleted: Dict[str, List[Any]]) -> Optional[str]:
+        """
+        Internal function to check sanity of the status deleted dictionary.
+        :param deleted:
+        :return:
+        """
+        is_correct = True
+        if not isinstance(deleted, dict):
+            is_correct = False
+
+        else:
+            for key, ids in deleted.items():
+                if key not in ["options", "profiles", "nodes", "sensors", "managers", "alerts", "alertLevels"]:
+                    is_correct = False
+                    break
+
+                if not isinstance(ids, list):
+                    is_correct = False
+                    break
+
+                # Options are identified by their type, all other objects by an integer id.
+                id_type = str if key == "options" else int
+                if not all(isinstance(obj_id, id_type) for obj_id in ids):
+                    is_correct = False
+                    break
+
+        if not is_correct:
+            return "deleted dictionary not valid"
+
+        return None
+
     # Internal function to check sanity of the status options list.
     @staticmethod
     def check_status_options_list(options: List[Dict[str, Any]]) -> Optional[str]:
@@ -1192,6 +1251,22 @@ class MsgChecker:
 
         return None
 
+    @staticmethod
+    def check_status_version(status_version: int) -> Optional[str]:
+        """
+        Internal function to check sanity of a status version.
+        :param status_version:
+        :return:
+        """
+        is_correct = True
+        if not isinstance(status_version, int):
+            is_correct = False
+
+        if not is_correct:
+            return "status version not valid"
+
+        return None
+
     # Internal function to check sanity of the status sensors list.
     @staticmethod
     def check_status_sensors_list(sensors: List[Dict[str, Any]]) -> Optional[str]:
@@ -1412,6 +1487,7 @@ class MsgBuilder:
                    "nodeType": node_type,
                    "instance": instance,
                    "persistent": persistent,
+                   "pipelining": True,
                    "alerts": alerts}
 
         utc_timestamp = int(time.time())
@@ -1437,12 +1513,14 @@ class MsgBuilder:
         # build manager dict for the message
         manager = dict()
         manager["description"] = description
+        manager["statusDelta"] = True
 
         payload = {"type": "request",
                    "hostname": socket.gethostname(),
                    "nodeType": node_type,
                    "instance": instance,
                    "persistent": persistent,
+                   "pipelining": True,
                    "manager": manager}
 
         utc_timestamp = int(time.time())
@@ -1485,6 +1563,8 @@ class MsgBuilder:
                    "nodeType": node_type,
                    "instance": instance,
                    "persistent": persistent,
+                   "pipelining": True,
+                   "sensorEvents": True,
                    "sensors": msg_sensors}
 
         utc_timestamp = int(time.time())
@@ -1493,6 +1573,49 @@ class MsgBuilder:
                    "payload": payload}
         return json.dumps(message)
 
+    @staticmethod
+    def _build_error_state_change_payload(error_state_change: SensorObjErrorStateChange) -> Dict[str, Any]:
+        """
+        Internal function that builds the payload of an error state change for sensor nodes.
+
+        :param error_state_change:
+        """
+        return {"clientSensorId": error_state_change.clientSensorId,
+                "error_state": error_state_change.error_state.copy_to_dict()}
+
+    @staticmethod
+    def _build_sensor_alert_payload(sensor_alert: SensorObjSensorAlert) -> Dict[str, Any]:
+        """
+        Internal function that builds the payload of a sensor alert for sensor nodes.
+
+        :param sensor_alert:
+        """
+        payload = {"clientSensorId": sensor_alert.clientSensorId,
+                   "state": sensor_alert.state,
+                   "hasOptionalData": sensor_alert.hasOptionalData,
+                   "changeState": sensor_alert.changeState,
+                   "hasLatestData": sensor_alert.hasLatestData,
+                   "dataType": sensor_alert.dataType,
+                   "data": sensor_alert.data.copy_to_dict()}
+
+        # Only add optional data field if it should be transfered.
+        if sensor_alert.hasOptionalData:
+            payload["optionalData"] = sensor_alert.optionalData
+
+        return payload
+
+    @staticmethod
+    def _build_state_change_payload(state_change: SensorObjStateChange) -> Dict[str, Any]:
+        """
+        Internal function that builds the payload of a state change for sensor nodes.
+
+        :param state_change:
+        """
+        return {"clientSensorId": state_change.clientSensorId,
+                "state": state_change.state,
+                "dataType": state_change.dataType,
+                "data": state_change.data.copy_to_dict()}
+
     @staticmethod
     def build_error_state_change_msg_sensor(error_state_change: SensorObjErrorStateChange) -> str:
         """
@@ -1500,9 +1623,8 @@ class MsgBuilder:
 
         :param error_state_change:
         """
-        payload = {"type": "request",
-                   "clientSensorId": error_state_change.clientSensorId,
-                   "error_state": error_state_change.error_state.copy_to_dict()}
+        payload = {"type": "request"}
+        payload.update(MsgBuilder._build_error_state_change_payload(error_state_change))
 
         utc_timestamp = int(time.time())
         message = {"msgTime": utc_timestamp,
@@ -1518,18 +1640,8 @@ class MsgBuilder:
         :param sensor_alert:
         """
 
-        payload = {"type": "request",
-                   "clientSensorId": sensor_alert.clientSensorId,
-                   "state": sensor_alert.state,
-                   "hasOptionalData": sensor_alert.hasOptionalData,
-                   "changeState": sensor_alert.changeState,
-                   "hasLatestData": sensor_alert.hasLatestData,
-                   "dataType": sensor_alert.dataType,
-                   "data": sensor_alert.data.copy_to_dict()}
-
-        # Only add optional data field if it should be transfered.
-        if sensor_alert.hasOptionalData:
-            payload["optionalData"] = sensor_alert.optionalData
+        payload = {"type": "request"}
+        payload.update(MsgBuilder._build_sensor_alert_payload(sensor_alert))
 
         utc_timestamp = int(time.time())
         message = {"msgTime": utc_timestamp,
@@ -1544,11 +1656,8 @@ class MsgBuilder:
 
         :param state_change:
         """
-        payload = {"type": "request",
-                   "clientSensorId": state_change.clientSensorId,
-                   "state": state_change.state,
-                   "dataType": state_change.dataType,
-                   "data": state_change.data.copy_to_dict()}
+        payload = {"type": "request"}
+        payload.update(MsgBuilder._build_state_change_payload(state_change))
 
         utc_timestamp = int(time.time())
         message = {"msgTime": utc_timestamp,
@@ -1556,6 +1665,42 @@ class MsgBuilder:
                    "payload": payload}
         return json.dumps(message)
 
+    @staticmethod
+    def build_sensor_events_msg_sensor(events: List[Union[SensorObjSensorAlert,
+                                                          SensorObjStateChange,
+                                                          SensorObjErrorStateChange]]) -> str:
+        """
+        Internal function that builds a message for sensor nodes that contains multiple sensor alerts,
+        state changes and error state changes in the order they have to be processed.
+
+        :param events:
+        """
+        msg_events = list()
+        for event in events:
+            if isinstance(event, SensorObjSensorAlert):
+                msg_events.append({"message": "sensoralert",
+                                   "payload": MsgBuilder._build_sensor_alert_payload(event)})
+
+            elif isinstance(event, SensorObjStateChange):
+                msg_events.append({"message": "statechange",
+                                   "payload": MsgBuilder._build_state_change_payload(event)})
+
+            elif isinstance(event, SensorObjErrorStateChange):
+                msg_events.append({"message": "sensorerrorstatechange",
+                                   "payload": MsgBuilder._build_error_state_change_payload(event)})
+
+            else:
+                raise ValueError("Unknown sensor event type '%s'." % event.__class__.__name__)
+
+        payload = {"type": "request",
+                   "events": msg_events}
+
+        utc_timestamp = int(time.time())
+        message = {"msgTime": utc_timestamp,
+                   "message": "sensorevents",
+                   "payload": payload}
+        return json.dumps(message)
+
     @staticmethod
     def build_status_update_msg_sensor(polling_sensors) -> str:
         """
@@ -10,6 +10,7 @@
 import time
 import logging
 import os
+import random
 import threading
 from typing import Optional
 from .communication import Promise
@@ -47,8 +48,39 @@ class ConnectionWatchdog(threading.Thread):
         # internal counter to get the current count of connection retries
         self._connection_retries = 1
 
+        # Delays in seconds used for the reconnection attempts. The delay is doubled with each failed attempt
+        # up to the maximal delay and is randomized in order to spread the reconnections of all clients
+        # (for example, after a restart of the server all clients lose their connection at the same time).
+        self._reconnect_base_delay = 5.0
+        self._reconnect_max_delay = 120.0
+
         self._ping_delay_warning = 10
 
+    def _get_reconnect_delay(self, retries: int) -> float:
+        """
+        Gets the delay before the next reconnection attempt (exponential backoff with jitter).
+
+        :param retries: number of failed reconnection attempts
+        :return: delay in seconds
+        """
+        delay = min(self._reconnect_max_delay, self._reconnect_base_delay * (2 ** min(retries - 1, 16)))
+        return random.uniform(delay / 2.0, delay)
+
+    def _wait(self, seconds: float) -> bool:
+        """
+        Waits the given time or until the exit flag is set.
+
+        :param seconds:
+        :return: False if the exit flag was set
+        """
+        end = time.time() + seconds
+        while not self._exit_flag:
+            remaining = end - time.time()
+            if remaining <= 0.0:
+                return True
+            time.sleep(min(1.0, remaining))
+        return False
+
     def run(self):
         """
         Connection watchdog loop that checks the communication channel to the server.
@@ -74,6 +106,11 @@ class ConnectionWatchdog(threading.Thread):
 
                 logging.error("[%s]: Connection to server has died. " % self._log_tag)
 
+                # Do not reconnect at the same time as all other clients that lost their connection.
+                if not self._wait(random.uniform(0.0, self._reconnect_base_delay)):
+                    logging.info("[%s]: Exiting Connection Watchdog." % self._log_tag)
+                    return
+
                 # Reconnect to the server.
                 while True:
 
@@ -96,10 +133,13 @@ class ConnectionWatchdog(threading.Thread):
                         self._connection_retries = 1
                         break
 
+                    delay = self._get_reconnect_delay(self._connection_retries)
                     self._connection_retries += 1
 
-                    logging.error("[%s]: Reconnecting failed. Retrying in 5 seconds." % self._log_tag)
-                    time.sleep(5)
+                    logging.error("[%s]: Reconnecting failed. Retrying in %.1f seconds." % (self._log_tag, delay))
+                    if not self._wait(delay):
+                        logging.info("[%s]: Exiting Connection Watchdog." % self._log_tag)
+                        return
 
             # Check if the time of the data last received lies too far in the
             # past => send ping to check connection
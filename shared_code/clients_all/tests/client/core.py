@@ -187,6 +187,13 @@ def create_simulated_communication() -> Tuple[Communication, Communication]:
     return comm_client, comm_server
 
 
+def create_simulated_pipelining_communication() -> Tuple[Communication, Communication]:
+    comm_client, comm_server = create_simulated_communication()
+    comm_client.set_pipelining(True)
+    comm_server.set_pipelining(True)
+    return comm_client, comm_server
+
+
 def create_simulated_error_communication() -> Tuple[Communication, Communication]:
     lock_send_client = threading.Lock()
     lock_send_server = threading.Lock()
@@ -1,13 +1,20 @@
 import logging
 import json
+import os
+import shutil
+import socket
+import ssl
+import subprocess
+import tempfile
 import threading
 import time
 from unittest import TestCase
+from lib.client.core import Client
 from lib.client.util import MsgBuilder
 from lib.client.communication import MsgState
 from tests.util import config_logging, Timer
 from tests.client.core import create_basic_communication, create_simulated_error_communication, \
-                              msg_receiver, create_simulated_communication
+                              msg_receiver, create_simulated_communication, create_simulated_pipelining_communication
 
 
 class TestCommunicationBasic(TestCase):
@@ -503,3 +510,186 @@ class TestCommunicationBasic(TestCase):
             self.assertTrue(promise.is_finished(timeout=5.0))
             self.assertTrue(promise.was_successful())
         Timer.stop_timer("receive_msgs")
+
+    def test_pipelined_communication(self):
+        """
+        Tests that requests are sent in pipelining mode without waiting for the response of the previous request.
+        """
+        config_logging(logging.CRITICAL)
+        num_msgs = 20
+
+        comm_client, comm_server = create_simulated_pipelining_communication()
+
+        # Send messages before the server starts to receive them.
+        promises = list()
+        for i in range(num_msgs):
+            ping_msg = MsgBuilder.build_ping_msg()
+            ping_dict = json.loads(ping_msg)
+            ping_dict["num_msg"] = i
+            promises.append(comm_client.send_request("ping", json.dumps(ping_dict)))
+
+        # All requests up to the maximum in flight are sent without any response.
+        # noinspection PyUnresolvedReferences
+        server_recv_queue = comm_server._connection._recv_msg_queue
+        Timer.start_timer(self, "send_msgs", 5)
+        while len(server_recv_queue) != comm_client._max_in_flight:
+            time.sleep(0.1)
+        Timer.stop_timer("send_msgs")
+
+        # The client processes the responses while waiting for requests.
+        client_receiver = threading.Thread(target=comm_client.recv_request, daemon=True)
+        client_receiver.start()
+
+        Timer.start_timer(self, "receive_msgs", 10)
+        for i in range(num_msgs):
+            msg_request = comm_server.recv_request()
+
+            self.assertIsNotNone(msg_request)
+            self.assertEqual(msg_request.state, MsgState.OK)
+            self.assertEqual(msg_request.msg_dict["message"], "ping")
+            self.assertEqual(msg_request.msg_dict["num_msg"], i)
+
+        for promise in promises:
+            self.assertTrue(promise.is_finished(timeout=5.0))
+            self.assertTrue(promise.was_successful())
+        Timer.stop_timer("receive_msgs")
+
+        comm_client.exit()
+        comm_server.exit()
+
+    def test_pipelining_disconnect(self):
+        """
+        Tests that requests in flight are queued again if the connection is lost in pipelining mode.
+        """
+        config_logging(logging.CRITICAL)
+        num_msgs = 3
+
+        comm_client, comm_server = create_simulated_pipelining_communication()
+
+        promises = list()
+        for _ in range(num_msgs):
+            promises.append(comm_client.send_request("ping", MsgBuilder.build_ping_msg()))
+
+        Timer.start_timer(self, "send_msgs", 5)
+        while len(comm_client._transaction_ids) != num_msgs:
+            time.sleep(0.1)
+        Timer.stop_timer("send_msgs")
+
+        comm_client.close()
+
+        self.assertFalse(comm_client.pipelining)
+        self.assertEqual(0, len(comm_client._transaction_ids))
+        self.assertEqual(promises, comm_client._msg_queue)
+        for promise in promises:
+            self.assertFalse(promise.is_finished())
+            self.assertIsNone(promise.transaction_id)
+
+        comm_client.exit()
+        comm_server.exit()
+
+    def test_fragmented_and_concatenated_messages(self):
+        """
+        Tests that requests received in pieces or together with the following request are processed correctly.
+        """
+        config_logging(logging.CRITICAL)
+        num_msgs = 3
+
+        comm_client, comm_server = create_simulated_communication()
+
+        data = ""
+        for i in range(num_msgs):
+            ping_msg = MsgBuilder.build_ping_msg()
+            ping_dict = json.loads(ping_msg)
+            ping_dict["num_msg"] = i
+            ping_msg = json.dumps(ping_dict)
+            rts_msg = json.dumps({"size": len(ping_msg),
+                                  "message": "ping",
+                                  "payload": {"type": "rts",
+                                              "id": i}})
+            data += rts_msg + ping_msg
+
+        # noinspection PyUnresolvedReferences
+        server_recv_queue = comm_server._connection._recv_msg_queue
+        for i in range(0, len(data), 7):
+            server_recv_queue.append(data[i:i + 7])
+
+        for i in range(num_msgs):
+            msg_request = comm_server.recv_request()
+
+            self.assertIsNotNone(msg_request)
+            self.assertEqual(msg_request.state, MsgState.OK)
+            self.assertEqual(msg_request.msg_dict["message"], "ping")
+            self.assertEqual(msg_request.msg_dict["num_msg"], i)
+
+        # Each request was acknowledged by a CTS and a response.
+        # noinspection PyUnresolvedReferences
+        client_recv_queue = comm_client._connection._recv_msg_queue
+        self.assertEqual(num_msgs * 2, len(client_recv_queue))
+        for i in range(num_msgs):
+            self.assertEqual("cts", json.loads(client_recv_queue[i * 2])["payload"]["type"])
+            self.assertEqual(i, json.loads(client_recv_queue[i * 2])["payload"]["id"])
+            self.assertEqual("ok", json.loads(client_recv_queue[i * 2 + 1])["payload"]["result"])
+
+        comm_client.exit()
+        comm_server.exit()
+
+
+class TestClientTls(TestCase):
+
+    def _serve(self, server_context: ssl.SSLContext, listen_sock: socket.socket, count: int):
+        for _ in range(count):
+            conn, _ = listen_sock.accept()
+            try:
+                ssl_sock = server_context.wrap_socket(conn, server_side=True)
+                ssl_sock.sendall(ssl_sock.recv(1024))
+                ssl_sock.close()
+
+            except Exception:
+                conn.close()
+
+    def test_session_resumption(self):
+        """
+        Tests that the client resumes its TLS session when it reconnects to the server.
+        """
+        if shutil.which("openssl") is None:
+            self.skipTest("openssl not available")
+
+        temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, temp_dir)
+        cert_file = os.path.join(temp_dir, "server.crt")
+        key_file = os.path.join(temp_dir, "server.key")
+        subprocess.check_call(["openssl", "req", "-x509",
+                               "-newkey", "ec", "-pkeyopt", "ec_paramgen_curve:prime256v1",
+                               "-nodes",
+                               "-keyout", key_file,
+                               "-out", cert_file,
+                               "-days", "1",
+                               "-subj", "/CN=alertR test"],
+                              stdout=subprocess.DEVNULL,
+                              stderr=subprocess.DEVNULL)
+
+        server_context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        server_context.load_cert_chain(certfile=cert_file, keyfile=key_file)
+
+        listen_sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.addCleanup(listen_sock.close)
+        listen_sock.bind(("127.0.0.1", 0))
+        listen_sock.listen(5)
+        port = listen_sock.getsockname()[1]
+
+        server_thread = threading.Thread(target=self._serve,
+                                         args=(server_context, listen_sock, 2),
+                                         daemon=True)
+        server_thread.start()
+
+        client = Client("127.0.0.1", port, cert_file, None, None)
+        for i in range(2):
+            client.connect()
+            client.send("ping")
+            self.assertEqual(b"ping", client.recv(1024, timeout=5.0))
+            client.close()
+
+            self.assertIsNotNone(client.handshake_duration)
+            self.assertEqual(i == 1, client.session_reused)
+
+        server_thread.join(5.0)
@@ -7,7 +7,7 @@
 #
 # Licensed under the GNU Affero General Public License, version 3.
 
-from typing import List
+from typing import List, Dict, Any
 from .screenUpdater import ScreenUpdater
 from .core import BaseManagerEventHandler
 from ..globalData.globalData import GlobalData
@@ -53,6 +53,31 @@ class ManagerEventHandler(BaseManagerEventHandler):
 
         return result
 
+    def status_update_delta(self,
+                            msg_time: int,
+                            options: List[ManagerObjOption],
+                            profiles: List[ManagerObjProfile],
+                            nodes: List[ManagerObjNode],
+                            sensors: List[ManagerObjSensor],
+                            managers: List[ManagerObjManager],
+                            alerts: List[ManagerObjAlert],
+                            alert_levels: List[ManagerObjAlertLevel],
+                            deleted: Dict[str, List[Any]]) -> bool:
+
+        result = super().status_update_delta(msg_time,
+                                             options,
+                                             profiles,
+                                             nodes,
+                                             sensors,
+                                             managers,
+                                             alerts,
+                                             alert_levels,
+                                             deleted)
+
+        self.screen_updater.update_status()
+
+        return result
+
     def sensor_alert(self, msg_time: int, sensor_alert: ManagerObjSensorAlert) -> bool:
 
         result = super().sensor_alert(msg_time,
@@ -9,7 +9,7 @@
 
 import os
 import logging
-from typing import List
+from typing import List, Dict, Any
 from ..globalData.globalData import GlobalData
 from ..globalData.managerObjects import ManagerObjOption, ManagerObjNode, ManagerObjSensor, ManagerObjManager, ManagerObjAlert, \
     ManagerObjAlertLevel, ManagerObjSensorAlert, ManagerObjProfile
@@ -96,89 +96,101 @@ class BaseManagerEventHandler(EventHandler):
 
         return True
 
-    def status_update(self,
-                      msg_time: int,
-                      options: List[ManagerObjOption],
-                      profiles: List[ManagerObjProfile],
-                      nodes: List[ManagerObjNode],
-                      sensors: List[ManagerObjSensor],
-                      managers: List[ManagerObjManager],
-                      alerts: List[ManagerObjAlert],
-                      alert_levels: List[ManagerObjAlertLevel]) -> bool:
-
-        self.msg_time = msg_time
-
-        # Update system data storage with received data.
-        options_type = []
+    def _update_system_data(self,
+                            options: List[ManagerObjOption],
+                            profiles: List[ManagerObjProfile],
+                            nodes: List[ManagerObjNode],
+                            sensors: List[ManagerObjSensor],
+                            managers: List[ManagerObjManager],
+                            alerts: List[ManagerObjAlert],
+                            alert_levels: List[ManagerObjAlertLevel]) -> bool:
+        """
+        Internal function that updates the system data storage with the received objects.
+
+        :return: Success or Failure
+        """
         for option in options:
             try:
                 self._system_data.update_option(option)
-                options_type.append(option.type)
 
             except ValueError:
                 logging.exception("[%s]: Updating Option '%s' failed." % (self._log_tag, option.type))
                 return False
 
-        profile_ids = []
         for profile in profiles:
             try:
                 self._system_data.update_profile(profile)
-                profile_ids.append(profile.profileId)
 
             except ValueError:
                 logging.exception("[%s]: Updating Profile %d failed." % (self._log_tag, profile.profileId))
                 return False
 
-        alert_levels_int = set()
         for alert_level in alert_levels:
             try:
                 self._system_data.update_alert_level(alert_level)
-                alert_levels_int.add(alert_level.level)
 
             except ValueError:
                 logging.exception("[%s]: Updating Alert Level %d failed." % (self._log_tag, alert_level.level))
                 return False
 
-        nodes_int = set()
         for node in nodes:
             try:
                 self._system_data.update_node(node)
-                nodes_int.add(node.nodeId)
 
             except ValueError:
                 logging.exception("[%s]: Updating Node %d failed." % (self._log_tag, node.nodeId))
                 return False
 
-        alerts_int = set()
         for alert in alerts:
             try:
                 self._system_data.update_alert(alert)
-                alerts_int.add(alert.alertId)
 
             except ValueError:
                 logging.exception("[%s]: Updating Alert %d failed." % (self._log_tag, alert.alertId))
                 return False
 
-        managers_int = set()
         for manager in managers:
             try:
                 self._system_data.update_manager(manager)
-                managers_int.add(manager.managerId)
 
             except ValueError:
                 logging.exception("[%s]: Updating Manager %d failed." % (self._log_tag, manager.managerId))
                 return False
 
-        sensors_int = set()
         for sensor in sensors:
             try:
                 self._system_data.update_sensor(sensor)
-                sensors_int.add(sensor.sensorId)
 
             except ValueError:
                 logging.exception("[%s]: Updating Sensor %d failed." % (self._log_tag, sensor.sensorId))
                 return False
 
+        return True
+
+    def status_update(self,
+                      msg_time: int,
+                      options: List[ManagerObjOption],
+                      profiles: List[ManagerObjProfile],
+                      nodes: List[ManagerObjNode],
+                      sensors: List[ManagerObjSensor],
+                      managers: List[ManagerObjManager],
+                      alerts: List[ManagerObjAlert],
+                      alert_levels: List[ManagerObjAlertLevel]) -> bool:
+
+        self.msg_time = msg_time
+
+        # Update system data storage with received data.
+        if not self._update_system_data(options, profiles, nodes, sensors, managers, alerts, alert_levels):
+            return False
+
+        options_type = set([option.type for option in options])
+        profile_ids = set([profile.profileId for profile in profiles])
+        alert_levels_int = set([alert_level.level for alert_level in alert_levels])
+        nodes_int = set([node.nodeId for node in nodes])
+        alerts_int = set([alert.alertId for alert in alerts])
+        managers_int = set([manager.managerId for manager in managers])
+        sensors_int = set([sensor.sensorId for sensor in sensors])
+
         # Clean system data storage of not existing data.
         for option in self._system_data.get_options_list():
             if option.type not in options_type:
@@ -209,3 +221,44 @@ class BaseManagerEventHandler(EventHandler):
                 self._system_data.delete_sensor_by_id(sensor.sensorId)
 
         return True
+
+    def status_update_delta(self,
+                            msg_time: int,
+                            options: List[ManagerObjOption],
+                            profiles: List[ManagerObjProfile],
+                            nodes: List[ManagerObjNode],
+                            sensors: List[ManagerObjSensor],
+                            managers: List[ManagerObjManager],
+                            alerts: List[ManagerObjAlert],
+                            alert_levels: List[ManagerObjAlertLevel],
+                            deleted: Dict[str, List[Any]]) -> bool:
+
+        self.msg_time = msg_time
+
+        # Update system data storage with changed data.
+        if not self._update_system_data(options, profiles, nodes, sensors, managers, alerts, alert_levels):
+            return False
+
+        # Remove deleted data from system data storage (same order as for a full status update).
+        for option_type in deleted.get("options", []):
+            self._system_data.delete_option_by_type(option_type)
+
+        for profile_id in deleted.get("profiles", []):
+            self._system_data.delete_profile_by_id(profile_id)
+
+        for level in deleted.get("alertLevels", []):
+            self._system_data.delete_alert_level_by_level(level)
+
+        for node_id in deleted.get("nodes", []):
+            self._system_data.delete_node_by_id(node_id)
+
+        for alert_id in deleted.get("alerts", []):
+            self._system_data.delete_alert_by_id(alert_id)
+
+        for manager_id in deleted.get("managers", []):
+            self._system_data.delete_manager_by_id(manager_id)
+
+        for sensor_id in deleted.get("sensors", []):
+            self._system_data.delete_sensor_by_id(sensor_id)
+
+        return True
@@ -499,3 +499,98 @@ class TestManagerCoreStatusUpdate(TestSystemDataCore):
 
             if not found:
                 self.fail("Stored Alert Level object not found in local objects.")
+
+    def test_delta_update(self):
+        """
+        Tests status delta that only contains changed objects.
+        """
+        global_data = GlobalData()
+        global_data.system_data = self._create_system_data()
+        event_handler = BaseManagerEventHandler(global_data)
+
+        # Change single local objects.
+        changed_option = self.options[0]
+        changed_option.value += 1
+
+        changed_node = self.nodes[0]
+        changed_node.hostname += "_new"
+
+        changed_sensor = self.sensors[0]
+        changed_sensor.description += "_new"
+
+        if not event_handler.status_update_delta(0,
+                                                 [changed_option],
+                                                 [],
+                                                 [changed_node],
+                                                 [changed_sensor],
+                                                 [],
+                                                 [],
+                                                 [],
+                                                 {}):
+            self.fail("Status delta failed.")
+
+        # Unchanged objects are still stored.
+        if len(self.options) != len(global_data.system_data.get_options_list()):
+            self.fail("Number of stored objects wrong.")
+
+        if len(self.nodes) != len(global_data.system_data.get_nodes_list()):
+            self.fail("Number of stored objects wrong.")
+
+        if len(self.sensors) != len(global_data.system_data.get_sensors_list()):
+            self.fail("Number of stored objects wrong.")
+
+        compare_options_content(self, self.options, global_data.system_data.get_options_list())
+        compare_nodes_content(self, self.nodes, global_data.system_data.get_nodes_list())
+        compare_sensors_content(self, self.sensors, global_data.system_data.get_sensors_list())
+        compare_alerts_content(self, self.alerts, global_data.system_data.get_alerts_list())
+        compare_managers_content(self, self.managers, global_data.system_data.get_managers_list())
+        compare_profiles_content(self, self.profiles, global_data.system_data.get_profiles_list())
+        compare_alert_levels_content(self, self.alert_levels, global_data.system_data.get_alert_levels_list())
+
+    def test_delta_deletion(self):
+        """
+        Tests status delta of object deletion.
+        """
+        global_data = GlobalData()
+        global_data.system_data = self._create_system_data()
+        event_handler = BaseManagerEventHandler(global_data)
+
+        option_to_remove = self.options[0]
+        self.options.remove(option_to_remove)
+
+        alert_to_remove = self.alerts[0]
+        self.alerts.remove(alert_to_remove)
+
+        manager_to_remove = self.managers[0]
+        self.managers.remove(manager_to_remove)
+
+        sensor_to_remove = self.sensors[0]
+        self.sensors.remove(sensor_to_remove)
+
+        deleted = {"options": [option_to_remove.type],
+                   "alerts": [alert_to_remove.alertId],
+                   "managers": [manager_to_remove.managerId],
+                   "sensors": [sensor_to_remove.sensorId]}
+
+        if not event_handler.status_update_delta(0, [], [], [], [], [], [], [], deleted):
+            self.fail("Status delta failed.")
+
+        if len(self.options) != len(global_data.system_data.get_options_list()):
+            self.fail("Number of stored objects wrong.")
+
+        if len(self.alerts) != len(global_data.system_data.get_alerts_list()):
+            self.fail("Number of stored objects wrong.")
+
+        if len(self.managers) != len(global_data.system_data.get_managers_list()):
+            self.fail("Number of stored objects wrong.")
+
+        if len(self.sensors) != len(global_data.system_data.get_sensors_list()):
+            self.fail("Number of stored objects wrong.")
+
+        if len(self.nodes) != len(global_data.system_data.get_nodes_list()):
+            self.fail("Number of stored objects wrong.")
+
+        compare_options_content(self, self.options, global_data.system_data.get_options_list())
+        compare_alerts_content(self, self.alerts, global_data.system_data.get_alerts_list())
+        compare_managers_content(self, self.managers, global_data.system_data.get_managers_list())
+        compare_sensors_content(self, self.sensors, global_data.system_data.get_sensors_list())
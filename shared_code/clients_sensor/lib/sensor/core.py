@@ -12,6 +12,7 @@ import os
 import logging
 import threading
 from typing import Optional, List, Union, Dict, Any
+from ..client.communication import Promise
 from ..client.serverCommunication import ServerCommunication
 from ..globalData import GlobalData
 # noinspection PyProtectedMember
@@ -385,6 +386,17 @@ class SensorExecuter(threading.Thread):
         # Interval in which a full state of the Sensors are send to the server.
         self._full_state_interval = 60
 
+        # Maximum number of events that are sent to the server in one message.
+        self._max_events_per_message = 100
+
+        # Polled events that are not yet handed to the server communication. If the server supports batched
+        # sensor events, events are held back while previously sent event messages are not yet finished
+        # (e.g., because the connection to the server is down) and are then sent together in batches.
+        self._backlog = []  # type: List[Union[SensorObjSensorAlert, SensorObjStateChange, SensorObjErrorStateChange]]
+
+        # Promises of the sent event messages that are not yet finished.
+        self._pending_promises = []  # type: List[Promise]
+
         self._exit_flag = False
 
         self._is_initialized = False
@@ -417,22 +429,35 @@ class SensorExecuter(threading.Thread):
                 continue
 
             # Poll all sensors and send their alerts/states.
+            events = self._backlog
             for sensor in self._sensors:
                 for event in sensor.get_events():
                     if type(event) == SensorObjSensorAlert:
                         logging.info("[%s]: Sensor alert triggered for Sensor %d with state %d."
                                      % (self._log_tag, sensor.id, event.state))
-                        self._connection.send_sensor_alert(event)
 
                     elif type(event) == SensorObjStateChange:
                         logging.debug("[%s]: State changed for Sensor %d to state %d."
                                       % (self._log_tag, sensor.id, event.state))
-                        self._connection.send_state_change(event)
 
                     elif type(event) == SensorObjErrorStateChange:
                         logging.debug("[%s]: Error state changed for Sensor %d to error state %d"
                                       % (self._log_tag, sensor.id, event.error_state.state))
-                        self._connection.send_error_state_change(event)
+
+                    else:
+                        continue
+
+                    events.append(event)
+
+            # Hold events back while earlier event messages are still queued in the server communication
+            # (e.g., waiting for the reconnect) to send them batched together afterwards.
+            self._pending_promises = [promise for promise in self._pending_promises if not promise.is_finished()]
+            if self._pending_promises and self._connection.sensor_events_supported:
+                self._backlog = events
+
+            else:
+                self._backlog = list()
+                self._send_events(events)
 
             # Check if the last state that was sent to the server is older than 60 seconds => send state update
             utc_timestamp = int(time.time())
@@ -446,6 +471,33 @@ class SensorExecuter(threading.Thread):
 
             time.sleep(0.5)
 
+    def _send_events(self, events: List[Union[SensorObjSensorAlert,
+                                              SensorObjStateChange,
+                                              SensorObjErrorStateChange]]):
+        """
+        Internal function that sends the polled events to the server. Multiple events are sent in one message
+        (processed by the server in one transaction) if the server supports it. The order of the events is kept.
+
+        :param events:
+        """
+        if len(events) > 1 and self._connection.sensor_events_supported:
+            for i in range(0, len(events), self._max_events_per_message):
+                promise = self._connection.send_sensor_events(events[i:i + self._max_events_per_message])
+                self._pending_promises.append(promise)
+            return
+
+        for event in events:
+            if type(event) == SensorObjSensorAlert:
+                promise = self._connection.send_sensor_alert(event)
+
+            elif type(event) == SensorObjStateChange:
+                promise = self._connection.send_state_change(event)
+
+            else:
+                promise = self._connection.send_error_state_change(event)
+
+            self._pending_promises.append(promise)
+
     def exit(self):
         self._exit_flag = True
         for sensor in self._sensors:
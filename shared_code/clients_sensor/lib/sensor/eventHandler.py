@@ -9,7 +9,7 @@
 
 import logging
 import os
-from typing import List
+from typing import List, Dict, Any
 from ..client import EventHandler
 from ..globalData import ManagerObjManager, ManagerObjNode, ManagerObjOption, ManagerObjSensorAlert, \
     ManagerObjAlertLevel, ManagerObjAlert, ManagerObjSensor, ManagerObjProfile
@@ -38,6 +38,20 @@ class SensorEventHandler(EventHandler):
         logging.critical("[%s]: status_update() not supported by node of type 'sensor'." % self._log_tag)
         raise NotImplementedError("Not supported by node of type 'sensor'.")
 
+    # noinspection PyTypeChecker
+    def status_update_delta(self,
+                            msg_time: int,
+                            options: List[ManagerObjOption],
+                            profiles: List[ManagerObjProfile],
+                            nodes: List[ManagerObjNode],
+                            sensors: List[ManagerObjSensor],
+                            managers: List[ManagerObjManager],
+                            alerts: List[ManagerObjAlert],
+                            alert_levels: List[ManagerObjAlertLevel],
+                            deleted: Dict[str, List[Any]]) -> bool:
+        logging.critical("[%s]: status_update_delta() not supported by node of type 'sensor'." % self._log_tag)
+        raise NotImplementedError("Not supported by node of type 'sensor'.")
+
     # noinspection PyTypeChecker
     def sensor_alert(self,
                      msg_time: int,
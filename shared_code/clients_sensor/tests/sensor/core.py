@@ -1,9 +1,11 @@
 import time
-from typing import List, Tuple
+from typing import List, Tuple, Union
 from lib.client.communication import Promise
-from lib.globalData.sensorObjects import SensorObjSensorAlert, SensorObjStateChange
+from lib.globalData.sensorObjects import SensorObjSensorAlert, SensorObjStateChange, SensorObjErrorStateChange
 from lib.sensor.core import _PollingSensor
 
+SensorEvent = Union[SensorObjSensorAlert, SensorObjStateChange, SensorObjErrorStateChange]
+
 
 class MockServerCommunication:
 
@@ -12,6 +14,20 @@ class MockServerCommunication:
         self._send_sensor_alerts = []  # type: List[Tuple[float, SensorObjSensorAlert]]
         self._send_state_changes = []  # type: List[Tuple[float, SensorObjStateChange]]
         self._send_sensors_status_updates = []  # type: List[int]
+        self._send_sensor_event_batches = []  # type: List[Tuple[float, List[SensorEvent]]]
+        self._sensor_events_supported = False
+
+        # Flag that indicates if the returned promises of sent sensor events are finished
+        # (otherwise they are pending as if they wait in the queue for the connection).
+        self._finish_promises = True
+        self._promises = []  # type: List[Promise]
+
+    def _new_promise(self, msg_type: str) -> Promise:
+        promise = Promise(msg_type, "place holder %s msg" % msg_type)
+        if self._finish_promises:
+            promise.set_success()
+        self._promises.append(promise)
+        return promise
 
     @property
     def is_connected(self) -> bool:
@@ -21,6 +37,14 @@ class MockServerCommunication:
     def send_sensor_alerts(self) -> List[Tuple[float, SensorObjSensorAlert]]:
         return self._send_sensor_alerts
 
+    @property
+    def send_sensor_event_batches(self) -> List[Tuple[float, List[SensorEvent]]]:
+        return self._send_sensor_event_batches
+
+    @property
+    def sensor_events_supported(self) -> bool:
+        return self._sensor_events_supported
+
     @property
     def send_sensors_status_updates(self) -> List[int]:
         return self._send_sensors_status_updates
@@ -32,12 +56,17 @@ class MockServerCommunication:
     def send_sensor_alert(self,
                           sensor_alert: SensorObjSensorAlert) -> Promise:
         self._send_sensor_alerts.append((time.time(), sensor_alert))
-        return Promise("sensoralert", "place holder sensoralert msg")
+        return self._new_promise("sensoralert")
+
+    def send_sensor_events(self,
+                           events: List[SensorEvent]) -> Promise:
+        self._send_sensor_event_batches.append((time.time(), list(events)))
+        return self._new_promise("sensorevents")
 
     def send_state_change(self,
                           state_change: SensorObjStateChange) -> Promise:
         self._send_state_changes.append((time.time(), state_change))
-        return Promise("statechange", "place holder statechange msg")
+        return self._new_promise("statechange")
 
     def send_sensors_status_update(self):
         self._send_sensors_status_updates.append(int(time.time()))
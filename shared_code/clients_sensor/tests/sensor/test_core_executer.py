@@ -131,6 +131,104 @@ class TestSensorExecuter(TestCase):
         self.assertEqual(len(self._communication.send_sensor_alerts), num_sensor_alerts)
         self.assertEqual(len(self._communication.send_state_changes), num_state_changes)
 
+    def test_event_triggered_batched(self):
+        """
+        Tests that multiple events are sent in batches in the correct order if the server supports it.
+        """
+        num_events = 11
+        self._communication._sensor_events_supported = True
+        self._sensor_executer._max_events_per_message = 4
+        self._sensor_executer.start()
+
+        time.sleep(1)
+
+        # Queue all events while disconnected to have them polled in one round.
+        self._communication._is_connected = False
+
+        sensor = self._sensors[0]
+        gt_events_list = []
+        for i in range(num_events):
+            if i % 2 == 0:
+                sensor_alert = SensorObjSensorAlert()
+                sensor_alert.clientSensorId = i
+                sensor_alert.state = 1
+                sensor_alert.hasOptionalData = False
+                sensor_alert.changeState = False
+                sensor_alert.hasLatestData = False
+                sensor_alert.dataType = SensorDataType.NONE
+                sensor_alert.data = SensorDataNone()
+                sensor.add_sensor_alert(sensor_alert)
+                gt_events_list.append(sensor_alert)
+
+            else:
+                state_change = SensorObjStateChange()
+                state_change.clientSensorId = i
+                state_change.state = 1
+                state_change.dataType = SensorDataType.NONE
+                state_change.data = SensorDataNone()
+                sensor.add_state_change(state_change)
+                gt_events_list.append(state_change)
+
+        self._communication._is_connected = True
+        time.sleep(1)
+
+        self.assertEqual(len(self._communication.send_sensor_alerts), 0)
+        self.assertEqual(len(self._communication.send_state_changes), 0)
+        self.assertEqual([4, 4, 3], [len(events) for _, events in self._communication.send_sensor_event_batches])
+
+        sent_events = []
+        for _, events in self._communication.send_sensor_event_batches:
+            sent_events.extend(events)
+        self.assertEqual(gt_events_list, sent_events)
+
+    def test_event_backlog_batched(self):
+        """
+        Tests that events triggered while earlier event messages wait in the queue for the connection
+        are sent together in one batch afterwards if the server supports it.
+        """
+        self._communication._sensor_events_supported = True
+        self._communication._finish_promises = False
+        self._sensor_executer.start()
+
+        time.sleep(1)
+
+        sensor = self._sensors[0]
+        state_change = SensorObjStateChange()
+        state_change.clientSensorId = 0
+        state_change.state = 1
+        state_change.dataType = SensorDataType.NONE
+        state_change.data = SensorDataNone()
+        sensor.add_state_change(state_change)
+
+        time.sleep(1)
+
+        self.assertEqual(1, len(self._communication.send_state_changes))
+
+        # Trigger events in different poll rounds while the first message is not yet sent.
+        gt_events_list = []
+        for i in range(1, 4):
+            state_change = SensorObjStateChange()
+            state_change.clientSensorId = i
+            state_change.state = 1
+            state_change.dataType = SensorDataType.NONE
+            state_change.data = SensorDataNone()
+            sensor.add_state_change(state_change)
+            gt_events_list.append(state_change)
+            time.sleep(0.7)
+
+        self.assertEqual(1, len(self._communication.send_state_changes))
+        self.assertEqual(0, len(self._communication.send_sensor_event_batches))
+
+        # Message is sent after the connection is available again.
+        for promise in self._communication._promises:
+            promise.set_success()
+
+        time.sleep(1)
+
+        self.assertEqual(1, len(self._communication.send_state_changes))
+        self.assertEqual(1, len(self._communication.send_sensor_event_batches))
+        self.assertEqual(gt_events_list, self._communication.send_sensor_event_batches[0][1])
+
     def test_full_state_update_interval(self):
         """
         Tests if in the given interval a full state update of the sensors is sent to the server.